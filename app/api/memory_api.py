@@ -161,6 +161,11 @@ async def list_mcp_tools():
                     "properties": {
                         "search_text": {"type": "string", "description": "搜索文本"},
                         "memory_types": {"type": "array", "items": {"type": "string"}, "description": "记忆类型过滤"},
+                        "importance_levels": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "重要性级别过滤",
+                        },
                         "limit": {"type": "integer", "minimum": 1, "maximum": 100, "description": "返回数量限制"},
                         "min_similarity": {
                             "type": "number",
@@ -18,6 +18,9 @@ class DatabaseConfig:
     def __init__(self):
         # 数据库存储根目录
         self.db_root = os.getenv("DB_ROOT", "data/databases")
+        # Per-plan 数据库连接池：同时打开的连接上限（含空闲与使用中，0 表示不缓存、不限制）与空闲超时秒数
+        self.plan_pool_max_open = int(os.getenv("PLAN_DB_POOL_MAX_OPEN", "64"))
+        self.plan_pool_idle_timeout = float(os.getenv("PLAN_DB_POOL_IDLE_TIMEOUT", "300"))
         self.ensure_db_directory()
 
     def ensure_db_directory(self):
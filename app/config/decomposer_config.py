@@ -23,6 +23,8 @@ class DecomposerSettings:
     retry_limit: int = 1
     allow_existing_children: bool = False
     enable_web_search: bool = True
+    # Nodes of one BFS level decomposed in parallel; 1 keeps the sequential loop.
+    max_concurrency: int = 1
 
 
 @lru_cache(maxsize=1)
@@ -78,6 +80,9 @@ def get_decomposer_settings() -> DecomposerSettings:
         enable_web_search=_env_bool(
             "DECOMP_ENABLE_WEB_SEARCH", defaults.enable_web_search
         ),
+        max_concurrency=max(
+            1, _env_int("DECOMP_MAX_CONCURRENCY", defaults.max_concurrency)
+        ),
     )
 
     return settings
@@ -35,6 +35,13 @@ class SearchSettings:
     perplexity_model: str = "sonar-pro"
     perplexity_timeout: float = 30.0
 
+    # 结果缓存：相同（规范化后的）查询在 TTL 内直接复用，并发相同查询只请求一次
+    cache_enabled: bool = True
+    cache_ttl: float = 1800.0
+    cache_max_entries: int = 512
+    # 批量查询时的最大并发数
+    batch_concurrency: int = 4
+
 
 def _env(key: str, default: Optional[str] = None) -> Optional[str]:
     value = os.getenv(key)
@@ -73,6 +80,20 @@ def get_search_settings() -> SearchSettings:
     except Exception:
         perplexity_timeout = 30.0
 
+    cache_enabled = (_env("WEB_SEARCH_CACHE_ENABLED", "true") or "true").lower() not in {"0", "false", "no", "off"}
+    try:
+        cache_ttl = float(_env("WEB_SEARCH_CACHE_TTL", "1800") or "1800")
+    except Exception:
+        cache_ttl = 1800.0
+    try:
+        cache_max_entries = int(_env("WEB_SEARCH_CACHE_MAX_ENTRIES", "512") or "512")
+    except Exception:
+        cache_max_entries = 512
+    try:
+        batch_concurrency = max(1, int(_env("WEB_SEARCH_BATCH_CONCURRENCY", "4") or "4"))
+    except Exception:
+        batch_concurrency = 4
+
     return SearchSettings(
         default_provider=default_provider or "builtin",
         builtin_provider=builtin_provider or "qwen",
@@ -87,6 +108,10 @@ def get_search_settings() -> SearchSettings:
         perplexity_api_url=perplexity_api_url or "https://api.perplexity.ai/chat/completions",
         perplexity_model=perplexity_model or "sonar-pro",
         perplexity_timeout=perplexity_timeout,
+        cache_enabled=cache_enabled,
+        cache_ttl=cache_ttl,
+        cache_max_entries=cache_max_entries,
+        batch_concurrency=batch_concurrency,
     )
 
 
@@ -12,7 +12,13 @@ from pathlib import Path
 from typing import Iterator
 
 from .config.database_config import get_database_config, get_main_database_path
-from .database_pool import get_connection_pool, get_db, initialize_connection_pool
+from .database_pool import (
+    close_plan_connection_pool,
+    get_connection_pool,
+    get_db,
+    get_plan_connection_pool,
+    initialize_connection_pool,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -35,11 +41,14 @@ def init_db() -> None:
                 description TEXT,
                 metadata TEXT,
                 plan_db_path TEXT,
+                task_count INTEGER,
+                task_status_counts TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
             """
         )
+        _ensure_plan_columns(conn)
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS chat_sessions (
@@ -141,31 +150,34 @@ def init_db() -> None:
 def close_db_pool() -> None:
     """关闭连接池，释放资源。"""
     get_connection_pool().close_pool()
+    close_plan_connection_pool()
 
 
 @contextmanager
 def plan_db_connection(plan_path: Path) -> Iterator:
-    """针对单个 plan 文件建立连接的便捷方法."""
-    import sqlite3
+    """针对单个 plan 文件获取连接（复用 per-plan 连接池，WAL 模式）.
 
-    conn = sqlite3.connect(plan_path, isolation_level="DEFERRED")
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys=ON")
-
-    try:
+    整个 with 块是一个事务：正常退出提交，异常回滚。
+    """
+    with get_plan_connection_pool().connection(plan_path) as conn:
         yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
 
 
 def _ensure_plan_directory(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+def _ensure_plan_columns(conn) -> None:
+    """为旧库补充任务计数冗余列（NULL 表示尚未回填）。"""
+    info_rows = conn.execute("PRAGMA table_info(plans)").fetchall()
+    existing = {row["name"] for row in info_rows}
+
+    if "task_count" not in existing:
+        conn.execute("ALTER TABLE plans ADD COLUMN task_count INTEGER")
+    if "task_status_counts" not in existing:
+        conn.execute("ALTER TABLE plans ADD COLUMN task_status_counts TEXT")
+
+
 def _ensure_chat_session_columns(conn) -> None:
     """Ensure newly required columns exist on chat_sessions table."""
     info_rows = conn.execute("PRAGMA table_info(chat_sessions)").fetchall()
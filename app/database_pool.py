@@ -6,12 +6,16 @@ to replace the current pattern of creating new connections for each operation.
 """
 
 import logging
+import os
 import queue
 import sqlite3
 import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -276,3 +280,319 @@ def get_pool_stats() -> dict:
     """Get connection pool statistics."""
     pool = get_connection_pool()
     return pool.get_stats()
+
+
+@dataclass
+class _PlanConnection:
+    conn: sqlite3.Connection
+    key: str
+    identity: Tuple[int, int]
+    generation: int
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class PlanConnectionPool:
+    """
+    Keyed pool of connections to the per-plan SQLite files.
+
+    Every plan (and session) has its own database file, so a single-file pool
+    does not fit. Connections are cached per file path and reused by whoever
+    asks for that file next:
+
+    - new connections switch the file to WAL and apply the same tuned pragmas
+      as the main pool (``synchronous=NORMAL``, page cache, mmap);
+    - at most ``max_open`` connections (idle plus checked out) are open at
+      once; when a new one is needed at the limit, idle connections of the
+      least recently used files are closed first, and if every connection is
+      checked out the caller waits up to ``timeout`` seconds for one to be
+      returned (then ``sqlite3.OperationalError``);
+    - at most ``max_idle_per_file`` idle connections are kept per file;
+    - connections idle longer than ``idle_timeout`` are closed on the next
+      release;
+    - a cached connection whose file was deleted or replaced since it was
+      opened is discarded instead of reused.
+
+    A thread that already holds a connection never waits: nested use (of the
+    same or another plan file) opens one more connection past the limit, so
+    it cannot deadlock against itself. ``max_open=0`` disables caching and
+    the limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_open: int = 64,
+        max_idle_per_file: int = 4,
+        idle_timeout: float = 300.0,
+        timeout: float = 30.0,
+        cache_size_kib: int = 8192,
+        mmap_size: int = 64 * 1024 * 1024,
+    ):
+        self.max_open = max(0, max_open)
+        self.max_idle_per_file = max(1, max_idle_per_file)
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self._idle: "OrderedDict[str, List[_PlanConnection]]" = OrderedDict()
+        self._idle_count = 0
+        self._in_use = 0
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._returned = threading.Condition(self._lock)
+        self._held = threading.local()
+        self._stats: Dict[str, int] = {
+            "opened": 0,
+            "reused": 0,
+            "closed_idle": 0,
+            "closed_lru": 0,
+            "closed_stale": 0,
+            "waits": 0,
+            "over_limit": 0,
+        }
+
+    @contextmanager
+    def connection(self, db_path: Union[str, Path]) -> Iterator[sqlite3.Connection]:
+        """
+        Check out a connection for ``db_path``.
+
+        The block runs in one transaction: committed on success, rolled back
+        on error, as with a freshly opened connection.
+        """
+        entry = self._acquire(os.path.abspath(os.fspath(db_path)))
+        conn = entry.conn
+        self._held.depth = getattr(self._held, "depth", 0) + 1
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            raise
+        finally:
+            self._held.depth -= 1
+            self._release(entry)
+
+    def discard(self, db_path: Union[str, Path]) -> None:
+        """Close cached connections to ``db_path`` (e.g. before deleting it).
+
+        Connections to it that are checked out right now are closed when they
+        are returned.
+        """
+        key = os.path.abspath(os.fspath(db_path))
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            entries = self._idle.pop(key, [])
+            self._idle_count -= len(entries)
+        self._close_all(entries)
+
+    def close_pool(self) -> None:
+        """Close every idle connection; checked-out ones close on return."""
+        with self._lock:
+            entries = [entry for stack in self._idle.values() for entry in stack]
+            for key in self._idle:
+                self._generations[key] = self._generations.get(key, 0) + 1
+            self._idle.clear()
+            self._idle_count = 0
+        self._close_all(entries)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_open": self.max_open,
+                "open_connections": self._idle_count + self._in_use,
+                "open_files": len(self._idle),
+                "idle_connections": self._idle_count,
+                "in_use": self._in_use,
+                **self._stats,
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _acquire(self, key: str) -> _PlanConnection:
+        to_close: List[_PlanConnection] = []
+        entry: Optional[_PlanConnection] = None
+        nested = getattr(self._held, "depth", 0) > 0
+        deadline = time.monotonic() + self.timeout
+        with self._lock:
+            while True:
+                entry = self._pop_idle_locked(key, to_close)
+                if entry is not None or self.max_open == 0:
+                    break
+                # A new connection is needed: make room by closing other
+                # files' idle connections, else wait for one to be returned.
+                while self._idle_count + self._in_use >= self.max_open and self._idle:
+                    to_close.append(self._pop_lru_locked())
+                if self._idle_count + self._in_use < self.max_open:
+                    break
+                if nested:
+                    self._stats["over_limit"] += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._close_all(to_close)
+                    raise sqlite3.OperationalError(
+                        f"timed out waiting for a plan database connection (max_open={self.max_open})"
+                    )
+                self._stats["waits"] += 1
+                self._returned.wait(remaining)
+            self._in_use += 1
+            generation = self._generations.get(key, 0)
+        self._close_all(to_close)
+        if entry is not None:
+            return entry
+        try:
+            return self._open(key, generation)
+        except BaseException:
+            with self._lock:
+                self._in_use -= 1
+                self._returned.notify()
+            raise
+
+    def _pop_idle_locked(self, key: str, stale: List[_PlanConnection]) -> Optional[_PlanConnection]:
+        entry: Optional[_PlanConnection] = None
+        stack = self._idle.get(key)
+        while stack:
+            candidate = stack.pop()
+            self._idle_count -= 1
+            if _file_identity(key) == candidate.identity:
+                entry = candidate
+                self._stats["reused"] += 1
+                break
+            stale.append(candidate)
+            self._stats["closed_stale"] += 1
+        if stack is not None and not stack:
+            self._idle.pop(key, None)
+        return entry
+
+    def _pop_lru_locked(self) -> _PlanConnection:
+        key, stack = next(iter(self._idle.items()))
+        entry = stack.pop(0)
+        self._idle_count -= 1
+        self._stats["closed_lru"] += 1
+        if not stack:
+            del self._idle[key]
+        return entry
+
+    def _open(self, key: str, generation: int) -> _PlanConnection:
+        conn = sqlite3.connect(
+            key,
+            timeout=self.timeout,
+            isolation_level="DEFERRED",
+            check_same_thread=False,  # handed between threads, never shared
+        )
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        with self._lock:
+            self._stats["opened"] += 1
+        return _PlanConnection(
+            conn=conn, key=key, identity=_file_identity(key), generation=generation
+        )
+
+    def _release(self, entry: _PlanConnection) -> None:
+        if entry.conn.in_transaction:
+            try:
+                entry.conn.rollback()
+            except sqlite3.Error:
+                pass
+        now = time.monotonic()
+        to_close: List[_PlanConnection] = []
+        with self._lock:
+            self._in_use -= 1
+            stack = self._idle.get(entry.key, [])
+            if (
+                self.max_open == 0
+                or entry.generation != self._generations.get(entry.key, 0)
+                or len(stack) >= self.max_idle_per_file
+            ):
+                to_close.append(entry)
+            else:
+                entry.last_used = now
+                stack.append(entry)
+                self._idle[entry.key] = stack
+                self._idle.move_to_end(entry.key)
+                self._idle_count += 1
+            to_close.extend(self._evict_locked(now))
+            self._returned.notify()
+        self._close_all(to_close)
+
+    def _evict_locked(self, now: float) -> List[_PlanConnection]:
+        evicted: List[_PlanConnection] = []
+        if self.idle_timeout is not None and self.idle_timeout >= 0:
+            for key in list(self._idle):
+                stack = self._idle[key]
+                fresh = [e for e in stack if now - e.last_used < self.idle_timeout]
+                if len(fresh) != len(stack):
+                    expired = [e for e in stack if now - e.last_used >= self.idle_timeout]
+                    evicted.extend(expired)
+                    self._stats["closed_idle"] += len(expired)
+                    self._idle_count -= len(expired)
+                    if fresh:
+                        self._idle[key] = fresh
+                    else:
+                        del self._idle[key]
+        # Connections opened past the limit by nested use are closed as soon
+        # as they come back.
+        while self._idle and self._idle_count + self._in_use > self.max_open:
+            evicted.append(self._pop_lru_locked())
+        return evicted
+
+    @staticmethod
+    def _close_all(entries: List[_PlanConnection]) -> None:
+        for entry in entries:
+            try:
+                entry.conn.close()
+            except sqlite3.Error:  # pragma: no cover - defensive
+                logger.debug("Failed to close plan connection for %s", entry.key)
+
+
+def _file_identity(path: str) -> Tuple[int, int]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (-1, -1)
+    return (st.st_dev, st.st_ino)
+
+
+_plan_connection_pool: Optional[PlanConnectionPool] = None
+
+
+def get_plan_connection_pool() -> PlanConnectionPool:
+    """Get the global per-plan connection pool (sized by DatabaseConfig)."""
+    global _plan_connection_pool
+
+    if _plan_connection_pool is None:
+        with _pool_lock:
+            if _plan_connection_pool is None:
+                from .config.database_config import get_database_config
+
+                config = get_database_config()
+                _plan_connection_pool = PlanConnectionPool(
+                    max_open=config.plan_pool_max_open,
+                    idle_timeout=config.plan_pool_idle_timeout,
+                )
+
+    return _plan_connection_pool
+
+
+def close_plan_connection_pool() -> None:
+    """Close the global per-plan connection pool."""
+    global _plan_connection_pool
+
+    with _pool_lock:
+        pool, _plan_connection_pool = _plan_connection_pool, None
+    if pool is not None:
+        pool.close_pool()
@@ -1,12 +1,19 @@
-import json
+import asyncio
 import os
 import random
 import time
-from typing import Any, Dict, Optional, Sequence
-from urllib import error, request
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
 
 from .interfaces import LLMProvider
 from .services.foundation.settings import get_settings
+from .services.llm.http_transport import (
+    LLMTransportError,
+    aiter_sse_deltas,
+    get_transport,
+    iter_sse_deltas,
+)
+from .services.llm.rate_limiter import ProviderRateLimiter, get_rate_limiter
+from .services.llm.response_cache import LLMResponseCache, estimate_tokens, get_response_cache, make_key
 
 PROVIDER_CONFIGS: Dict[str, Dict[str, Any]] = {
     "glm": {
@@ -154,6 +161,8 @@ class LLMClient(LLMProvider):
         timeout: int = 60,
         retries: Optional[int] = None,
         backoff_base: Optional[float] = None,
+        cache: Optional[LLMResponseCache] = None,
+        use_cache: Optional[bool] = None,
     ) -> None:
         settings = get_settings()
         provider_name = provider or os.getenv("LLM_PROVIDER") or getattr(settings, "llm_provider", DEFAULT_PROVIDER)
@@ -206,11 +215,15 @@ class LLMClient(LLMProvider):
                 self.backoff_base = float(backoff_base)
         except Exception:
             self.backoff_base = 0.5
+        # Response cache (opt-in): explicit cache/use_cache, else LLM_CACHE_ENABLED
+        if use_cache is None:
+            use_cache = cache is not None or bool(getattr(settings, "llm_cache_enabled", False))
+        self.cache: Optional[LLMResponseCache] = (cache or get_response_cache()) if use_cache else None
+        # Shared with every other client of the same provider in this process.
+        self.rate_limiter: ProviderRateLimiter = get_rate_limiter(self.provider)
+        self.completion_reserve = int(getattr(settings, "llm_rate_completion_reserve", 512))
 
-    def chat(self, prompt: str, force_real: bool = False, model: Optional[str] = None, **_: Any) -> str:
-        if self.mock and not force_real:
-            return "This is a mock completion."
-
+    def _build_request(self, prompt: str, model: Optional[str], stream: bool = False) -> Tuple[Dict[str, Any], Dict[str, str]]:
         if not self.api_key:
             raise RuntimeError(f"{self.provider.upper()}_API_KEY is not set in environment")
         # Use structured content blocks to satisfy providers that require `type: text`.
@@ -220,51 +233,225 @@ class LLMClient(LLMProvider):
                 "content": [{"type": "text", "text": prompt}],
             }
         ]
-        payload = {
+        payload: Dict[str, Any] = {
             "model": model or self.model,
             "messages": messages,
         }
         if self.payload_defaults:
             payload.update(self.payload_defaults)
+        if stream:
+            payload["stream"] = True
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}",
         }
         headers.update(self.extra_headers)
-        data = json.dumps(payload).encode("utf-8")
-        req = request.Request(self.endpoint_url, data=data, headers=headers, method="POST")
+        return payload, headers
+
+    @staticmethod
+    def _extract_content(obj: Dict[str, Any]) -> str:
+        try:
+            return obj["choices"][0]["message"]["content"]
+        except Exception:
+            raise RuntimeError(f"Unexpected LLM response: {obj}")
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return max(0.0, self.backoff_base * (2**attempt) + random.uniform(0, self.backoff_base / 4.0))
+
+    def _should_retry(self, exc: Exception, attempt: int) -> bool:
+        """Retry 429, 5xx and transport errors; surface other 4xx immediately."""
+        if attempt >= self.retries:
+            return False
+        if isinstance(exc, LLMTransportError):
+            return exc.status_code == 429 or 500 <= exc.status_code < 600
+        # Treat everything else as transient (network, truncated body, ...)
+        return True
+
+    @staticmethod
+    def _wrap_error(exc: Exception) -> RuntimeError:
+        if isinstance(exc, LLMTransportError):
+            return RuntimeError(f"LLM HTTPError: {exc.status_code} {exc.body}")
+        return RuntimeError(f"LLM request failed: {exc}")
+
+    def _reserve_tokens(self, prompt: str) -> int:
+        """Tokens held against the provider budget until real usage is known."""
+        return estimate_tokens(prompt) + self.completion_reserve
+
+    def _report_failure(self, exc: Exception, reserved: int) -> None:
+        if isinstance(exc, LLMTransportError):
+            self.rate_limiter.record_failure(
+                exc.status_code, retry_after=exc.retry_after, reserved_tokens=reserved
+            )
+        else:
+            self.rate_limiter.record_failure(reserved_tokens=reserved)
+
+    def cache_key(self, prompt: str, model: Optional[str] = None) -> str:
+        """Cache key covering everything that shapes the request payload."""
+        return make_key(self.provider, model or self.model, prompt, self.payload_defaults)
+
+    @staticmethod
+    def _usage_tokens(obj: Dict[str, Any], prompt: str, content: str) -> int:
+        usage = obj.get("usage") if isinstance(obj, dict) else None
+        try:
+            return int(usage["total_tokens"])
+        except Exception:
+            return estimate_tokens(prompt, content)
+
+    def _complete(self, prompt: str, model: Optional[str]) -> Tuple[str, int]:
+        payload, headers = self._build_request(prompt, model)
+        transport = get_transport(self.endpoint_url)
+        reserved = self._reserve_tokens(prompt)
 
         for attempt in range(self.retries + 1):
+            self.rate_limiter.acquire(reserved)
             try:
-                with request.urlopen(req, timeout=self.timeout) as resp:
-                    resp_text = resp.read().decode("utf-8")
-                    obj = json.loads(resp_text)
-                try:
-                    return obj["choices"][0]["message"]["content"]
-                except Exception:
-                    raise RuntimeError(f"Unexpected LLM response: {obj}")
-            except error.HTTPError as e:
-                # Retry only for 5xx; surface 4xx immediately
-                code = getattr(e, "code", None)
-                if isinstance(code, int) and 500 <= code < 600 and attempt < self.retries:
-                    # backoff retry
-                    delay = max(0.0, self.backoff_base * (2**attempt) + random.uniform(0, self.backoff_base / 4.0))
-                    time.sleep(delay)
+                obj = transport.post_json(self.endpoint_url, payload, headers, self.timeout)
+                content = self._extract_content(obj)
+                used = self._usage_tokens(obj, prompt, content)
+                self.rate_limiter.record_success(reserved, used)
+                return content, used
+            except Exception as e:
+                self._report_failure(e, reserved)
+                if self._should_retry(e, attempt):
+                    time.sleep(self._backoff_delay(attempt))
                     continue
-                try:
-                    msg = e.read().decode("utf-8")
-                except Exception:
-                    msg = str(e)
-                raise RuntimeError(f"LLM HTTPError: {e.code} {msg}")
+                raise self._wrap_error(e)
+        raise RuntimeError("LLM request failed after retries")
+
+    async def _complete_async(self, prompt: str, model: Optional[str]) -> Tuple[str, int]:
+        payload, headers = self._build_request(prompt, model)
+        transport = get_transport(self.endpoint_url)
+        reserved = self._reserve_tokens(prompt)
+
+        for attempt in range(self.retries + 1):
+            await self.rate_limiter.acquire_async(reserved)
+            try:
+                obj = await transport.post_json_async(self.endpoint_url, payload, headers, self.timeout)
+                content = self._extract_content(obj)
+                used = self._usage_tokens(obj, prompt, content)
+                self.rate_limiter.record_success(reserved, used)
+                return content, used
             except Exception as e:
-                # Treat as transient (network) and retry
-                if attempt < self.retries:
-                    delay = max(0.0, self.backoff_base * (2**attempt) + random.uniform(0, self.backoff_base / 4.0))
-                    time.sleep(delay)
+                self._report_failure(e, reserved)
+                if self._should_retry(e, attempt):
+                    await asyncio.sleep(self._backoff_delay(attempt))
                     continue
-                raise RuntimeError(f"LLM request failed: {e}")
+                raise self._wrap_error(e)
         raise RuntimeError("LLM request failed after retries")
 
+    def chat(
+        self,
+        prompt: str,
+        force_real: bool = False,
+        model: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        **_: Any,
+    ) -> str:
+        """
+        Return the completion for ``prompt``.
+
+        When a response cache is active, identical requests are served from it
+        and concurrent duplicates share one upstream call; ``use_cache=False``
+        bypasses the cache for this call, ``use_cache=True`` forces it on.
+        """
+        if self.mock and not force_real:
+            return "This is a mock completion."
+
+        cache = self.cache or (get_response_cache() if use_cache else None)
+        if cache is None:
+            return self._complete(prompt, model)[0]
+        return cache.get_or_compute(
+            self.cache_key(prompt, model), lambda: self._complete(prompt, model), bypass=use_cache is False
+        )
+
+    async def chat_async(
+        self,
+        prompt: str,
+        force_real: bool = False,
+        model: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        **_: Any,
+    ) -> str:
+        """Native async variant of :meth:`chat` on a pooled ``httpx.AsyncClient``."""
+        if self.mock and not force_real:
+            return "This is a mock completion."
+
+        cache = self.cache or (get_response_cache() if use_cache else None)
+        if cache is None:
+            return (await self._complete_async(prompt, model))[0]
+        return await cache.get_or_compute_async(
+            self.cache_key(prompt, model), lambda: self._complete_async(prompt, model), bypass=use_cache is False
+        )
+
+    def chat_stream(
+        self, prompt: str, force_real: bool = False, model: Optional[str] = None, **_: Any
+    ) -> Iterator[str]:
+        """
+        Yield completion text incrementally as the provider streams it.
+
+        Retries only happen before the first chunk is received; once tokens have
+        been handed to the caller an error is raised instead of restarting.
+        """
+        if self.mock and not force_real:
+            yield "This is a mock completion."
+            return
+
+        payload, headers = self._build_request(prompt, model, stream=True)
+        transport = get_transport(self.endpoint_url)
+        reserved = self._reserve_tokens(prompt)
+
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.acquire(reserved)
+            started = False
+            streamed: list = []
+            try:
+                for delta in iter_sse_deltas(
+                    transport.stream_lines(self.endpoint_url, payload, headers, self.timeout)
+                ):
+                    started = True
+                    streamed.append(delta)
+                    yield delta
+                self.rate_limiter.record_success(reserved, estimate_tokens(prompt, "".join(streamed)))
+                return
+            except Exception as e:
+                self._report_failure(e, reserved)
+                if not started and self._should_retry(e, attempt):
+                    time.sleep(self._backoff_delay(attempt))
+                    continue
+                raise self._wrap_error(e)
+
+    async def chat_stream_async(
+        self, prompt: str, force_real: bool = False, model: Optional[str] = None, **_: Any
+    ) -> AsyncIterator[str]:
+        """Async variant of :meth:`chat_stream`."""
+        if self.mock and not force_real:
+            yield "This is a mock completion."
+            return
+
+        payload, headers = self._build_request(prompt, model, stream=True)
+        transport = get_transport(self.endpoint_url)
+        reserved = self._reserve_tokens(prompt)
+
+        for attempt in range(self.retries + 1):
+            await self.rate_limiter.acquire_async(reserved)
+            started = False
+            streamed: list = []
+            try:
+                async for delta in aiter_sse_deltas(
+                    transport.stream_lines_async(self.endpoint_url, payload, headers, self.timeout)
+                ):
+                    started = True
+                    streamed.append(delta)
+                    yield delta
+                self.rate_limiter.record_success(reserved, estimate_tokens(prompt, "".join(streamed)))
+                return
+            except Exception as e:
+                self._report_failure(e, reserved)
+                if not started and self._should_retry(e, attempt):
+                    await asyncio.sleep(self._backoff_delay(attempt))
+                    continue
+                raise self._wrap_error(e)
+
     def ping(self) -> bool:
         if self.mock:
             return True
@@ -280,6 +467,16 @@ class LLMClient(LLMProvider):
             "model": self.model,
             "has_api_key": bool(self.api_key),
             "mock": bool(self.mock),
+            "cache_enabled": self.cache is not None,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Response cache counters and the provider's rate limiter state."""
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+            "rate_limit": self.rate_limiter.get_stats(),
         }
 
 
@@ -15,11 +15,12 @@ from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from tool_box import initialize_toolbox
+from tool_box.tools_impl.executors import shutdown_tool_executors
 
 # Ensure memory API routes are registered
 from .api import memory_api  # noqa: F401
 from .database import init_db
-from .database_pool import get_db
+from .database_pool import close_plan_connection_pool, get_db
 from .errors import (
     BaseError,
     BusinessError,
@@ -27,7 +28,7 @@ from .errors import (
     ValidationError,
     handle_api_error,
 )
-from .errors.exceptions import ErrorCategory
+from .errors.exceptions import ErrorCategory, ErrorSeverity
 from .errors.exceptions import SystemError as CustomSystemError
 from .llm import get_default_client
 
@@ -35,6 +36,9 @@ from .llm import get_default_client
 from .routers import get_all_routers
 from .services.foundation.logging_config import setup_logging
 from .services.foundation.settings import get_settings
+from .services.llm.http_transport import close_transports
+from .services.plans.decomposition_jobs import plan_decomposition_jobs
+from .services.plans.job_scheduler import shutdown_job_scheduler
 from .utils.route_helpers import parse_bool
 
 
@@ -80,6 +84,12 @@ async def lifespan(_fastapi_app: FastAPI):
 
     yield
 
+    close_transports()
+    shutdown_job_scheduler()
+    plan_decomposition_jobs.flush_logs()
+    close_plan_connection_pool()
+    shutdown_tool_executors(wait=False)
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -146,6 +156,15 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
             error_code=ErrorCode.INVALID_FIELD_FORMAT,
             context={"method": request.method, "path": str(request.url)},
         )
+    elif exc.status_code == 429:
+        # 队列满等背压属于可重试的限流，不是服务端故障
+        error = BusinessError(
+            message=exc.detail if exc.detail else "Too many requests",
+            error_code=ErrorCode.API_RATE_LIMIT_EXCEEDED,
+            severity=ErrorSeverity.LOW,
+            context={"path": str(request.url), "method": request.method},
+            suggestions=["稍后重试", "降低请求频率"],
+        )
     else:
         error = CustomSystemError(
             message=exc.detail if exc.detail else f"HTTP error {exc.status_code}",
@@ -154,7 +173,9 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         )
 
     error_response = handle_api_error(error, include_debug=False)
-    return JSONResponse(status_code=exc.status_code, content=error_response)
+    return JSONResponse(
+        status_code=exc.status_code, content=error_response, headers=getattr(exc, "headers", None)
+    )
 
 
 @app.exception_handler(Exception)
@@ -113,6 +113,7 @@ class QueryMemoryRequest(BaseModel):
 
     search_text: str = Field(..., description="搜索文本")
     memory_types: Optional[List[MemoryType]] = Field(default=None, description="记忆类型过滤")
+    importance_levels: Optional[List[ImportanceLevel]] = Field(default=None, description="重要性级别过滤")
     limit: int = Field(default=10, ge=1, le=100, description="返回数量限制")
     min_similarity: float = Field(default=0.01, ge=0.0, le=1.0, description="最小相似度阈值")
     include_task_context: bool = Field(default=False, description="是否包含任务上下文")
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import itertools
 import json
 import logging
-from collections import defaultdict
-from typing import Any, Dict, List, Optional, Tuple, Set
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Set
 
 from ..database import get_db, plan_db_connection
 from ..services.plans.plan_models import PlanNode, PlanSummary, PlanTree
@@ -16,6 +18,128 @@ from .plan_storage import (
 
 logger = logging.getLogger(__name__)
 
+_TASK_COLUMNS = """
+                    id,
+                    name,
+                    status,
+                    instruction,
+                    parent_id,
+                    position,
+                    depth,
+                    path,
+                    metadata,
+                    execution_result,
+                    context_combined,
+                    context_sections,
+                    context_meta,
+                    context_updated_at
+"""
+
+# Outline projection: same shape as _TASK_COLUMNS, heavy text columns left out.
+_OUTLINE_TASK_COLUMNS = """
+                    id,
+                    name,
+                    status,
+                    instruction,
+                    parent_id,
+                    position,
+                    depth,
+                    path,
+                    metadata,
+                    NULL AS execution_result,
+                    NULL AS context_combined,
+                    NULL AS context_sections,
+                    NULL AS context_meta,
+                    context_updated_at
+"""
+
+DEFAULT_TREE_CACHE_SIZE = 64
+
+
+class PlanTreeCache:
+    """In-process LRU of parsed plan trees, validated by a per-plan version.
+
+    Every mutating ``PlanRepository`` method bumps the plan's version, so a
+    cached tree is served only while nothing has been written to the plan
+    since it was loaded. Versions come from one process-wide counter and never
+    go backwards, even across ``delete_plan`` / id reuse. Writes made by other
+    processes are not seen; set ``PLAN_TREE_CACHE_SIZE=0`` when several
+    processes write the same plans.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_TREE_CACHE_SIZE) -> None:
+        self.max_entries = max(0, max_entries)
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._versions: Dict[int, int] = {}
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[int, PlanTree]]" = OrderedDict()
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def version(self, plan_id: int) -> int:
+        with self._lock:
+            return self._versions.get(plan_id, 0)
+
+    def bump(self, plan_id: int) -> int:
+        with self._lock:
+            version = next(self._counter)
+            self._versions[plan_id] = version
+            for key in [key for key in self._entries if key[0] == plan_id]:
+                del self._entries[key]
+            self._stats["invalidations"] += 1
+            return version
+
+    def get(self, plan_id: int, kind: str, version: int) -> Optional[PlanTree]:
+        with self._lock:
+            entry = self._entries.get((plan_id, kind))
+            if entry is None or entry[0] != version:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end((plan_id, kind))
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, plan_id: int, kind: str, version: int, tree: PlanTree) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            # A write landed while the tree was loading; it may be stale.
+            if self._versions.get(plan_id, 0) != version:
+                return
+            self._entries[(plan_id, kind)] = (version, tree)
+            self._entries.move_to_end((plan_id, kind))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            return stats
+
+
+_tree_cache: Optional[PlanTreeCache] = None
+_tree_cache_lock = threading.Lock()
+
+
+def get_plan_tree_cache() -> PlanTreeCache:
+    """Return the process-wide tree cache (sized by PLAN_TREE_CACHE_SIZE)."""
+    global _tree_cache
+    with _tree_cache_lock:
+        if _tree_cache is None:
+            from ..services.foundation.settings import get_settings
+
+            size = getattr(get_settings(), "plan_tree_cache_size", DEFAULT_TREE_CACHE_SIZE)
+            _tree_cache = PlanTreeCache(int(size))
+        return _tree_cache
+
 
 class PlanRepository:
     """Repository for plan metadata (main DB) and per-plan SQLite storage."""
@@ -26,44 +150,77 @@ class PlanRepository:
 
     def list_plans(self) -> List[PlanSummary]:
         sql = """
-        SELECT id, title, description, metadata, plan_db_path, updated_at
+        SELECT id, title, description, metadata, updated_at, task_count, task_status_counts
         FROM plans
         ORDER BY updated_at DESC, id DESC
         """
         with get_db() as conn:
             rows = conn.execute(sql).fetchall()
-
-        summaries: List[PlanSummary] = []
-        for row in rows:
-            plan_id = row["id"]
-            summaries.append(
-                PlanSummary(
-                    id=plan_id,
-                    title=row["title"],
-                    description=row["description"],
-                    metadata=_loads_json(row["metadata"]),
-                    task_count=self._count_tasks(plan_id),
-                    updated_at=row["updated_at"],
-                )
-            )
-        return summaries
+        return [self._row_to_summary(row) for row in rows]
 
     def get_plan_tree(self, plan_id: int) -> PlanTree:
-        plan_row = self._get_plan_record(plan_id)
-        task_rows, dependency_map = self._load_tasks_and_dependencies(plan_id)
-        return _rows_to_plan_tree(plan_id, plan_row, task_rows, dependency_map)
+        """Return a private, mutable copy of the plan tree."""
+        return _copy_plan_tree(self.get_plan_snapshot(plan_id))
 
-    def get_plan_summary(self, plan_id: int) -> PlanSummary:
-        plan_row = self._get_plan_record(plan_id)
-        return PlanSummary(
-            id=plan_row["id"],
-            title=plan_row["title"],
-            description=plan_row["description"],
-            metadata=_loads_json(plan_row["metadata"]),
-            task_count=self._count_tasks(plan_id),
-            updated_at=plan_row["updated_at"],
+    def get_plan_snapshot(self, plan_id: int) -> PlanTree:
+        """Return the shared cached tree; callers must treat it as read-only.
+
+        Served from memory while the plan version is unchanged, otherwise
+        reloaded from the plan database. Use ``get_plan_tree`` for a copy that
+        may be modified (e.g. before ``upsert_plan_tree``).
+        """
+        return self._cached_tree(plan_id, "full", self._load_plan_tree)
+
+    def get_plan_outline(self, plan_id: int) -> PlanTree:
+        """Return a read-only tree without the heavy text columns.
+
+        Nodes keep structure, status, instruction, metadata and dependencies;
+        ``execution_result`` and ``context_*`` are left empty.
+        """
+        return self._cached_tree(
+            plan_id,
+            "outline",
+            lambda pid: self._load_plan_tree(pid, columns=_OUTLINE_TASK_COLUMNS),
         )
 
+    def get_plan_version(self, plan_id: int) -> int:
+        """Monotonic in-process version, bumped by every mutating method."""
+        return get_plan_tree_cache().version(plan_id)
+
+    def get_plan_summary(self, plan_id: int) -> PlanSummary:
+        return self._row_to_summary(self._get_plan_record(plan_id))
+
+    def refresh_task_counts(self, plan_id: int) -> Tuple[int, Dict[str, int]]:
+        """Recount a plan's tasks from its database and store the counters.
+
+        Used to backfill plans created before the counters existed and to
+        repair drift; normal mutations keep the counters current themselves.
+        """
+        plan_path = get_plan_db_path(plan_id)
+        if not plan_path.exists():
+            total, histogram = 0, {}
+            self._store_task_counts(plan_id, total, histogram)
+            return total, histogram
+        with plan_db_connection(plan_path) as conn:
+            self._ensure_task_columns(conn, plan_id)
+            # Hold the plan's write lock so no mutation lands between the
+            # recount and the main-database update.
+            conn.execute("BEGIN IMMEDIATE")
+            total, histogram = self._task_histogram(conn)
+            self._store_task_counts(plan_id, total, histogram)
+        return total, histogram
+
+    def backfill_task_counts(self, *, only_missing: bool = True) -> int:
+        """Refresh the counters of every plan (or only those never counted)."""
+        sql = "SELECT id FROM plans"
+        if only_missing:
+            sql += " WHERE task_count IS NULL OR task_status_counts IS NULL"
+        with get_db() as conn:
+            plan_ids = [int(row["id"]) for row in conn.execute(sql).fetchall()]
+        for plan_id in plan_ids:
+            self.refresh_task_counts(plan_id)
+        return len(plan_ids)
+
     def create_plan(
         self,
         title: str,
@@ -76,8 +233,11 @@ class PlanRepository:
         with get_db() as conn:
             cursor = conn.execute(
                 """
-                INSERT INTO plans (title, owner, description, metadata, plan_db_path)
-                VALUES (?, ?, ?, ?, NULL)
+                INSERT INTO plans (
+                    title, owner, description, metadata, plan_db_path,
+                    task_count, task_status_counts
+                )
+                VALUES (?, ?, ?, ?, NULL, 0, '{}')
                 """,
                 (title, owner, description, metadata_json),
             )
@@ -101,12 +261,14 @@ class PlanRepository:
             description=description,
             metadata=metadata or {},
         )
+        self._invalidate(plan_id)
         return self.get_plan_tree(plan_id)
 
     def delete_plan(self, plan_id: int) -> None:
         remove_plan_database(plan_id)
         with get_db() as conn:
             conn.execute("DELETE FROM plans WHERE id=?", (plan_id,))
+        self._invalidate(plan_id)
 
     def create_task(
         self,
@@ -174,8 +336,9 @@ class PlanRepository:
             )
             self._replace_dependencies(conn, task_id, deps)
             self._resequence_children(conn, parent_id)
+            self._record_plan_change(conn, plan_id)
 
-        self._touch_plan(plan_id)
+        self._invalidate(plan_id)
         return self.get_node(plan_id, task_id)
 
     def update_task(
@@ -241,8 +404,9 @@ class PlanRepository:
                     raise ValueError(f"Task {task_id} not found in plan {plan_id}")
             if deps is not None:
                 self._replace_dependencies(conn, task_id, _sanitize_dependencies(deps))
+            self._record_plan_change(conn, plan_id, counts=status is not None)
 
-        self._touch_plan(plan_id)
+        self._invalidate(plan_id)
         return self.get_node(plan_id, task_id)
 
     def delete_task(self, plan_id: int, task_id: int) -> None:
@@ -260,8 +424,9 @@ class PlanRepository:
                 (task_id, f"{path}/%"),
             )
             self._resequence_children(conn, parent_id)
+            self._record_plan_change(conn, plan_id)
 
-        self._touch_plan(plan_id)
+        self._invalidate(plan_id)
 
     def move_task(
         self,
@@ -320,8 +485,9 @@ class PlanRepository:
 
             self._resequence_children(conn, origin_parent)
             self._resequence_children(conn, new_parent_id)
+            self._record_plan_change(conn, plan_id, counts=False)
 
-        self._touch_plan(plan_id)
+        self._invalidate(plan_id)
         return self.get_node(plan_id, task_id)
 
     def upsert_plan_tree(self, tree: PlanTree, *, note: Optional[str] = None) -> None:
@@ -492,8 +658,9 @@ class PlanRepository:
                     "INSERT INTO snapshots (snapshot, note) VALUES (?, ?)",
                     (snapshot_json, note),
                 )
+            self._record_plan_change(conn, tree.id)
 
-        self._touch_plan(tree.id)
+        self._invalidate(tree.id)
 
     def get_node(self, plan_id: int, task_id: int) -> PlanNode:
         with plan_db_connection(get_plan_db_path(plan_id)) as conn:
@@ -608,15 +775,46 @@ class PlanRepository:
     def _get_plan_record(self, plan_id: int) -> Dict[str, Any]:
         with get_db() as conn:
             row = conn.execute(
-                "SELECT id, title, description, metadata, updated_at FROM plans WHERE id=?",
+                """
+                SELECT id, title, description, metadata, updated_at, task_count, task_status_counts
+                FROM plans
+                WHERE id=?
+                """,
                 (plan_id,),
             ).fetchone()
         if not row:
             raise ValueError(f"Plan {plan_id} not found")
         return dict(row)
 
+    def _cached_tree(
+        self, plan_id: int, kind: str, loader: Callable[[int], PlanTree]
+    ) -> PlanTree:
+        cache = get_plan_tree_cache()
+        # Read the version before loading: a write that lands mid-load bumps
+        # it, so the (possibly stale) tree is never served as current.
+        version = cache.version(plan_id)
+        tree = cache.get(plan_id, kind, version)
+        if tree is not None and not get_plan_db_path(plan_id).exists():
+            # Storage removed behind our back: drop the entry, let the loader raise.
+            version = cache.bump(plan_id)
+            tree = None
+        if tree is None:
+            tree = loader(plan_id)
+            cache.put(plan_id, kind, version, tree)
+        return tree
+
+    def _load_plan_tree(self, plan_id: int, *, columns: str = _TASK_COLUMNS) -> PlanTree:
+        plan_row = self._get_plan_record(plan_id)
+        task_rows, dependency_map = self._load_tasks_and_dependencies(
+            plan_id, columns=columns
+        )
+        return _rows_to_plan_tree(plan_id, plan_row, task_rows, dependency_map)
+
+    def _invalidate(self, plan_id: int) -> None:
+        get_plan_tree_cache().bump(plan_id)
+
     def _load_tasks_and_dependencies(
-        self, plan_id: int
+        self, plan_id: int, *, columns: str = _TASK_COLUMNS
     ) -> Tuple[List[Any], Dict[int, List[int]]]:
         plan_path = get_plan_db_path(plan_id)
         if not plan_path.exists():
@@ -624,22 +822,8 @@ class PlanRepository:
         with plan_db_connection(plan_path) as conn:
             self._ensure_task_columns(conn, plan_id)
             task_rows = conn.execute(
-                """
-                SELECT
-                    id,
-                    name,
-                    status,
-                    instruction,
-                    parent_id,
-                    position,
-                    depth,
-                    path,
-                    metadata,
-                    execution_result,
-                    context_combined,
-                    context_sections,
-                    context_meta,
-                    context_updated_at
+                f"""
+                SELECT{columns}
                 FROM tasks
                 ORDER BY depth ASC, position ASC, id ASC
                 """
@@ -878,20 +1062,65 @@ class PlanRepository:
                 dropped_invalid,
             )
 
-    def _touch_plan(self, plan_id: int) -> None:
-        with get_db() as conn:
-            conn.execute(
-                "UPDATE plans SET updated_at=CURRENT_TIMESTAMP WHERE id=?",
-                (plan_id,),
+    def _record_plan_change(self, conn, plan_id: int, *, counts: bool = True) -> None:
+        """Bump ``plans.updated_at`` and, optionally, the task counters.
+
+        Must be called with the plan connection still inside its write
+        transaction: writers of one plan are serialized by that lock, so the
+        counters reach the main database in commit order.
+        """
+        if not counts:
+            with get_db() as main:
+                main.execute(
+                    "UPDATE plans SET updated_at=CURRENT_TIMESTAMP WHERE id=?",
+                    (plan_id,),
+                )
+            return
+        total, histogram = self._task_histogram(conn)
+        self._store_task_counts(plan_id, total, histogram, touch=True)
+
+    def _task_histogram(self, conn) -> Tuple[int, Dict[str, int]]:
+        rows = conn.execute(
+            """
+            SELECT COALESCE(NULLIF(status, ''), 'pending') AS status, COUNT(*) AS cnt
+            FROM tasks
+            GROUP BY 1
+            """
+        ).fetchall()
+        histogram = {row["status"]: int(row["cnt"]) for row in rows}
+        return sum(histogram.values()), histogram
+
+    def _store_task_counts(
+        self,
+        plan_id: int,
+        total: int,
+        histogram: Dict[str, int],
+        *,
+        touch: bool = False,
+    ) -> None:
+        touch_sql = ", updated_at=CURRENT_TIMESTAMP" if touch else ""
+        with get_db() as main:
+            main.execute(
+                f"UPDATE plans SET task_count=?, task_status_counts=?{touch_sql} WHERE id=?",
+                (total, _dump_json(histogram), plan_id),
             )
 
-    def _count_tasks(self, plan_id: int) -> int:
-        plan_path = get_plan_db_path(plan_id)
-        if not plan_path.exists():
-            return 0
-        with plan_db_connection(plan_path) as conn:
-            row = conn.execute("SELECT COUNT(*) AS cnt FROM tasks").fetchone()
-            return int(row["cnt"]) if row else 0
+    def _row_to_summary(self, row) -> PlanSummary:
+        plan_id = row["id"]
+        task_count = row["task_count"]
+        status_counts = _loads_json(row["task_status_counts"])
+        if task_count is None or row["task_status_counts"] is None:
+            # Plan predates the counters: count once and store the result.
+            task_count, status_counts = self.refresh_task_counts(plan_id)
+        return PlanSummary(
+            id=plan_id,
+            title=row["title"],
+            description=row["description"],
+            metadata=_loads_json(row["metadata"]),
+            task_count=int(task_count),
+            status_counts=status_counts,
+            updated_at=row["updated_at"],
+        )
 
 
 def _rows_to_plan_tree(
@@ -921,6 +1150,40 @@ def _rows_to_plan_tree(
     )
 
 
+def _copy_plan_tree(tree: PlanTree) -> PlanTree:
+    """Copy a validated tree, duplicating only its mutable containers.
+
+    Strings are shared and nothing is re-validated, which makes this several
+    times cheaper than ``model_copy(deep=True)`` on large plans.
+    """
+    nodes = {
+        node_id: node.model_copy(
+            update={
+                "metadata": _copy_json(node.metadata),
+                "dependencies": list(node.dependencies),
+                "context_sections": _copy_json(node.context_sections),
+                "context_meta": _copy_json(node.context_meta),
+            }
+        )
+        for node_id, node in tree.nodes.items()
+    }
+    return tree.model_copy(
+        update={
+            "metadata": _copy_json(tree.metadata),
+            "nodes": nodes,
+            "adjacency": {key: list(ids) for key, ids in tree.adjacency.items()},
+        }
+    )
+
+
+def _copy_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+    return value
+
+
 def _row_to_plan_node(plan_id: int, row, dependencies: List[int]) -> PlanNode:
     metadata = _loads_json(row["metadata"])
     context_sections = _loads_json_list(row["context_sections"])
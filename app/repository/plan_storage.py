@@ -10,6 +10,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from app.config.database_config import get_database_config
 from app.database import get_db, plan_db_connection
+from app.database_pool import get_plan_connection_pool
 
 logger = logging.getLogger(__name__)
 
@@ -165,10 +166,16 @@ def update_plan_metadata(
 def remove_plan_database(plan_id: int) -> None:
     """删除 plan 的数据库文件."""
     db_path = get_plan_db_path(plan_id)
+    # 先关闭连接池中的缓存连接，否则它们会继续写入已删除的文件
+    get_plan_connection_pool().discard(db_path)
     try:
         if db_path.exists():
             db_path.unlink()
             logger.info("Removed plan database at %s", db_path)
+        for suffix in ("-wal", "-shm"):
+            sidecar = db_path.with_name(db_path.name + suffix)
+            if sidecar.exists():
+                sidecar.unlink()
     except OSError as exc:  # pragma: no cover - best effort cleanup
         logger.warning("Failed to remove plan database %s: %s", db_path, exc)
 
@@ -337,6 +344,37 @@ def append_decomposition_job_log(
         )
 
 
+def append_decomposition_job_logs(
+    plan_id: Optional[int],
+    entries: List[Dict[str, Any]],
+) -> None:
+    """在单个事务中批量写入 job 日志，entries 按写入顺序排列.
+
+    每项包含 job_id、timestamp、level、message、metadata.
+    """
+    if not entries:
+        return
+    db_path = _resolve_job_db_path(plan_id)
+    with plan_db_connection(db_path) as conn:
+        _ensure_decomposition_tables(conn)
+        conn.executemany(
+            """
+            INSERT INTO decomposition_job_logs (job_id, timestamp, level, message, metadata_json)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    entry["job_id"],
+                    entry["timestamp"].isoformat(),
+                    entry["level"],
+                    entry["message"],
+                    _json_dump(entry.get("metadata")) or None,
+                )
+                for entry in entries
+            ],
+        )
+
+
 def load_decomposition_job(plan_id: Optional[int], job_id: str) -> Optional[Dict[str, Any]]:
     db_path = _resolve_job_db_path(plan_id)
     with plan_db_connection(db_path) as conn:
@@ -0,0 +1,46 @@
+"""
+Backfill or repair the denormalized task counters in the main ``plans`` table.
+
+``PlanRepository`` keeps ``plans.task_count`` and ``plans.task_status_counts``
+current on every mutation. Databases created before those columns existed get
+them lazily the first time a plan is listed; this command fills them in one
+pass, or recounts every plan (``--all``) after plan files were edited by hand.
+
+Usage:
+    python -m app.repository.repair_plan_counts            # only missing rows
+    python -m app.repository.repair_plan_counts --all      # recount everything
+    python -m app.repository.repair_plan_counts --plan-id 12 --plan-id 15
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import List, Optional
+
+from ..database import init_db
+from .plan_repository import PlanRepository
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--all", action="store_true", help="Recount every plan, not only missing rows")
+    parser.add_argument("--plan-id", type=int, action="append", default=[], help="Recount these plans only")
+    args = parser.parse_args(argv)
+
+    init_db()
+    repo = PlanRepository()
+    if args.plan_id:
+        for plan_id in args.plan_id:
+            total, histogram = repo.refresh_task_counts(plan_id)
+            print(f"plan {plan_id}: {total} tasks {histogram}")
+        return 0
+
+    count = repo.backfill_task_counts(only_missing=not args.all)
+    print(f"Refreshed task counters for {count} plan(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,7 +13,7 @@ from pathlib import Path
 from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
 from uuid import uuid4
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Response
+from fastapi import APIRouter, HTTPException, Query, Response
 from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from app.config import get_graph_rag_settings, get_search_settings
@@ -44,12 +44,18 @@ from app.services.plans.action_catalog import build_action_catalog
 from app.services.plans.action_schema import normalize_action
 from app.services.plans.decomposition_jobs import (
     get_current_job,
+    is_current_job_cancelled,
     log_job_event,
     plan_decomposition_jobs,
     reset_current_job,
     set_current_job,
     start_decomposition_job_thread,
 )
+from app.services.plans.job_scheduler import (
+    PRIORITY_HIGH,
+    JobQueueFullError,
+    get_job_scheduler,
+)
 from app.services.plans.plan_decomposer import DecompositionResult, PlanDecomposer
 from app.services.plans.plan_executor import PlanExecutor
 from app.services.plans.plan_models import PlanTree
@@ -578,7 +584,7 @@ async def get_chat_history(session_id: str, limit: int = 50):
 
 
 @router.post("/message", response_model=ChatResponse)
-async def chat_message(request: ChatRequest, background_tasks: BackgroundTasks):
+async def chat_message(request: ChatRequest):
     """Main chat entry: respond with LLM actions first, then execute in the background."""
     try:
         context = dict(request.context or {})
@@ -817,10 +823,25 @@ async def chat_message(request: ChatRequest, background_tasks: BackgroundTasks):
             },
         )
 
-        background_tasks.add_task(_execute_action_run, tracking_id)
+        try:
+            get_job_scheduler().submit(
+                tracking_id,
+                _execute_action_run,
+                args=(tracking_id,),
+                plan_id=plan_session.plan_id,
+                priority=PRIORITY_HIGH,
+                on_cancel=lambda: update_action_run(
+                    tracking_id, status="failed", errors=["cancelled"]
+                ),
+            )
+        except JobQueueFullError as exc:
+            update_action_run(tracking_id, status="failed", errors=[str(exc)])
+            raise
 
         return _save_assistant_response(request.session_id, chat_response)
 
+    except JobQueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
     except Exception as exc:  # pragma: no cover - defensive
         logger.error("Chat processing failed: %s", exc)
         error_message = "⚠️ Something went wrong while processing the request. Try again later or rephrase."
@@ -1443,7 +1464,11 @@ async def _execute_action_run(run_id: str) -> None:
             )
             return
 
-        status = "completed" if result.success else "failed"
+        # POST /jobs/{id}/cancel only flags a running job; the agent stops between actions
+        cancelled = plan_decomposition_jobs.is_cancel_requested(job.job_id)
+        if cancelled and "cancelled" not in result.errors:
+            result.errors.append("cancelled")
+        status = "completed" if result.success and not cancelled else "failed"
         result_dict = result.model_dump()
         tool_results_payload: List[Dict[str, Any]] = []
         for step in result.steps:
@@ -1502,7 +1527,19 @@ async def _execute_action_run(run_id: str) -> None:
             "error_count": len(result.errors),
         }
 
-        if result.success:
+        if cancelled:
+            plan_decomposition_jobs.append_log(
+                job.job_id,
+                "warning",
+                "Structured action execution cancelled.",
+                {**stats_payload, "action_total": len(sorted_actions)},
+            )
+            plan_decomposition_jobs.mark_cancelled(
+                job.job_id,
+                result=result,
+                stats=stats_payload,
+            )
+        elif result.success:
             plan_decomposition_jobs.append_log(
                 job.job_id,
                 "info",
@@ -1649,6 +1686,7 @@ class AgentResult(BaseModel):
     job_type: Optional[str] = None
     actions_summary: List[Dict[str, Any]] = Field(default_factory=list)
     errors: List[str] = Field(default_factory=list)
+    cancelled: bool = False
 
 
 class StructuredChatAgent:
@@ -1737,7 +1775,12 @@ class StructuredChatAgent:
             job_id = None
             job_type = "chat_action"
 
+        cancelled = False
         for action in structured.sorted_actions():
+            if is_current_job_cancelled():
+                logger.info("Job %s cancelled; skipping remaining actions", job_id)
+                cancelled = True
+                break
             try:
                 step = await self._execute_action(action)
             except Exception as exc:  # pragma: no cover - defensive
@@ -1752,7 +1795,7 @@ class StructuredChatAgent:
             steps.append(step)
 
         suggestions = self._build_suggestions(structured, steps)
-        success = all(step.success for step in steps) if steps else True
+        success = not cancelled and (all(step.success for step in steps) if steps else True)
         primary_intent = steps[-1].action.name if steps else None
         plan_persisted = False
         if self.plan_session.plan_id is not None:
@@ -1789,6 +1832,7 @@ class StructuredChatAgent:
             job_type=job_type,
             actions_summary=actions_summary,
             errors=errors,
+            cancelled=cancelled,
         )
 
         if get_current_job() is None:
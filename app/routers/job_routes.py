@@ -8,7 +8,11 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from app.services.plans.decomposition_jobs import plan_decomposition_jobs
+from app.services.plans.decomposition_jobs import (
+    TERMINAL_STATUSES,
+    plan_decomposition_jobs,
+)
+from app.services.plans.job_scheduler import get_job_scheduler
 from . import register_router
 
 job_router = APIRouter(prefix="/jobs", tags=["jobs"])
@@ -74,7 +78,7 @@ async def stream_job(job_id: str):
                     continue
                 message.setdefault("type", "event")
                 yield _sse_message(message)
-                if message.get("status") in {"succeeded", "failed"}:
+                if message.get("status") in TERMINAL_STATUSES:
                     break
         except asyncio.CancelledError:  # pragma: no cover - defensive
             raise
@@ -84,6 +88,31 @@ async def stream_job(job_id: str):
     return StreamingResponse(event_generator(), media_type="text/event-stream", headers=headers)
 
 
+@job_router.get(
+    "/scheduler/metrics",
+    summary="查询后台 Job 调度器的队列与并发指标",
+)
+def get_scheduler_metrics():
+    return get_job_scheduler().get_metrics()
+
+
+@job_router.post(
+    "/{job_id}/cancel",
+    summary="取消排队中或运行中的 Job",
+)
+def cancel_job(job_id: str):
+    outcome = get_job_scheduler().cancel(job_id)
+    if outcome is None:
+        payload = plan_decomposition_jobs.get_job_payload(job_id, include_logs=False)
+        if payload is None:
+            raise HTTPException(status_code=404, detail="未找到对应的 Job。")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job 当前状态为 {payload.get('status')}，无法取消。",
+        )
+    return {"job_id": job_id, "status": outcome}
+
+
 @job_router.get(
     "/{job_id}",
     response_model=AsyncJobStatusResponse,
@@ -5,16 +5,18 @@ import json
 import logging
 from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, BackgroundTasks, Body, HTTPException, Query
+from fastapi import APIRouter, Body, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from app.repository.plan_repository import PlanRepository
 from app.services.plans.plan_decomposer import PlanDecomposer, DecompositionResult
 from app.services.plans.decomposition_jobs import (
+    TERMINAL_STATUSES,
     execute_decomposition_job,
     plan_decomposition_jobs,
 )
+from app.services.plans.job_scheduler import JobQueueFullError, get_job_scheduler
 from . import register_router
 
 plan_router = APIRouter(prefix="/plans", tags=["plans"])
@@ -176,7 +178,7 @@ def _parse_execution_result(raw_value: Any) -> Tuple[Optional[str], List[str], D
 def get_plan_tree(plan_id: int):
     """Return serialized PlanTree for the specified plan."""
     try:
-        tree = _plan_repo.get_plan_tree(plan_id)
+        tree = _plan_repo.get_plan_snapshot(plan_id)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
     return tree.model_dump()
@@ -192,7 +194,7 @@ def get_plan_results(
     only_with_output: bool = Query(True, description="仅返回包含执行结果的任务"),
 ):
     try:
-        tree = _plan_repo.get_plan_tree(plan_id)
+        tree = _plan_repo.get_plan_snapshot(plan_id)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -223,7 +225,7 @@ def get_plan_results(
 )
 def get_task_result(task_id: int, plan_id: int = Query(..., description="计划 ID")):
     try:
-        tree = _plan_repo.get_plan_tree(plan_id)
+        tree = _plan_repo.get_plan_snapshot(plan_id)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
     if not tree.has_node(task_id):
@@ -250,7 +252,7 @@ def get_task_result(task_id: int, plan_id: int = Query(..., description="计划
 )
 def get_plan_execution_summary(plan_id: int):
     try:
-        tree = _plan_repo.get_plan_tree(plan_id)
+        tree = _plan_repo.get_plan_outline(plan_id)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -284,7 +286,7 @@ def get_plan_subgraph(
     max_depth: int = Query(2, ge=1, le=6, description="递归深度限制"),
 ):
     try:
-        tree = _plan_repo.get_plan_tree(plan_id)
+        tree = _plan_repo.get_plan_snapshot(plan_id)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -311,12 +313,11 @@ def get_plan_subgraph(
 )
 def decompose_task(
     task_id: int,
-    background_tasks: BackgroundTasks,
     request: DecomposeTaskRequest = Body(...),
 ):
     plan_id = request.plan_id
     try:
-        tree = _plan_repo.get_plan_tree(plan_id)
+        tree = _plan_repo.get_plan_snapshot(plan_id)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -343,10 +344,6 @@ def decompose_task(
                 "allow_web_search": allow_web_search,
             },
         )
-        if background_tasks is None:
-            raise HTTPException(
-                status_code=500, detail="后台任务管理不可用，无法执行异步分解。"
-            )
         plan_decomposition_jobs.append_log(
             job.job_id,
             "info",
@@ -360,16 +357,24 @@ def decompose_task(
                 "allow_web_search": allow_web_search,
             },
         )
-        background_tasks.add_task(
-            _run_decomposition_job,
-            job.job_id,
-            plan_id,
-            task_id,
-            expand_depth,
-            node_budget,
-            allow_existing_children,
-            allow_web_search,
-        )
+        try:
+            get_job_scheduler().submit(
+                job.job_id,
+                _run_decomposition_job,
+                args=(
+                    job.job_id,
+                    plan_id,
+                    task_id,
+                    expand_depth,
+                    node_budget,
+                    allow_existing_children,
+                    allow_web_search,
+                ),
+                plan_id=plan_id,
+            )
+        except JobQueueFullError as exc:
+            plan_decomposition_jobs.mark_failure(job.job_id, str(exc))
+            raise HTTPException(status_code=429, detail=str(exc)) from exc
         message = (
             "任务拆分已提交到后台执行。你可以稍后查询 job 状态或刷新计划树查看进度。"
         )
@@ -444,7 +449,7 @@ async def stream_decomposition_job(job_id: str):
                     continue
                 message.setdefault("type", "event")
                 yield _sse_message(message)
-                if message.get("status") in {"succeeded", "failed"}:
+                if message.get("status") in TERMINAL_STATUSES:
                     break
         except asyncio.CancelledError:  # pragma: no cover - defensive
             raise
@@ -11,6 +11,7 @@ import psutil
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
+from ..services.llm.rate_limiter import get_rate_limiter_stats
 from ..services.storage.hybrid_vector_storage import get_hybrid_storage
 from . import register_router
 
@@ -245,6 +246,15 @@ async def get_vector_metrics():
         raise HTTPException(status_code=500, detail=f"获取指标失败: {str(e)}")
 
 
+@router.get("/metrics/llm-rate-limits", summary="LLM调用限流状态")
+async def get_llm_rate_limits():
+    """各提供方的限流预算、当前速率系数与最近一分钟的利用率"""
+    return {
+        "providers": list(get_rate_limiter_stats()),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
 @router.post("/maintenance/optimize", summary="系统维护优化")
 async def system_optimization():
     """执行系统维护和优化操作"""
@@ -53,6 +53,8 @@ class AppConfig:
     output_dir: str = "new_output_dir"
     llm_provider: str = "qwen"
     interpreter_type: str = "venv"
+    max_workers: int = 1
+    persistent_kernel: bool = False
     readme_filenames: list[str] = field(
         default_factory=lambda: ["README.md", "README.txt", "README.rst", "README"]
     )
@@ -231,6 +233,8 @@ def run_app(cfg: AppConfig) -> None:
             output_dir=str(output_dir),
             interpreter_type=cfg.interpreter_type,
             llm_provider=cfg.llm_provider,
+            max_workers=cfg.max_workers,
+            persistent_kernel=cfg.persistent_kernel,
         )
 
         print("OK: PlanExecutorInterpreter created")
@@ -238,6 +242,7 @@ def run_app(cfg: AppConfig) -> None:
         print(f"  Data directory: {cfg.data_dir} (auto-discovery mode)")
         print(f"  Output directory: {output_dir}")
         print(f"  Interpreter type: {cfg.interpreter_type}")
+        print(f"  Max workers: {cfg.max_workers}")
         print()
 
         print("Executing tasks...")
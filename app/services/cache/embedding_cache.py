@@ -2,11 +2,13 @@
 Embedding Cache Implementation using Unified Base Cache
 
 Provides caching for text embeddings with model-specific caching and 
-batch processing support.
+batch processing support. Embedding vectors are kept in the shared tiered
+embedding store (``app.services.embeddings.embedding_store``) under the same
+content-addressed key as every other embedding service.
 """
 
-import hashlib
 import logging
+import warnings
 from typing import List, Optional, Tuple, cast
 
 from .base_cache import BaseCache
@@ -19,9 +21,9 @@ class EmbeddingCache(BaseCache):
     Cache for text embeddings with model-specific caching.
     
     Extends BaseCache with embedding-specific features:
-    - Model-aware key generation
+    - Model-aware, content-addressed keys
     - Batch processing support
-    - Vector storage optimization
+    - Vectors stored in the shared tiered embedding store
     """
     
     def __init__(
@@ -37,8 +39,11 @@ class EmbeddingCache(BaseCache):
         
         Args:
             cache_name: Name of the cache (default: "embedding")
-            max_size: Maximum number of entries in cache
-            default_ttl: Default TTL in seconds (default: 7200)
+            max_size: Maximum number of entries in the inherited generic
+                ``get``/``set`` cache; embedding vectors are bounded by the
+                shared store instead (``EMBEDDING_CACHE_SIZE``)
+            default_ttl: Default TTL in seconds for the generic cache only;
+                stored embeddings do not expire
             enable_persistent: Enable persistent storage
             cleanup_interval: Cleanup interval in seconds
         """
@@ -50,6 +55,28 @@ class EmbeddingCache(BaseCache):
             cleanup_interval=cleanup_interval
         )
     
+    @property
+    def store(self):
+        """Shared tiered embedding store that holds the vectors."""
+        from ..embeddings.embedding_store import get_embedding_store
+
+        return get_embedding_store()
+
+    @staticmethod
+    def _model(model: str) -> Optional[str]:
+        # "default" resolves to the configured embedding model, as in the embedding services
+        return None if model in ("", "default") else model
+
+    @staticmethod
+    def _warn_ttl(ttl: Optional[int]) -> None:
+        if ttl is not None:
+            warnings.warn(
+                "The ttl argument of EmbeddingCache is ignored: embeddings are kept in the "
+                "shared embedding store and do not expire.",
+                DeprecationWarning,
+                stacklevel=3,
+            )
+
     def _generate_key(self, text: str, model: str = "default") -> str:
         """
         Generate cache key for text and model.
@@ -59,11 +86,11 @@ class EmbeddingCache(BaseCache):
             model: Model name
             
         Returns:
-            Cache key string
+            Content-addressed key shared with every embedding service
         """
-        # Create a consistent key using text and model
-        key_data = f"{text.strip().lower()}|{model}"
-        return hashlib.md5(key_data.encode('utf-8')).hexdigest()
+        from ..embeddings.embedding_store import embedding_key
+
+        return embedding_key(text, self.store._resolve_model(self._model(model)))
     
     def get_embedding(self, text: str, model: str = "default") -> Optional[List[float]]:
         """
@@ -76,8 +103,9 @@ class EmbeddingCache(BaseCache):
         Returns:
             Embedding vector or None if not cached
         """
-        key = self._generate_key(text, model)
-        result = self.get(key)
+        from ..embeddings.embedding_store import as_float_list
+
+        result = as_float_list(self.store.get(text, self._model(model)))
         
         if result is not None:
             logger.debug(f"Cache hit for embedding: {text[:50]}...")
@@ -98,10 +126,11 @@ class EmbeddingCache(BaseCache):
             text: Text that was embedded
             embedding: Embedding vector
             model: Model name
-            ttl: TTL in seconds
+            ttl: Deprecated and ignored; embeddings are deterministic and live
+                in the shared store
         """
-        key = self._generate_key(text, model)
-        self.set(key, embedding, ttl)
+        self._warn_ttl(ttl)
+        self.store.put(text, embedding, self._model(model))
         logger.debug(f"Cached embedding for: {text[:50]}...")
     
     def get_batch(
@@ -119,18 +148,10 @@ class EmbeddingCache(BaseCache):
         Returns:
             Tuple of (embeddings, missing_indices)
         """
-        embeddings = []
-        missing_indices = []
-        
-        for i, text in enumerate(texts):
-            embedding = self.get_embedding(text, model)
-            if embedding is not None:
-                embeddings.append(embedding)
-            else:
-                embeddings.append(None)
-                missing_indices.append(i)
-        
-        return embeddings, missing_indices
+        from ..embeddings.embedding_store import as_float_list
+
+        embeddings, missing_indices = self.store.get_many(texts, self._model(model))
+        return [as_float_list(e) for e in embeddings], missing_indices
     
     def set_batch(
         self,
@@ -146,30 +167,31 @@ class EmbeddingCache(BaseCache):
             texts: List of texts that were embedded
             embeddings: List of embedding vectors
             model: Model name
-            ttl: TTL in seconds
+            ttl: Deprecated and ignored; see set_embedding
             
         Returns:
             List of indices that were successfully cached
         """
-        cached_indices = []
-        
+        self._warn_ttl(ttl)
         if len(texts) != len(embeddings):
             logger.warning("Texts and embeddings length mismatch in batch cache operation")
-            return cached_indices
+            return []
         
-        for i, (text, embedding) in enumerate(zip(texts, embeddings)):
-            try:
-                self.set_embedding(text, embedding, model, ttl)
-                cached_indices.append(i)
-            except Exception as e:
-                logger.error(f"Failed to cache embedding for text {i}: {e}")
+        cached_indices = [
+            i for i, (text, embedding) in enumerate(zip(texts, embeddings)) if text.strip() and len(embedding)
+        ]
+        try:
+            self.store.put_many(texts, embeddings, self._model(model))
+        except Exception as e:
+            logger.error(f"Failed to cache embeddings in batch: {e}")
+            return []
         
         logger.debug(f"Cached {len(cached_indices)} embeddings in batch operation")
         return cached_indices
     
     def clear_model(self, model: str) -> int:
         """
-        Clear all entries for a specific model.
+        Clear all persisted entries for a specific model.
         
         Args:
             model: Model name to clear
@@ -177,48 +199,15 @@ class EmbeddingCache(BaseCache):
         Returns:
             Number of entries cleared
         """
+        store = self.store
         cleared_count = 0
-        
-        with self._lock:
-            # Find keys that match the model
-            keys_to_remove = []
-            for key in self._memory_cache:
-                # Check if key was generated with this model
-                # We can't easily reverse the key generation, so we'll use
-                # the database to find matching entries
-                pass
-            
-            if self.enable_persistent:
-                try:
-                    import sqlite3
-                    with sqlite3.connect(self._db_path) as conn:
-                        # Find entries with specific model in their data
-                        cursor = conn.execute(
-                            'SELECT key FROM cache_entries WHERE entry_data LIKE ?',
-                            (f'%"model":"{model}"%',)
-                        )
-                        for row in cursor:
-                            key = row[0]
-                            if key in self._memory_cache:
-                                del self._memory_cache[key]
-                                keys_to_remove.append(key)
-                        
-                        # Delete from database
-                        cursor.execute(
-                            'DELETE FROM cache_entries WHERE entry_data LIKE ?',
-                            (f'%"model":"{model}"%',)
-                        )
-                        conn.commit()
-                        cleared_count = cursor.rowcount
-                        
-                except Exception as e:
-                    logger.error(f"Failed to clear model {model} from database: {e}")
-            
-            # Remove from memory cache
-            for key in keys_to_remove:
-                if key in self._memory_cache:
-                    del self._memory_cache[key]
-                    cleared_count += 1
+        if store.disk is not None:
+            try:
+                cleared_count = store.disk.delete(model=store._resolve_model(self._model(model)))
+            except Exception as e:
+                logger.error(f"Failed to clear model {model} from database: {e}")
+        # Memory entries are not tagged by model; drop them all so nothing stale is served
+        store.clear_memory()
         
         logger.info(f"Cleared {cleared_count} entries for model: {model}")
         return cleared_count
@@ -233,24 +222,15 @@ class EmbeddingCache(BaseCache):
         Returns:
             Dictionary with model-specific statistics
         """
-        total_entries = 0
-        model_entries = 0
-        
-        with self._lock:
-            total_entries = len(self._memory_cache)
-            
-            # Count model-specific entries (approximate)
-            if self.enable_persistent:
-                try:
-                    import sqlite3
-                    with sqlite3.connect(self._db_path) as conn:
-                        cursor = conn.execute(
-                            'SELECT COUNT(*) FROM cache_entries WHERE entry_data LIKE ?',
-                            (f'%"model":"{model}"%',)
-                        )
-                        model_entries = cursor.fetchone()[0]
-                except Exception as e:
-                    logger.error(f"Failed to get model stats from database: {e}")
+        store = self.store
+        distribution = {}
+        if store.disk is not None:
+            try:
+                distribution = store.disk.model_distribution()
+            except Exception as e:
+                logger.error(f"Failed to get model stats from database: {e}")
+        total_entries = sum(distribution.values())
+        model_entries = distribution.get(store._resolve_model(self._model(model)), 0)
         
         return {
             'model': model,
@@ -0,0 +1,727 @@
+#!/usr/bin/env python3
+"""
+统一的分层嵌入向量存储
+
+所有嵌入服务共用同一个存储和同一种内容寻址键 ``sha256(f"{model}:{text}")``，
+同一段文本只会被嵌入、存储一次，命中率不再被多个缓存分摊。
+
+查找顺序：内存 → 本地磁盘（SQLite）→ Milvus（可选），下层命中后回填上层；
+写入时逐层写穿。所有层都以批量接口 ``get_many`` / ``put_many`` 访问。
+
+- 内存层（``EMBEDDING_CACHE_STORAGE``）：``float32`` / ``float16`` 使用连续的
+  NumPy slab，hash → 槽位索引，O(1) LRU，命中时在锁内把行复制为独立的小数组
+  （槽位淘汰后会被复用，不能把视图交给调用方）；``list`` 为每个向量一个列表。
+- 磁盘层（``EMBEDDING_CACHE_PERSISTENT``）：``embedding_vectors`` 表中的二进制
+  BLOB；旧版 ``embedding_cache`` 表中的 JSON 向量在首次读取时迁移。
+- Milvus 层（``EMBEDDING_STORE_MILVUS``）：``embedding_cache_collection`` 集合，
+  pymilvus 不可用或初始化失败时自动跳过。
+
+旧缓存数据库的合并见 ``python -m app.services.embeddings.migrate_embedding_caches``。
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.services.foundation.config import get_config
+from app.services.foundation.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+Vector = Union[List[float], np.ndarray]
+
+SLAB_DTYPES = {"float32": np.float32, "float16": np.float16}
+STORAGE_MODES = ("float32", "float16", "list")
+# SQLite 单条语句的参数上限较低，批量查询时分块
+_SQL_CHUNK = 500
+
+
+def embedding_key(text: str, model: str) -> str:
+    """内容寻址键：模型 + 文本的 SHA-256"""
+    return hashlib.sha256(f"{model}:{text}".encode("utf-8")).hexdigest()
+
+
+def as_float_list(vector: Optional[Vector]) -> Optional[List[float]]:
+    """把缓存返回的数组转换为普通浮点数列表（已是列表时原样返回）"""
+    if isinstance(vector, np.ndarray):
+        return vector.tolist()
+    return vector
+
+
+def _is_empty(vector: Optional[Vector]) -> bool:
+    return vector is None or len(vector) == 0
+
+
+# ----------------------------------------------------------------------
+# 内存层
+# ----------------------------------------------------------------------
+
+
+class RWLock:
+    """简单的读写锁实现"""
+
+    def __init__(self):
+        self._read_ready = threading.Condition(threading.RLock())
+        self._readers = 0
+
+    @contextmanager
+    def read_lock(self):
+        """获取读锁"""
+        with self._read_ready:
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._read_ready:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._read_ready.notify_all()
+
+    @contextmanager
+    def write_lock(self):
+        """获取写锁"""
+        with self._read_ready:
+            while self._readers > 0:
+                self._read_ready.wait()
+            yield
+
+
+@dataclass
+class ThreadSafeCacheEntry:
+    """线程安全的缓存条目"""
+
+    text_hash: str
+    embedding: List[float]
+    model: str
+    created_at: float
+    access_count: int = 0
+    last_accessed: float = 0.0
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+
+    def update_access_stats(self, current_time: float) -> None:
+        """原子更新访问统计"""
+        with self._lock:
+            self.access_count += 1
+            self.last_accessed = current_time
+
+    def get_embedding_copy(self) -> List[float]:
+        """获取embedding的线程安全副本"""
+        with self._lock:
+            return self.embedding.copy()
+
+
+class ListEmbeddingStore:
+    """每个向量一个 Python 列表的内存存储（旧实现）"""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._entries: Dict[str, ThreadSafeCacheEntry] = {}
+        self._lock = RWLock()
+
+    def get(self, text_hash: str) -> Optional[List[float]]:
+        with self._lock.read_lock():
+            entry = self._entries.get(text_hash)
+            if entry is None:
+                return None
+            entry.update_access_stats(time.time())
+            return entry.get_embedding_copy()
+
+    def get_many(self, hashes: Sequence[str]) -> List[Optional[List[float]]]:
+        return [self.get(h) for h in hashes]
+
+    def as_stored(self, vector: Vector) -> List[float]:
+        """转换为本层返回的表示（浮点数列表），用于下层命中的结果"""
+        return [float(x) for x in vector]
+
+    def put(self, text_hash: str, vector: Vector, model: str = "") -> None:
+        now = time.time()
+        entry = ThreadSafeCacheEntry(
+            text_hash=text_hash,
+            embedding=[float(x) for x in vector],
+            model=model,
+            created_at=now,
+            access_count=1,
+            last_accessed=now,
+        )
+        with self._lock.write_lock():
+            if text_hash not in self._entries and len(self._entries) >= self.capacity:
+                self._evict_lru_unsafe()
+            self._entries[text_hash] = entry
+
+    def _evict_lru_unsafe(self) -> None:
+        """移除最少使用且最久未访问的条目（非线程安全）"""
+        if not self._entries:
+            return
+        lru_key = min(
+            self._entries.keys(),
+            key=lambda k: (self._entries[k].access_count, self._entries[k].last_accessed),
+        )
+        del self._entries[lru_key]
+        logger.debug(f"Evicted from memory cache: {lru_key[:8]}...")
+
+    def clear(self) -> None:
+        with self._lock.write_lock():
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"slabs": {}, "memory_bytes": None}
+
+
+class EmbeddingSlab:
+    """同一维度向量的连续存储块，按需倍增扩容"""
+
+    __slots__ = ("dim", "vectors", "used", "_free")
+
+    def __init__(self, dim: int, dtype: Any, rows: int):
+        self.dim = dim
+        self.vectors = np.empty((rows, dim), dtype=dtype)
+        self.used = 0
+        self._free = deque(range(rows))
+
+    def allocate(self, max_rows: int) -> int:
+        if not self._free:
+            rows = self.vectors.shape[0]
+            new_rows = min(max_rows, max(rows * 2, 1))
+            if new_rows <= rows:
+                raise MemoryError("embedding slab is full")
+            grown = np.empty((new_rows, self.dim), dtype=self.vectors.dtype)
+            grown[:rows] = self.vectors
+            self.vectors = grown
+            self._free.extend(range(rows, new_rows))
+        self.used += 1
+        return self._free.popleft()
+
+    def release(self, slot: int) -> None:
+        self.used -= 1
+        self._free.append(slot)
+
+
+class SlabEmbeddingStore:
+    """基于 NumPy slab 的紧凑内存存储：hash → (维度, 槽位) 索引 + O(1) LRU"""
+
+    _INITIAL_ROWS = 64
+
+    def __init__(self, capacity: int, dtype: str = "float32"):
+        self.capacity = max(1, int(capacity))
+        self.dtype = np.dtype(SLAB_DTYPES[dtype])
+        self._lock = threading.Lock()
+        # OrderedDict 同时充当索引和 LRU 链表（末尾为最近使用）
+        self._index: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+        self._slabs: Dict[int, EmbeddingSlab] = {}
+
+    def _copy_unsafe(self, text_hash: str) -> Optional[np.ndarray]:
+        # 槽位在淘汰后会被其他文本复用，必须在锁内复制出来
+        located = self._index.get(text_hash)
+        if located is None:
+            return None
+        self._index.move_to_end(text_hash)
+        dim, slot = located
+        return self._slabs[dim].vectors[slot].copy()
+
+    def get(self, text_hash: str) -> Optional[np.ndarray]:
+        with self._lock:
+            return self._copy_unsafe(text_hash)
+
+    def get_many(self, hashes: Sequence[str]) -> List[Optional[np.ndarray]]:
+        with self._lock:
+            return [self._copy_unsafe(h) for h in hashes]
+
+    def as_stored(self, vector: Vector) -> np.ndarray:
+        """转换为本层返回的表示（slab 精度的独立数组），用于下层命中的结果"""
+        return np.array(vector, dtype=self.dtype).reshape(-1)
+
+    def put(self, text_hash: str, vector: Vector, model: str = "") -> None:
+        values = np.asarray(vector, dtype=self.dtype).reshape(-1)
+        dim = int(values.shape[0])
+        with self._lock:
+            located = self._index.get(text_hash)
+            if located is not None:
+                if located[0] == dim:
+                    self._slabs[dim].vectors[located[1]] = values
+                    self._index.move_to_end(text_hash)
+                    return
+                self._remove_unsafe(text_hash)
+            elif len(self._index) >= self.capacity:
+                self._remove_unsafe(next(iter(self._index)))
+
+            slab = self._slabs.get(dim)
+            if slab is None:
+                slab = self._slabs[dim] = EmbeddingSlab(dim, self.dtype, min(self.capacity, self._INITIAL_ROWS))
+            slot = slab.allocate(self.capacity)
+            slab.vectors[slot] = values
+            self._index[text_hash] = (dim, slot)
+
+    def _remove_unsafe(self, text_hash: str) -> None:
+        dim, slot = self._index.pop(text_hash)
+        slab = self._slabs[dim]
+        slab.release(slot)
+        if slab.used == 0:
+            # 某个维度的条目全部淘汰后释放整块内存
+            del self._slabs[dim]
+        logger.debug(f"Evicted from memory cache: {text_hash[:8]}...")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index.clear()
+            self._slabs.clear()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            slabs = {dim: {"rows": s.vectors.shape[0], "used": s.used} for dim, s in self._slabs.items()}
+            memory_bytes = sum(s.vectors.nbytes for s in self._slabs.values())
+        return {"slabs": slabs, "memory_bytes": memory_bytes}
+
+
+# ----------------------------------------------------------------------
+# 磁盘层
+# ----------------------------------------------------------------------
+
+
+VECTOR_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS embedding_vectors (
+        text_hash TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        dtype TEXT NOT NULL,
+        dim INTEGER NOT NULL,
+        vector BLOB NOT NULL,
+        created_at REAL NOT NULL,
+        access_count INTEGER DEFAULT 0,
+        last_accessed REAL DEFAULT 0.0
+    )
+"""
+
+
+def create_vector_table(conn: sqlite3.Connection) -> None:
+    conn.execute(VECTOR_TABLE_SQL)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vectors_model ON embedding_vectors(model)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vectors_last_accessed ON embedding_vectors(last_accessed)")
+
+
+def decode_blob(blob: bytes, dtype: str, dim: int) -> Optional[np.ndarray]:
+    try:
+        vector = np.frombuffer(blob, dtype=np.dtype(dtype))
+    except (TypeError, ValueError):
+        return None
+    return vector if vector.shape[0] == dim else None
+
+
+class SQLiteEmbeddingTier:
+    """本地磁盘层：``embedding_vectors`` 表中的二进制向量"""
+
+    def __init__(self, db_path: str, dtype: Any = np.float32):
+        self.db_path = db_path
+        self.dtype = np.dtype(dtype)
+        self._db_lock = threading.RLock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self.has_legacy_table = False
+        with self.connection() as conn:
+            create_vector_table(conn)
+            conn.commit()
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'embedding_cache'"
+            ).fetchone()
+            self.has_legacy_table = row is not None
+
+    @contextmanager
+    def connection(self):
+        """获取线程安全的数据库连接（每个线程一个，保持在池中）"""
+        thread_id = threading.get_ident()
+        with self._db_lock:
+            if thread_id not in self._connections:
+                self._connections[thread_id] = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        conn = self._connections[thread_id]
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+
+    def get_many(self, keys: Sequence[str], model: str) -> Dict[str, Vector]:
+        loaded: Dict[str, Vector] = {}
+        with self.connection() as conn:
+            for start in range(0, len(keys), _SQL_CHUNK):
+                chunk = list(keys[start : start + _SQL_CHUNK])
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT text_hash, dtype, dim, vector FROM embedding_vectors "
+                    f"WHERE model = ? AND text_hash IN ({marks})",
+                    (model, *chunk),
+                ).fetchall()
+                for text_hash, dtype, dim, blob in rows:
+                    vector = decode_blob(blob, dtype, dim)
+                    if vector is not None:
+                        loaded[text_hash] = vector
+
+            if loaded:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embedding_vectors SET access_count = access_count + 1, last_accessed = ? "
+                    "WHERE text_hash = ?",
+                    [(now, h) for h in loaded],
+                )
+                conn.commit()
+
+            missing = [h for h in keys if h not in loaded]
+            if missing and self.has_legacy_table:
+                legacy = self._load_legacy_rows(conn, missing, model)
+                if legacy:
+                    self.put_many(list(legacy.items()), model)
+                    loaded.update(legacy)
+        return loaded
+
+    def _load_legacy_rows(self, conn: sqlite3.Connection, keys: List[str], model: str) -> Dict[str, List[float]]:
+        """读取旧版 JSON 格式的缓存行，随后迁移到二进制表"""
+        legacy: Dict[str, List[float]] = {}
+        for start in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[start : start + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT text_hash, embedding_json FROM embedding_cache WHERE model = ? AND text_hash IN ({marks})",
+                (model, *chunk),
+            ).fetchall()
+            for text_hash, embedding_json in rows:
+                try:
+                    vector = json.loads(embedding_json)
+                except (TypeError, ValueError):
+                    continue
+                if vector:
+                    legacy[text_hash] = vector
+        return legacy
+
+    def put_many(self, items: Sequence[Tuple[str, Vector]], model: str) -> None:
+        now = time.time()
+        rows = []
+        for text_hash, embedding in items:
+            vector = np.asarray(embedding, dtype=self.dtype).reshape(-1)
+            rows.append((text_hash, model, self.dtype.name, int(vector.shape[0]), vector.tobytes(), now, 1, now))
+        with self.connection() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO embedding_vectors
+                (text_hash, model, dtype, dim, vector, created_at, access_count, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                rows,
+            )
+            conn.commit()
+
+    def iter_vectors(self, batch_size: int = 1000) -> Iterator[Tuple[str, str, np.ndarray, float, int]]:
+        """遍历全部向量：(text_hash, model, vector, created_at, access_count)"""
+        with self.connection() as conn:
+            cursor = conn.execute(
+                "SELECT text_hash, model, dtype, dim, vector, created_at, access_count FROM embedding_vectors"
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for text_hash, model, dtype, dim, blob, created_at, access_count in rows:
+                    vector = decode_blob(blob, dtype, dim)
+                    if vector is not None:
+                        yield text_hash, model, vector, created_at, access_count
+
+    def count(self) -> int:
+        with self.connection() as conn:
+            row = conn.execute("SELECT COUNT(*) FROM embedding_vectors").fetchone()
+        return row[0] if row else 0
+
+    def model_distribution(self) -> Dict[str, int]:
+        with self.connection() as conn:
+            rows = conn.execute("SELECT model, COUNT(*) FROM embedding_vectors GROUP BY model").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def delete(self, model: Optional[str] = None, older_than: Optional[float] = None) -> int:
+        """按模型和/或最后访问时间删除；都不指定时清空"""
+        clauses, params = [], []
+        if model is not None:
+            clauses.append("model = ?")
+            params.append(model)
+        if older_than is not None:
+            clauses.append("last_accessed < ?")
+            params.append(older_than)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.connection() as conn:
+            cursor = conn.execute(f"DELETE FROM embedding_vectors{where}", params)
+            conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._db_lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+
+
+# ----------------------------------------------------------------------
+# Milvus 层（可选）
+# ----------------------------------------------------------------------
+
+
+class MilvusEmbeddingTier:
+    """远端层：复用 ``MilvusVectorService`` 的 ``embedding_cache_collection`` 集合"""
+
+    def __init__(self, service: Any):
+        self.service = service
+
+    @classmethod
+    def connect(cls) -> Optional["MilvusEmbeddingTier"]:
+        try:
+            from app.services.storage.milvus_service import PYMILVUS_AVAILABLE, MilvusVectorService
+            from app.utils import run_async
+        except Exception as e:  # pragma: no cover - optional dependency
+            logger.warning(f"Milvus embedding tier unavailable: {e}")
+            return None
+        if not PYMILVUS_AVAILABLE:
+            logger.warning("Milvus embedding tier requested but pymilvus is not installed")
+            return None
+        service = MilvusVectorService()
+        if not run_async(service.initialize()):
+            return None
+        return cls(service)
+
+    def get_many(self, keys: Sequence[str], model: str) -> Dict[str, Vector]:
+        return self.service.fetch_embedding_cache(list(keys), model)
+
+    def put_many(self, items: Sequence[Tuple[str, Vector]], model: str) -> None:
+        self.service.store_embedding_cache_many([(key, as_float_list(vec)) for key, vec in items], model)
+
+
+# ----------------------------------------------------------------------
+# 分层存储
+# ----------------------------------------------------------------------
+
+
+class TieredEmbeddingStore:
+    """内存 → 磁盘 → Milvus 的分层嵌入向量存储"""
+
+    def __init__(
+        self,
+        memory_size: int = 10000,
+        storage: Optional[str] = None,
+        enable_disk: bool = True,
+        db_path: Optional[str] = None,
+        remote: Optional[Any] = None,
+    ):
+        self.config = get_config()
+        self.memory_size = memory_size
+
+        storage = (storage or getattr(get_settings(), "embedding_cache_storage", "float32") or "float32").lower()
+        if storage not in STORAGE_MODES:
+            logger.warning(f"Unknown embedding cache storage '{storage}', falling back to float32")
+            storage = "float32"
+        self.storage = storage
+        if storage == "list":
+            self.memory: Union[ListEmbeddingStore, SlabEmbeddingStore] = ListEmbeddingStore(memory_size)
+        else:
+            self.memory = SlabEmbeddingStore(memory_size, storage)
+
+        if db_path is None:
+            from ...config.database_config import get_cache_database_path
+
+            db_path = get_cache_database_path("embedding")
+        self.db_path = db_path
+        self.disk: Optional[SQLiteEmbeddingTier] = None
+        if enable_disk:
+            try:
+                # 磁盘层的向量精度跟随内存层（list 模式使用 float32）
+                self.disk = SQLiteEmbeddingTier(db_path, np.float16 if storage == "float16" else np.float32)
+            except Exception as e:
+                logger.error(f"Failed to initialize persistent cache: {e}")
+        self.remote = remote
+
+        self._stats_lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "persistent_hits": 0, "remote_hits": 0, "misses": 0}
+
+        logger.info(
+            f"Tiered embedding store initialized: memory_size={memory_size}, storage={self.storage}, "
+            f"disk={self.disk is not None}, remote={remote is not None}"
+        )
+
+    # 键与模型 -------------------------------------------------------------
+
+    def _resolve_model(self, model: Optional[str]) -> str:
+        value = model or getattr(self.config, "embedding_model", None)
+        return value or "embedding-3"
+
+    def _compute_text_hash(self, text: str, model: str) -> str:
+        return embedding_key(text, model)
+
+    # 按键访问 -------------------------------------------------------------
+
+    def get_by_keys(self, keys: Sequence[str], model: str) -> List[Optional[Vector]]:
+        """按内容寻址键批量查找，逐层下探并回填上层"""
+        results: List[Optional[Vector]] = list(self.memory.get_many(keys))
+        counts = {"memory_hits": sum(1 for r in results if r is not None)}
+
+        lower = [(name, tier) for name, tier in (("persistent", self.disk), ("remote", self.remote)) if tier]
+        filled: List[Tuple[str, Any]] = []
+        for name, tier in lower:
+            pending = list(dict.fromkeys(k for k, r in zip(keys, results) if r is None))
+            if not pending:
+                break
+            try:
+                loaded = tier.get_many(pending, model)
+            except Exception as e:
+                logger.warning(f"Failed to read from {name} embedding tier: {e}")
+                continue
+            if not loaded:
+                filled.append((name, tier))
+                continue
+            items = list(loaded.items())
+            for upper_name, upper in filled:
+                try:
+                    upper.put_many(items, model)
+                except Exception as e:
+                    logger.warning(f"Failed to backfill {upper_name} embedding tier: {e}")
+            for key, vector in items:
+                self.memory.put(key, vector, model)
+            hits = 0
+            for i, key in enumerate(keys):
+                if results[i] is None and key in loaded:
+                    # 与内存命中的类型、精度一致，不随命中的层而变
+                    results[i] = self.memory.as_stored(loaded[key])
+                    hits += 1
+            counts[f"{name}_hits"] = hits
+            filled.append((name, tier))
+
+        counts["misses"] = sum(1 for r in results if r is None)
+        with self._stats_lock:
+            for name, value in counts.items():
+                self._stats[name] += value
+        return results
+
+    def put_by_keys(self, items: Sequence[Tuple[str, Vector]], model: str) -> None:
+        """按内容寻址键批量写入各层"""
+        items = [(key, vector) for key, vector in items if not _is_empty(vector)]
+        if not items:
+            return
+        for key, vector in items:
+            self.memory.put(key, vector, model)
+        for name, tier in (("persistent", self.disk), ("remote", self.remote)):
+            if tier is None:
+                continue
+            try:
+                tier.put_many(items, model)
+            except Exception as e:
+                logger.warning(f"Failed to write to {name} embedding tier: {e}")
+
+    # 按文本访问 -----------------------------------------------------------
+
+    def get_many(self, texts: List[str], model: Optional[str] = None) -> Tuple[List[Optional[Vector]], List[int]]:
+        """批量获取嵌入向量，返回 (结果, 未命中下标)"""
+        model = self._resolve_model(model)
+        keys = [embedding_key(text, model) if text.strip() else None for text in texts]
+        present = [k for k in keys if k is not None]
+        found = dict(zip(present, self.get_by_keys(present, model))) if present else {}
+        results = [found.get(k) if k is not None else None for k in keys]
+        return results, [i for i, r in enumerate(results) if r is None]
+
+    def put_many(self, texts: List[str], embeddings: List[Vector], model: Optional[str] = None) -> None:
+        """批量存储嵌入向量（磁盘层单事务写入）"""
+        if len(texts) != len(embeddings):
+            raise ValueError("texts and embeddings must have the same length")
+        model = self._resolve_model(model)
+        self.put_by_keys(
+            [(embedding_key(text, model), vec) for text, vec in zip(texts, embeddings) if text.strip()],
+            model,
+        )
+
+    def get(self, text: str, model: Optional[str] = None) -> Optional[Vector]:
+        """获取单个嵌入向量（slab 模式返回独立的 NumPy 数组）"""
+        return self.get_many([text], model)[0][0]
+
+    def put(self, text: str, embedding: Vector, model: Optional[str] = None) -> None:
+        self.put_many([text], [embedding], model)
+
+    # 兼容旧缓存接口
+    get_batch = get_many
+    put_batch = put_many
+
+    # 维护 -----------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取存储统计信息（线程安全）"""
+        memory_stats = self.memory.stats()
+        with self._stats_lock:
+            counters = dict(self._stats)
+        hits = counters["memory_hits"] + counters["persistent_hits"] + counters["remote_hits"]
+        lookups = hits + counters["misses"]
+        stats: Dict[str, Any] = {
+            "memory_cache_size": len(self.memory),
+            "memory_cache_limit": self.memory_size,
+            "storage": self.storage,
+            "memory_bytes": memory_stats["memory_bytes"],
+            "slabs": memory_stats["slabs"],
+            **counters,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "persistent_enabled": self.disk is not None,
+            "remote_enabled": self.remote is not None,
+        }
+        if self.disk is not None:
+            try:
+                stats["persistent_cache_size"] = self.disk.count()
+                stats["model_distribution"] = self.disk.model_distribution()
+            except Exception as e:
+                logger.warning(f"Failed to get persistent cache stats: {e}")
+                stats["persistent_cache_size"] = 0
+                stats["model_distribution"] = {}
+        return stats
+
+    def clear_memory(self) -> None:
+        self.memory.clear()
+        logger.info("Memory cache cleared")
+
+    def shutdown(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+        logger.info("Tiered embedding store shutdown completed")
+
+
+_embedding_store: Optional[TieredEmbeddingStore] = None
+_store_creation_lock = threading.Lock()
+
+
+def get_embedding_store() -> TieredEmbeddingStore:
+    """进程内共享的嵌入向量存储（单例）"""
+    global _embedding_store
+
+    if _embedding_store is None:
+        with _store_creation_lock:
+            if _embedding_store is None:  # 双重检查锁定
+                settings = get_settings()
+                remote = MilvusEmbeddingTier.connect() if getattr(settings, "embedding_store_milvus", False) else None
+                _embedding_store = TieredEmbeddingStore(
+                    memory_size=int(getattr(settings, "embedding_cache_size", 10000)),
+                    storage=str(getattr(settings, "embedding_cache_storage", "float32")),
+                    enable_disk=bool(getattr(settings, "embedding_cache_persistent", True)),
+                    remote=remote,
+                )
+
+    return _embedding_store
+
+
+def reset_embedding_store() -> None:
+    """关闭并丢弃共享存储，下次获取时按当前配置重建"""
+    global _embedding_store
+    with _store_creation_lock:
+        if _embedding_store is not None:
+            _embedding_store.shutdown()
+        _embedding_store = None
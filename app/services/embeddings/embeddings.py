@@ -9,7 +9,9 @@ specialized components and provides a unified public interface.
 
 import logging
 from concurrent.futures import Future
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from app.services.embeddings.async_embedding_manager import AsyncEmbeddingManager
 from app.services.embeddings.cache import get_embedding_cache
@@ -152,6 +154,23 @@ class GLMEmbeddingsService:
         """Find most similar candidates"""
         return self.similarity_calculator.find_most_similar(query_embedding, candidates, k, min_similarity)
 
+    def normalize_embeddings(self, embeddings: List[List[float]]) -> np.ndarray:
+        """Normalize candidate embeddings into a cacheable matrix"""
+        return self.similarity_calculator.normalize_embeddings(embeddings)
+
+    def top_k_similar(
+        self,
+        query_embedding: List[float],
+        normalized_matrix: np.ndarray,
+        k: int = 5,
+        min_similarity: Optional[float] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k indices and scores against a pre-normalized matrix"""
+        return self.similarity_calculator.top_k_similar(
+            query_embedding, normalized_matrix, k=k, min_similarity=min_similarity, chunk_size=chunk_size
+        )
+
     # Service information and configuration methods
     def get_service_info(self) -> Dict[str, Any]:
         """Get service information"""
@@ -14,6 +14,9 @@ from typing import Any, Dict, List
 
 import requests
 
+from app.services.llm.rate_limiter import get_rate_limiter, parse_retry_after
+from app.services.llm.response_cache import estimate_tokens
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +40,8 @@ class GLMApiClient:
 
         # Connection pool reuse
         self.session = requests.Session()
+        # Embedding quota is separate from chat completions on the GLM platform
+        self.rate_limiter = get_rate_limiter("glm_embedding")
 
         logger.info(f"GLM API Client initialized - Model: {self.model}, Mock: {self.mock_mode}")
 
@@ -74,14 +79,34 @@ class GLMApiClient:
         """Execute actual API request"""
         headers = self._build_request_headers()
         payload = self._build_request_payload(texts)
+        tokens = estimate_tokens(*texts)
 
-        response = self.session.post(self.api_url, headers=headers, json=payload, timeout=self.request_timeout)
+        self.rate_limiter.acquire(tokens)
+        try:
+            response = self.session.post(self.api_url, headers=headers, json=payload, timeout=self.request_timeout)
+        except Exception:
+            self.rate_limiter.record_failure(reserved_tokens=tokens)
+            raise
 
         if response.status_code != 200:
+            self.rate_limiter.record_failure(
+                response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                reserved_tokens=tokens,
+            )
             raise Exception(f"API request failed with status {response.status_code}: {response.text}")
 
+        self.rate_limiter.record_success(tokens, self._usage_tokens(response, tokens))
         return self._parse_api_response(response)
 
+    @staticmethod
+    def _usage_tokens(response, default: int) -> int:
+        """Tokens reported by the API, falling back to the estimate"""
+        try:
+            return int(response.json()["usage"]["total_tokens"])
+        except Exception:
+            return default
+
     def _build_request_headers(self) -> Dict[str, str]:
         """Build request headers"""
         return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
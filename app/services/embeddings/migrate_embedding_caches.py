@@ -0,0 +1,238 @@
+"""
+Merge the old embedding cache databases into the shared tiered store.
+
+Before the tiered ``embedding_store`` existed, embeddings were persisted by
+several independent caches:
+
+* ``embedding_cache`` tables (JSON vectors, ``sha256(model:text)`` keys) written
+  by the old ``EmbeddingCache`` / ``ThreadSafeEmbeddingCache`` and by
+  ``HybridVectorStorage`` (whose default path was relative to the working
+  directory, ``./data/databases/cache/embedding_cache.db``);
+* ``embedding_vectors`` tables (binary vectors) in other cache files;
+* ``cache_entries`` tables of the unified ``services.cache`` embedding cache.
+
+This command copies every vector it can address into the ``embedding_vectors``
+table of the store's database. Rows that already exist keep their vector; the
+access statistics are merged, so the command is safe to run more than once.
+``cache_entries`` rows are keyed by ``md5(lower(text)|model)``, which cannot be
+mapped back to the content key, so they are only counted and reported.
+
+Usage:
+    python -m app.services.embeddings.migrate_embedding_caches --dry-run
+    python -m app.services.embeddings.migrate_embedding_caches
+    python -m app.services.embeddings.migrate_embedding_caches --source old/embedding_cache.db --drop-legacy
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .embedding_store import create_vector_table, decode_blob
+
+# Default location HybridVectorStorage used before it shared the store's database.
+LEGACY_HYBRID_PATH = "./data/databases/cache/embedding_cache.db"
+_BATCH = 1000
+
+_MERGE_SQL = """
+    INSERT INTO embedding_vectors
+    (text_hash, model, dtype, dim, vector, created_at, access_count, last_accessed)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(text_hash) DO UPDATE SET
+        created_at = MIN(created_at, excluded.created_at),
+        access_count = MAX(access_count, excluded.access_count),
+        last_accessed = MAX(last_accessed, excluded.last_accessed)
+"""
+
+
+def _tables(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def _same_file(a: str, b: str) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return os.path.abspath(a) == os.path.abspath(b)
+
+
+def default_sources(target: str) -> List[str]:
+    """The store's own database, the old HybridVectorStorage file and other cache databases."""
+    candidates = [target, LEGACY_HYBRID_PATH]
+    cache_dir = Path(target).parent
+    if cache_dir.is_dir():
+        candidates.extend(str(p) for p in sorted(cache_dir.glob("*.db")))
+    sources: List[str] = []
+    for path in candidates:
+        if os.path.exists(path) and not any(_same_file(path, seen) for seen in sources):
+            sources.append(path)
+    return sources
+
+
+def _json_rows(conn: sqlite3.Connection, dtype: np.dtype) -> Iterable[Tuple[Any, ...]]:
+    cursor = conn.execute(
+        "SELECT text_hash, embedding_json, model, created_at, access_count, last_accessed FROM embedding_cache"
+    )
+    while True:
+        batch = cursor.fetchmany(_BATCH)
+        if not batch:
+            break
+        for text_hash, embedding_json, model, created_at, access_count, last_accessed in batch:
+            try:
+                vector = np.asarray(json.loads(embedding_json), dtype=dtype).reshape(-1)
+            except (TypeError, ValueError):
+                yield None
+                continue
+            if vector.size == 0:
+                yield None
+                continue
+            yield (
+                text_hash,
+                model,
+                dtype.name,
+                int(vector.shape[0]),
+                vector.tobytes(),
+                created_at or 0.0,
+                access_count or 0,
+                last_accessed or 0.0,
+            )
+
+
+def _blob_rows(conn: sqlite3.Connection) -> Iterable[Tuple[Any, ...]]:
+    cursor = conn.execute(
+        "SELECT text_hash, model, dtype, dim, vector, created_at, access_count, last_accessed FROM embedding_vectors"
+    )
+    while True:
+        batch = cursor.fetchmany(_BATCH)
+        if not batch:
+            break
+        for row in batch:
+            yield row if decode_blob(row[4], row[2], row[3]) is not None else None
+
+
+def _count_embedding_entries(conn: sqlite3.Connection) -> int:
+    count = 0
+    for (entry_data,) in conn.execute("SELECT entry_data FROM cache_entries"):
+        try:
+            value = json.loads(entry_data).get("value")
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if isinstance(value, list) and value and all(isinstance(x, (int, float)) for x in value[:8]):
+            count += 1
+    return count
+
+
+def _merge(target: sqlite3.Connection, rows: Iterable[Optional[Tuple[Any, ...]]], dry_run: bool) -> Tuple[int, int]:
+    merged = invalid = 0
+    batch: List[Tuple[Any, ...]] = []
+    for row in rows:
+        if row is None:
+            invalid += 1
+            continue
+        batch.append(row)
+        if len(batch) >= _BATCH:
+            if not dry_run:
+                target.executemany(_MERGE_SQL, batch)
+            merged += len(batch)
+            batch = []
+    if batch:
+        if not dry_run:
+            target.executemany(_MERGE_SQL, batch)
+        merged += len(batch)
+    return merged, invalid
+
+
+def migrate_embedding_caches(
+    target: str,
+    sources: Optional[List[str]] = None,
+    dtype: str = "float32",
+    drop_legacy: bool = False,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """Merge every source database into ``target``; returns per-source counts."""
+    vector_dtype = np.dtype(dtype)
+    sources = sources if sources is not None else default_sources(target)
+    Path(target).parent.mkdir(parents=True, exist_ok=True)
+
+    report: Dict[str, Any] = {"target": target, "sources": {}, "merged": 0}
+    target_conn = sqlite3.connect(target)
+    try:
+        create_vector_table(target_conn)
+        before = target_conn.execute("SELECT COUNT(*) FROM embedding_vectors").fetchone()[0]
+        for source in sources:
+            is_target = _same_file(source, target)
+            conn = target_conn if is_target else sqlite3.connect(source)
+            entry: Dict[str, Any] = {"json_rows": 0, "blob_rows": 0, "invalid_rows": 0, "unaddressable_rows": 0}
+            try:
+                tables = _tables(conn)
+                if "embedding_cache" in tables:
+                    entry["json_rows"], invalid = _merge(target_conn, _json_rows(conn, vector_dtype), dry_run)
+                    entry["invalid_rows"] += invalid
+                if "embedding_vectors" in tables and not is_target:
+                    entry["blob_rows"], invalid = _merge(target_conn, _blob_rows(conn), dry_run)
+                    entry["invalid_rows"] += invalid
+                if "cache_entries" in tables:
+                    entry["unaddressable_rows"] = _count_embedding_entries(conn)
+                if not dry_run:
+                    target_conn.commit()
+                    if drop_legacy and "embedding_cache" in tables:
+                        conn.execute("DROP TABLE embedding_cache")
+                        conn.commit()
+                        entry["dropped_legacy_table"] = True
+            finally:
+                if not is_target:
+                    conn.close()
+            report["sources"][source] = entry
+
+        after = target_conn.execute("SELECT COUNT(*) FROM embedding_vectors").fetchone()[0]
+        if dry_run:
+            # Upper bound: rows already present in the target are counted too.
+            report["merged"] = sum(e["json_rows"] + e["blob_rows"] for e in report["sources"].values())
+        else:
+            report["merged"] = after - before
+        report["total"] = after
+    finally:
+        target_conn.close()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="Store database (default: the embedding cache database from DB_ROOT)")
+    parser.add_argument(
+        "--source", action="append", default=None, help="Database to merge (repeatable; default: auto-discover)"
+    )
+    parser.add_argument("--dtype", choices=("float32", "float16"), help="Precision for converted JSON vectors")
+    parser.add_argument("--drop-legacy", action="store_true", help="Drop merged embedding_cache JSON tables")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be merged")
+    args = parser.parse_args(argv)
+
+    target = args.target
+    if target is None:
+        from ...config.database_config import get_cache_database_path
+
+        target = get_cache_database_path("embedding")
+    dtype = args.dtype
+    if dtype is None:
+        from app.services.foundation.settings import get_settings
+
+        dtype = "float16" if getattr(get_settings(), "embedding_cache_storage", "") == "float16" else "float32"
+
+    report = migrate_embedding_caches(target, args.source, dtype, args.drop_legacy, args.dry_run)
+    for source, entry in report["sources"].items():
+        print(f"{source}: {entry}")
+    if args.dry_run:
+        print(f"Would merge up to {report['merged']} vector(s) into {report['target']} ({report['total']} present).")
+    else:
+        print(f"Merged into {report['target']}: {report['merged']} new vector(s), {report['total']} total.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,12 +7,14 @@ Extracted from GLMEmbeddingsService to follow the single responsibility principl
 """
 
 import logging
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+EmbeddingMatrix = Union[np.ndarray, Sequence[Sequence[float]]]
+
 
 class SimilarityCalculator:
     """Similarity calculator class specialized in vector similarity computation"""
@@ -58,6 +60,89 @@ class SimilarityCalculator:
             logger.error(f"Similarity computation failed: {e}")
             return 0.0
 
+    @staticmethod
+    def normalize_embeddings(embeddings: EmbeddingMatrix) -> np.ndarray:
+        """
+        Convert embeddings to an L2-normalized float32 matrix
+
+        The result can be cached by callers and passed to ``top_k_similar`` so
+        that norms are not recomputed on every query. Zero vectors stay zero.
+
+        Args:
+            embeddings: 2-D array or list of vectors (a single vector is treated as one row)
+
+        Returns:
+            Array of shape (n, dim) with unit-length rows
+        """
+        # Always copy so that caller-owned arrays are never modified in place
+        matrix = np.array(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.size == 0:
+            return matrix
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms != 0)
+        return matrix
+
+    def top_k_similar(
+        self,
+        query_embedding: EmbeddingMatrix,
+        normalized_matrix: np.ndarray,
+        k: int = 5,
+        min_similarity: Optional[float] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k cosine similarity against a pre-normalized candidate matrix
+
+        Args:
+            query_embedding: Query vector (raw, normalized internally)
+            normalized_matrix: Output of ``normalize_embeddings`` for the candidates
+            k: Number of results to return
+            min_similarity: Optional threshold; lower scores are dropped
+            chunk_size: If set, score candidates in row blocks of this size so that
+                only ``chunk_size`` scores are materialized at a time
+
+        Returns:
+            (indices, scores) sorted by descending similarity
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+        if k <= 0 or normalized_matrix is None or len(normalized_matrix) == 0:
+            return empty
+
+        query = self.normalize_embeddings(query_embedding)[0]
+        if query.shape[0] != normalized_matrix.shape[1]:
+            logger.warning(
+                f"Embedding dimensions mismatch: {query.shape[0]} vs {normalized_matrix.shape[1]}"
+            )
+            return empty
+
+        total = normalized_matrix.shape[0]
+        step = total if not chunk_size or chunk_size <= 0 else int(chunk_size)
+        best_idx = empty[0]
+        best_scores = empty[1]
+
+        for start in range(0, total, step):
+            scores = normalized_matrix[start:start + step] @ query
+            idx = np.arange(start, start + len(scores))
+            if min_similarity is not None:
+                keep = scores >= min_similarity
+                scores, idx = scores[keep], idx[keep]
+            if len(scores) > k:
+                part = np.argpartition(-scores, k - 1)[:k]
+                scores, idx = scores[part], idx[part]
+            if len(best_scores):
+                scores = np.concatenate([best_scores, scores])
+                idx = np.concatenate([best_idx, idx])
+                if len(scores) > k:
+                    part = np.argpartition(-scores, k - 1)[:k]
+                    scores, idx = scores[part], idx[part]
+            best_scores, best_idx = scores, idx
+
+        # Stable ordering: descending score, ascending index on ties
+        order = np.lexsort((best_idx, -best_scores))
+        return best_idx[order], best_scores[order]
+
     def compute_similarities(self, query_embedding: List[float], target_embeddings: List[List[float]]) -> List[float]:
         """
         Compute similarities between query vector and multiple target vectors
@@ -69,15 +154,13 @@ class SimilarityCalculator:
         Returns:
             List of similarities
         """
-        if not query_embedding or not target_embeddings:
-            return []
+        return self.compute_similarities_batch(query_embedding, target_embeddings)
 
-        similarities = []
-        for target_embedding in target_embeddings:
-            similarity = self.compute_similarity(query_embedding, target_embedding)
-            similarities.append(similarity)
-
-        return similarities
+    def _compute_similarities_pairwise(
+        self, query_embedding: List[float], target_embeddings: List[List[float]]
+    ) -> List[float]:
+        """Per-vector fallback for ragged input that cannot form a matrix"""
+        return [self.compute_similarity(query_embedding, target) for target in target_embeddings]
 
     def compute_similarities_batch(
         self, query_embedding: List[float], target_embeddings: List[List[float]]
@@ -92,30 +175,21 @@ class SimilarityCalculator:
         Returns:
             List of similarities
         """
-        if not query_embedding or not target_embeddings:
+        if query_embedding is None or target_embeddings is None:
+            return []
+        if len(query_embedding) == 0 or len(target_embeddings) == 0:
             return []
 
         try:
-            query_vec = np.array(query_embedding, dtype=np.float32)
-            target_matrix = np.array(target_embeddings, dtype=np.float32)
-
-            # Batch compute cosine similarities
-            dot_products = np.dot(target_matrix, query_vec)
-            query_norm = np.linalg.norm(query_vec)
-            target_norms = np.linalg.norm(target_matrix, axis=1)
-
-            # Avoid division by zero
-            valid_mask = (target_norms != 0) & (query_norm != 0)
-            similarities = np.zeros(len(target_embeddings))
-
-            if query_norm != 0:
-                similarities[valid_mask] = dot_products[valid_mask] / (target_norms[valid_mask] * query_norm)
-
-            return similarities.tolist()
+            target_matrix = self.normalize_embeddings(target_embeddings)
+            if target_matrix.shape[1] != len(query_embedding):
+                return self._compute_similarities_pairwise(query_embedding, target_embeddings)
+            query_vec = self.normalize_embeddings(query_embedding)[0]
+            return (target_matrix @ query_vec).tolist()
 
         except Exception as e:
-            logger.error(f"Batch similarity computation failed: {e}")
-            return self.compute_similarities(query_embedding, target_embeddings)
+            logger.debug(f"Batch similarity computation fell back to pairwise: {e}")
+            return self._compute_similarities_pairwise(query_embedding, target_embeddings)
 
     def find_most_similar(
         self, query_embedding: List[float], candidates: List[Dict[str, Any]], k: int = 5, min_similarity: float = 0.0
@@ -132,7 +206,7 @@ class SimilarityCalculator:
         Returns:
             List of candidates sorted by similarity
         """
-        if not query_embedding or not candidates:
+        if query_embedding is None or len(query_embedding) == 0 or not candidates:
             return []
 
         # Extract embeddings
@@ -140,29 +214,35 @@ class SimilarityCalculator:
         valid_candidates = []
 
         for candidate in candidates:
-            if "embedding" in candidate and candidate["embedding"]:
-                candidate_embeddings.append(candidate["embedding"])
+            embedding = candidate.get("embedding")
+            if embedding is not None and len(embedding) > 0:
+                candidate_embeddings.append(embedding)
                 valid_candidates.append(candidate)
 
         if not candidate_embeddings:
             logger.warning("No valid embeddings found in candidates")
             return []
 
-        # Compute similarities
-        similarities = self.compute_similarities_batch(query_embedding, candidate_embeddings)
-
-        # Add similarity to candidates
-        for i, candidate in enumerate(valid_candidates):
-            candidate["similarity"] = similarities[i]
-
-        # Filter candidates below threshold
-        filtered_candidates = [c for c in valid_candidates if c["similarity"] >= min_similarity]
-
-        # Sort by similarity
-        sorted_candidates = sorted(filtered_candidates, key=lambda x: x["similarity"], reverse=True)
-
-        # Return top k
-        result = sorted_candidates[:k]
+        try:
+            matrix = self.normalize_embeddings(candidate_embeddings)
+        except ValueError:
+            # Ragged candidates: score them one by one
+            similarities = self._compute_similarities_pairwise(query_embedding, candidate_embeddings)
+            for candidate, similarity in zip(valid_candidates, similarities):
+                candidate["similarity"] = similarity
+            ranked = sorted(
+                (c for c in valid_candidates if c["similarity"] >= min_similarity),
+                key=lambda x: x["similarity"],
+                reverse=True,
+            )
+            return ranked[:k]
+
+        indices, scores = self.top_k_similar(query_embedding, matrix, k=k, min_similarity=min_similarity)
+        result = []
+        for idx, score in zip(indices.tolist(), scores.tolist()):
+            candidate = valid_candidates[idx]
+            candidate["similarity"] = score
+            result.append(candidate)
 
         logger.debug(f"Found {len(result)} most similar items from {len(candidates)} candidates")
         return result
@@ -184,19 +264,17 @@ class SimilarityCalculator:
         similar_pairs = []
 
         try:
-            embedding_matrix = np.array(embeddings, dtype=np.float32)
-
-            # Compute similarity matrix for all vector pairs
-            norms = np.linalg.norm(embedding_matrix, axis=1)
-            normalized_embeddings = embedding_matrix / norms[:, np.newaxis]
-            similarity_matrix = np.dot(normalized_embeddings, normalized_embeddings.T)
-
-            # Find similar pairs above threshold
-            for i in range(len(embeddings)):
-                for j in range(i + 1, len(embeddings)):
-                    similarity = similarity_matrix[i, j]
-                    if similarity >= threshold:
-                        similar_pairs.append((i, j, float(similarity)))
+            normalized_embeddings = self.normalize_embeddings(embeddings)
+            similarity_matrix = normalized_embeddings @ normalized_embeddings.T
+
+            # Find similar pairs above threshold (upper triangle only)
+            rows, cols = np.triu_indices(len(embeddings), k=1)
+            pair_scores = similarity_matrix[rows, cols]
+            keep = pair_scores >= threshold
+            similar_pairs = [
+                (int(i), int(j), float(score))
+                for i, j, score in zip(rows[keep], cols[keep], pair_scores[keep])
+            ]
 
         except Exception as e:
             logger.error(f"Similar pairs computation failed: {e}")
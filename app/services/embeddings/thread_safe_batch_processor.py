@@ -14,6 +14,8 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List
 
+from app.services.embeddings.thread_safe_cache import as_float_list
+
 logger = logging.getLogger(__name__)
 
 
@@ -96,8 +98,8 @@ class ThreadSafeBatchProcessor:
             processing_time = time.time() - start_time
             self._update_performance_stats(len(texts), len(cache_misses), processing_time)
 
-            # 确保返回完整结果
-            return [result for result in cached_results if result is not None]
+            # 确保返回完整结果（缓存命中可能是 NumPy 数组，对外统一返回列表）
+            return [as_float_list(result) for result in cached_results if result is not None]
 
         except Exception as e:
             logger.error(f"Batch processing failed: {e}")
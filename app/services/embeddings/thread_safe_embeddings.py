@@ -11,7 +11,9 @@
 import logging
 import threading
 from concurrent.futures import Future
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from app.services.foundation.config import get_config
 from app.services.embeddings.glm_api_client import GLMApiClient
@@ -154,6 +156,23 @@ class ThreadSafeEmbeddingsService:
         """查找最相似的候选项"""
         return self.similarity_calculator.find_most_similar(query_embedding, candidates, k, min_similarity)
 
+    def normalize_embeddings(self, embeddings: List[List[float]]) -> np.ndarray:
+        """将候选向量归一化为可缓存的矩阵"""
+        return self.similarity_calculator.normalize_embeddings(embeddings)
+
+    def top_k_similar(
+        self,
+        query_embedding: List[float],
+        normalized_matrix: np.ndarray,
+        k: int = 5,
+        min_similarity: Optional[float] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """基于预归一化矩阵返回 top-k 索引和相似度"""
+        return self.similarity_calculator.top_k_similar(
+            query_embedding, normalized_matrix, k=k, min_similarity=min_similarity, chunk_size=chunk_size
+        )
+
     # 服务信息和配置方法
     def get_service_info(self) -> Dict[str, Any]:
         """获取线程安全的服务信息"""
@@ -3,12 +3,12 @@
 将现有的嵌入服务无缝迁移到新的Milvus混合存储系统
 """
 
-import hashlib
 from typing import List, Dict, Any, Optional
 import logging
 
 from ..storage.hybrid_vector_storage import get_hybrid_storage
-from .cache import EmbeddingCache  # 原有的缓存系统
+from .cache import EmbeddingCache  # 共享分层存储的列表接口
+from .embedding_store import embedding_key
 
 logger = logging.getLogger(__name__)
 
@@ -61,9 +61,8 @@ class VectorStorageAdapter:
             return False
     
     def _compute_text_hash(self, text: str, model: str) -> str:
-        """计算文本哈希值 (兼容原有系统)"""
-        combined = f"{text}:{model}"
-        return hashlib.sha256(combined.encode()).hexdigest()
+        """计算文本哈希值（与统一嵌入存储相同的内容寻址键）"""
+        return embedding_key(text, model)
     
     async def get_embedding(self, text: str, model: str = "embedding-3") -> Optional[List[float]]:
         """
@@ -78,6 +78,18 @@ class AppSettings:
         self.llm_mock: bool = _env_bool("LLM_MOCK", False)
         self.llm_retries: int = _env_int("LLM_RETRIES", 2)
         self.llm_backoff_base: float = _env_float("LLM_BACKOFF_BASE", 0.5)
+        self.llm_pool_max_connections: int = _env_int("LLM_POOL_MAX_CONNECTIONS", 20)
+        self.llm_pool_max_keepalive: int = _env_int("LLM_POOL_MAX_KEEPALIVE", 10)
+        self.llm_pool_keepalive_expiry: float = _env_float("LLM_POOL_KEEPALIVE_EXPIRY", 30.0)
+        self.llm_cache_enabled: bool = _env_bool("LLM_CACHE_ENABLED", False)
+        self.llm_cache_ttl: float = _env_float("LLM_CACHE_TTL", 3600.0)
+        self.llm_cache_max_entries: int = _env_int("LLM_CACHE_MAX_ENTRIES", 1024)
+        # Per-provider budgets for outbound calls (0 = unlimited until throttled);
+        # override per provider with <PROVIDER>_RATE_RPM / <PROVIDER>_RATE_TPM.
+        self.llm_rate_rpm: int = _env_int("LLM_RATE_RPM", 0)
+        self.llm_rate_tpm: int = _env_int("LLM_RATE_TPM", 0)
+        self.llm_rate_burst_seconds: float = _env_float("LLM_RATE_BURST_SECONDS", 10.0)
+        self.llm_rate_completion_reserve: int = _env_int("LLM_RATE_COMPLETION_RESERVE", 512)
 
         # Perplexity
         self.perplexity_api_key: Optional[str] = os.getenv("PERPLEXITY_API_KEY")
@@ -140,6 +152,21 @@ class AppSettings:
         # Embedding cache
         self.embedding_cache_size: int = _env_int("EMBEDDING_CACHE_SIZE", 10000)
         self.embedding_cache_persistent: bool = _env_bool("EMBEDDING_CACHE_PERSISTENT", True)
+        # float32 | float16 (contiguous NumPy slab) or list (one Python list per vector)
+        self.embedding_cache_storage: str = _env_str("EMBEDDING_CACHE_STORAGE", "float32")
+        # Optional third tier of the shared embedding store (requires pymilvus)
+        self.embedding_store_milvus: bool = _env_bool("EMBEDDING_STORE_MILVUS", False)
+
+        # Data file metadata parsing
+        self.metadata_cache_enabled: bool = _env_bool("METADATA_CACHE_ENABLED", True)
+        self.metadata_parse_workers: int = _env_int("METADATA_PARSE_WORKERS", 4)
+
+        # Sandbox for LLM-generated parser code (CodeExecutor)
+        self.code_executor_mode: str = _env_str("CODE_EXECUTOR_MODE", "process")
+        self.code_executor_workers: int = _env_int("CODE_EXECUTOR_WORKERS", 4)
+        self.code_executor_timeout: float = _env_float("CODE_EXECUTOR_TIMEOUT", 120.0)
+        self.code_executor_cpu_seconds: int = _env_int("CODE_EXECUTOR_CPU_SECONDS", 120)
+        self.code_executor_memory_mb: int = _env_int("CODE_EXECUTOR_MEMORY_MB", 2048)
 
         # Context/debug flags
         self.ctx_debug: bool = _env_bool("CTX_DEBUG", False) or _env_bool("CONTEXT_DEBUG", False)
@@ -163,6 +190,11 @@ class AppSettings:
         self.chat_include_action_summary: bool = _env_bool("CHAT_INCLUDE_ACTION_SUMMARY", True)
         self.job_log_retention_days: int = _env_int("JOB_LOG_RETENTION_DAYS", 30)
         self.job_log_max_rows: int = _env_int("JOB_LOG_MAX_ROWS", 10000)
+        self.job_log_batch_size: int = _env_int("JOB_LOG_BATCH_SIZE", 200)
+        self.job_log_flush_interval: float = _env_float("JOB_LOG_FLUSH_INTERVAL", 0.5)
+        self.job_scheduler_workers: int = _env_int("JOB_SCHEDULER_WORKERS", 4)
+        self.job_scheduler_max_queue: int = _env_int("JOB_SCHEDULER_MAX_QUEUE", 100)
+        self.plan_tree_cache_size: int = _env_int("PLAN_TREE_CACHE_SIZE", 64)
 
         # Simulation
         self.sim_user_model: str = _env_str("SIM_USER_MODEL", "qwen3-max")
@@ -15,6 +15,7 @@ from .metadata import (
     get_metadata,
     get_metadata_parser,
 )
+from .metadata_cache import MetadataCache, get_metadata_cache
 from .code_executor import (
     CodeExecutor,
     ExecutionResult,
@@ -46,6 +47,8 @@ __all__ = [
     "LLMMetadataParser",
     "get_metadata",
     "get_metadata_parser",
+    "MetadataCache",
+    "get_metadata_cache",
     # Code executor
     "CodeExecutor",
     "ExecutionResult",
@@ -6,6 +6,7 @@
 import sys
 import json
 import logging
+import threading
 import traceback
 from io import StringIO
 from typing import Any, Optional, Callable
@@ -65,6 +66,21 @@ class CodeExecutor:
         'datetime', 'pathlib',
     }
     
+    # 执行模式："process" 在预启动的工作进程池中执行（默认），"inprocess" 在当前进程 exec；
+    # None 表示取 CODE_EXECUTOR_MODE 配置。process 模式下不会退回进程内执行，
+    # 否则会绕过沙箱和超时/CPU/内存限制
+    mode: Optional[str] = None
+    
+    # sys.stdout/sys.stderr 是进程全局的，进程内执行时须串行化输出捕获
+    _capture_lock = threading.RLock()
+    
+    @classmethod
+    def _resolve_mode(cls) -> str:
+        if cls.mode:
+            return cls.mode
+        from ..foundation.settings import get_settings
+        return str(getattr(get_settings(), "code_executor_mode", "process")).lower()
+    
     @classmethod
     def execute(
         cls,
@@ -89,6 +105,47 @@ class CodeExecutor:
         Returns:
             ExecutionResult: 执行结果
         """
+        if cls._resolve_mode() == "process":
+            from .executor_pool import get_snippet_pool
+            try:
+                response = get_snippet_pool().execute(
+                    code,
+                    variables=variables,
+                    function_name=function_name,
+                    function_args=function_args,
+                    function_kwargs=function_kwargs,
+                    capture_output=capture_output,
+                )
+                return ExecutionResult(**response)
+            except (TypeError, ValueError) as e:
+                # 变量/参数无法 JSON 序列化，无法传入工作进程
+                return ExecutionResult(
+                    success=False,
+                    error_type=type(e).__name__,
+                    error_message=f"参数无法传入执行进程（需可 JSON 序列化）: {e}",
+                )
+            except RuntimeError as e:
+                logger.error(f"工作进程不可用: {e}")
+                return ExecutionResult(
+                    success=False,
+                    error_type="WorkerUnavailable",
+                    error_message=f"执行进程不可用：{e}",
+                )
+        with cls._capture_lock:
+            return cls._execute(
+                code, variables, function_name, function_args, function_kwargs, capture_output
+            )
+    
+    @classmethod
+    def _execute(
+        cls,
+        code: str,
+        variables: Optional[dict[str, Any]],
+        function_name: Optional[str],
+        function_args: Optional[tuple],
+        function_kwargs: Optional[dict],
+        capture_output: bool,
+    ) -> ExecutionResult:
         # 准备执行环境
         exec_globals = {
             '__builtins__': __builtins__,
@@ -1,10 +1,12 @@
 import logging
-import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
 import docker
+import requests
 from docker.errors import ContainerError, ImageNotFound, APIError
 
+from .docker_pool import PoolClosedError, get_container_pool
+
 logger = logging.getLogger(__name__)
 
 import os
@@ -24,7 +26,10 @@ class DockerCodeInterpreter:
         timeout: int = 60, 
         auto_pull: bool = True, 
         work_dir: Optional[str] = None,
-        data_dir: Optional[str] = None
+        data_dir: Optional[str] = None,
+        use_pool: bool = True,
+        pool_size: int = 1,
+        max_runs_per_container: int = 20
     ):
         """
         初始化 Docker 代码解释器
@@ -34,6 +39,10 @@ class DockerCodeInterpreter:
         :param work_dir: 宿主机工作目录，将挂载到容器的 /workspace（用于输出文件）
         :param data_dir: 宿主机数据目录，将挂载到容器的 /data（用于读取数据文件）
                         如果不指定，则使用 work_dir
+        :param use_pool: 是否使用预热容器池（通过 docker exec 复用常驻容器）；
+                        False 时每段代码启动一个一次性容器
+        :param pool_size: 容器池中保持预热的空闲容器数
+        :param max_runs_per_container: 单个容器最多执行次数，达到后回收
         """
         self.image = image
         self.timeout = timeout
@@ -41,6 +50,9 @@ class DockerCodeInterpreter:
         self.work_dir = os.path.abspath(work_dir) if work_dir else os.getcwd()
         # 如果指定了 data_dir，单独挂载；否则数据文件也在 work_dir 中
         self.data_dir = os.path.abspath(data_dir) if data_dir else None
+        self.use_pool = use_pool
+        self.pool_size = pool_size
+        self.max_runs_per_container = max_runs_per_container
         self.client = None
         
         if docker:
@@ -51,10 +63,12 @@ class DockerCodeInterpreter:
         else:
             logger.warning("Python 'docker' package is not installed. Please run `pip install docker`.")
 
-    def run_python_code(self, code: str) -> CodeExecutionResult:
+    def run_python_code(self, code: str, work_dir: Optional[str] = None) -> CodeExecutionResult:
         """
         在 Docker 容器中运行 Python 代码
         :param code: Python 代码字符串
+        :param work_dir: 本次执行的宿主机工作目录，须位于 work_dir 之内（对应 /workspace 下的子目录）；
+                         默认直接使用 /workspace
         :return: CodeExecutionResult
         """
         if not self.client:
@@ -65,6 +79,87 @@ class DockerCodeInterpreter:
                 exit_code=-1
             )
 
+        try:
+            container_dir = self._container_work_dir(work_dir)
+        except ValueError as e:
+            return CodeExecutionResult("error", "", str(e), -1)
+
+        if self.use_pool:
+            return self._run_in_pool(code, container_dir)
+        return self._run_in_new_container(code, container_dir)
+
+    def _container_work_dir(self, work_dir: Optional[str]) -> str:
+        """把宿主机上 work_dir 内的子目录映射为容器内 /workspace 下的路径"""
+        if not work_dir:
+            return "/workspace"
+        host_dir = os.path.abspath(work_dir)
+        relative = os.path.relpath(host_dir, self.work_dir)
+        if relative == ".":
+            return "/workspace"
+        if relative.startswith(os.pardir) or os.path.isabs(relative):
+            raise ValueError(f"work_dir {host_dir} is not inside the mounted directory {self.work_dir}")
+        os.makedirs(host_dir, exist_ok=True)
+        return "/workspace/" + relative.replace(os.sep, "/")
+
+    def _volumes(self) -> Dict[str, Dict[str, str]]:
+        """
+        挂载目录：
+          - work_dir -> /workspace (读写，用于输出文件)
+          - data_dir -> /data (只读，用于读取数据文件，如果指定了的话)
+        """
+        volumes = {
+            self.work_dir: {'bind': '/workspace', 'mode': 'rw'}
+        }
+        
+        # 如果指定了单独的数据目录，挂载到 /data
+        if self.data_dir and self.data_dir != self.work_dir:
+            volumes[self.data_dir] = {'bind': '/data', 'mode': 'ro'}
+            logger.info(f"Docker 挂载: /workspace={self.work_dir}, /data={self.data_dir}")
+        else:
+            logger.info(f"Docker 挂载: /workspace={self.work_dir}")
+        return volumes
+
+    def _timeout_result(self) -> CodeExecutionResult:
+        return CodeExecutionResult(
+            status="timeout",
+            output="",
+            error=f"Execution exceeded {self.timeout} seconds limit.",
+            exit_code=-1
+        )
+
+    def _run_in_pool(self, code: str, container_dir: str = "/workspace") -> CodeExecutionResult:
+        """在预热容器池中执行（docker exec，完成由 exec 流结束感知）"""
+        try:
+            for attempt in range(2):
+                pool = get_container_pool(
+                    self.client,
+                    self.image,
+                    self._volumes(),
+                    size=self.pool_size,
+                    max_runs=self.max_runs_per_container,
+                    auto_pull=self.auto_pull,
+                )
+                try:
+                    outcome = pool.execute(code, self.timeout, workdir=container_dir)
+                    break
+                except PoolClosedError:
+                    # 池在取得后恰好被空闲回收，重新获取一次
+                    if attempt:
+                        raise
+        except docker.errors.DockerException as e:
+            logger.exception("Error during pooled Docker execution")
+            return CodeExecutionResult("error", "", f"Failed to check/pull image or start container: {e}", -1)
+        except Exception as e:
+            logger.exception("Error during pooled Docker execution")
+            return CodeExecutionResult("error", "", str(e), -1)
+
+        if outcome.timed_out:
+            return self._timeout_result()
+        status = "success" if outcome.exit_code == 0 else "failed"
+        return CodeExecutionResult(status, outcome.stdout, outcome.stderr, outcome.exit_code)
+
+    def _run_in_new_container(self, code: str, container_dir: str = "/workspace") -> CodeExecutionResult:
+        """为本段代码启动一个一次性容器执行，结束后删除"""
         container = None
         try:
             # 1. 检查镜像是否存在，不存在则拉取
@@ -80,19 +175,7 @@ class DockerCodeInterpreter:
             # 2. 启动容器
             # 使用 python -c 方式运行，通过 command 列表传递避免 shell 注入
             # network_disabled=True 确保安全
-            # 挂载目录：
-            #   - work_dir -> /workspace (读写，用于输出文件)
-            #   - data_dir -> /data (只读，用于读取数据文件，如果指定了的话)
-            volumes = {
-                self.work_dir: {'bind': '/workspace', 'mode': 'rw'}
-            }
-            
-            # 如果指定了单独的数据目录，挂载到 /data
-            if self.data_dir and self.data_dir != self.work_dir:
-                volumes[self.data_dir] = {'bind': '/data', 'mode': 'ro'}
-                logger.info(f"Docker 挂载: /workspace={self.work_dir}, /data={self.data_dir}")
-            else:
-                logger.info(f"Docker 挂载: /workspace={self.work_dir}")
+            volumes = self._volumes()
             
             container = self.client.containers.run(
                 image=self.image,
@@ -101,32 +184,19 @@ class DockerCodeInterpreter:
                 network_disabled=True,
                 mem_limit="512m",
                 volumes=volumes,
-                working_dir="/workspace",
+                working_dir=container_dir,
                 # user="1000:1000" # 可选：以非 root 用户运行
             )
             
-            # 3. 监控执行状态（实现超时机制）
-            start_time = time.time()
-            while True:
-                container.reload() # 刷新容器状态
-                status = container.status
-                
-                if status in ['exited', 'dead']:
-                    break
-                    
-                if time.time() - start_time > self.timeout:
-                    container.kill()
-                    return CodeExecutionResult(
-                        status="timeout",
-                        output="",
-                        error=f"Execution exceeded {self.timeout} seconds limit.",
-                        exit_code=-1
-                    )
-                time.sleep(0.5) # 轮询间隔
+            # 3. 等待容器退出（实现超时机制）
+            # container.wait() 会返回类似 {'StatusCode': 0, 'Error': None}
+            try:
+                result_state = container.wait(timeout=self.timeout)
+            except requests.exceptions.RequestException:
+                container.kill()
+                return self._timeout_result()
 
             # 4. 获取执行结果
-            # container.wait() 会返回类似 {'StatusCode': 0, 'Error': None}
-            result_state = container.wait()
             exit_code = result_state.get('StatusCode', 0)
             
             # 获取日志
@@ -0,0 +1,374 @@
+"""
+Docker 预热容器池
+
+为 DockerCodeInterpreter 维护一组预先启动、禁用网络的常驻容器。每段代码通过
+``docker exec`` 在空闲容器内以新的 ``python -c`` 进程运行，执行结束由 exec
+流关闭（事件）感知，无需轮询容器状态。容器在执行 ``max_runs`` 次后、或执行
+失败/超时后回收，并在后台补充新的预热容器。
+
+容器池按 (Docker 守护进程, 镜像, 挂载目录) 区分，挂载与工作目录语义与
+一次性容器完全一致：work_dir -> /workspace (rw)，data_dir -> /data (ro)。
+
+每次计划运行的输出目录不同，会各自产生一个池。空闲超过 ``POOL_IDLE_TIMEOUT``
+秒的池由后台线程关闭；池总数超过 ``MAX_POOLS`` 时关闭最久未用的空闲池，
+因此常驻容器数不超过 ``MAX_POOLS * size``（外加正在执行的容器）。
+"""
+
+import atexit
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 常驻进程：只依赖镜像内的 python，不要求 sleep/tail 等命令存在
+_IDLE_COMMAND = ["python", "-c", "import time\nwhile True:\n    time.sleep(3600)"]
+_POOL_LABEL = "gagent.interpreter.pool"
+
+# 最多同时保留的池数量，以及池空闲多久（秒）后被关闭
+MAX_POOLS = 4
+POOL_IDLE_TIMEOUT = 300.0
+
+
+class PoolClosedError(RuntimeError):
+    """池已被关闭（空闲回收或进程退出），调用方应重新获取池"""
+
+
+@dataclass
+class ExecOutcome:
+    """一次 exec 的结果；timed_out 为 True 时 exit_code 无意义"""
+    exit_code: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+
+
+@dataclass
+class _PooledContainer:
+    container: Any
+    runs: int = 0
+
+
+class DockerContainerPool:
+    """单个镜像 + 挂载组合的预热容器池"""
+
+    def __init__(
+        self,
+        client,
+        image: str,
+        volumes: Dict[str, Dict[str, str]],
+        working_dir: str = "/workspace",
+        mem_limit: str = "512m",
+        size: int = 1,
+        max_runs: int = 20,
+        auto_pull: bool = True,
+    ):
+        self.client = client
+        self.image = image
+        self.volumes = volumes
+        self.working_dir = working_dir
+        self.mem_limit = mem_limit
+        self.size = max(0, size)
+        self.max_runs = max(1, max_runs)
+        self.auto_pull = auto_pull
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle: List[_PooledContainer] = []
+        self._starting = 0
+        self._closed = False
+        self._image_checked = False
+        self._in_use = 0
+        self.last_used = time.monotonic()
+        self.stats: Dict[str, int] = {
+            "started": 0,
+            "reused": 0,
+            "recycled": 0,
+            "timeouts": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # 容器生命周期
+    # ------------------------------------------------------------------
+
+    def _ensure_image(self) -> None:
+        """每个池只检查/拉取一次镜像"""
+        if self._image_checked or not self.auto_pull:
+            return
+        import docker
+
+        try:
+            self.client.images.get(self.image)
+        except docker.errors.ImageNotFound:
+            logger.info(f"Pulling image {self.image}...")
+            self.client.images.pull(self.image)
+        self._image_checked = True
+
+    def _start_container(self) -> _PooledContainer:
+        self._ensure_image()
+        container = self.client.containers.run(
+            image=self.image,
+            command=_IDLE_COMMAND,
+            detach=True,
+            network_disabled=True,
+            mem_limit=self.mem_limit,
+            volumes=self.volumes,
+            working_dir=self.working_dir,
+            labels={_POOL_LABEL: "1"},
+        )
+        with self._lock:
+            self.stats["started"] += 1
+        return _PooledContainer(container)
+
+    @staticmethod
+    def _discard(pooled: _PooledContainer) -> None:
+        try:
+            pooled.container.remove(force=True)
+        except Exception as e:
+            logger.debug(f"Failed to remove pooled container: {e}")
+
+    def _refill(self) -> None:
+        """后台补充预热容器直到空闲数达到 size"""
+        with self._lock:
+            missing = self.size - len(self._idle) - self._starting
+            if self._closed or missing <= 0:
+                return
+            self._starting += missing
+
+        def _worker(count: int) -> None:
+            for _ in range(count):
+                pooled = None
+                try:
+                    pooled = self._start_container()
+                except Exception as e:
+                    logger.warning(f"Failed to pre-start container for {self.image}: {e}")
+                with self._lock:
+                    self._starting -= 1
+                    if pooled is not None and not self._closed:
+                        self._idle.append(pooled)
+                        pooled = None
+                    self._available.notify()
+                if pooled is not None:
+                    self._discard(pooled)
+
+        threading.Thread(target=_worker, args=(missing,), name="docker-pool-refill", daemon=True).start()
+
+    def warm_up(self) -> None:
+        """在后台预先启动 size 个容器"""
+        self._refill()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def is_idle_since(self, cutoff: float) -> bool:
+        """没有正在执行的代码，且最后一次使用早于 cutoff"""
+        with self._lock:
+            return self._in_use == 0 and self.last_used <= cutoff
+
+    def _acquire(self) -> _PooledContainer:
+        with self._lock:
+            self._in_use += 1
+            self.last_used = time.monotonic()
+        try:
+            return self._acquire_container()
+        except BaseException:
+            with self._lock:
+                self._in_use -= 1
+            raise
+
+    def _acquire_container(self) -> _PooledContainer:
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise PoolClosedError("Docker container pool is closed")
+                if not self._idle and self._starting:
+                    # 预热中的容器很快就绪，等待它而不是再启动一个
+                    self._available.wait_for(lambda: self._idle or not self._starting, timeout=30)
+                pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                pooled = self._start_container()
+                break
+            # 空闲期间容器可能被外部停止
+            try:
+                pooled.container.reload()
+                if pooled.container.status == "running":
+                    with self._lock:
+                        self.stats["reused"] += 1
+                    break
+            except Exception:
+                pass
+            self._discard(pooled)
+        self._refill()
+        return pooled
+
+    def _release(self, pooled: _PooledContainer, healthy: bool) -> None:
+        pooled.runs += 1
+        with self._lock:
+            self._in_use -= 1
+            self.last_used = time.monotonic()
+            keep = healthy and not self._closed and pooled.runs < self.max_runs
+            if keep:
+                self._idle.append(pooled)
+                self._available.notify()
+            else:
+                self.stats["recycled"] += 1
+        if not keep:
+            self._discard(pooled)
+            self._refill()
+
+    # ------------------------------------------------------------------
+    # 执行
+    # ------------------------------------------------------------------
+
+    def execute(self, code: str, timeout: float, workdir: Optional[str] = None) -> ExecOutcome:
+        """在池中容器内运行一段代码（新 python 进程），超时则回收容器；workdir 默认为池的工作目录"""
+        workdir = workdir or self.working_dir
+        pooled = self._acquire()
+        api = self.client.api
+        done = threading.Event()
+        result: Dict[str, Any] = {}
+
+        def _run() -> None:
+            try:
+                exec_id = api.exec_create(
+                    pooled.container.id,
+                    ["python", "-c", code],
+                    workdir=workdir,
+                )["Id"]
+                stdout, stderr = api.exec_start(exec_id, demux=True)
+                result["stdout"] = stdout or b""
+                result["stderr"] = stderr or b""
+                result["exit_code"] = api.exec_inspect(exec_id).get("ExitCode")
+            except Exception as e:
+                result["error"] = e
+            finally:
+                done.set()
+
+        threading.Thread(target=_run, name="docker-pool-exec", daemon=True).start()
+
+        if not done.wait(timeout):
+            with self._lock:
+                self.stats["timeouts"] += 1
+            # 杀掉容器会关闭 exec 流，执行线程随之退出
+            try:
+                pooled.container.kill()
+            except Exception:
+                pass
+            self._release(pooled, healthy=False)
+            return ExecOutcome(exit_code=-1, stdout="", stderr="", timed_out=True)
+
+        if "error" in result:
+            self._release(pooled, healthy=False)
+            raise result["error"]
+
+        exit_code = result.get("exit_code")
+        exit_code = -1 if exit_code is None else int(exit_code)
+        self._release(pooled, healthy=exit_code == 0)
+        return ExecOutcome(
+            exit_code=exit_code,
+            stdout=result["stdout"].decode("utf-8", errors="replace"),
+            stderr=result["stderr"].decode("utf-8", errors="replace"),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._discard(pooled)
+
+
+_pools: Dict[Tuple[Any, ...], DockerContainerPool] = {}
+_pools_lock = threading.Lock()
+_reaper: Optional[threading.Thread] = None
+
+
+def reap_container_pools(idle_timeout: Optional[float] = None, max_pools: Optional[int] = None) -> int:
+    """关闭空闲超时的池，并在池数超过上限时关闭最久未用的空闲池；返回关闭的池数"""
+    idle_timeout = POOL_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+    max_pools = MAX_POOLS if max_pools is None else max_pools
+    now = time.monotonic()
+    doomed: List[DockerContainerPool] = []
+    with _pools_lock:
+        for key, pool in list(_pools.items()):
+            if pool.closed or pool.is_idle_since(now - idle_timeout):
+                doomed.append(_pools.pop(key))
+        if len(_pools) > max_pools:
+            for key, pool in sorted(_pools.items(), key=lambda item: item[1].last_used):
+                if len(_pools) <= max_pools:
+                    break
+                if pool.is_idle_since(now):
+                    doomed.append(_pools.pop(key))
+    for pool in doomed:
+        pool.close()
+    return len(doomed)
+
+
+def _reap_forever() -> None:
+    while True:
+        time.sleep(max(1.0, POOL_IDLE_TIMEOUT / 4))
+        try:
+            reap_container_pools()
+        except Exception as e:
+            logger.debug(f"Docker pool reaper failed: {e}")
+
+
+def _ensure_reaper() -> None:
+    global _reaper
+    if _reaper is None or not _reaper.is_alive():
+        _reaper = threading.Thread(target=_reap_forever, name="docker-pool-reaper", daemon=True)
+        _reaper.start()
+
+
+def get_container_pool(
+    client,
+    image: str,
+    volumes: Dict[str, Dict[str, str]],
+    size: int = 1,
+    max_runs: int = 20,
+    auto_pull: bool = True,
+) -> DockerContainerPool:
+    """获取 (守护进程, 镜像, 挂载) 对应的共享容器池，首次创建时开始预热"""
+    base_url = getattr(getattr(client, "api", None), "base_url", id(client))
+    key = (
+        base_url,
+        image,
+        tuple(sorted((host, spec["bind"], spec.get("mode", "rw")) for host, spec in volumes.items())),
+    )
+    with _pools_lock:
+        pool = _pools.get(key)
+        created = pool is None or pool.closed
+        if not created:
+            pool.last_used = time.monotonic()
+        if created:
+            pool = DockerContainerPool(
+                client,
+                image,
+                volumes,
+                size=size,
+                max_runs=max_runs,
+                auto_pull=auto_pull,
+            )
+            _pools[key] = pool
+            pool.warm_up()
+            _ensure_reaper()
+    if created:
+        # 新池可能使总数超过上限，立即淘汰最久未用的空闲池
+        reap_container_pools()
+    return pool
+
+
+def shutdown_container_pools() -> None:
+    """移除所有池中的空闲容器（应用关闭或测试清理时调用）"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+# 进程退出时清理常驻容器，避免遗留
+atexit.register(shutdown_container_pools)
@@ -0,0 +1,292 @@
+"""
+CodeExecutor 的进程池执行后端
+
+预先启动若干 snippet_worker.py 工作进程，LLM 生成的解析代码在工作进程中执行，
+结果以 JSON 返回。与进程内 exec 相比：
+
+- 每个工作进程独占自己的 sys.stdout/stderr，并发执行互不干扰；
+- 每次调用都有墙钟超时、CPU 时间和内存上限，超时或崩溃只影响该工作进程，
+  之后会被替换；
+- 工作进程在执行 max_tasks 次后回收，避免解析代码遗留的状态/内存累积。
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snippet_worker.py")
+
+DEFAULT_SNIPPET_PRELOAD = ("numpy", "pandas")
+
+
+class SnippetWorker:
+    """单个常驻工作进程；同一时间只被一个调用者使用"""
+
+    def __init__(self, env: Dict[str, str], startup_timeout: float = 60.0):
+        self.env = env
+        self.startup_timeout = startup_timeout
+        self.tasks = 0
+        self.restarts = 0
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._started = False
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    @property
+    def pid(self) -> Optional[int]:
+        proc = self._proc
+        return proc.pid if proc is not None else None
+
+    def _pump(self, proc: subprocess.Popen, lines: "queue.Queue[Optional[str]]") -> None:
+        for line in proc.stdout:
+            lines.put(line)
+        lines.put(None)  # EOF: 进程已退出
+
+    def start(self) -> None:
+        self._lines = queue.Queue()
+        self.tasks = 0
+        self._proc = subprocess.Popen(
+            [sys.executable, _WORKER_SCRIPT],
+            env=self.env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        threading.Thread(
+            target=self._pump, args=(self._proc, self._lines), name="snippet-worker-reader", daemon=True
+        ).start()
+        try:
+            ready = self.read(self.startup_timeout)
+        except queue.Empty:
+            self.kill()
+            raise RuntimeError(f"Snippet worker did not start within {self.startup_timeout} seconds")
+        if not ready or not ready.get("ready"):
+            self.kill()
+            raise RuntimeError("Snippet worker failed to start")
+
+    def ensure_started(self) -> None:
+        """进程未运行时（首次使用、超时被杀、崩溃或回收后）启动"""
+        with self._start_lock:
+            if self.alive:
+                return
+            if self._started:
+                self.restarts += 1
+                self.kill()
+            self.start()
+            self._started = True
+
+    def read(self, timeout: float) -> Optional[dict]:
+        """读取一条响应；超时抛 queue.Empty，进程退出返回 None"""
+        line = self._lines.get(timeout=timeout)
+        return json.loads(line) if line is not None else None
+
+    def send(self, payload: str) -> None:
+        self._proc.stdin.write(payload + "\n")
+        self._proc.stdin.flush()
+
+    def exit_code(self) -> Optional[int]:
+        if self._proc is None:
+            return None
+        try:
+            return self._proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            return None
+
+    def kill(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=5)
+        except Exception:
+            pass
+        for stream in (proc.stdin, proc.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+
+def _failure(error_type: str, message: str) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "result": None,
+        "stdout": "",
+        "stderr": "",
+        "error_type": error_type,
+        "error_message": message,
+        "error_traceback": None,
+    }
+
+
+class SnippetWorkerPool:
+    """预启动的工作进程池，execute() 线程安全，可被多个线程并发调用"""
+
+    def __init__(
+        self,
+        size: int = 4,
+        timeout: float = 120.0,
+        cpu_seconds: int = 120,
+        memory_mb: int = 2048,
+        max_tasks: int = 50,
+        preload: Sequence[str] = DEFAULT_SNIPPET_PRELOAD,
+    ):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.max_tasks = max(1, max_tasks)
+
+        env = dict(os.environ)
+        env["SNIPPET_PRELOAD"] = ",".join(preload)
+        env["SNIPPET_MEMORY_MB"] = str(int(memory_mb))
+        # 避免 BLAS 线程池在每个工作进程中占满所有核心/地址空间
+        for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+            env.setdefault(name, "1")
+        env["PYTHONIOENCODING"] = "utf-8"
+
+        self._idle: "queue.Queue[SnippetWorker]" = queue.Queue()
+        self._workers: List[SnippetWorker] = [SnippetWorker(env) for _ in range(self.size)]
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"executed": 0, "timeouts": 0, "crashes": 0}
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["restarts"] = sum(worker.restarts for worker in self._workers)
+        return stats
+
+    def warm_up(self) -> None:
+        """在后台并行启动所有工作进程"""
+
+        def _start(worker: SnippetWorker) -> None:
+            try:
+                worker.ensure_started()
+            except Exception as e:
+                if not self._closed:
+                    logger.warning(f"Failed to pre-start snippet worker: {e}")
+
+        for worker in self._workers:
+            threading.Thread(target=_start, args=(worker,), name="snippet-worker-start", daemon=True).start()
+
+    def execute(
+        self,
+        code: str,
+        variables: Optional[Dict[str, Any]] = None,
+        function_name: Optional[str] = None,
+        function_args: Optional[Sequence[Any]] = None,
+        function_kwargs: Optional[Dict[str, Any]] = None,
+        capture_output: bool = True,
+        timeout: Optional[float] = None,
+        cpu_seconds: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """在空闲工作进程中执行代码，返回 ExecutionResult 字段组成的字典"""
+        if self._closed:
+            raise RuntimeError("Snippet worker pool is closed")
+        request = {
+            "code": code,
+            "variables": variables or {},
+            "function_name": function_name,
+            "function_args": list(function_args or ()),
+            "function_kwargs": function_kwargs or {},
+            "capture_output": capture_output,
+            "cpu_seconds": self.cpu_seconds if cpu_seconds is None else cpu_seconds,
+        }
+        # 先序列化，参数无法 JSON 化时直接报错而不占用工作进程
+        payload = json.dumps(request)
+        timeout = self.timeout if timeout is None else timeout
+
+        worker = self._idle.get()
+        try:
+            try:
+                worker.ensure_started()
+            except (RuntimeError, OSError) as e:
+                logger.error(f"Snippet worker unavailable: {e}")
+                return _failure("WorkerUnavailable", f"执行进程不可用：{e}")
+            try:
+                worker.send(payload)
+                response = worker.read(timeout)
+            except queue.Empty:
+                self._bump("timeouts")
+                logger.error(f"Snippet execution timeout after {timeout} seconds, restarting worker")
+                worker.kill()
+                return _failure("TimeoutError", f"代码执行超时（{timeout} 秒）")
+            except (BrokenPipeError, OSError):
+                response = None
+
+            if response is None:
+                self._bump("crashes")
+                exit_code = worker.exit_code()
+                worker.kill()
+                return _failure("WorkerCrashed", f"执行进程异常退出 (exit code {exit_code})")
+
+            worker.tasks += 1
+            self._bump("executed")
+            # 内存耗尽后进程状态不可靠；执行次数达到上限也回收
+            if response.get("error_type") == "MemoryError" or worker.tasks >= self.max_tasks:
+                worker.kill()
+            return response
+        finally:
+            self._idle.put(worker)
+
+    def close(self) -> None:
+        self._closed = True
+        for worker in self._workers:
+            worker.kill()
+
+
+_pool: Optional[SnippetWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_snippet_pool() -> SnippetWorkerPool:
+    """获取全局工作进程池（参数取自 CODE_EXECUTOR_* 配置），首次创建时开始预热"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            from ..foundation.settings import get_settings
+
+            settings = get_settings()
+            _pool = SnippetWorkerPool(
+                size=int(getattr(settings, "code_executor_workers", 4)),
+                timeout=float(getattr(settings, "code_executor_timeout", 120.0)),
+                cpu_seconds=int(getattr(settings, "code_executor_cpu_seconds", 120)),
+                memory_mb=int(getattr(settings, "code_executor_memory_mb", 2048)),
+            )
+            _pool.warm_up()
+        return _pool
+
+
+def shutdown_snippet_pool() -> None:
+    """终止全局池中的所有工作进程"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(shutdown_snippet_pool)
@@ -10,6 +10,12 @@ from typing import Optional
 
 from openai import OpenAI
 
+from app.services.llm.rate_limiter import get_rate_limiter
+from app.services.llm.response_cache import estimate_tokens
+
+# Image inputs are billed per tile; a flat allowance keeps the TPM budget honest.
+_IMAGE_TOKEN_ESTIMATE = 1024
+
 
 class ImageAnalyzer:
     def __init__(
@@ -26,6 +32,7 @@ class ImageAnalyzer:
             model = "qwen-vl-plus"
         self._client = OpenAI(api_key=api_key, base_url=base_url)
         self._model = model
+        self._rate_limiter = get_rate_limiter("vision")
 
     def analyze(self, image_path: Path, prompt: str = "Describe this image.") -> str:
         mime, _ = mimetypes.guess_type(str(image_path))
@@ -35,16 +42,24 @@ class ImageAnalyzer:
         b64 = base64.b64encode(data).decode("ascii")
         data_url = f"data:{mime};base64,{b64}"
 
-        completion = self._client.chat.completions.create(
-            model=self._model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "image_url", "image_url": {"url": data_url}},
-                        {"type": "text", "text": prompt},
-                    ],
-                }
-            ],
-        )
+        reserved = estimate_tokens(prompt) + _IMAGE_TOKEN_ESTIMATE
+        self._rate_limiter.acquire(reserved)
+        try:
+            completion = self._client.chat.completions.create(
+                model=self._model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "image_url", "image_url": {"url": data_url}},
+                            {"type": "text", "text": prompt},
+                        ],
+                    }
+                ],
+            )
+        except Exception as exc:
+            self._rate_limiter.record_failure(getattr(exc, "status_code", None), reserved_tokens=reserved)
+            raise
+        usage = getattr(completion, "usage", None)
+        self._rate_limiter.record_success(reserved, getattr(usage, "total_tokens", None))
         return completion.choices[0].message.content or ""
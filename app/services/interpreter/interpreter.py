@@ -187,7 +187,7 @@ def run_analysis(
 
         # Step 4: 图简化（合并相似节点，生成DAG）
         logger.info(f"[4/5] 图简化（合并相似节点）...")
-        simplifier = TreeSimplifier(matcher=LLMSimilarityMatcher(threshold=0.9))
+        simplifier = TreeSimplifier(matcher=LLMSimilarityMatcher(threshold=0.9, batched=True))
         dag, simplified_plan_id = simplifier.simplify_and_save(plan_id, repo)
         
         merge_count = len(dag.merge_map)
@@ -282,6 +282,7 @@ def execute_plan(
     llm_provider: str = "qwen",
     docker_image: str = "agent-plotter",
     docker_timeout: int = 300,
+    max_workers: int = 1,
 ) -> PlanExecutionResult:
     """
     执行已存在的计划
@@ -293,6 +294,7 @@ def execute_plan(
         llm_provider: LLM提供商
         docker_image: Docker镜像
         docker_timeout: 超时时间
+        max_workers: 并发执行的最大节点数（1 表示串行）
     
     Returns:
         PlanExecutionResult: 执行结果
@@ -309,7 +311,8 @@ def execute_plan(
         llm_provider=llm_provider,
         docker_image=docker_image,
         docker_timeout=docker_timeout,
-        repo=repo
+        repo=repo,
+        max_workers=max_workers
     )
     exec_result: PlanExecutionResult = executor.execute()
 
@@ -328,7 +331,7 @@ def execute_plan(
 
 def print_plan_tree(repo: PlanRepository, plan_id: int):
     """打印计划树结构"""
-    tree = repo.get_plan_tree(plan_id)
+    tree = repo.get_plan_outline(plan_id)
     
     print(f"\n{'='*60}")
     print(f"计划 #{tree.id}: {tree.title}")
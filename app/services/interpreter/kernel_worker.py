@@ -0,0 +1,185 @@
+"""
+常驻执行内核（工作进程端）
+
+由 VenvCodeInterpreter 以 ``python kernel_worker.py`` 方式在目标虚拟环境中启动，
+因此只能依赖标准库。协议为按行分隔的 JSON：
+
+    请求  {"code": "...", "work_dir": "..."}（work_dir 可选，缺省为 WORK_DIR）
+    响应  {"exit_code": 0, "stdout": "...", "stderr": "..."}
+
+启动后先发送 {"ready": true}。每段代码在全新的命名空间中以 ``__main__`` 执行，
+已导入的模块（pandas/numpy/matplotlib 等）常驻内存；pandas 的 read_* 结果按
+(路径, mtime, size, 参数) 缓存，重复读取同一数据文件时返回副本而不再解析。
+代码的标准输出/错误在文件描述符层面重定向，子进程和 C 扩展的输出也能捕获。
+"""
+
+import builtins
+import functools
+import io
+import json
+import os
+import sys
+import tempfile
+import traceback
+from collections import OrderedDict
+
+_FRAME_CACHE_MAX = 16
+_frame_cache = OrderedDict()
+_patched_pandas = False
+
+
+def _cache_key(path, args, kwargs):
+    try:
+        stat = os.stat(path)
+        frozen = json.dumps([args, kwargs], sort_keys=True, default=repr)
+    except (OSError, TypeError, ValueError):
+        return None
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, frozen)
+
+
+def _cached_reader(reader):
+    @functools.wraps(reader)
+    def wrapper(path, *args, **kwargs):
+        key = _cache_key(path, args, kwargs) if isinstance(path, (str, os.PathLike)) else None
+        if key is None:
+            return reader(path, *args, **kwargs)
+        frame = _frame_cache.get(key)
+        if frame is None:
+            frame = reader(path, *args, **kwargs)
+            # 只缓存能深拷贝的 DataFrame/Series（迭代器、dict 等原样返回）
+            if type(frame).__name__ not in ("DataFrame", "Series"):
+                return frame
+            _frame_cache[key] = frame
+            while len(_frame_cache) > _FRAME_CACHE_MAX:
+                _frame_cache.popitem(last=False)
+        else:
+            _frame_cache.move_to_end(key)
+        # 返回副本，保证片段之间互不影响
+        return frame.copy()
+
+    return wrapper
+
+
+def _patch_pandas():
+    """pandas 一旦被导入就为常用读取函数加上缓存"""
+    global _patched_pandas
+    pd = sys.modules.get("pandas")
+    if _patched_pandas or pd is None:
+        return
+    for name in ("read_csv", "read_table", "read_excel", "read_parquet", "read_feather", "read_pickle"):
+        reader = getattr(pd, name, None)
+        if callable(reader):
+            setattr(pd, name, _cached_reader(reader))
+    _patched_pandas = True
+
+
+def _preload(modules):
+    for name in modules:
+        try:
+            if name == "matplotlib":
+                import matplotlib
+
+                matplotlib.use("Agg")
+                import matplotlib.pyplot  # noqa: F401
+            else:
+                __import__(name)
+        except Exception:
+            pass
+    _patch_pandas()
+
+
+def _reset_matplotlib():
+    plt = sys.modules.get("matplotlib.pyplot")
+    if plt is not None:
+        try:
+            plt.close("all")
+        except Exception:
+            pass
+
+
+def _run_snippet(code, work_dir):
+    """在独立命名空间中执行代码，返回 (exit_code, stdout, stderr)"""
+    out_file = tempfile.TemporaryFile()
+    err_file = tempfile.TemporaryFile()
+    saved_out, saved_err = os.dup(1), os.dup(2)
+    exit_code = 0
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(out_file.fileno(), 1)
+        os.dup2(err_file.fileno(), 2)
+        os.chdir(work_dir)
+        namespace = {"__name__": "__main__", "__builtins__": builtins}
+        try:
+            exec(compile(code, "<snippet>", "exec"), namespace)
+        except SystemExit as e:
+            if e.code is None:
+                exit_code = 0
+            elif isinstance(e.code, int):
+                exit_code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            _patch_pandas()
+            _reset_matplotlib()
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            except Exception:
+                pass
+    finally:
+        os.dup2(saved_out, 1)
+        os.dup2(saved_err, 2)
+        os.close(saved_out)
+        os.close(saved_err)
+
+    def _read(handle):
+        handle.seek(0)
+        data = handle.read().decode("utf-8", errors="replace")
+        handle.close()
+        return data
+
+    return exit_code, _read(out_file), _read(err_file)
+
+
+def main():
+    work_dir = os.environ.get("WORK_DIR") or os.getcwd()
+    preload = [m for m in os.environ.get("KERNEL_PRELOAD", "").split(",") if m]
+
+    # 协议使用私有的描述符，fd 0/1 交给用户代码
+    proto_in = io.open(os.dup(0), "r", encoding="utf-8", newline="\n")
+    proto_out = io.open(os.dup(1), "w", encoding="utf-8", newline="\n")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    sys.stdin = io.open(0, "r", closefd=False)
+    sys.stdout = io.open(1, "w", encoding="utf-8", errors="replace", closefd=False, buffering=1)
+    sys.stderr = io.open(2, "w", encoding="utf-8", errors="replace", closefd=False, buffering=1)
+
+    # 与一次性模式一致：脚本目录不应出现在用户代码的导入路径中
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        sys.path[0] = work_dir
+    base_path = list(sys.path)
+    _preload(preload)
+    proto_out.write(json.dumps({"ready": True}) + "\n")
+    proto_out.flush()
+
+    for line in proto_in:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        sys.path[:] = base_path
+        snippet_dir = request.get("work_dir") or work_dir
+        os.environ["WORK_DIR"] = snippet_dir
+        exit_code, stdout, stderr = _run_snippet(request.get("code", ""), snippet_dir)
+        proto_out.write(json.dumps({"exit_code": exit_code, "stdout": stdout, "stderr": stderr}) + "\n")
+        proto_out.flush()
+
+
+if __name__ == "__main__":
+    main()
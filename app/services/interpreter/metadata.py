@@ -1,10 +1,19 @@
 import os
+import logging
 import mimetypes
 import chardet
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Any
+from io import StringIO
+from itertools import islice
+from typing import Optional, Any, List
 from pydantic import BaseModel
 
+from .metadata_cache import MetadataCache, get_metadata_cache
+from .native_metadata import NativeMetadataParser
+
+logger = logging.getLogger(__name__)
+
 
 class FileMetadata(BaseModel):
     """
@@ -65,6 +74,7 @@ class FileMetadataExtractor:
     """
     
     TEXT_PREVIEW_LINES = 20
+    TEXT_PREVIEW_MAX_CHARS = 64 * 1024
     BINARY_PREVIEW_BYTES = 512
     ENCODING_DETECT_BYTES = 8192
     
@@ -152,12 +162,12 @@ class FileMetadataExtractor:
             lines = []
             byte_count = 0
             
+            # 只读取有限字符，避免超长单行（如整行 JSON）被整体读入内存
             with open(file_path, 'r', encoding=encoding, errors='replace') as f:
-                for i, line in enumerate(f):
-                    if i >= cls.TEXT_PREVIEW_LINES:
-                        break
-                    lines.append(line)
-                    byte_count += len(line.encode(encoding, errors='replace'))
+                head = f.read(cls.TEXT_PREVIEW_MAX_CHARS)
+            for line in islice(StringIO(head), cls.TEXT_PREVIEW_LINES):
+                lines.append(line)
+                byte_count += len(line.encode(encoding, errors='replace'))
             
             return ''.join(lines), len(lines), byte_count
             
@@ -206,14 +216,29 @@ class LLMMetadataParser:
     整合完整流程：构建提示词 -> 调用 LLM -> 执行代码 -> 返回结果
     """
     
-    def __init__(self, llm_client=None):
+    def __init__(
+        self,
+        llm_client=None,
+        cache: Optional[MetadataCache] = None,
+        use_cache: Optional[bool] = None,
+        native: bool = True,
+    ):
         """
         初始化解析器。
         
         Args:
             llm_client: LLMClient 实例，默认使用全局客户端
+            cache: 解析结果缓存，默认使用全局 MetadataCache
+            use_cache: 是否启用缓存，默认取 METADATA_CACHE_ENABLED
+            native: 对 csv/tsv/npy/parquet/h5 先尝试原生解析，失败再走 LLM
         """
         self._llm_client = llm_client
+        self.native = native
+        self._cache = cache
+        if use_cache is None:
+            from ..foundation.settings import get_settings
+            use_cache = bool(getattr(get_settings(), "metadata_cache_enabled", True))
+        self.use_cache = use_cache
     
     @property
     def llm_client(self):
@@ -223,6 +248,38 @@ class LLMMetadataParser:
             self._llm_client = LLMClient(provider="qwen")
         return self._llm_client
     
+    @property
+    def cache(self) -> Optional[MetadataCache]:
+        """延迟创建缓存；未启用缓存时为 None。"""
+        if self.use_cache and self._cache is None:
+            self._cache = get_metadata_cache()
+        return self._cache if self.use_cache else None
+    
+    def _load_cached(self, metadata: FileMetadata) -> bool:
+        """命中缓存时直接填充 parsed_content，跳过 LLM 与代码执行。"""
+        cache = self.cache
+        if cache is None:
+            return False
+        try:
+            parsed = cache.get(metadata.file_path)
+        except Exception as e:
+            logger.warning(f"读取元数据缓存失败 {metadata.file_path}: {e}")
+            return False
+        if parsed is None:
+            return False
+        metadata.parsed_content = parsed
+        logger.info(f"元数据缓存命中: {metadata.filename}")
+        return True
+    
+    def _store_cached(self, metadata: FileMetadata) -> None:
+        cache = self.cache
+        if cache is None or not metadata.parsed_content:
+            return
+        try:
+            cache.put(metadata.file_path, metadata.parsed_content)
+        except Exception as e:
+            logger.warning(f"写入元数据缓存失败 {metadata.file_path}: {e}")
+    
     def build_prompt(self, metadata: FileMetadata) -> str:
         """
         根据 FileMetadata 构建 LLM 提示词。
@@ -307,6 +364,8 @@ class LLMMetadataParser:
         """
         完整解析流程（同步）：获取元数据 -> 调用 LLM -> 执行代码 -> 返回结果
         
+        内容未变化的文件直接使用缓存的解析结果。
+        
         Args:
             file_path: 文件路径
             max_attempts: 代码执行失败时的最大重试次数
@@ -317,14 +376,8 @@ class LLMMetadataParser:
         # 1. 获取基础元数据
         metadata = FileMetadataExtractor.extract(file_path)
         
-        # 2. 构建提示词
-        prompt = self.build_prompt(metadata)
-        
-        # 3. 调用 LLM 获取解析代码
-        code = self.llm_client.chat(prompt)
-        
-        # 4. 执行代码并更新 metadata（带自动修复重试）
-        return self._execute_code(metadata, code, max_attempts)
+        # 2-4. 构建提示词 -> 调用 LLM -> 执行代码（缓存命中时跳过）
+        return self.parse_metadata(metadata, max_attempts)
     
     def parse_metadata(
         self, 
@@ -341,9 +394,71 @@ class LLMMetadataParser:
         Returns:
             更新了 parsed_content 的 FileMetadata
         """
+        if self._load_cached(metadata):
+            return metadata
+        return self._parse_uncached(metadata, max_attempts)
+    
+    def _parse_uncached(self, metadata: FileMetadata, max_attempts: int) -> FileMetadata:
+        """原生解析或调用 LLM 生成解析代码并执行，成功结果写入缓存。"""
+        if self.native and NativeMetadataParser.supports(metadata.file_extension):
+            parsed = NativeMetadataParser.parse(metadata.file_path, metadata.file_extension, metadata.encoding)
+            if parsed is not None:
+                metadata.parsed_content = parsed
+                self._store_cached(metadata)
+                return metadata
         prompt = self.build_prompt(metadata)
         code = self.llm_client.chat(prompt)
-        return self._execute_code(metadata, code, max_attempts)
+        metadata = self._execute_code(metadata, code, max_attempts)
+        self._store_cached(metadata)
+        return metadata
+    
+    def parse_many(
+        self,
+        file_paths: List[str],
+        max_attempts: int = 3,
+        max_workers: Optional[int] = None,
+    ) -> List[FileMetadata]:
+        """
+        批量解析多个文件，结果顺序与 file_paths 一致。
+        
+        缓存命中的文件不调用 LLM；未命中的文件用有界线程池并发解析。
+        
+        Args:
+            file_paths: 文件路径列表
+            max_attempts: 代码执行失败时的最大重试次数
+            max_workers: 并发解析数，默认取 METADATA_PARSE_WORKERS
+            
+        Returns:
+            FileMetadata 列表
+        """
+        results: List[Optional[FileMetadata]] = []
+        pending: List[int] = []
+        for index, file_path in enumerate(file_paths):
+            metadata = FileMetadataExtractor.extract(file_path)
+            results.append(metadata)
+            if not self._load_cached(metadata):
+                pending.append(index)
+        
+        if pending:
+            if max_workers is None:
+                from ..foundation.settings import get_settings
+                max_workers = int(getattr(get_settings(), "metadata_parse_workers", 4))
+            workers = max(1, min(max_workers, len(pending)))
+            logger.info(f"解析 {len(pending)} 个数据文件元数据（缓存命中 {len(file_paths) - len(pending)} 个，并发 {workers}）")
+            
+            if workers == 1:
+                for index in pending:
+                    results[index] = self._parse_uncached(results[index], max_attempts)
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="metadata-parse") as pool:
+                    futures = {
+                        index: pool.submit(self._parse_uncached, results[index], max_attempts)
+                        for index in pending
+                    }
+                    for index, future in futures.items():
+                        results[index] = future.result()
+        
+        return results
 
 
 # 全局解析器实例
@@ -0,0 +1,159 @@
+"""
+数据文件元数据缓存。
+
+LLMMetadataParser 对每个数据文件都要调用 LLM 生成解析代码并执行，同一数据集
+反复执行计划时这部分开销完全重复。本模块按文件内容持久化解析结果：
+
+- 键为 (内容 SHA-256, 文件大小, 提示词版本)，文件被复制/移动后仍能命中；
+- (路径, 大小, mtime) -> 内容哈希 的映射同样持久化，未修改的文件无需重新读取
+  整个文件计算哈希；
+- 提示词模板变更后版本号变化，旧结果自动失效；
+- 只缓存解析成功的结果，失败的文件下次仍会重新解析。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def _file_digest(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MetadataCache:
+    """按文件内容寻址的 parsed_content 持久化缓存（SQLite）"""
+
+    def __init__(self, db_path: Optional[str] = None, prompt_version: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite 文件路径，默认 ``<DB_ROOT>/cache/metadata_cache.db``
+            prompt_version: 提示词版本，默认取 METADATA_PARSER_PROMPT_VERSION
+        """
+        if db_path is None:
+            from ...config.database_config import get_cache_database_path
+            db_path = get_cache_database_path("metadata")
+        if prompt_version is None:
+            from .prompts.metadata_parser_prompt import METADATA_PARSER_PROMPT_VERSION
+            prompt_version = METADATA_PARSER_PROMPT_VERSION
+        self.db_path = str(db_path)
+        self.prompt_version = prompt_version
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "hashed": 0}
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self) -> None:
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS file_fingerprints (
+                    file_path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS parsed_metadata (
+                    content_hash TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    parsed_content TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (content_hash, size, prompt_version)
+                )
+                """
+            )
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def fingerprint(self, file_path: str) -> Tuple[str, int]:
+        """返回 (内容哈希, 大小)；大小与 mtime 未变时复用已记录的哈希"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT content_hash FROM file_fingerprints WHERE file_path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        if row:
+            return row[0], stat.st_size
+
+        content_hash = _file_digest(path)
+        self._bump("hashed")
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO file_fingerprints (file_path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, content_hash),
+            )
+        return content_hash, stat.st_size
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """查找文件的已缓存解析结果，未命中返回 None"""
+        content_hash, size = self.fingerprint(file_path)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT parsed_content FROM parsed_metadata WHERE content_hash = ? AND size = ? AND prompt_version = ?",
+                (content_hash, size, self.prompt_version),
+            ).fetchone()
+        if row is None:
+            self._bump("misses")
+            return None
+        self._bump("hits")
+        return json.loads(row[0])
+
+    def put(self, file_path: str, parsed_content: Dict[str, Any]) -> None:
+        """保存解析结果（包含 error 字段的失败结果不缓存）"""
+        if not isinstance(parsed_content, dict) or "error" in parsed_content:
+            return
+        content_hash, size = self.fingerprint(file_path)
+        payload = json.dumps(parsed_content, ensure_ascii=False, default=str)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO parsed_metadata
+                (content_hash, size, prompt_version, parsed_content, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (content_hash, size, self.prompt_version, payload, time.time()),
+            )
+        self._bump("stores")
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM parsed_metadata")
+            conn.execute("DELETE FROM file_fingerprints")
+
+
+_metadata_cache: Optional[MetadataCache] = None
+_metadata_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """获取全局元数据缓存实例"""
+    global _metadata_cache
+    with _metadata_cache_lock:
+        if _metadata_cache is None:
+            _metadata_cache = MetadataCache()
+        return _metadata_cache
@@ -0,0 +1,336 @@
+"""
+常见数据格式的原生元数据解析（不经过 LLM）。
+
+对 csv/tsv/npy/parquet/h5 直接以分块或内存映射方式读取，在有界内存内得到
+行列数、dtype 与采样统计，结果结构与 LLM 生成的 parse_file 一致
+（file_type=tabular/array）。无法处理的格式或缺少可选依赖（pyarrow、h5py）
+时返回 None，由调用方回退到 LLM 解析流程。
+"""
+
+import logging
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _py(value: Any) -> Any:
+    """numpy/pandas 标量转为可 JSON 序列化的 Python 值，NaN 转为 None。"""
+    if value is None:
+        return None
+    item = getattr(value, "item", None)
+    if callable(item):
+        try:
+            value = item()
+        except (ValueError, TypeError):
+            pass
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+class _ColumnStats:
+    """单列的流式统计：dtype 合并、空值计数、数值 min/max/mean、样例值。"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.dtypes: List[Any] = []
+        self.null_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min: Any = None
+        self.max: Any = None
+        self.samples: List[Any] = []
+
+    def update(self, series) -> None:
+        import numpy as np
+
+        if series.dtype not in self.dtypes:
+            self.dtypes.append(series.dtype)
+        self.null_count += int(series.isna().sum())
+        if len(self.samples) < NativeMetadataParser.SAMPLE_VALUES:
+            for value in series.dropna().head(NativeMetadataParser.SAMPLE_VALUES - len(self.samples)):
+                self.samples.append(_py(value))
+        if series.dtype.kind in "iuf":
+            values = series.dropna()
+            if len(values):
+                low, high = values.min(), values.max()
+                self.min = low if self.min is None else min(self.min, low)
+                self.max = high if self.max is None else max(self.max, high)
+                self.total += float(values.to_numpy(dtype=np.float64).sum())
+                self.count += len(values)
+
+    def dtype(self) -> str:
+        import numpy as np
+
+        if len(self.dtypes) == 1:
+            return str(self.dtypes[0])
+        if all(getattr(d, "kind", "O") in "iuf" for d in self.dtypes):
+            return str(np.result_type(*self.dtypes))
+        return "object"
+
+    def to_dict(self) -> Dict[str, Any]:
+        info: Dict[str, Any] = {
+            "name": self.name,
+            "dtype": self.dtype(),
+            "sample_values": self.samples,
+            "null_count": self.null_count,
+        }
+        if self.count and self.dtype() != "object":
+            info.update(min=_py(self.min), max=_py(self.max), mean=_py(self.total / self.count))
+        return info
+
+
+class NativeMetadataParser:
+    """
+    原生解析器。
+
+    - csv/tsv：pandas 分块读取；不超过 FULL_SCAN_BYTES 的文件全量统计，
+      更大的文件只统计前 SAMPLE_ROWS 行，总行数通过分块统计换行符得到；
+    - npy：np.load(mmap_mode="r")，元素过多时按步长采样统计；
+    - parquet：读取文件元数据与行组统计，只解码前几行作为样例（需 pyarrow）；
+    - h5/hdf5：遍历数据集，对最大的数据集按切片采样统计（需 h5py）。
+    """
+
+    CHUNK_ROWS = 100_000
+    FULL_SCAN_BYTES = 256 * 1024 * 1024
+    SAMPLE_ROWS = 200_000
+    LINE_COUNT_BLOCK_BYTES = 16 * 1024 * 1024
+    MAX_ARRAY_STAT_ELEMENTS = 2_000_000
+    MAX_COLUMNS = 20
+    SAMPLE_VALUES = 3
+    SAMPLE_ROWS_PREVIEW = 5
+
+    TABULAR_SEPARATORS = {".csv": ",", ".tsv": "\t"}
+
+    @classmethod
+    def supports(cls, file_extension: str) -> bool:
+        return file_extension.lower() in (".csv", ".tsv", ".npy", ".parquet", ".h5", ".hdf5")
+
+    @classmethod
+    def parse(cls, file_path: str, file_extension: Optional[str] = None, encoding: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        解析文件并返回 parsed_content；不支持或解析失败时返回 None。
+
+        Args:
+            file_path: 文件路径
+            file_extension: 扩展名（默认从路径推断）
+            encoding: 文本编码（csv/tsv）
+        """
+        ext = (file_extension or os.path.splitext(file_path)[1]).lower()
+        try:
+            if ext in cls.TABULAR_SEPARATORS:
+                return cls._parse_delimited(file_path, cls.TABULAR_SEPARATORS[ext], encoding)
+            if ext == ".npy":
+                return cls._parse_npy(file_path)
+            if ext == ".parquet":
+                return cls._parse_parquet(file_path)
+            if ext in (".h5", ".hdf5"):
+                return cls._parse_hdf5(file_path)
+        except ImportError as e:
+            logger.info(f"原生解析不可用（缺少依赖 {e.name}），回退到 LLM 解析: {file_path}")
+        except Exception as e:
+            logger.warning(f"原生解析失败，回退到 LLM 解析 {file_path}: {e}")
+        return None
+
+    # ------------------------------------------------------------------
+    # 表格
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _count_lines(cls, file_path: str) -> int:
+        """按块统计换行符数量（末行无换行符时补 1）。"""
+        lines = 0
+        last = b""
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(cls.LINE_COUNT_BLOCK_BYTES), b""):
+                lines += block.count(b"\n")
+                last = block
+        if last and not last.endswith(b"\n"):
+            lines += 1
+        return lines
+
+    @classmethod
+    def _parse_delimited(cls, file_path: str, sep: str, encoding: Optional[str]) -> Dict[str, Any]:
+        import pandas as pd
+
+        size = os.path.getsize(file_path)
+        full_scan = size <= cls.FULL_SCAN_BYTES
+        reader = pd.read_csv(
+            file_path,
+            sep=sep,
+            encoding=encoding or "utf-8",
+            encoding_errors="replace",
+            chunksize=cls.CHUNK_ROWS,
+            nrows=None if full_scan else cls.SAMPLE_ROWS,
+            low_memory=True,
+        )
+
+        columns: List[_ColumnStats] = []
+        column_names: List[str] = []
+        sample_rows: List[Dict[str, Any]] = []
+        scanned_rows = 0
+        with reader:
+            for chunk in reader:
+                if not column_names:
+                    column_names = [str(c) for c in chunk.columns]
+                    columns = [_ColumnStats(name) for name in column_names[: cls.MAX_COLUMNS]]
+                if len(sample_rows) < cls.SAMPLE_ROWS_PREVIEW:
+                    head = chunk.iloc[: cls.SAMPLE_ROWS_PREVIEW - len(sample_rows), : cls.MAX_COLUMNS]
+                    for row in head.to_dict(orient="records"):
+                        sample_rows.append({str(k): _py(v) for k, v in row.items()})
+                for stats, name in zip(columns, chunk.columns):
+                    stats.update(chunk[name])
+                scanned_rows += len(chunk)
+
+        if not column_names:
+            # 只有表头（或空文件）时 chunksize 读取不会产出任何块
+            column_names = [str(c) for c in pd.read_csv(file_path, sep=sep, nrows=0, encoding=encoding or "utf-8").columns]
+            columns = [_ColumnStats(name) for name in column_names[: cls.MAX_COLUMNS]]
+
+        if full_scan:
+            total_rows = scanned_rows
+        else:
+            # 大文件不做全量解析；按行计数（引号内换行会使结果偏大）
+            total_rows = max(0, cls._count_lines(file_path) - 1)
+
+        return {
+            "file_type": "tabular",
+            "total_rows": total_rows,
+            "total_columns": len(column_names),
+            "columns": [c.to_dict() for c in columns],
+            "sample_rows": sample_rows,
+            "parser": "native",
+            "stats_rows": scanned_rows,
+            "stats_sampled": not full_scan,
+        }
+
+    # ------------------------------------------------------------------
+    # 数组
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _array_stats(cls, array) -> Dict[str, Any]:
+        """对 numpy 数组/memmap/h5 数据集计算有界内存的采样统计。"""
+        import numpy as np
+
+        shape = tuple(int(n) for n in array.shape)
+        size = int(np.prod(shape)) if shape else 1
+        dtype = np.dtype(array.dtype)
+        info: Dict[str, Any] = {
+            "file_type": "array",
+            "shape": list(shape),
+            "dtype": str(dtype),
+            "ndim": len(shape),
+            "size": size,
+        }
+        if size == 0:
+            info["sample_values"] = []
+            return info
+
+        # 沿第一维按步长取行，保证读取的元素数不超过上限
+        if len(shape) == 0:
+            sample = np.asarray(array[()]).reshape(-1)
+        else:
+            row_elements = max(1, size // shape[0])
+            max_rows = max(1, cls.MAX_ARRAY_STAT_ELEMENTS // row_elements)
+            step = max(1, math.ceil(shape[0] / max_rows))
+            sample = np.asarray(array[::step]).reshape(-1)[: cls.MAX_ARRAY_STAT_ELEMENTS]
+            info["stats_sampled"] = step > 1 or sample.size < size
+
+        info["sample_values"] = [_py(v) for v in sample[: cls.SAMPLE_VALUES]]
+        if dtype.kind in "iufb" and sample.size:
+            values = sample.astype(np.float64) if dtype.kind == "b" else sample
+            if dtype.kind == "f":
+                values = values[~np.isnan(values)]
+            if values.size:
+                info.update(
+                    min=_py(values.min()),
+                    max=_py(values.max()),
+                    mean=_py(values.mean(dtype=np.float64)),
+                )
+        return info
+
+    @classmethod
+    def _parse_npy(cls, file_path: str) -> Optional[Dict[str, Any]]:
+        import numpy as np
+
+        array = np.load(file_path, mmap_mode="r", allow_pickle=False)
+        info = cls._array_stats(array)
+        info["parser"] = "native"
+        return info
+
+    @classmethod
+    def _parse_parquet(cls, file_path: str) -> Dict[str, Any]:
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(file_path)
+        meta = parquet.metadata
+        schema = parquet.schema_arrow
+        names = list(schema.names)
+
+        sample_rows: List[Dict[str, Any]] = []
+        sample_batch = None
+        for batch in parquet.iter_batches(batch_size=cls.SAMPLE_ROWS_PREVIEW, columns=names[: cls.MAX_COLUMNS]):
+            sample_batch = batch
+            sample_rows = [{k: _py(v) for k, v in row.items()} for row in batch.to_pylist()]
+            break
+
+        columns = []
+        for index, name in enumerate(names[: cls.MAX_COLUMNS]):
+            null_count: Optional[int] = 0
+            low = high = None
+            for rg in range(meta.num_row_groups):
+                stats = meta.row_group(rg).column(index).statistics
+                if stats is None:
+                    null_count = None
+                    continue
+                if null_count is not None and stats.has_null_count:
+                    null_count += stats.null_count
+                if stats.has_min_max:
+                    low = stats.min if low is None else min(low, stats.min)
+                    high = stats.max if high is None else max(high, stats.max)
+            samples: List[Any] = []
+            if sample_batch is not None:
+                samples = [_py(v) for v in sample_batch.column(index).to_pylist() if v is not None]
+            column = {
+                "name": name,
+                "dtype": str(schema.field(name).type),
+                "sample_values": samples[: cls.SAMPLE_VALUES],
+                "null_count": null_count,
+            }
+            if low is not None:
+                column.update(min=_py(low), max=_py(high))
+            columns.append(column)
+
+        return {
+            "file_type": "tabular",
+            "total_rows": int(meta.num_rows),
+            "total_columns": len(names),
+            "columns": columns,
+            "sample_rows": sample_rows,
+            "parser": "native",
+        }
+
+    @classmethod
+    def _parse_hdf5(cls, file_path: str) -> Optional[Dict[str, Any]]:
+        import h5py
+
+        datasets: List[Any] = []
+        with h5py.File(file_path, "r") as f:
+            f.visititems(lambda name, obj: datasets.append((name, obj)) if isinstance(obj, h5py.Dataset) else None)
+            if not datasets:
+                return None
+            summary = [
+                {"name": name, "shape": list(ds.shape), "dtype": str(ds.dtype)}
+                for name, ds in datasets[: cls.MAX_COLUMNS]
+            ]
+            name, largest = max(datasets, key=lambda item: item[1].size or 0)
+            info = cls._array_stats(largest)
+        info.update(dataset=name, datasets=summary, total_datasets=len(datasets), parser="native")
+        return info
@@ -9,6 +9,8 @@ import os
 import json
 import logging
 import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Set
@@ -127,7 +129,9 @@ class PlanExecutorInterpreter:
         docker_timeout: int = 120,
         interpreter_type: str = "docker",
         venv_path: Optional[str] = None,
-        repo: Optional[PlanRepository] = None
+        repo: Optional[PlanRepository] = None,
+        max_workers: int = 1,
+        persistent_kernel: bool = False
     ):
         """
         初始化计划执行器
@@ -145,8 +149,13 @@ class PlanExecutorInterpreter:
             interpreter_type: 代码执行器类型（"docker"或"venv"）
             venv_path: Python虚拟环境路径（当interpreter_type="venv"时使用）
             repo: PlanRepository实例（可选，默认创建新实例）
+            max_workers: 并发执行的最大节点数（默认1，即按拓扑顺序串行执行）
+                        大于1时启用 DAG 并发调度，就绪节点会被分发到线程池执行
+                        （每个节点在 output_dir/nodes/task_<id> 中运行，生成文件按目录归属）
+            persistent_kernel: venv 模式下使用常驻内核进程（整个计划共用一个）
         """
         self.plan_id = plan_id
+        self.max_workers = max(1, int(max_workers or 1))
 
         # 兼容单个文件路径的情况
         if data_file_paths and isinstance(data_file_paths, str):
@@ -218,6 +227,7 @@ class PlanExecutorInterpreter:
             output_dir=str(self.output_dir),
             interpreter_type=interpreter_type,
             venv_path=venv_path,
+            persistent_kernel=persistent_kernel,
         )
 
         # LLM service for report generation
@@ -229,6 +239,11 @@ class PlanExecutorInterpreter:
         self._node_records: Dict[int, NodeExecutionRecord] = {}
         self._all_generated_files: List[str] = []
 
+        # Concurrent scheduling state (only used when max_workers > 1)
+        self._state_lock = threading.RLock()
+        self._report_buffer: Optional[Dict[int, List[str]]] = None
+        self._report_cursor = 0
+
         # Analysis report path
         self._analysis_report_path = self._init_analysis_report()
 
@@ -278,6 +293,42 @@ class PlanExecutorInterpreter:
         logger.info(f"分析报告已创建: {report_path}")
         return report_path
 
+    def _write_report_section(self, node_id: int, content: str):
+        """
+        写入某个节点的报告片段
+
+        串行模式下直接追加到报告文件；并发模式下先缓存，
+        由 _flush_report_sections 按拓扑顺序写入，保证报告内容的顺序与串行执行一致。
+        """
+        with self._state_lock:
+            if self._report_buffer is None:
+                with open(self._analysis_report_path, 'a', encoding='utf-8') as f:
+                    f.write(content)
+            else:
+                self._report_buffer.setdefault(node_id, []).append(content)
+
+    def _flush_report_sections(self, force: bool = False):
+        """
+        按拓扑顺序将已结束节点的缓存报告片段写入文件
+
+        Args:
+            force: 为 True 时忽略仍未结束的节点，写出全部剩余片段（用于执行结束时）
+        """
+        done_statuses = {NodeExecutionStatus.COMPLETED, NodeExecutionStatus.FAILED, NodeExecutionStatus.SKIPPED}
+        with self._state_lock:
+            if self._report_buffer is None:
+                return
+            parts: List[str] = []
+            while self._report_cursor < len(self._topo_order):
+                node_id = self._topo_order[self._report_cursor]
+                if not force and self._node_status.get(node_id) not in done_statuses:
+                    break
+                parts.extend(self._report_buffer.pop(node_id, []))
+                self._report_cursor += 1
+            if parts:
+                with open(self._analysis_report_path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(parts))
+
     def _append_visualization_to_report(self, record: NodeExecutionRecord, new_files: List[str]):
         """
         将可视化分析内容追加到分析报告
@@ -335,8 +386,7 @@ class PlanExecutorInterpreter:
         content_parts.append("---\n")
         
         # 追加到报告文件
-        with open(self._analysis_report_path, 'a', encoding='utf-8') as f:
-            f.write(''.join(content_parts))
+        self._write_report_section(record.node_id, ''.join(content_parts))
         
         logger.info(f"已将任务 [{record.node_id}] 的可视化分析添加到报告")
 
@@ -379,8 +429,7 @@ class PlanExecutorInterpreter:
         content_parts.append("---\n")
 
         # 追加到报告文件
-        with open(self._analysis_report_path, 'a', encoding='utf-8') as f:
-            f.write(''.join(content_parts))
+        self._write_report_section(record.node_id, ''.join(content_parts))
 
         logger.info(f"已将任务 [{record.node_id}] 的文字分析添加到报告")
 
@@ -417,8 +466,7 @@ class PlanExecutorInterpreter:
         content_parts.append("---\n")
 
         # 追加到报告文件
-        with open(self._analysis_report_path, 'a', encoding='utf-8') as f:
-            f.write(''.join(content_parts))
+        self._write_report_section(record.node_id, ''.join(content_parts))
 
         logger.info(f"已将任务 [{record.node_id}] 的代码输出添加到报告")
 
@@ -449,8 +497,7 @@ class PlanExecutorInterpreter:
         content_parts.append("---\n")
 
         # 追加到报告文件
-        with open(self._analysis_report_path, 'a', encoding='utf-8') as f:
-            f.write(''.join(content_parts))
+        self._write_report_section(record.node_id, ''.join(content_parts))
 
         logger.info(f"已为任务 [{record.node_id}] 添加占位符信息到报告")
 
@@ -581,6 +628,17 @@ class PlanExecutorInterpreter:
         context_parts: List[str] = []
         collected_ids: Set[int] = set()
 
+        work_dir = self._node_work_dir(node_id)
+        if work_dir is not None:
+            # 并发模式下当前目录是 nodes/task_<id>，说明如何访问 output_dir 中的文件
+            root = Path(os.path.relpath(self.output_dir, work_dir)).as_posix()
+            context_parts.append(
+                f"### Working Directory\nYour code runs in `{work_dir.relative_to(self.output_dir).as_posix()}` "
+                f"inside the output directory. Files at the top of the output directory are under `{root}/` "
+                "(e.g. data files placed there); paths of generated files below are already relative to "
+                "the current directory.\n\n"
+            )
+
         def _add_record_context(label: str, record: NodeExecutionRecord) -> str:
             block = [f"### {label} [{record.node_id}] {record.node_name}"]
             if record.code_description:
@@ -594,12 +652,14 @@ class PlanExecutorInterpreter:
             if record.visualization_analysis:
                 block.append(f"**Visualization Analysis**: {record.visualization_analysis}")
             if record.generated_files:
-                block.append(f"**Generated Files**: {', '.join(record.generated_files)}")
+                readable = [self._path_from_node(f, node_id) for f in record.generated_files]
+                block.append(f"**Generated Files**: {', '.join(readable)}")
                 image_files = [
                     f for f in record.generated_files
                     if f.lower().endswith((".png", ".jpg", ".jpeg", ".svg", ".pdf"))
                 ]
                 if image_files:
+                    # 引用路径相对 output_dir（报告所在目录）
                     block.append("**Available Figures (for citation in papers)**:")
                     for i, img in enumerate(image_files, 1):
                         block.append(f"  - Figure {i}: {img}")
@@ -625,32 +685,51 @@ class PlanExecutorInterpreter:
 
         return "".join(context_parts)
 
-    def _scan_generated_files(self) -> List[str]:
+    def _node_work_dir(self, node_id: int) -> Optional[Path]:
+        """
+        并发模式下每个节点的代码在 output_dir/nodes/task_<id> 中运行，
+        同时运行的节点生成的文件互不混淆；串行模式直接使用 output_dir（返回 None）
         """
-        扫描 output_dir 及其子目录下生成的文件
+        if self.max_workers <= 1:
+            return None
+        return self.output_dir / "nodes" / f"task_{node_id}"
+
+    def _path_from_node(self, path: str, node_id: int) -> str:
+        """把相对 output_dir 的生成文件路径转换为相对 node_id 工作目录（代码 cwd）的路径"""
+        work_dir = self._node_work_dir(node_id)
+        if work_dir is None:
+            return path
+        return Path(os.path.relpath(self.output_dir / path, work_dir)).as_posix()
+
+    def _scan_generated_files(self, base_dir: Optional[Path] = None) -> List[str]:
+        """
+        扫描 base_dir（默认 output_dir）及其 results 子目录下生成的文件
         
         扫描范围：
-        1. output_dir 根目录下的文件
-        2. output_dir/results 子目录下的文件
+        1. base_dir 根目录下的文件
+        2. base_dir/results 子目录下的文件
         
         Returns:
             List[str]: 文件的相对路径列表（相对于 output_dir）
         """
+        base_dir = base_dir or self.output_dir
+        prefix = base_dir.relative_to(self.output_dir).as_posix()
+        prefix = "" if prefix == "." else f"{prefix}/"
         files = []
         
-        # 扫描 output_dir 根目录
-        for f in self.output_dir.iterdir():
-            if f.is_file():
-                files.append(f.name)
+        # 扫描 base_dir 根目录
+        if base_dir.exists():
+            for f in base_dir.iterdir():
+                if f.is_file():
+                    files.append(f"{prefix}{f.name}")
         
         # 扫描 results 子目录
-        results_dir = self.output_dir / "results"
+        results_dir = base_dir / "results"
         if results_dir.exists():
             for f in results_dir.iterdir():
                 if f.is_file():
-                    # 返回相对路径，格式为 results/filename.ext
-                    relative_path = f"results/{f.name}"
-                    files.append(relative_path)
+                    # 返回相对路径，格式为 [nodes/task_<id>/]results/filename.ext
+                    files.append(f"{prefix}results/{f.name}")
         
         return files
 
@@ -671,7 +750,8 @@ class PlanExecutorInterpreter:
                 logger.warning(f"节点 [{node_id}] 有 {len(failed_children)} 个子节点执行失败: {failed_names}，继续执行当前节点")
         
         # 更新状态为运行中
-        self._node_status[node_id] = NodeExecutionStatus.RUNNING
+        with self._state_lock:
+            self._node_status[node_id] = NodeExecutionStatus.RUNNING
         
         record = NodeExecutionRecord(
             node_id=node_id,
@@ -686,8 +766,11 @@ class PlanExecutorInterpreter:
         # 收集依赖节点和子节点的执行结果作为上下文（DAG 调度）
         dependency_context = self._collect_dependency_context(node_id)
         
-        # 记录执行前的文件
-        files_before = set(self._scan_generated_files())
+        # 记录执行前的文件（并发模式下只扫描本节点自己的工作目录）
+        work_dir = self._node_work_dir(node_id)
+        if work_dir is not None:
+            work_dir.mkdir(parents=True, exist_ok=True)
+        files_before = set(self._scan_generated_files(work_dir))
 
         # 从节点metadata中读取task_type（如果有的话）
         force_task_type = None
@@ -707,12 +790,13 @@ class PlanExecutorInterpreter:
             subtask_results=dependency_context,  # 传递依赖结果给信息收集和任务执行阶段
             force_task_type=force_task_type,  # 传递任务类型（如果指定）
             skip_info_gathering=True,  # 在智能模式下跳过信息收集，避免路径错误
-            is_visualization=is_visualization
+            is_visualization=is_visualization,
+            work_dir=str(work_dir) if work_dir is not None else None
         )
         
         # 记录执行后的文件，找出新生成的
-        files_after = set(self._scan_generated_files())
-        new_files = list(files_after - files_before)
+        files_after = set(self._scan_generated_files(work_dir))
+        new_files = sorted(files_after - files_before)
         
         # 更新记录
         record.task_type = result.task_type
@@ -747,11 +831,11 @@ class PlanExecutorInterpreter:
                 except Exception as e:
                     logger.warning(f"Vision analysis skipped: {e}")
 
-        self._all_generated_files.extend(new_files)
+        with self._state_lock:
+            self._all_generated_files.extend(new_files)
         
         if result.success:
             record.status = NodeExecutionStatus.COMPLETED
-            self._node_status[node_id] = NodeExecutionStatus.COMPLETED
             
             if result.task_type == TaskType.CODE_REQUIRED:
                 record.code = result.final_code
@@ -806,7 +890,6 @@ class PlanExecutorInterpreter:
                 self._append_empty_task_to_report(record)
         else:
             record.status = NodeExecutionStatus.FAILED
-            self._node_status[node_id] = NodeExecutionStatus.FAILED
             record.error_message = result.error_message or result.code_error
             logger.error(f"节点 [{node_id}] 执行失败: {record.error_message}")
 
@@ -814,7 +897,10 @@ class PlanExecutorInterpreter:
             record.completed_at = datetime.now().isoformat()
         if record.duration_seconds is None:
             record.duration_seconds = self._calc_duration_seconds(record.started_at, record.completed_at)
-        self._node_records[node_id] = record
+        # 先写入记录再发布状态：并发调度器看到节点结束时，其上下文和报告片段必须已经就绪
+        with self._state_lock:
+            self._node_records[node_id] = record
+            self._node_status[node_id] = record.status
         
         # 更新数据库中的节点状态
         self.repo.update_task(
@@ -957,6 +1043,7 @@ class PlanExecutorInterpreter:
         - 按 DAG 拓扑顺序执行（parent_ids 决定顺序）
         - 同时检查显式依赖（dependencies）
         - 每个节点可获取其父节点和子节点的执行结果
+        - max_workers > 1 时，所有就绪节点并发执行，报告仍按拓扑顺序写入
         
         Returns:
             PlanExecutionResult: 完整的执行结果
@@ -968,21 +1055,10 @@ class PlanExecutorInterpreter:
         # 根据数据库中的状态初始化所有节点状态，并加载已完成节点的执行记录
         self._initialize_node_states()
         
-        # 按拓扑顺序执行
-        for idx, node_id in enumerate(self._topo_order):
-            if self._node_status.get(node_id) != NodeExecutionStatus.PENDING:
-                status = self._node_status.get(node_id)
-                logger.info(f"[{idx+1}/{len(self._topo_order)}] 节点 [{node_id}] 状态为 {status.value}，跳过")
-                continue
-            
-            # 检查是否可以执行（父节点和依赖都已完成）
-            if not self._can_execute_node(node_id):
-                logger.warning(f"[{idx+1}/{len(self._topo_order)}] 节点 [{node_id}] 前置条件未满足，标记为 SKIPPED")
-                self._node_status[node_id] = NodeExecutionStatus.SKIPPED
-                continue
-            
-            logger.info(f"[{idx+1}/{len(self._topo_order)}] 执行节点 [{node_id}]")
-            self._execute_single_node(node_id)
+        if self.max_workers > 1:
+            self._execute_concurrently()
+        else:
+            self._execute_sequentially()
         
         # 统计结果
         completed_count = sum(1 for s in self._node_status.values() if s == NodeExecutionStatus.COMPLETED)
@@ -1017,6 +1093,98 @@ class PlanExecutorInterpreter:
         
         return result
 
+    def _execute_sequentially(self):
+        """按拓扑顺序逐个执行节点"""
+        for idx, node_id in enumerate(self._topo_order):
+            if self._node_status.get(node_id) != NodeExecutionStatus.PENDING:
+                status = self._node_status.get(node_id)
+                logger.info(f"[{idx+1}/{len(self._topo_order)}] 节点 [{node_id}] 状态为 {status.value}，跳过")
+                continue
+            
+            # 检查是否可以执行（父节点和依赖都已完成）
+            if not self._can_execute_node(node_id):
+                logger.warning(f"[{idx+1}/{len(self._topo_order)}] 节点 [{node_id}] 前置条件未满足，标记为 SKIPPED")
+                self._node_status[node_id] = NodeExecutionStatus.SKIPPED
+                continue
+            
+            logger.info(f"[{idx+1}/{len(self._topo_order)}] 执行节点 [{node_id}]")
+            self._execute_single_node(node_id)
+
+    def _is_node_ready(self, node_id: int) -> bool:
+        """并发调度的就绪判断：子节点已结束，且显式依赖也已结束（保证依赖上下文可用）"""
+        if not self._can_execute_node(node_id):
+            return False
+        node = self.tree.nodes.get(node_id)
+        return node is not None and self._all_dependencies_done(node)
+
+    def _execute_concurrently(self):
+        """
+        DAG 并发调度
+
+        每当有节点结束，就重新计算就绪节点并提交到线程池（最多 max_workers 个同时运行），
+        依赖方在其输入全部结束后立即被释放。报告片段先缓存，再按拓扑顺序写入。
+        最终仍无法执行的 PENDING 节点标记为 SKIPPED，与串行模式一致。
+        """
+        order_index = {nid: idx for idx, nid in enumerate(self._topo_order)}
+        total = len(self._topo_order)
+        with self._state_lock:
+            self._report_buffer = {}
+            self._report_cursor = 0
+
+        logger.info(f"[DAG并发] 启用并发调度: max_workers={self.max_workers}")
+        running: Dict[Future, int] = {}
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=f"plan{self.plan_id}-node",
+            ) as pool:
+                while True:
+                    ready = sorted(
+                        (nid for nid in self.tree.nodes if self._is_node_ready(nid)),
+                        key=lambda nid: order_index.get(nid, total),
+                    )
+                    for node_id in ready:
+                        # 提交前标记为 RUNNING，避免重复调度
+                        with self._state_lock:
+                            self._node_status[node_id] = NodeExecutionStatus.RUNNING
+                        logger.info(f"[DAG并发] 提交节点 [{node_id}]（运行中 {len(running) + 1}）")
+                        running[pool.submit(self._execute_single_node, node_id)] = node_id
+
+                    if not running:
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        node_id = running.pop(future)
+                        exc = future.exception()
+                        if exc is not None:
+                            self._record_node_crash(node_id, exc)
+                    self._flush_report_sections()
+        finally:
+            for node_id, status in list(self._node_status.items()):
+                if status == NodeExecutionStatus.PENDING:
+                    logger.warning(f"[DAG并发] 节点 [{node_id}] 前置条件未满足，标记为 SKIPPED")
+                    self._node_status[node_id] = NodeExecutionStatus.SKIPPED
+            self._flush_report_sections(force=True)
+            with self._state_lock:
+                self._report_buffer = None
+
+    def _record_node_crash(self, node_id: int, exc: BaseException):
+        """并发模式下节点执行抛出异常时，记录为 FAILED 以便依赖方继续调度"""
+        logger.error(f"节点 [{node_id}] 执行异常: {exc}")
+        node = self.tree.nodes.get(node_id)
+        completed_at = datetime.now().isoformat()
+        record = NodeExecutionRecord(
+            node_id=node_id,
+            node_name=node.name if node else str(node_id),
+            status=NodeExecutionStatus.FAILED,
+            error_message=str(exc),
+            completed_at=completed_at,
+        )
+        with self._state_lock:
+            self._node_records[node_id] = record
+            self._node_status[node_id] = NodeExecutionStatus.FAILED
+
     def _finalize_analysis_report(
         self,
         completed: int,
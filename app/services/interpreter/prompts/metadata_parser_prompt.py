@@ -2,6 +2,8 @@
 File metadata parsing prompts for the LLM.
 """
 
+import hashlib
+
 METADATA_PARSER_SYSTEM_PROMPT = """You are a data file parsing expert. Generate Python code to parse the file and extract metadata."""
 
 METADATA_PARSER_USER_PROMPT = '''Please generate Python code to parse the file and extract metadata based on the information below.
@@ -133,6 +135,13 @@ def parse_file(file_path: str) -> dict:
 '''
 
 
+# Parsed metadata is cached per prompt version; editing the templates above
+# invalidates previously cached parse results automatically.
+METADATA_PARSER_PROMPT_VERSION = hashlib.sha256(
+    (METADATA_PARSER_SYSTEM_PROMPT + METADATA_PARSER_USER_PROMPT).encode("utf-8")
+).hexdigest()[:16]
+
+
 def build_code_fix_prompt(code: str, error: str) -> str:
     """Build a code-fix prompt for execution errors."""
     return CODE_FIX_PROMPT.format(code=code, error=error)
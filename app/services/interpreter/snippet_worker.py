@@ -0,0 +1,171 @@
+"""
+代码片段执行工作进程（工作进程端）
+
+由 executor_pool.SnippetWorkerPool 以 ``python snippet_worker.py`` 方式预先启动，
+只依赖标准库（numpy/pandas 仅作为可选预加载）。协议为按行分隔的 JSON：
+
+    请求  {"code": "...", "variables": {...}, "function_name": "parse_file",
+           "function_args": [...], "function_kwargs": {...},
+           "capture_output": true, "cpu_seconds": 60}
+    响应  ExecutionResult.to_dict() 的字段
+
+启动后先发送 {"ready": true}。每个片段在独立命名空间中执行，sys.stdout/stderr
+只在本进程内替换，互不干扰。资源限制：
+- 内存：RLIMIT_AS = 预加载完成后的地址空间 + SNIPPET_MEMORY_MB；
+- CPU：每次执行前把 RLIMIT_CPU 软限制设为 已用 CPU + cpu_seconds，超限时
+  SIGXCPU 转为异常返回；卡在 C 代码中无法响应时由调用方的超时杀掉进程。
+"""
+
+import io
+import json
+import math
+import os
+import signal
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class CpuLimitExceeded(Exception):
+    pass
+
+
+def _on_sigxcpu(signum, frame):
+    raise CpuLimitExceeded("CPU time limit exceeded")
+
+
+def _json_default(value):
+    """numpy 标量/数组等转为 JSON 原生类型，其余转字符串"""
+    for attr in ("item", "tolist"):
+        fn = getattr(value, attr, None)
+        if callable(fn):
+            try:
+                return fn()
+            except Exception:
+                pass
+    return str(value)
+
+
+def _address_space_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+
+def _limit_memory(memory_mb):
+    if resource is None or memory_mb <= 0:
+        return
+    baseline = _address_space_bytes()
+    if baseline is None:
+        return
+    limit = baseline + memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+
+def _limit_cpu(cpu_seconds):
+    """只调整软限制：非特权进程无法再调高已降低的硬限制"""
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = hard
+    if cpu_seconds and cpu_seconds > 0:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = int(math.ceil(usage.ru_utime + usage.ru_stime + cpu_seconds))
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _execute(request):
+    exec_globals = {"__builtins__": __builtins__, "__name__": "__main__"}
+    exec_globals.update(request.get("variables") or {})
+    capture = request.get("capture_output", True)
+    stdout_capture = io.StringIO()
+    stderr_capture = io.StringIO()
+    old_stdout, old_stderr = sys.stdout, sys.stderr
+    response = {"success": False, "result": None, "stdout": "", "stderr": "",
+                "error_type": None, "error_message": None, "error_traceback": None}
+    try:
+        if capture:
+            sys.stdout, sys.stderr = stdout_capture, stderr_capture
+        _limit_cpu(request.get("cpu_seconds"))
+        exec(compile(request.get("code", ""), "<llm_generated>", "exec"), exec_globals)
+
+        result = None
+        function_name = request.get("function_name")
+        if function_name:
+            if function_name not in exec_globals:
+                raise NameError(f"函数 '{function_name}' 未在代码中定义")
+            result = exec_globals[function_name](
+                *(request.get("function_args") or []), **(request.get("function_kwargs") or {})
+            )
+        response.update(success=True, result=result)
+    except BaseException as e:  # 包括 SystemExit/CpuLimitExceeded，不能让工作进程退出
+        response.update(
+            error_type=type(e).__name__,
+            error_message=str(e),
+            error_traceback=traceback.format_exc(),
+        )
+    finally:
+        sys.stdout, sys.stderr = old_stdout, old_stderr
+        _limit_cpu(None)
+    response["stdout"] = stdout_capture.getvalue()
+    response["stderr"] = stderr_capture.getvalue()
+    return response
+
+
+def _encode(response):
+    try:
+        return json.dumps(response, default=_json_default)
+    except (TypeError, ValueError):
+        response["result"] = str(response["result"])
+        return json.dumps(response, default=_json_default)
+
+
+def main():
+    # 协议使用私有的描述符，fd 0/1 交给用户代码
+    proto_in = io.open(os.dup(0), "r", encoding="utf-8", newline="\n")
+    proto_out = io.open(os.dup(1), "w", encoding="utf-8", newline="\n")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    sys.stdin = io.open(0, "r", closefd=False)
+    sys.stdout = io.open(1, "w", encoding="utf-8", errors="replace", closefd=False, buffering=1)
+
+    # 脚本所在目录不应出现在片段的导入路径中
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        sys.path.pop(0)
+
+    for name in [m for m in os.environ.get("SNIPPET_PRELOAD", "").split(",") if m]:
+        try:
+            __import__(name)
+        except Exception:
+            pass
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+    _limit_memory(int(os.environ.get("SNIPPET_MEMORY_MB", "0") or 0))
+
+    proto_out.write(json.dumps({"ready": True}) + "\n")
+    proto_out.flush()
+    for line in proto_in:
+        if not line.strip():
+            continue
+        proto_out.write(_encode(_execute(json.loads(line))) + "\n")
+        proto_out.flush()
+
+
+if __name__ == "__main__":
+    main()
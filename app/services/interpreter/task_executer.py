@@ -96,7 +96,8 @@ class TaskExecutor:
         docker_timeout: int = 60,
         output_dir: Optional[str] = None,
         interpreter_type: str = "docker",
-        venv_path: Optional[str] = None
+        venv_path: Optional[str] = None,
+        persistent_kernel: bool = False
     ):
         """
         初始化任务执行器
@@ -113,6 +114,8 @@ class TaskExecutor:
                        如果不指定，则使用数据目录
             interpreter_type: 代码执行器类型（"docker"或"venv"）
             venv_path: Python虚拟环境路径（当interpreter_type="venv"时使用）
+            persistent_kernel: venv 模式下使用常驻内核进程，避免每次执行都重新导入
+                             pandas/numpy 并重新读取数据文件（当interpreter_type="venv"时使用）
         """
         import os
         from pathlib import Path
@@ -177,15 +180,10 @@ class TaskExecutor:
             logger.warning(f"Failed to load README.md: {e}")
         
         # 解析所有数据文件的元数据
-        self.metadata_list: List[FileMetadata] = []
         self.metadata_parser = LLMMetadataParser(llm_client=LLMClient(provider=llm_provider))
-        
-        for fp in data_file_paths:
-            logger.info(f"正在解析数据文件元数据: {fp}")
-            # 使用新的 LLM 元数据解析器
-            metadata = self.metadata_parser.parse(fp)
-            self.metadata_list.append(metadata)
-            
+        # 内容未变化的文件直接复用缓存结果，其余文件并发调用 LLM 解析
+        self.metadata_list: List[FileMetadata] = self.metadata_parser.parse_many(list(data_file_paths))
+        for metadata in self.metadata_list:
             # 从 parsed_content 获取统计信息
             parsed = metadata.parsed_content or {}
             rows = parsed.get('total_rows', 'N/A')
@@ -245,7 +243,8 @@ class TaskExecutor:
                 timeout=docker_timeout,
                 work_dir=self.output_dir,
                 data_dir=self.data_dir,
-                venv_path=venv_path
+                venv_path=venv_path,
+                persistent=persistent_kernel
             )
         else:
             logger.info(f"使用Docker执行器 (image={docker_image})")
@@ -351,7 +350,8 @@ class TaskExecutor:
         task_description: str,
         subtask_results: str = "",
         max_rounds: int = 3,
-        max_fix_attempts: int = 3
+        max_fix_attempts: int = 3,
+        work_dir: Optional[str] = None
     ) -> tuple[str, int]:
         """
         信息收集阶段：循环询问LLM是否需要更多数据信息
@@ -362,6 +362,7 @@ class TaskExecutor:
             subtask_results: 子任务结果（可选）
             max_rounds: 最大收集轮次，防止无限循环
             max_fix_attempts: 每轮代码执行失败时的最大修复尝试次数
+            work_dir: 代码执行的工作目录，默认使用 output_dir
             
         Returns:
             tuple[str, int]: (收集到的所有额外信息, 收集轮次)
@@ -432,7 +433,7 @@ class TaskExecutor:
                         
                         for fix_attempt in range(1, max_fix_attempts + 1):
                             logger.info(f"信息收集第 {round_num} 轮: 执行代码 (尝试 {fix_attempt}/{max_fix_attempts})...")
-                            exec_result = self.docker_interpreter.run_python_code(current_code)
+                            exec_result = self.docker_interpreter.run_python_code(current_code, work_dir=work_dir)
                             
                             if exec_result.status == "success":
                                 info_text = f"**Code:**\n```python\n{current_code}\n```\n\n**Output:**\n```\n{exec_result.output}\n```"
@@ -501,7 +502,8 @@ class TaskExecutor:
         subtask_results: str = "",
         gathered_info: str = "",
         max_fix_attempts: int = 5,
-        is_visualization: bool = False
+        is_visualization: bool = False,
+        work_dir: Optional[str] = None
     ) -> TaskExecutionResult:
         """
         执行需要代码的任务
@@ -513,6 +515,7 @@ class TaskExecutor:
             gathered_info: 信息收集阶段获取的额外信息
             max_fix_attempts: 最大修复尝试次数，默认5次
             is_visualization: 是否为可视化任务，如果是则使用 visualization skill
+            work_dir: 代码执行的工作目录，默认使用 output_dir
         """
         # 1. 生成初始代码（包含收集到的额外信息）
         logger.info("正在生成代码...")
@@ -562,7 +565,7 @@ class TaskExecutor:
             total_attempts = attempt
             logger.info(f"执行代码 (尝试 {attempt}/{max_fix_attempts})...")
 
-            exec_result = self.docker_interpreter.run_python_code(current_code)
+            exec_result = self.docker_interpreter.run_python_code(current_code, work_dir=work_dir)
 
             # 执行成功，直接返回
             if exec_result.status == "success":
@@ -728,7 +731,8 @@ Now generate a COMPLETELY NEW code solution based on your rethinking:
         task_description: str,
         subtask_results: str = "",
         gathered_info: str = "",
-        max_fix_attempts: int = 5
+        max_fix_attempts: int = 5,
+        work_dir: Optional[str] = None
     ) -> TaskExecutionResult:
         """
         执行数据总结任务（两阶段智能流程）
@@ -742,6 +746,7 @@ Now generate a COMPLETELY NEW code solution based on your rethinking:
             subtask_results: 子任务结果
             gathered_info: 信息收集阶段获取的额外信息
             max_fix_attempts: 最大修复尝试次数
+            work_dir: 代码执行的工作目录，默认使用 output_dir
         """
         import json
 
@@ -890,7 +895,7 @@ Now generate a COMPLETELY NEW code solution based on your rethinking:
             total_attempts = attempt
             logger.info(f"执行代码 (尝试 {attempt}/{max_fix_attempts})...")
 
-            exec_result = self.docker_interpreter.run_python_code(current_code)
+            exec_result = self.docker_interpreter.run_python_code(current_code, work_dir=work_dir)
 
             if exec_result.status == "success":
                 logger.info(f"执行成功 (第 {attempt} 次尝试)")
@@ -1116,7 +1121,8 @@ Return JSON format:
         force_code: Optional[bool] = None,
         force_task_type: Optional[str] = None,
         skip_info_gathering: bool = False,
-        is_visualization: bool = False
+        is_visualization: bool = False,
+        work_dir: Optional[str] = None
     ) -> TaskExecutionResult:
         """
         执行任务的主入口
@@ -1130,6 +1136,7 @@ Return JSON format:
             force_task_type: 强制指定任务类型（"code_required"/"text_only"/"data_summary"）
             skip_info_gathering: 是否跳过信息收集阶段
             is_visualization: 是否为可视化任务，如果是则使用 visualization skill 生成代码
+            work_dir: 本次任务代码的工作目录（须位于 output_dir 内），默认使用 output_dir
         """
         logger.info(f"开始执行任务: {task_title}")
 
@@ -1143,7 +1150,8 @@ Return JSON format:
             gathered_info, info_rounds = self._gather_additional_info(
                 task_title=task_title,
                 task_description=task_description,
-                subtask_results=subtask_results
+                subtask_results=subtask_results,
+                work_dir=work_dir
             )
             if gathered_info:
                 logger.info(f"信息收集完成: 共 {info_rounds} 轮，获取了额外信息")
@@ -1171,7 +1179,8 @@ Return JSON format:
                 task_title,
                 task_description,
                 subtask_results=subtask_results,
-                gathered_info=gathered_info
+                gathered_info=gathered_info,
+                work_dir=work_dir
             )
         elif task_type == TaskType.DATA_SUMMARY:
             result = self._execute_data_summary_task(
@@ -1179,7 +1188,8 @@ Return JSON format:
                 task_description,
                 subtask_results=subtask_results,
                 gathered_info=gathered_info,
-                is_visualization=is_visualization
+                is_visualization=is_visualization,
+                work_dir=work_dir
             )
         else:
             result = self._execute_text_task(
@@ -1,11 +1,14 @@
+import json
 import logging
+import queue
 import subprocess
 import sys
 import os
 import tempfile
+import threading
 import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -19,6 +22,129 @@ class CodeExecutionResult:
     exit_code: int
 
 
+_KERNEL_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kernel_worker.py")
+DEFAULT_KERNEL_PRELOAD = ("numpy", "pandas", "matplotlib")
+
+
+class PersistentKernel:
+    """
+    常驻Python工作进程（见 kernel_worker.py）
+
+    进程启动时预先导入重型依赖，此后每段代码在独立命名空间中执行。
+    超时或进程异常退出时杀掉进程，下次执行时自动重启。
+    """
+
+    def __init__(
+        self,
+        python_executable: str,
+        work_dir: str,
+        env: dict,
+        preload: Sequence[str] = DEFAULT_KERNEL_PRELOAD,
+        startup_timeout: float = 120.0
+    ):
+        self.python_executable = python_executable
+        self.work_dir = work_dir
+        self.env = dict(env)
+        self.env["KERNEL_PRELOAD"] = ",".join(preload)
+        self.startup_timeout = startup_timeout
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self.restarts = 0
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _pump(self, proc: subprocess.Popen, lines: "queue.Queue[Optional[str]]") -> None:
+        for line in proc.stdout:
+            lines.put(line)
+        lines.put(None)  # EOF: 进程已退出
+
+    def _start(self) -> None:
+        self._lines = queue.Queue()
+        self._proc = subprocess.Popen(
+            [self.python_executable, _KERNEL_SCRIPT],
+            cwd=self.work_dir,
+            env=self.env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        threading.Thread(
+            target=self._pump, args=(self._proc, self._lines), name="venv-kernel-reader", daemon=True
+        ).start()
+        ready = self._read(self.startup_timeout)
+        if not ready or not ready.get("ready"):
+            self.kill()
+            raise RuntimeError("Persistent kernel failed to start")
+        logger.info(f"Persistent kernel started (pid={self._proc.pid})")
+
+    def _read(self, timeout: float) -> Optional[dict]:
+        """读取一条响应；超时抛 queue.Empty，进程退出返回 None"""
+        line = self._lines.get(timeout=timeout)
+        return json.loads(line) if line is not None else None
+
+    def kill(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=5)
+        except Exception:
+            pass
+        for stream in (proc.stdin, proc.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def run(self, code: str, timeout: float, work_dir: Optional[str] = None) -> CodeExecutionResult:
+        with self._lock:
+            if not self.alive:
+                if self._started:
+                    self.restarts += 1
+                    self.kill()
+                self._start()
+                self._started = True
+            proc = self._proc
+            try:
+                request = {"code": code}
+                if work_dir:
+                    request["work_dir"] = work_dir
+                proc.stdin.write(json.dumps(request) + "\n")
+                proc.stdin.flush()
+                response = self._read(timeout)
+            except queue.Empty:
+                logger.error(f"Code execution timeout after {timeout} seconds, restarting kernel")
+                self.kill()
+                return CodeExecutionResult(
+                    status="timeout",
+                    output="",
+                    error=f"Execution exceeded {timeout} seconds limit.",
+                    exit_code=-1
+                )
+            except (BrokenPipeError, OSError):
+                response = None
+
+            if response is None:
+                # 代码让工作进程退出（os._exit、段错误等）
+                exit_code = proc.wait()
+                self.kill()
+                return CodeExecutionResult(
+                    "failed", "", f"Kernel process exited with code {exit_code}", exit_code or -1
+                )
+
+            exit_code = int(response.get("exit_code", 1))
+            status = "success" if exit_code == 0 else "failed"
+            return CodeExecutionResult(status, response.get("stdout", ""), response.get("stderr", ""), exit_code)
+
+
 class VenvCodeInterpreter:
     """使用Python虚拟环境执行代码的解释器"""
 
@@ -27,7 +153,9 @@ class VenvCodeInterpreter:
         timeout: int = 60,
         work_dir: Optional[str] = None,
         data_dir: Optional[str] = None,
-        venv_path: Optional[str] = None
+        venv_path: Optional[str] = None,
+        persistent: bool = False,
+        preload: Sequence[str] = DEFAULT_KERNEL_PRELOAD
     ):
         """
         初始化虚拟环境代码解释器
@@ -35,11 +163,17 @@ class VenvCodeInterpreter:
         :param work_dir: 工作目录（用于输出文件）
         :param data_dir: 数据目录（用于读取数据文件）
         :param venv_path: 虚拟环境路径，如果不指定则使用系统Python
+        :param persistent: 是否使用常驻内核：重型导入与已读取的数据在多次执行间保留，
+                           每段代码仍在独立命名空间中运行
+        :param preload: 常驻内核启动时预先导入的模块
         """
         self.timeout = timeout
         self.work_dir = os.path.abspath(work_dir) if work_dir else os.getcwd()
         self.data_dir = os.path.abspath(data_dir) if data_dir else self.work_dir
         self.venv_path = venv_path
+        self.persistent = persistent
+        self.preload = tuple(preload)
+        self._kernel: Optional[PersistentKernel] = None
 
         # 确保工作目录存在
         Path(self.work_dir).mkdir(parents=True, exist_ok=True)
@@ -61,12 +195,47 @@ class VenvCodeInterpreter:
         logger.info(f"Work directory: {self.work_dir}")
         logger.info(f"Data directory: {self.data_dir}")
 
-    def run_python_code(self, code: str) -> CodeExecutionResult:
+    def _env(self, work_dir: Optional[str] = None) -> dict:
+        # 准备环境变量，添加数据目录路径
+        env = os.environ.copy()
+        env['DATA_DIR'] = self.data_dir
+        env['WORK_DIR'] = work_dir or self.work_dir
+        return env
+
+    def close(self) -> None:
+        """关闭常驻内核（如有）"""
+        if self._kernel is not None:
+            self._kernel.kill()
+            self._kernel = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def run_python_code(self, code: str, work_dir: Optional[str] = None) -> CodeExecutionResult:
         """
         在虚拟环境中运行Python代码
         :param code: Python代码字符串
+        :param work_dir: 本次执行的工作目录，默认使用初始化时的 work_dir
         :return: CodeExecutionResult
         """
+        if work_dir:
+            work_dir = os.path.abspath(work_dir)
+            Path(work_dir).mkdir(parents=True, exist_ok=True)
+        if self.persistent:
+            if self._kernel is None:
+                self._kernel = PersistentKernel(
+                    self.python_executable, self.work_dir, self._env(), preload=self.preload
+                )
+            try:
+                return self._kernel.run(code, self.timeout, work_dir=work_dir)
+            except Exception as e:
+                logger.exception("Error during persistent kernel execution")
+                self._kernel.kill()
+                return CodeExecutionResult("error", "", str(e), -1)
+
         # 创建临时文件保存代码
         try:
             with tempfile.NamedTemporaryFile(
@@ -80,16 +249,13 @@ class VenvCodeInterpreter:
 
             logger.info(f"Created temporary Python file: {temp_file_path}")
 
-            # 准备环境变量，添加数据目录路径
-            env = os.environ.copy()
-            env['DATA_DIR'] = self.data_dir
-            env['WORK_DIR'] = self.work_dir
+            env = self._env(work_dir)
 
             # 执行代码
             try:
                 result = subprocess.run(
                     [self.python_executable, temp_file_path],
-                    cwd=self.work_dir,
+                    cwd=work_dir or self.work_dir,
                     capture_output=True,
                     text=True,
                     timeout=self.timeout,
@@ -0,0 +1,259 @@
+"""
+Pooled HTTP transport for LLM providers.
+
+Every provider endpoint (scheme + host + port) gets one shared keep-alive
+connection pool, so consecutive ``LLMClient`` calls reuse TCP/TLS sessions
+instead of opening a new connection per request.  A synchronous pool is shared
+by all threads; asynchronous pools are created per event loop because
+``httpx.AsyncClient`` cannot be shared across loops.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.services.foundation.settings import get_settings
+from app.services.llm.rate_limiter import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+
+class LLMTransportError(Exception):
+    """Raised for non-2xx responses so callers can decide whether to retry."""
+
+    def __init__(self, status_code: int, body: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(f"{status_code} {body}")
+        self.status_code = status_code
+        self.body = body
+        self.retry_after = retry_after
+
+
+def _pool_limits() -> httpx.Limits:
+    settings = get_settings()
+    return httpx.Limits(
+        max_connections=max(1, int(getattr(settings, "llm_pool_max_connections", 20))),
+        max_keepalive_connections=max(0, int(getattr(settings, "llm_pool_max_keepalive", 10))),
+        keepalive_expiry=float(getattr(settings, "llm_pool_keepalive_expiry", 30.0)),
+    )
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+_SSE_DONE = object()
+
+
+def parse_sse_line(line: str) -> Any:
+    """Return the content delta of one SSE line, ``None`` to skip, or ``_SSE_DONE``."""
+    line = (line or "").strip()
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if not data:
+        return None
+    if data == "[DONE]":
+        return _SSE_DONE
+    try:
+        obj = json.loads(data)
+    except json.JSONDecodeError:
+        logger.debug("Skipping malformed SSE chunk: %s", data[:200])
+        return None
+    try:
+        choice = obj["choices"][0]
+    except (KeyError, IndexError, TypeError):
+        return None
+    delta = choice.get("delta") or choice.get("message") or {}
+    content = delta.get("content") if isinstance(delta, dict) else None
+    return content or None
+
+
+def iter_sse_deltas(lines: Iterable[str]) -> Iterator[str]:
+    """Yield content deltas from an OpenAI-compatible ``text/event-stream`` body."""
+    for line in lines:
+        delta = parse_sse_line(line)
+        if delta is _SSE_DONE:
+            return
+        if delta is not None:
+            yield delta
+
+
+async def aiter_sse_deltas(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Async variant of :func:`iter_sse_deltas`."""
+    async for line in lines:
+        delta = parse_sse_line(line)
+        if delta is _SSE_DONE:
+            return
+        if delta is not None:
+            yield delta
+
+
+class LLMHttpTransport:
+    """Keep-alive connection pools for a single provider origin."""
+
+    def __init__(self, origin: str, limits: Optional[httpx.Limits] = None) -> None:
+        self.origin = origin
+        self._limits = limits or _pool_limits()
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._stats: Dict[str, int] = {"requests": 0, "stream_requests": 0, "errors": 0}
+
+    # ------------------------------------------------------------------
+    # Client management
+    # ------------------------------------------------------------------
+
+    def _sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(limits=self._limits)
+            return self._client
+
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(limits=self._limits)
+                self._async_clients[loop] = client
+            return client
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] = self._stats.get(key, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "origin": self.origin,
+                "async_pools": len(self._async_clients),
+                **self._stats,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+            async_clients = list(self._async_clients.items())
+            self._async_clients.clear()
+        if client is not None:
+            client.close()
+        for loop, aclient in async_clients:
+            if loop.is_closed() or aclient.is_closed:
+                continue
+            try:
+                if loop.is_running():
+                    asyncio.run_coroutine_threadsafe(aclient.aclose(), loop)
+                else:
+                    loop.run_until_complete(aclient.aclose())
+            except Exception as exc:  # pragma: no cover - best effort cleanup
+                logger.debug("Failed to close async LLM pool for %s: %s", self.origin, exc)
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response, body: Optional[str] = None) -> None:
+        if response.status_code >= 400:
+            raise LLMTransportError(
+                response.status_code,
+                body if body is not None else response.text,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+
+    def post_json(
+        self, url: str, payload: Dict[str, Any], headers: Dict[str, str], timeout: float
+    ) -> Dict[str, Any]:
+        self._count("requests")
+        try:
+            response = self._sync_client().post(url, json=payload, headers=headers, timeout=timeout)
+            self._raise_for_status(response)
+            return response.json()
+        except Exception:
+            self._count("errors")
+            raise
+
+    async def post_json_async(
+        self, url: str, payload: Dict[str, Any], headers: Dict[str, str], timeout: float
+    ) -> Dict[str, Any]:
+        self._count("requests")
+        try:
+            response = await self._async_client().post(url, json=payload, headers=headers, timeout=timeout)
+            self._raise_for_status(response)
+            return response.json()
+        except Exception:
+            self._count("errors")
+            raise
+
+    def stream_lines(
+        self, url: str, payload: Dict[str, Any], headers: Dict[str, str], timeout: float
+    ) -> Iterator[str]:
+        self._count("stream_requests")
+        try:
+            with self._sync_client().stream(
+                "POST", url, json=payload, headers=headers, timeout=timeout
+            ) as response:
+                if response.status_code >= 400:
+                    self._raise_for_status(response, response.read().decode("utf-8", errors="replace"))
+                yield from response.iter_lines()
+        except Exception:
+            self._count("errors")
+            raise
+
+    async def stream_lines_async(
+        self, url: str, payload: Dict[str, Any], headers: Dict[str, str], timeout: float
+    ) -> AsyncIterator[str]:
+        self._count("stream_requests")
+        try:
+            async with self._async_client().stream(
+                "POST", url, json=payload, headers=headers, timeout=timeout
+            ) as response:
+                if response.status_code >= 400:
+                    body = (await response.aread()).decode("utf-8", errors="replace")
+                    self._raise_for_status(response, body)
+                async for line in response.aiter_lines():
+                    yield line
+        except Exception:
+            self._count("errors")
+            raise
+
+
+_transports: Dict[str, LLMHttpTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(url: str) -> LLMHttpTransport:
+    """Return the shared transport for the origin of ``url``."""
+    origin = _origin(url)
+    with _transports_lock:
+        transport = _transports.get(origin)
+        if transport is None:
+            transport = LLMHttpTransport(origin)
+            _transports[origin] = transport
+        return transport
+
+
+def get_transport_stats() -> Tuple[Dict[str, Any], ...]:
+    with _transports_lock:
+        transports = list(_transports.values())
+    return tuple(t.stats() for t in transports)
+
+
+def close_transports() -> None:
+    """Close every pooled connection (used on shutdown and in tests)."""
+    with _transports_lock:
+        transports = list(_transports.values())
+        _transports.clear()
+    for transport in transports:
+        transport.close()
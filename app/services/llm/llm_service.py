@@ -10,11 +10,12 @@ import functools
 import json
 import logging
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
 from ...llm import get_default_client
 from ...interfaces import LLMProvider
 from app.services.foundation.settings import get_settings
+from .response_cache import LLMResponseCache, estimate_tokens, get_response_cache, make_key
 
 logger = logging.getLogger(__name__)
 
@@ -22,17 +23,30 @@ logger = logging.getLogger(__name__)
 class LLMService:
     """Unified service for all LLM interactions with consistent error handling"""
     
-    def __init__(self, client: Optional[LLMProvider] = None):
+    def __init__(
+        self,
+        client: Optional[LLMProvider] = None,
+        cache: Optional[LLMResponseCache] = None,
+        use_cache: Optional[bool] = None,
+    ):
         """
         Initialize the LLM service
         
         Args:
             client: Optional LLM client, defaults to system default
+            cache: Optional response cache (defaults to the shared cache when enabled)
+            use_cache: Enable/disable caching; defaults to ``LLM_CACHE_ENABLED``
         """
         self.client = client or get_default_client()
+        s = get_settings()
+        if use_cache is None:
+            use_cache = cache is not None or bool(getattr(s, "llm_cache_enabled", False))
+        # Clients with their own response cache (LLMClient) are not cached twice
+        self.cache: Optional[LLMResponseCache] = None
+        if use_cache and not self._client_caches():
+            self.cache = cache or get_response_cache()
         # Centralize retry/backoff from settings for consistency with LLM client
         try:
-            s = get_settings()
             retries = int(getattr(s, "llm_retries", 2))
             self._retry_attempts = max(1, retries + 1)  # attempts = first try + retries
             self._retry_delay = float(getattr(s, "llm_backoff_base", 0.5))
@@ -40,12 +54,26 @@ class LLMService:
             self._retry_attempts = 3
             self._retry_delay = 1.0  # seconds
         
-    def chat(self, prompt: str, **kwargs) -> str:
+    def _client_caches(self) -> bool:
+        return isinstance(getattr(self.client, "cache", None), LLMResponseCache)
+
+    def _cache_key(self, prompt: str, kwargs: Dict[str, Any]) -> str:
+        params = {k: v for k, v in kwargs.items() if k != "model"}
+        params["payload_defaults"] = getattr(self.client, "payload_defaults", None)
+        return make_key(
+            str(getattr(self.client, "provider", type(self.client).__name__)),
+            kwargs.get("model") or getattr(self.client, "model", None),
+            prompt,
+            params,
+        )
+
+    def chat(self, prompt: str, use_cache: Optional[bool] = None, **kwargs) -> str:
         """
         Execute synchronous chat with robust error handling and retry logic
         
         Args:
             prompt: The prompt to send to the LLM
+            use_cache: Per-call cache override (``False`` bypasses the response cache)
             **kwargs: Additional parameters for the LLM
             
         Returns:
@@ -54,6 +82,21 @@ class LLMService:
         Raises:
             RuntimeError: If all retry attempts fail
         """
+        if self._client_caches():
+            if use_cache is not None:
+                kwargs["use_cache"] = use_cache
+            return self._chat_with_retry(prompt, **kwargs)
+        cache = self.cache or (get_response_cache() if use_cache else None)
+        if cache is None:
+            return self._chat_with_retry(prompt, **kwargs)
+
+        def _compute():
+            content = self._chat_with_retry(prompt, **kwargs)
+            return content, estimate_tokens(prompt, content)
+
+        return cache.get_or_compute(self._cache_key(prompt, kwargs), _compute, bypass=use_cache is False)
+    
+    def _chat_with_retry(self, prompt: str, **kwargs) -> str:
         for attempt in range(self._retry_attempts):
             try:
                 return self._execute_chat(prompt, **kwargs)
@@ -68,12 +111,13 @@ class LLMService:
         # This should never be reached
         raise RuntimeError("Unexpected error in LLM chat")
     
-    async def chat_async(self, prompt: str, **kwargs) -> str:
+    async def chat_async(self, prompt: str, use_cache: Optional[bool] = None, **kwargs) -> str:
         """
         Execute asynchronous chat with robust error handling and retry logic
         
         Args:
             prompt: The prompt to send to the LLM
+            use_cache: Per-call cache override (``False`` bypasses the response cache)
             **kwargs: Additional parameters for the LLM
             
         Returns:
@@ -82,6 +126,23 @@ class LLMService:
         Raises:
             RuntimeError: If all retry attempts fail
         """
+        if self._client_caches():
+            if use_cache is not None:
+                kwargs["use_cache"] = use_cache
+            return await self._chat_with_retry_async(prompt, **kwargs)
+        cache = self.cache or (get_response_cache() if use_cache else None)
+        if cache is None:
+            return await self._chat_with_retry_async(prompt, **kwargs)
+
+        async def _compute():
+            content = await self._chat_with_retry_async(prompt, **kwargs)
+            return content, estimate_tokens(prompt, content)
+
+        return await cache.get_or_compute_async(
+            self._cache_key(prompt, kwargs), _compute, bypass=use_cache is False
+        )
+    
+    async def _chat_with_retry_async(self, prompt: str, **kwargs) -> str:
         for attempt in range(self._retry_attempts):
             try:
                 return await self._execute_chat_async(prompt, **kwargs)
@@ -96,6 +157,44 @@ class LLMService:
         # This should never be reached
         raise RuntimeError("Unexpected error in async LLM chat")
     
+    def stream_chat(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Yield the LLM response incrementally
+        
+        Uses the client's ``chat_stream`` when available; otherwise the full
+        response is produced as a single chunk.
+        
+        Args:
+            prompt: The prompt to send to the LLM
+            **kwargs: Additional parameters for the LLM
+            
+        Yields:
+            str: Response text deltas
+        """
+        chat_stream = getattr(self.client, "chat_stream", None)
+        if callable(chat_stream):
+            yield from chat_stream(prompt, **kwargs)
+            return
+        yield self.chat(prompt, **kwargs)
+    
+    async def stream_chat_async(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Async variant of :meth:`stream_chat`
+        
+        Args:
+            prompt: The prompt to send to the LLM
+            **kwargs: Additional parameters for the LLM
+            
+        Yields:
+            str: Response text deltas
+        """
+        chat_stream_async = getattr(self.client, "chat_stream_async", None)
+        if callable(chat_stream_async):
+            async for delta in chat_stream_async(prompt, **kwargs):
+                yield delta
+            return
+        yield await self.chat_async(prompt, **kwargs)
+    
     def _execute_chat(self, prompt: str, **kwargs) -> str:
         """
         Internal method to execute chat with unified response extraction
@@ -201,6 +300,18 @@ class LLMService:
         # Fallback to string representation
         return str(response)
     
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Response cache statistics for this service
+        
+        Returns:
+            Dict with ``cache`` counters (hits, misses, coalesced, saved_tokens, ...)
+            or ``None`` when caching is disabled
+        """
+        if self._client_caches():
+            return {"cache": self.client.cache.get_stats()}
+        return {"cache": self.cache.get_stats() if self.cache is not None else None}
+    
     def parse_json_response(self, content: str) -> Optional[Dict[str, Any]]:
         """
         Parse JSON from LLM response with robust extraction
@@ -0,0 +1,342 @@
+"""
+Process-wide, provider-keyed rate limiting for outbound LLM and embedding calls.
+
+Chat completions (``LLMClient``), embeddings (``GLMApiClient``) and image
+analysis used to hit providers independently: a plan execution, a
+decomposition job and chat traffic together regularly tripped 429s and then
+slept in per-call retry backoff. Every outbound call now acquires from the
+``ProviderRateLimiter`` of its provider first.
+
+Each limiter holds two token buckets, requests per minute and tokens per
+minute. A request reserves its estimated prompt size plus a completion
+allowance; once the response arrives the reservation is settled against the
+reported usage. Bucket capacity is ``burst_seconds`` worth of budget, so a
+full bucket allows a short burst but not a whole minute's quota at once.
+
+The effective rate adapts AIMD-style. Every 429 or 5xx multiplies a
+``factor`` (applied to both budgets) by ``decrease_factor``, at most once per
+``cooldown`` seconds because in-flight requests fail together. Each success
+adds ``increase_step`` back, up to 1.0. A ``Retry-After`` pauses the whole
+provider. A provider without configured budgets is unlimited until its first
+429; its request budget is then learned from the traffic of the last minute
+(at least ``MIN_LEARNED_RPM``), and it becomes unlimited again once the factor
+has recovered and stayed quiet for a minute. Plain 5xx responses on an
+unlimited provider are left to the caller's retry backoff.
+
+Budgets come from ``LLM_RATE_RPM`` / ``LLM_RATE_TPM`` (0 = unlimited),
+overridable per key with ``<KEY>_RATE_RPM`` / ``<KEY>_RATE_TPM``
+(e.g. ``GLM_RATE_RPM``, ``GLM_EMBEDDING_RATE_TPM``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from app.services.foundation.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60.0
+MIN_LEARNED_RPM = 10.0
+# Longest single sleep while waiting, so rate changes are picked up quickly.
+_MAX_SLEEP = 0.5
+
+
+def is_throttle_status(status_code: Optional[int]) -> bool:
+    """429 and 5xx responses shrink the provider's rate."""
+    return status_code is not None and (status_code == 429 or 500 <= status_code < 600)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Bucket:
+    """Token bucket refilled continuously at ``per_minute / 60`` per second."""
+
+    def __init__(self) -> None:
+        self.level = 0.0
+        self.capacity = 0.0
+        self.rate = 0.0  # per second
+        self.updated = time.monotonic()
+
+    def configure(self, per_minute: Optional[float], burst_seconds: float, now: float) -> None:
+        self.refill(now)
+        if not per_minute:
+            self.rate = 0.0
+            self.capacity = 0.0
+            return
+        first = self.capacity == 0.0
+        self.rate = per_minute / WINDOW_SECONDS
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity if first else min(self.level, self.capacity)
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0.0
+
+    def refill(self, now: float) -> None:
+        if not self.unlimited:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        if self.unlimited:
+            return 0.0
+        # Oversized requests only need a full bucket, never more.
+        needed = min(amount, self.capacity) - self.level
+        return 0.0 if needed <= 0 else needed / self.rate
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self.level -= amount
+
+
+class ProviderRateLimiter:
+    """Request and token budgets for one provider key, adapted on throttling."""
+
+    def __init__(
+        self,
+        key: str,
+        *,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        burst_seconds: float = 10.0,
+        min_factor: float = 0.1,
+        increase_step: float = 0.02,
+        decrease_factor: float = 0.5,
+        cooldown: float = 2.0,
+    ) -> None:
+        self.key = key
+        self.rpm = rpm or None
+        self.tpm = tpm or None
+        self.burst_seconds = burst_seconds
+        self.min_factor = min_factor
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.factor = 1.0
+        self._learned: Tuple[Optional[float], Optional[float]] = (None, None)
+        self._requests = _Bucket()
+        self._tokens = _Bucket()
+        self._history: Deque[Tuple[float, int, int]] = deque()
+        self._blocked_until = 0.0
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+        self._stats: Dict[str, float] = {
+            "requests": 0,
+            "throttled": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+        }
+        with self._lock:
+            self._configure_locked(time.monotonic())
+
+    # ------------------------------------------------------------------
+    # Acquire / report
+    # ------------------------------------------------------------------
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until a request with ``tokens`` estimated tokens may start.
+
+        Returns the seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            delay = self._try_acquire(tokens, waited)
+            if delay <= 0:
+                return waited
+            time.sleep(min(delay, _MAX_SLEEP))
+            waited += min(delay, _MAX_SLEEP)
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        """Async variant of :meth:`acquire`; never blocks the event loop."""
+        waited = 0.0
+        while True:
+            delay = self._try_acquire(tokens, waited)
+            if delay <= 0:
+                return waited
+            await asyncio.sleep(min(delay, _MAX_SLEEP))
+            waited += min(delay, _MAX_SLEEP)
+
+    def record_success(self, reserved_tokens: int = 0, used_tokens: Optional[int] = None) -> None:
+        """Settle a reservation against actual usage and raise the rate."""
+        now = time.monotonic()
+        with self._lock:
+            self._settle_locked(now, reserved_tokens, used_tokens)
+            if self.factor < 1.0:
+                self.factor = min(1.0, self.factor + self.increase_step)
+                self._configure_locked(now)
+            elif self._learned != (None, None) and now - self._last_decrease >= WINDOW_SECONDS:
+                # A learned budget is only a guess: drop it once things stay calm.
+                self._learned = (None, None)
+                self._configure_locked(now)
+
+    def record_failure(
+        self,
+        status_code: Optional[int] = None,
+        *,
+        retry_after: Optional[float] = None,
+        reserved_tokens: int = 0,
+    ) -> None:
+        """Report a failed call; 429/5xx shrink the rate, others only refund."""
+        now = time.monotonic()
+        with self._lock:
+            self._settle_locked(now, reserved_tokens, 0)
+            if not is_throttle_status(status_code):
+                return
+            self._stats["throttled"] += 1
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            if now - self._last_decrease < self.cooldown:
+                return
+            if self._base() == (None, None):
+                if status_code != 429:
+                    return
+                requests, tokens = self._window_totals_locked(now)
+                scale = max(1.0, MIN_LEARNED_RPM / max(1, requests))
+                self._learned = (max(1, requests) * scale, (tokens * scale) or None)
+            self._last_decrease = now
+            self.factor = max(self.min_factor, self.factor * self.decrease_factor)
+            self._configure_locked(now)
+            logger.info(
+                "LLM rate limiter %s throttled (status=%s): factor=%.2f rpm=%s tpm=%s",
+                self.key,
+                status_code,
+                self.factor,
+                self._effective(self._base()[0]),
+                self._effective(self._base()[1]),
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            requests, tokens = self._window_totals_locked(now)
+            rpm_limit = self._effective(self._base()[0])
+            tpm_limit = self._effective(self._base()[1])
+            return {
+                "key": self.key,
+                "configured_rpm": self.rpm,
+                "configured_tpm": self.tpm,
+                "learned_rpm": self._learned[0],
+                "learned_tpm": self._learned[1],
+                "factor": round(self.factor, 3),
+                "effective_rpm": rpm_limit,
+                "effective_tpm": tpm_limit,
+                "requests_last_minute": requests,
+                "tokens_last_minute": tokens,
+                "request_utilization": round(requests / rpm_limit, 3) if rpm_limit else None,
+                "token_utilization": round(tokens / tpm_limit, 3) if tpm_limit else None,
+                "blocked_for_seconds": round(max(0.0, self._blocked_until - now), 3),
+                **{k: (round(v, 3) if isinstance(v, float) else v) for k, v in self._stats.items()},
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _base(self) -> Tuple[Optional[float], Optional[float]]:
+        if self.rpm is None and self.tpm is None:
+            return self._learned
+        return self.rpm, self.tpm
+
+    def _effective(self, base: Optional[float]) -> Optional[float]:
+        return round(base * self.factor, 2) if base else None
+
+    def _configure_locked(self, now: float) -> None:
+        rpm, tpm = self._base()
+        self._requests.configure(self._effective(rpm), self.burst_seconds, now)
+        self._tokens.configure(self._effective(tpm), self.burst_seconds, now)
+
+    def _try_acquire(self, tokens: int, waited: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            delay = max(
+                self._blocked_until - now,
+                self._requests.wait_for(1),
+                self._tokens.wait_for(tokens),
+            )
+            if delay > 0:
+                return delay
+            self._requests.take(1)
+            self._tokens.take(tokens)
+            self._history.append((now, 1, tokens))
+            self._stats["requests"] += 1
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += waited
+            return 0.0
+
+    def _settle_locked(self, now: float, reserved: int, used: Optional[int]) -> None:
+        if used is None or used == reserved:
+            return
+        self._tokens.refill(now)
+        # Over-use becomes debt; over-reservation is handed back.
+        self._tokens.take(used - reserved)
+        self._history.append((now, 0, used - reserved))
+
+    def _window_totals_locked(self, now: float) -> Tuple[int, int]:
+        while self._history and now - self._history[0][0] > WINDOW_SECONDS:
+            self._history.popleft()
+        requests = sum(entry[1] for entry in self._history)
+        tokens = sum(entry[2] for entry in self._history)
+        return requests, max(0, tokens)
+
+
+def _budget(key: str, kind: str, default: float) -> Optional[float]:
+    raw = os.getenv(f"{key.upper()}_RATE_{kind}")
+    if raw is None:
+        return default or None
+    try:
+        return float(raw) or None
+    except ValueError:
+        logger.warning("Ignoring invalid %s_RATE_%s=%r", key.upper(), kind, raw)
+        return default or None
+
+
+_limiters: Dict[str, ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str) -> ProviderRateLimiter:
+    """Return the shared limiter for a provider key (``glm``, ``glm_embedding``, ...)."""
+    key = (key or "default").lower()
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            settings = get_settings()
+            limiter = ProviderRateLimiter(
+                key,
+                rpm=_budget(key, "RPM", float(getattr(settings, "llm_rate_rpm", 0))),
+                tpm=_budget(key, "TPM", float(getattr(settings, "llm_rate_tpm", 0))),
+                burst_seconds=float(getattr(settings, "llm_rate_burst_seconds", 10.0)),
+            )
+            _limiters[key] = limiter
+        return limiter
+
+
+def get_rate_limiter_stats() -> Tuple[Dict[str, Any], ...]:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return tuple(limiter.get_stats() for limiter in limiters)
+
+
+def reset_rate_limiters() -> None:
+    """Forget every limiter (tests, or after changing budgets at runtime)."""
+    with _limiters_lock:
+        _limiters.clear()
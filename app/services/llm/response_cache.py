@@ -0,0 +1,264 @@
+"""
+In-memory, single-flight cache for LLM completions.
+
+``LLMClient`` and ``LLMService`` consult this cache when caching is enabled
+(``LLM_CACHE_ENABLED`` or ``use_cache=True``).  Entries are keyed on provider,
+model, request parameters and a whitespace-normalized prompt, expire after a
+TTL and are evicted least-recently-used beyond ``max_entries``.
+
+Concurrent identical requests are coalesced: the first caller performs the
+upstream request while later callers (threads or coroutines, on any event
+loop) wait for its result instead of issuing their own.  Failures are shared
+with the waiters but never cached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from app.services.foundation.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize line endings and trailing/outer whitespace; case and inner spacing are kept."""
+    text = str(prompt).replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+
+def make_key(provider: str, model: Optional[str], prompt: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Stable cache key for a completion request."""
+    material = json.dumps(
+        [provider, model, dict(params or {}), normalize_prompt(prompt)],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=repr,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token estimate for providers that do not report usage."""
+    return sum(max(1, len(t) // 4) for t in texts if t)
+
+
+def _resolve(future: "asyncio.Future[Any]", value: Any, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(value)
+
+
+class _Flight:
+    """An upstream request in progress that other callers can wait on."""
+
+    __slots__ = ("event", "value", "error", "followers", "waiters")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.followers = 0
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[Any]"]] = []
+
+    def result(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class LLMResponseCache:
+    """Thread-safe TTL + LRU completion cache with in-flight request coalescing."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._lock = threading.Lock()
+        # key -> (value, tokens, expires_at)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._inflight: Dict[str, _Flight] = {}
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "bypassed": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "saved_tokens": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers (call with the lock held)
+    # ------------------------------------------------------------------
+
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, tokens, expires_at = entry
+        if self.ttl_seconds > 0 and time.monotonic() >= expires_at:
+            del self._entries[key]
+            self._stats["expirations"] += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        self._stats["saved_tokens"] += tokens
+        return True, value
+
+    def _store(self, key: str, value: Any, tokens: int) -> None:
+        self._entries[key] = (value, int(tokens), time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _begin(self, key: str) -> Tuple[str, Any]:
+        """Return ("hit", value), ("wait", flight) or ("lead", flight)."""
+        found, value = self._lookup(key)
+        if found:
+            return "hit", value
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self._stats["coalesced"] += 1
+            flight.followers += 1
+            return "wait", flight
+        self._stats["misses"] += 1
+        flight = self._inflight[key] = _Flight()
+        return "lead", flight
+
+    def _finish(self, key: str, flight: _Flight, value: Any, tokens: int, error: Optional[BaseException]) -> None:
+        with self._lock:
+            if error is None:
+                self._store(key, value, tokens)
+            self._inflight.pop(key, None)
+            flight.value, flight.error = value, error
+            waiters, flight.waiters = flight.waiters, []
+            if error is None:
+                self._stats["saved_tokens"] += tokens * flight.followers
+        flight.event.set()
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future, value, error)
+            except RuntimeError:
+                # The waiter's loop has been closed; nobody is listening any more.
+                pass
+
+    @staticmethod
+    def _shareable(error: BaseException) -> BaseException:
+        if isinstance(error, Exception):
+            return error
+        return RuntimeError(f"Coalesced LLM request was aborted: {error!r}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_or_compute(self, key: str, compute: Callable[[], Tuple[Any, int]], bypass: bool = False) -> Any:
+        """
+        Return the cached value for ``key`` or run ``compute`` once for all concurrent callers.
+
+        ``compute`` returns ``(value, tokens)``; the token count is credited to
+        ``saved_tokens`` whenever the value is served without an upstream call.
+        """
+        if bypass:
+            with self._lock:
+                self._stats["bypassed"] += 1
+            return compute()[0]
+
+        with self._lock:
+            state, payload = self._begin(key)
+        if state == "hit":
+            return payload
+        if state == "wait":
+            payload.event.wait()
+            return payload.result()
+
+        try:
+            value, tokens = compute()
+        except BaseException as e:
+            self._finish(key, payload, None, 0, self._shareable(e))
+            raise
+        self._finish(key, payload, value, tokens, None)
+        return value
+
+    async def get_or_compute_async(
+        self, key: str, compute: Callable[[], Awaitable[Tuple[Any, int]]], bypass: bool = False
+    ) -> Any:
+        """Async variant of :meth:`get_or_compute`; waiters never block the event loop."""
+        if bypass:
+            with self._lock:
+                self._stats["bypassed"] += 1
+            return (await compute())[0]
+
+        with self._lock:
+            state, payload = self._begin(key)
+            if state == "wait":
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                payload.waiters.append((loop, future))
+        if state == "hit":
+            return payload
+        if state == "wait":
+            return await future
+
+        try:
+            value, tokens = await compute()
+        except BaseException as e:
+            self._finish(key, payload, None, 0, self._shareable(e))
+            raise
+        self._finish(key, payload, value, tokens, None)
+        return value
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one entry, or every entry when ``key`` is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["inflight"] = len(self._inflight)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["saved_calls"] = stats["hits"] + stats["coalesced"]
+        stats["hit_rate"] = stats["saved_calls"] / lookups if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
+
+
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    """Process-wide cache shared by every client/service that enables caching."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            settings = get_settings()
+            _response_cache = LLMResponseCache(
+                max_entries=int(getattr(settings, "llm_cache_max_entries", 1024)),
+                ttl_seconds=float(getattr(settings, "llm_cache_ttl", 3600.0)),
+            )
+        return _response_cache
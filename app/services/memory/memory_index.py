@@ -0,0 +1,230 @@
+"""
+In-memory vector index for memory semantic search.
+
+Keeps one L2-normalized embedding matrix per memory database (main DB or a
+session DB) together with the columns used for filtering, so a query is a
+single matrix product plus vectorized masks instead of a full table scan
+with per-row ``json.loads``.  The index is built lazily on first query,
+appended to as new embeddings are written and dropped on deletes.
+"""
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..embeddings.similarity_calculator import SimilarityCalculator
+
+logger = logging.getLogger(__name__)
+
+# (memory_id, memory_type, importance, tags_json, embedding_json)
+IndexRow = Tuple[str, str, str, Optional[str], str]
+
+
+@dataclass(frozen=True)
+class MemoryFilter:
+    """查询过滤条件（与 query_memory 的 SQL 条件一一对应）"""
+
+    memory_types: Tuple[str, ...] = ()
+    importance: Tuple[str, ...] = ()
+    session_id: Optional[str] = None
+    plan_id: Optional[int] = None
+
+
+def _scoped_tag(tags: Sequence[str], prefix: str) -> str:
+    for tag in tags:
+        if isinstance(tag, str) and tag.startswith(prefix):
+            return tag[len(prefix):]
+    return ""
+
+
+class _SessionIndex:
+    """单个数据库的向量矩阵与过滤列，按容量倍增追加"""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.dim = dim
+        self.size = 0
+        self.positions: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self.memory_types = np.empty(capacity, dtype=object)
+        self.importance = np.empty(capacity, dtype=object)
+        self.sessions = np.empty(capacity, dtype=object)
+        self.plans = np.empty(capacity, dtype=object)
+
+    def _grow(self) -> None:
+        capacity = max(1, len(self.matrix)) * 2
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[: self.size] = self.matrix[: self.size]
+        self.matrix = matrix
+        for name in ("memory_types", "importance", "sessions", "plans"):
+            column = np.empty(capacity, dtype=object)
+            column[: self.size] = getattr(self, name)[: self.size]
+            setattr(self, name, column)
+
+    def put(self, memory_id: str, vector: np.ndarray, memory_type: str, importance: str, tags: Sequence[str]) -> None:
+        pos = self.positions.get(memory_id)
+        if pos is None:
+            if self.size == len(self.matrix):
+                self._grow()
+            pos = self.size
+            self.size += 1
+            self.positions[memory_id] = pos
+            self.ids.append(memory_id)
+        self.matrix[pos] = vector
+        self.memory_types[pos] = memory_type
+        self.importance[pos] = importance
+        self.sessions[pos] = _scoped_tag(tags, "session:")
+        self.plans[pos] = _scoped_tag(tags, "plan:")
+
+    def mask(self, filters: MemoryFilter) -> Optional[np.ndarray]:
+        n = self.size
+        mask: Optional[np.ndarray] = None
+
+        def _and(current: Optional[np.ndarray], other: np.ndarray) -> np.ndarray:
+            return other if current is None else current & other
+
+        if filters.memory_types:
+            mask = _and(mask, np.isin(self.memory_types[:n], list(filters.memory_types)))
+        if filters.importance:
+            mask = _and(mask, np.isin(self.importance[:n], list(filters.importance)))
+        if filters.session_id:
+            mask = _and(mask, self.sessions[:n] == filters.session_id)
+        if filters.plan_id is not None:
+            mask = _and(mask, self.plans[:n] == str(filters.plan_id))
+        return mask
+
+
+class MemoryVectorIndex:
+    """按数据库（db_key）划分的记忆向量索引"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._indexes: Dict[str, Optional[_SessionIndex]] = {}
+        self._stats: Dict[str, int] = {"builds": 0, "appends": 0, "invalidations": 0, "queries": 0}
+
+    @staticmethod
+    def _normalize(embedding: Any) -> np.ndarray:
+        return SimilarityCalculator.normalize_embeddings(embedding)[0]
+
+    @staticmethod
+    def _parse_tags(tags: Any) -> List[str]:
+        if isinstance(tags, (list, tuple)):
+            return list(tags)
+        try:
+            parsed = json.loads(tags or "[]")
+        except (TypeError, ValueError):
+            return []
+        return parsed if isinstance(parsed, list) else []
+
+    def is_loaded(self, db_key: str) -> bool:
+        with self._lock:
+            return db_key in self._indexes
+
+    def _build(self, db_key: str, rows: Iterable[IndexRow]) -> Optional[_SessionIndex]:
+        index: Optional[_SessionIndex] = None
+        skipped = 0
+        for memory_id, memory_type, importance, tags, embedding_json in rows:
+            try:
+                vector = self._normalize(json.loads(embedding_json))
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Skipping memory {memory_id} with unreadable embedding: {e}")
+                skipped += 1
+                continue
+            if index is None:
+                index = _SessionIndex(dim=vector.shape[0])
+            elif vector.shape[0] != index.dim:
+                skipped += 1
+                continue
+            index.put(memory_id, vector, memory_type, importance, self._parse_tags(tags))
+        self._indexes[db_key] = index
+        self._stats["builds"] += 1
+        logger.info(
+            f"Built memory vector index for {db_key}: {index.size if index else 0} rows"
+            + (f", skipped {skipped}" if skipped else "")
+        )
+        return index
+
+    def add(
+        self,
+        db_key: str,
+        memory_id: str,
+        embedding: Sequence[float],
+        memory_type: str,
+        importance: str,
+        tags: Any,
+    ) -> None:
+        """增量写入一条向量；索引尚未构建时由后续的懒加载统一读取"""
+        with self._lock:
+            if db_key not in self._indexes:
+                return
+            vector = self._normalize(embedding)
+            index = self._indexes[db_key]
+            if index is None:
+                index = _SessionIndex(dim=vector.shape[0])
+                self._indexes[db_key] = index
+            elif vector.shape[0] != index.dim:
+                logger.warning(
+                    f"Embedding dimension changed for {db_key} ({index.dim} -> {vector.shape[0]}), "
+                    "dropping index"
+                )
+                self._indexes.pop(db_key, None)
+                return
+            index.put(memory_id, vector, memory_type, importance, self._parse_tags(tags))
+            self._stats["appends"] += 1
+
+    def invalidate(self, db_key: Optional[str] = None) -> None:
+        """丢弃索引（删除记忆或外部写库后调用），下次查询时重建"""
+        with self._lock:
+            if db_key is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(db_key, None)
+            self._stats["invalidations"] += 1
+
+    def search(
+        self,
+        db_key: str,
+        loader: Callable[[], Iterable[IndexRow]],
+        query_embedding: Sequence[float],
+        filters: MemoryFilter,
+        limit: int,
+        min_similarity: float,
+    ) -> List[Tuple[str, float]]:
+        """返回 [(memory_id, similarity)]，按相似度降序，同分时新记忆优先"""
+        with self._lock:
+            self._stats["queries"] += 1
+            if db_key in self._indexes:
+                index = self._indexes[db_key]
+            else:
+                index = self._build(db_key, loader())
+            if index is None or index.size == 0 or limit <= 0:
+                return []
+
+            query = self._normalize(query_embedding)
+            if query.shape[0] != index.dim:
+                raise ValueError(f"Query embedding dimension {query.shape[0]} != index dimension {index.dim}")
+
+            scores = index.matrix[: index.size] @ query
+            keep = scores >= min_similarity
+            mask = index.mask(filters)
+            if mask is not None:
+                keep &= mask
+            candidates = np.flatnonzero(keep)
+            if len(candidates) > limit:
+                part = np.argpartition(-scores[candidates], limit - 1)[:limit]
+                candidates = candidates[part]
+            order = np.lexsort((-candidates, -scores[candidates]))
+            ranked = candidates[order]
+            return [(index.ids[i], float(scores[i])) for i in ranked]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "indexes": len(self._indexes),
+                "rows": sum(index.size for index in self._indexes.values() if index is not None),
+                **self._stats,
+            }
@@ -26,6 +26,7 @@ from ...models_memory import (
     SaveMemoryResponse,
 )
 from ..embeddings import get_embeddings_service
+from .memory_index import MemoryFilter, MemoryVectorIndex
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +40,7 @@ class IntegratedMemoryService:
         self.evolution_threshold = 10  # 每10个记忆触发一次进化
         self.evolution_count = 0
         self._initialized_dbs: set[str] = set()
+        self.vector_index = MemoryVectorIndex()
         self.session_dir = get_database_config().get_session_store_dir()
         try:
             from ...services.foundation.settings import get_settings
@@ -50,15 +52,23 @@ class IntegratedMemoryService:
         with get_db() as conn:
             self._ensure_memory_tables(conn, db_key="main")
 
+    @staticmethod
+    def _safe_session_id(session_id: str) -> str:
+        return "".join(ch for ch in session_id if ch.isalnum() or ch in ("-", "_"))
+
+    def _db_key(self, session_id: Optional[str]) -> str:
+        """记忆所在数据库的标识（同时作为向量索引的键）"""
+        return f"session:{self._safe_session_id(session_id)}" if session_id else "main"
+
     @contextmanager
     def _get_conn(self, session_id: Optional[str]):
         """根据 session_id 选择主库或 session 专属库."""
         if session_id:
-            safe_id = "".join(ch for ch in session_id if ch.isalnum() or ch in ("-", "_"))
+            safe_id = self._safe_session_id(session_id)
             path = self.session_dir / f"session_{safe_id}.sqlite"
             path.parent.mkdir(parents=True, exist_ok=True)
             with plan_db_connection(path) as conn:
-                self._ensure_memory_tables(conn, db_key=f"session:{safe_id}")
+                self._ensure_memory_tables(conn, db_key=self._db_key(session_id))
                 yield conn
         else:
             with get_db() as conn:
@@ -209,6 +219,11 @@ class IntegratedMemoryService:
                 where_conditions.append(f"memory_type IN ({type_placeholders})")
                 params.extend([t.value for t in request.memory_types])
 
+            if request.importance_levels:
+                importance_placeholders = ",".join(["?" for _ in request.importance_levels])
+                where_conditions.append(f"importance IN ({importance_placeholders})")
+                params.extend([level.value for level in request.importance_levels])
+
             # session 过滤（基于 tags 模糊匹配）
             if request.session_id:
                 where_conditions.append("tags LIKE ?")
@@ -218,6 +233,14 @@ class IntegratedMemoryService:
                 where_conditions.append("tags LIKE ?")
                 params.append(f"%plan:{request.plan_id}%")
 
+            # 同样的条件供向量索引做掩码过滤
+            filters = MemoryFilter(
+                memory_types=tuple(t.value for t in request.memory_types or ()),
+                importance=tuple(level.value for level in request.importance_levels or ()),
+                session_id=request.session_id,
+                plan_id=request.plan_id,
+            )
+
             # 如果有嵌入向量，使用语义搜索
             memories = await self._semantic_search(
                 query=query_text,
@@ -227,6 +250,7 @@ class IntegratedMemoryService:
                 limit=request.limit,
                 min_similarity=request.min_similarity,
                 session_id=request.session_id,
+                filters=filters,
             )
 
             # 转换为响应格式
@@ -391,6 +415,15 @@ class IntegratedMemoryService:
                         ("embedding-2", memory_note.id),
                     )
 
+                # 增量更新向量索引（未构建时由首次查询懒加载）
+                self.vector_index.add(
+                    self._db_key(session_id),
+                    memory_note.id,
+                    embedding,
+                    memory_note.memory_type.value,
+                    memory_note.importance.value,
+                    memory_note.tags,
+                )
                 return True
             else:
                 return False
@@ -423,8 +456,9 @@ class IntegratedMemoryService:
         limit: int,
         min_similarity: float,
         session_id: Optional[str],
+        filters: Optional[MemoryFilter] = None,
     ) -> List[Dict[str, Any]]:
-        """语义搜索记忆"""
+        """语义搜索记忆（基于内存向量索引，一次矩阵乘法完成打分）"""
         try:
             if query_all:
                 return await self._text_search(
@@ -442,56 +476,64 @@ class IntegratedMemoryService:
                 # Fallback到文本搜索
                 return await self._text_search(query, where_conditions, params, limit, session_id, match_all=False)
 
-            # 获取所有有嵌入向量的记忆
-            where_clause = "WHERE embedding_generated = TRUE"
-            if where_conditions:
-                where_clause += " AND " + " AND ".join(where_conditions)
+            hits = self.vector_index.search(
+                self._db_key(session_id),
+                lambda: self._load_index_rows(session_id),
+                query_embedding,
+                filters or MemoryFilter(),
+                limit,
+                min_similarity,
+            )
+            if not hits:
+                return []
 
+            # 只回表读取命中的记忆
+            hit_ids = [memory_id for memory_id, _ in hits]
+            placeholders = ",".join(["?" for _ in hit_ids])
             with self._get_conn(session_id) as conn:
-                query_sql = f"""
-                    SELECT m.*, me.embedding_vector
-                    FROM memories m
-                    JOIN memory_embeddings me ON m.id = me.memory_id
-                    {where_clause}
-                    ORDER BY m.created_at DESC
-                """
-
-                rows = conn.execute(query_sql, params).fetchall()
+                rows = conn.execute(f"SELECT * FROM memories WHERE id IN ({placeholders})", hit_ids).fetchall()
+            rows_by_id = {row["id"]: row for row in rows}
 
-            # 计算相似度并排序
             results = []
-            for row in rows:
-                try:
-                    embedding_vector = json.loads(row["embedding_vector"])
-                    similarity = self.embeddings_service.compute_similarity(query_embedding, embedding_vector)
-
-                    if similarity >= min_similarity:
-                        memory_data = {
-                            "id": row["id"],
-                            "content": row["content"],
-                            "memory_type": row["memory_type"],
-                            "importance": row["importance"],
-                            "keywords": row["keywords"],
-                            "context": row["context"],
-                            "tags": row["tags"],
-                            "related_task_id": row["related_task_id"],
-                            "created_at": row["created_at"],
-                            "similarity": similarity,
-                        }
-                        results.append(memory_data)
-
-                except Exception as e:
-                    logger.warning(f"Error processing memory row: {e}")
+            for memory_id, similarity in hits:
+                row = rows_by_id.get(memory_id)
+                if row is None:
+                    # 行已被外部删除，索引过期
+                    self.vector_index.invalidate(self._db_key(session_id))
                     continue
-
-            # 按相似度排序
-            results.sort(key=lambda x: x["similarity"], reverse=True)
-            return results[:limit]
+                results.append(
+                    {
+                        "id": row["id"],
+                        "content": row["content"],
+                        "memory_type": row["memory_type"],
+                        "importance": row["importance"],
+                        "keywords": row["keywords"],
+                        "context": row["context"],
+                        "tags": row["tags"],
+                        "related_task_id": row["related_task_id"],
+                        "created_at": row["created_at"],
+                        "similarity": similarity,
+                    }
+                )
+            return results
 
         except Exception as e:
             logger.error(f"Semantic search failed: {e}")
             return await self._text_search(query, where_conditions, params, limit, session_id, match_all=False)
 
+    def _load_index_rows(self, session_id: Optional[str]) -> List[Any]:
+        """读取构建向量索引所需的列（按创建时间升序）"""
+        with self._get_conn(session_id) as conn:
+            return conn.execute(
+                """
+                SELECT m.id, m.memory_type, m.importance, m.tags, me.embedding_vector
+                FROM memories m
+                JOIN memory_embeddings me ON m.id = me.memory_id
+                WHERE m.embedding_generated = TRUE
+                ORDER BY m.created_at ASC
+            """
+            ).fetchall()
+
     async def _text_search(
         self,
         query: str,
@@ -538,6 +580,15 @@ class IntegratedMemoryService:
 
         return results
 
+    async def delete_memory(self, memory_id: str, session_id: Optional[str] = None) -> bool:
+        """删除记忆及其嵌入向量，并使对应的向量索引失效"""
+        with self._get_conn(session_id) as conn:
+            conn.execute("DELETE FROM memory_embeddings WHERE memory_id = ?", (memory_id,))
+            deleted = conn.execute("DELETE FROM memories WHERE id = ?", (memory_id,)).rowcount
+            conn.commit()
+        self.vector_index.invalidate(self._db_key(session_id))
+        return deleted > 0
+
     async def _process_memory_evolution(self, memory_note: MemoryNote, session_id: Optional[str]):
         """处理记忆进化"""
         try:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
 import json
 import threading
 import uuid
@@ -11,7 +12,6 @@ from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
 
 from ...repository.plan_storage import (
-    append_decomposition_job_log,
     list_action_logs,
     load_decomposition_job,
     lookup_decomposition_job_entry,
@@ -19,12 +19,15 @@ from ...repository.plan_storage import (
     register_decomposition_job_index,
     update_decomposition_job_status,
 )
+from .job_log_writer import JobLogWriter
+from .job_scheduler import PRIORITY_NORMAL, get_job_scheduler
 
 if TYPE_CHECKING:  # pragma: no cover
     from .plan_decomposer import PlanDecomposer
 
 MAX_LOG_ENTRIES = 400
 DEFAULT_TTL_SECONDS = 600
+TERMINAL_STATUSES = frozenset({"succeeded", "failed", "cancelled"})
 
 _job_context: ContextVar[Optional[str]] = ContextVar(
     "plan_decomposition_job_id", default=None
@@ -137,6 +140,7 @@ class PlanDecompositionJob:
     subscribers: List[PlanDecompositionSubscriber] = field(default_factory=list)
     last_activity_at: datetime = field(default_factory=_utc_now)
     persisted_log_count: int = 0
+    cancel_requested: bool = False
 
     def to_payload(self, *, include_logs: bool = True) -> Dict[str, Any]:
         result_payload: Any
@@ -191,10 +195,17 @@ class PlanDecompositionJob:
 class PlanDecompositionJobManager:
     """In-memory store tracking asynchronous plan decomposition jobs."""
 
-    def __init__(self, *, ttl_seconds: int = DEFAULT_TTL_SECONDS) -> None:
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        log_writer: Optional[JobLogWriter] = None,
+    ) -> None:
         self._jobs: Dict[str, PlanDecompositionJob] = {}
         self._lock = threading.Lock()
         self._ttl_seconds = ttl_seconds
+        # Log lines are persisted in batches off the request/job threads.
+        self._log_writer = log_writer or JobLogWriter.from_settings()
 
     def create_job(
         self,
@@ -342,6 +353,8 @@ class PlanDecompositionJobManager:
             subscribers = list(job.subscribers)
         result_payload = _coerce_result_payload(job.result)
         stats_payload = _coerce_stats_payload(job.stats)
+        # A finished job's log is complete; make it durable now.
+        self._log_writer.flush_plan(job.plan_id)
         update_decomposition_job_status(
             job.plan_id,
             job_id=job_id,
@@ -385,6 +398,8 @@ class PlanDecompositionJobManager:
             subscribers = list(job.subscribers)
         stats_payload = _coerce_stats_payload(job.stats)
         result_payload = _coerce_result_payload(job.result)
+        # A finished job's log is complete; make it durable now.
+        self._log_writer.flush_plan(job.plan_id)
         update_decomposition_job_status(
             job.plan_id,
             job_id=job_id,
@@ -406,6 +421,70 @@ class PlanDecompositionJobManager:
         }
         self._notify_subscribers(subscribers, payload)
 
+    def mark_cancelled(
+        self,
+        job_id: str,
+        reason: str = "cancelled",
+        *,
+        result: Any = None,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        subscribers: List[PlanDecompositionSubscriber] = []
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in TERMINAL_STATUSES:
+                return
+            job.status = "cancelled"
+            job.error = reason
+            job.cancel_requested = True
+            job.finished_at = _utc_now()
+            if result is not None:
+                job.result = result
+            if stats is not None:
+                job.stats = _coerce_stats_payload(stats)
+            job.last_activity_at = job.finished_at
+            subscribers = list(job.subscribers)
+        stats_payload = _coerce_stats_payload(job.stats)
+        result_payload = _coerce_result_payload(job.result)
+        self._log_writer.flush_plan(job.plan_id)
+        update_decomposition_job_status(
+            job.plan_id,
+            job_id=job_id,
+            status="cancelled",
+            error=reason,
+            finished_at=job.finished_at,
+            stats=stats_payload,
+            result=result_payload,
+        )
+        payload = {
+            "job_id": job_id,
+            "job_type": job.job_type,
+            "status": "cancelled",
+            "event": None,
+            "error": reason,
+            "stats": stats_payload,
+            "result": result_payload,
+            "metadata": dict(job.metadata),
+        }
+        self._notify_subscribers(subscribers, payload)
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Flag a running job for cooperative cancellation."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in TERMINAL_STATUSES:
+                return False
+            job.cancel_requested = True
+        self.append_log(job_id, "warning", "Cancellation requested")
+        return True
+
+    def is_cancel_requested(self, job_id: Optional[str]) -> bool:
+        if not job_id:
+            return False
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return bool(job and job.cancel_requested)
+
     def append_log(
         self,
         job_id: str,
@@ -429,15 +508,8 @@ class PlanDecompositionJobManager:
                 "stats": dict(job.stats),
                 "metadata": dict(job.metadata),
             }
-            append_decomposition_job_log(
-                job.plan_id,
-                job_id=job_id,
-                timestamp=event.timestamp,
-                level=level,
-                message=message,
-                metadata=metadata,
-            )
-            job.persisted_log_count += 1
+            # Submitted under the lock so buffered order matches event order.
+            self._submit_log_locked(job, event)
         self._notify_subscribers(subscribers, payload)
 
     def log_from_context(
@@ -484,20 +556,38 @@ class PlanDecompositionJobManager:
             )
             pending_logs = list(job.logs)[job.persisted_log_count :]
             for event in pending_logs:
-                append_decomposition_job_log(
-                    plan_id,
-                    job_id=job_id,
-                    timestamp=event.timestamp,
-                    level=event.level,
-                    message=event.message,
-                    metadata=event.metadata,
-                )
-                job.persisted_log_count += 1
+                self._submit_log_locked(job, event)
+
+    def flush_logs(self) -> None:
+        """Persist every buffered log line now."""
+        self._log_writer.flush()
+
+    def get_log_writer_stats(self) -> Dict[str, int]:
+        return self._log_writer.get_stats()
+
+    def shutdown(self) -> None:
+        """Stop the background log writer after flushing buffered lines."""
+        self._log_writer.close()
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _submit_log_locked(
+        self, job: PlanDecompositionJob, event: PlanDecompositionLogEvent
+    ) -> None:
+        self._log_writer.submit(
+            job.plan_id,
+            {
+                "job_id": job.job_id,
+                "timestamp": event.timestamp,
+                "level": event.level,
+                "message": event.message,
+                "metadata": event.metadata,
+            },
+        )
+        job.persisted_log_count += 1
+
     def _notify_subscribers(
         self,
         subscribers: List[PlanDecompositionSubscriber],
@@ -527,6 +617,7 @@ class PlanDecompositionJobManager:
             self._jobs.pop(job_id, None)
 
     def _load_persisted_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._log_writer.flush()
         entry = lookup_decomposition_job_entry(job_id)
         plan_id = entry.get("plan_id") if entry else None
         record = load_decomposition_job(plan_id, job_id)
@@ -555,6 +646,7 @@ class PlanDecompositionJobManager:
 
 
 plan_decomposition_jobs = PlanDecompositionJobManager()
+atexit.register(plan_decomposition_jobs.shutdown)
 
 
 def set_current_job(job_id: Optional[str]) -> Any:
@@ -572,6 +664,11 @@ def get_current_job() -> Optional[str]:
     return _job_context.get()
 
 
+def is_current_job_cancelled() -> bool:
+    """True when the job bound to the current context was asked to cancel."""
+    return plan_decomposition_jobs.is_cancel_requested(_job_context.get())
+
+
 def log_job_event(
     level: str,
     message: str,
@@ -636,6 +733,18 @@ def execute_decomposition_job(
                 allow_existing_children=allow_existing_children,
                 allow_web_search=allow_web_search,
             )
+        if plan_decomposition_jobs.is_cancel_requested(job_id):
+            log_job_event(
+                "warning",
+                "Task decomposition cancelled",
+                {"created_tasks": len(result.created_tasks)},
+            )
+            plan_decomposition_jobs.mark_cancelled(
+                job_id,
+                result=result,
+                stats=result.stats,
+            )
+            return
         log_job_event(
             "info",
             "Task decomposition completed successfully",
@@ -671,7 +780,14 @@ def start_decomposition_job_thread(
     node_budget: Optional[int] = None,
     allow_existing_children: Optional[bool] = None,
     allow_web_search: Optional[bool] = None,
+    priority: int = PRIORITY_NORMAL,
 ) -> PlanDecompositionJob:
+    """Create a decomposition job and queue it on the shared job scheduler.
+
+    The name is kept for callers; jobs no longer get a dedicated thread.
+    Raises ``JobQueueFullError`` (after marking the job failed) when the
+    scheduler queue is full.
+    """
     params = {
         "mode": mode,
         "plan_id": plan_id,
@@ -699,8 +815,9 @@ def start_decomposition_job_thread(
         },
     )
 
-    thread = threading.Thread(
-        target=execute_decomposition_job,
+    get_job_scheduler().submit(
+        job.job_id,
+        execute_decomposition_job,
         kwargs={
             "plan_decomposer": plan_decomposer,
             "job_id": job.job_id,
@@ -713,9 +830,9 @@ def start_decomposition_job_thread(
             "allow_existing_children": allow_existing_children,
             "allow_web_search": allow_web_search,
         },
-        daemon=True,
+        plan_id=plan_id,
+        priority=priority,
     )
-    thread.start()
     return job
 
 
@@ -0,0 +1,197 @@
+"""Background, batched persistence for decomposition job logs.
+
+``PlanDecompositionJobManager.append_log`` used to open the per-plan SQLite
+file and commit once per log line while holding the manager lock.
+``JobLogWriter`` takes that I/O off the hot path: log lines are buffered per
+plan and written by one background thread in a single transaction per plan
+once a buffer reaches ``batch_size`` lines or its oldest line is
+``flush_interval`` seconds old.
+
+Ordering: lines are buffered in submission order and a buffer is swapped out
+and written under the same write lock, so batches of one plan reach the
+database in the order they were submitted, whether they are written by the
+background thread or by an explicit ``flush()``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ...repository import plan_storage
+
+logger = logging.getLogger(__name__)
+
+LogEntry = Dict[str, Any]
+BatchWriter = Callable[[Optional[int], List[LogEntry]], None]
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+
+def _write_batch(plan_id: Optional[int], entries: List[LogEntry]) -> None:
+    # Resolved at call time so a reloaded plan_storage module is honoured.
+    plan_storage.append_decomposition_job_logs(plan_id, entries)
+
+
+class JobLogWriter:
+    """Per-plan log buffers flushed in batched transactions by a daemon thread.
+
+    A ``flush_interval`` of 0 (or less) disables buffering: every line is
+    written synchronously, matching the old behaviour.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        writer: Optional[BatchWriter] = None,
+    ) -> None:
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._writer = writer or _write_batch
+        self._buffers: Dict[Optional[int], List[LogEntry]] = {}
+        self._oldest: Dict[Optional[int], float] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._stats: Dict[str, int] = {
+            "submitted": 0,
+            "written": 0,
+            "batches": 0,
+            "failed": 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "JobLogWriter":
+        from ..foundation.settings import get_settings
+
+        settings = get_settings()
+        return cls(
+            batch_size=int(getattr(settings, "job_log_batch_size", DEFAULT_BATCH_SIZE)),
+            flush_interval=float(
+                getattr(settings, "job_log_flush_interval", DEFAULT_FLUSH_INTERVAL)
+            ),
+        )
+
+    @property
+    def buffered(self) -> bool:
+        return self.flush_interval > 0 and not self._closed
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = sum(len(entries) for entries in self._buffers.values())
+        return stats
+
+    def submit(self, plan_id: Optional[int], entry: LogEntry) -> None:
+        """Queue one log line (job_id, timestamp, level, message, metadata)."""
+        if not self.buffered:
+            with self._lock:
+                self._stats["submitted"] += 1
+            with self._write_lock:
+                # Lines buffered before close() must still go first.
+                pending = self._take([plan_id])
+                entries = pending[0][1] if pending else []
+                entries.append(entry)
+                self._write(plan_id, entries)
+            return
+
+        with self._lock:
+            self._stats["submitted"] += 1
+            buffer = self._buffers.setdefault(plan_id, [])
+            if not buffer:
+                self._oldest[plan_id] = time.monotonic()
+            buffer.append(entry)
+            full = len(buffer) >= self.batch_size
+            self._ensure_thread_locked()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Write every buffered line now."""
+        self._flush(None)
+
+    def flush_plan(self, plan_id: Optional[int]) -> None:
+        """Write the buffered lines of one plan (``None`` = system job database)."""
+        self._flush([plan_id])
+
+    def close(self) -> None:
+        """Stop the background thread and write everything still buffered."""
+        with self._lock:
+            self._closed = True
+            thread, self._thread = self._thread, None
+        self._wakeup.set()
+        if thread is not None:
+            thread.join(timeout=10)
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _ensure_thread_locked(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="job-log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _flush(self, plan_ids: Optional[List[Optional[int]]]) -> None:
+        with self._write_lock:
+            for key, entries in self._take(plan_ids):
+                self._write(key, entries)
+
+    def _take(
+        self, plan_ids: Optional[List[Optional[int]]]
+    ) -> List[Tuple[Optional[int], List[LogEntry]]]:
+        with self._lock:
+            keys = list(self._buffers) if plan_ids is None else plan_ids
+            taken = []
+            for key in keys:
+                entries = self._buffers.pop(key, None)
+                self._oldest.pop(key, None)
+                if entries:
+                    taken.append((key, entries))
+            return taken
+
+    def _due_plans(self) -> List[Optional[int]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                key
+                for key, entries in self._buffers.items()
+                if len(entries) >= self.batch_size
+                or now - self._oldest.get(key, now) >= self.flush_interval
+            ]
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            if self._closed:
+                return
+            due = self._due_plans()
+            if due:
+                self._flush(due)
+
+    def _write(self, plan_id: Optional[int], entries: List[LogEntry]) -> None:
+        try:
+            self._writer(plan_id, entries)
+        except Exception:  # pragma: no cover - defensive
+            logger.exception(
+                "Failed to persist %d decomposition log lines for plan %s",
+                len(entries),
+                plan_id,
+            )
+            with self._lock:
+                self._stats["failed"] += len(entries)
+            return
+        with self._lock:
+            self._stats["written"] += len(entries)
+            self._stats["batches"] += 1
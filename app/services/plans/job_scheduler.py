@@ -0,0 +1,337 @@
+"""Shared, bounded scheduler for background plan jobs.
+
+Decomposition jobs and chat action runs used to get a fresh OS thread (or a
+Starlette background task) each, with no cap on how many talk to the LLM
+provider at once. ``JobScheduler`` runs them on a fixed pool of worker
+threads instead:
+
+- jobs wait in a priority queue (lower value first, FIFO within a priority);
+  a full queue rejects new jobs (backpressure) and marks them failed;
+- jobs touching the same plan never run concurrently: a queued job is skipped
+  while another job of its plan is running;
+- queued jobs can be cancelled outright; running jobs are flagged on their
+  ``PlanDecompositionJob`` and stop cooperatively;
+- coroutine jobs run on the event loop they were submitted from, while a
+  worker holds their slot, so loop-bound clients keep working.
+
+Job status changes go through ``PlanDecompositionJobManager`` so the job
+status API and SSE streams see them unchanged.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised by ``JobScheduler.submit`` when the queue is at capacity."""
+
+
+@dataclass
+class ScheduledJob:
+    job_id: str
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    plan_id: Optional[int] = None
+    priority: int = PRIORITY_NORMAL
+    seq: int = 0
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    on_cancel: Optional[Callable[[], None]] = None
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+
+    @property
+    def sort_key(self) -> Tuple[int, int]:
+        return (self.priority, self.seq)
+
+
+class JobScheduler:
+    """Fixed worker pool with priorities and per-plan serialization."""
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 4,
+        max_queue: int = 100,
+        manager: Any = None,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._manager = manager
+        self._queue: List[ScheduledJob] = []
+        self._running: Dict[str, ScheduledJob] = {}
+        self._busy_plans: Set[int] = set()
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._seq = itertools.count()
+        self._closed = False
+        self._counters: Dict[str, int] = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+        }
+        self._wait_seconds_total = 0.0
+
+    @property
+    def manager(self):
+        if self._manager is None:
+            from .decomposition_jobs import plan_decomposition_jobs
+
+            self._manager = plan_decomposition_jobs
+        return self._manager
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(
+        self,
+        job_id: str,
+        fn: Callable[..., Any],
+        *,
+        args: Tuple[Any, ...] = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+        plan_id: Optional[int] = None,
+        priority: int = PRIORITY_NORMAL,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        on_cancel: Optional[Callable[[], None]] = None,
+    ) -> ScheduledJob:
+        """Queue ``fn(*args, **kwargs)`` for the job ``job_id``.
+
+        Coroutine functions run on ``loop`` (default: the running loop of the
+        caller, or a private loop when there is none).
+        """
+        if loop is None and inspect.iscoroutinefunction(fn):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+        entry = ScheduledJob(
+            job_id=job_id,
+            fn=fn,
+            args=tuple(args),
+            kwargs=dict(kwargs or {}),
+            plan_id=plan_id,
+            priority=priority,
+            loop=loop,
+            on_cancel=on_cancel,
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Job scheduler is shut down")
+            if self.max_queue and len(self._queue) >= self.max_queue:
+                self._counters["rejected"] += 1
+                depth = len(self._queue)
+                rejected = True
+            else:
+                entry.seq = next(self._seq)
+                self._queue.append(entry)
+                self._counters["submitted"] += 1
+                depth = len(self._queue)
+                rejected = False
+                self._ensure_workers_locked()
+                self._cond.notify()
+        if rejected:
+            message = f"Job queue is full ({depth} jobs waiting)"
+            self.manager.mark_failure(job_id, message)
+            raise JobQueueFullError(message)
+        logger.debug(
+            "Queued job %s (plan=%s, priority=%s, depth=%s)",
+            job_id,
+            plan_id,
+            priority,
+            depth,
+        )
+        return entry
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a job.
+
+        Returns ``"cancelled"`` when it was still queued, ``"cancelling"`` when
+        it is running and has been flagged, ``None`` when it is unknown to the
+        scheduler (finished or never submitted).
+        """
+        with self._cond:
+            entry = next((e for e in self._queue if e.job_id == job_id), None)
+            if entry is not None:
+                self._queue.remove(entry)
+                self._counters["cancelled"] += 1
+            running = job_id in self._running
+        if entry is not None:
+            self.manager.mark_cancelled(job_id, "Cancelled before start")
+            if entry.on_cancel is not None:
+                try:
+                    entry.on_cancel()
+                except Exception:  # pragma: no cover - defensive
+                    logger.exception("on_cancel hook failed for job %s", job_id)
+            return "cancelled"
+        if running and self.manager.request_cancel(job_id):
+            return "cancelling"
+        return None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._cond:
+            by_priority: Dict[str, int] = {}
+            for entry in self._queue:
+                key = str(entry.priority)
+                by_priority[key] = by_priority.get(key, 0) + 1
+            blocked = sum(
+                1 for entry in self._queue if entry.plan_id in self._busy_plans
+            )
+            started = self._counters["completed"] + self._counters["failed"] + len(self._running)
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": len(self._running),
+                "queued": len(self._queue),
+                "queued_by_priority": by_priority,
+                "blocked_by_plan": blocked,
+                "busy_plans": sorted(self._busy_plans),
+                "oldest_wait_seconds": round(
+                    max((now - e.submitted_at for e in self._queue), default=0.0), 3
+                ),
+                "avg_wait_seconds": round(self._wait_seconds_total / started, 3)
+                if started
+                else 0.0,
+                **self._counters,
+            }
+
+    def shutdown(self, *, cancel_pending: bool = True, wait: bool = False) -> None:
+        """Stop accepting jobs; optionally cancel queued ones and join workers."""
+        with self._cond:
+            self._closed = True
+            pending = list(self._queue) if cancel_pending else []
+            if cancel_pending:
+                self._queue.clear()
+                self._counters["cancelled"] += len(pending)
+            workers = list(self._workers)
+            self._cond.notify_all()
+        for entry in pending:
+            self.manager.mark_cancelled(entry.job_id, "Scheduler shut down")
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _ensure_workers_locked(self) -> None:
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"plan-job-worker-{len(self._workers)}",
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _next_runnable_locked(self) -> Optional[ScheduledJob]:
+        best: Optional[ScheduledJob] = None
+        for entry in self._queue:
+            if entry.plan_id is not None and entry.plan_id in self._busy_plans:
+                continue
+            if best is None or entry.sort_key < best.sort_key:
+                best = entry
+        return best
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                entry = self._next_runnable_locked()
+                while entry is None:
+                    if self._closed and not self._queue:
+                        return
+                    self._cond.wait()
+                    entry = self._next_runnable_locked()
+                self._queue.remove(entry)
+                if entry.plan_id is not None:
+                    self._busy_plans.add(entry.plan_id)
+                entry.started_at = time.monotonic()
+                self._wait_seconds_total += entry.started_at - entry.submitted_at
+                self._running[entry.job_id] = entry
+
+            failed = False
+            try:
+                self._run(entry)
+            except Exception as exc:
+                failed = True
+                logger.exception("Scheduled job %s crashed: %s", entry.job_id, exc)
+                self.manager.mark_failure(entry.job_id, str(exc))
+            finally:
+                with self._cond:
+                    self._running.pop(entry.job_id, None)
+                    if entry.plan_id is not None:
+                        self._busy_plans.discard(entry.plan_id)
+                    self._counters["failed" if failed else "completed"] += 1
+                    # A finished plan may unblock queued jobs for any worker.
+                    self._cond.notify_all()
+
+    def _run(self, entry: ScheduledJob) -> None:
+        if not inspect.iscoroutinefunction(entry.fn):
+            entry.fn(*entry.args, **entry.kwargs)
+            return
+        coro = entry.fn(*entry.args, **entry.kwargs)
+        loop = entry.loop
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(coro, loop).result()
+        else:
+            asyncio.run(coro)
+
+
+_scheduler: Optional[JobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_job_scheduler() -> JobScheduler:
+    """Return the process-wide scheduler (sized by JOB_SCHEDULER_* settings)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from ..foundation.settings import get_settings
+
+            settings = get_settings()
+            _scheduler = JobScheduler(
+                max_workers=int(getattr(settings, "job_scheduler_workers", 4)),
+                max_queue=int(getattr(settings, "job_scheduler_max_queue", 100)),
+            )
+        return _scheduler
+
+
+def shutdown_job_scheduler() -> None:
+    """Cancel queued jobs and stop the process-wide scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.shutdown()
+
+
+__all__ = [
+    "JobQueueFullError",
+    "JobScheduler",
+    "PRIORITY_HIGH",
+    "PRIORITY_LOW",
+    "PRIORITY_NORMAL",
+    "ScheduledJob",
+    "get_job_scheduler",
+    "shutdown_job_scheduler",
+]
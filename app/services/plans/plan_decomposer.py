@@ -1,9 +1,13 @@
 # noqa: D401 - module-level documentation handled in docs/decompose_task_plan.md
 from __future__ import annotations
 
+import contextvars
 import logging
+import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
 
 from pydantic import BaseModel, Field
@@ -14,6 +18,7 @@ from ...utils import parse_json_obj, run_async
 from .plan_models import PlanNode, PlanTree
 from ..llm.decomposer_service import (
     DecompositionChild,
+    DecompositionResponse,
     PlanDecomposerLLMService,
 )
 from tool_box.integration import execute_tool
@@ -29,12 +34,34 @@ def _log_job(level: str, message: str, metadata: Optional[Dict[str, Any]] = None
     log_job_event(level, message, metadata)
 
 
+def _job_cancelled() -> bool:
+    try:
+        from .decomposition_jobs import is_current_job_cancelled
+    except Exception:  # pragma: no cover - defensive
+        return False
+    return is_current_job_cancelled()
+
+
 @dataclass
 class QueueItem:
     node_id: Optional[int]
     relative_depth: int
 
 
+@dataclass
+class _NodeExpansion:
+    """LLM output for one queue item, computed before it is applied to the tree."""
+
+    item: QueueItem
+    node: Optional[PlanNode]
+    llm_result: Optional[DecompositionResponse] = None
+    web_context: Optional[str] = None
+    web_query: Optional[str] = None
+    web_provider: Optional[str] = None
+    web_results_count: int = 0
+    seconds: float = 0.0
+
+
 class DecompositionResult(BaseModel):
     plan_id: int
     mode: str
@@ -334,8 +361,13 @@ class PlanDecomposer:
         max_depth: Optional[int] = None,
         node_budget: Optional[int] = None,
         allow_web_search: Optional[bool] = None,
+        max_concurrency: Optional[int] = None,
     ) -> DecompositionResult:
-        """Decompose an entire plan by traversing from the plan root."""
+        """Decompose an entire plan by traversing from the plan root.
+
+        With ``max_concurrency`` > 1 (default ``settings.max_concurrency``) the
+        nodes of each BFS level are decomposed in parallel.
+        """
         tree = self._repo.get_plan_tree(plan_id)
         queue: Deque[QueueItem] = deque()
         if tree.is_empty():
@@ -356,6 +388,7 @@ class PlanDecomposer:
             else self._settings.total_node_budget,
             root_reference=root_reference,
             allow_web_search=allow_web_search,
+            max_concurrency=max_concurrency,
         )
 
     def decompose_node(
@@ -367,6 +400,7 @@ class PlanDecomposer:
         node_budget: Optional[int] = None,
         allow_existing_children: Optional[bool] = None,
         allow_web_search: Optional[bool] = None,
+        max_concurrency: Optional[int] = None,
     ) -> DecompositionResult:
         """Decompose a specific node and optionally continue BFS under it."""
         tree = self._repo.get_plan_tree(plan_id)
@@ -389,6 +423,7 @@ class PlanDecomposer:
             override_allow_existing_children=allow_existing_children,
             root_reference=root_reference,
             allow_web_search=allow_web_search,
+            max_concurrency=max_concurrency,
         )
 
     # ------------------------------------------------------------------
@@ -407,6 +442,7 @@ class PlanDecomposer:
         override_allow_existing_children: Optional[bool] = None,
         root_reference: Optional[int] = None,
         allow_web_search: Optional[bool] = None,
+        max_concurrency: Optional[int] = None,
     ) -> DecompositionResult:
         processed: List[Optional[int]] = []
         created_nodes: List[PlanNode] = []
@@ -415,6 +451,13 @@ class PlanDecomposer:
         budget_remaining = max(node_budget, 0)
         llm_calls = 0
         stopped_reason: Optional[str] = None
+        levels: List[Dict[str, Any]] = []
+        max_concurrency = max(
+            1,
+            self._settings.max_concurrency
+            if max_concurrency is None
+            else max_concurrency,
+        )
 
         if budget_remaining == 0:
             return DecompositionResult(
@@ -443,259 +486,489 @@ class PlanDecomposer:
             else allow_web_search
         )
 
-        while queue and budget_remaining > 0:
-            current = queue.popleft()
-            if current.relative_depth > max_depth:
-                continue
+        if max_concurrency > 1:
+            budget_remaining, llm_calls, stopped_reason, levels = self._process_levels(
+                plan_id,
+                tree=tree,
+                mode=mode,
+                queue=queue,
+                max_depth=max_depth,
+                budget_remaining=budget_remaining,
+                allow_existing=allow_existing,
+                allow_web_search=effective_allow_web_search,
+                max_concurrency=max_concurrency,
+                processed=processed,
+                created_nodes=created_nodes,
+                failed=failed,
+            )
+        else:
+            while queue and budget_remaining > 0:
+                if _job_cancelled():
+                    stopped_reason = "cancelled"
+                    break
+                current = queue.popleft()
+                if current.relative_depth > max_depth:
+                    continue
 
-            node = tree.nodes.get(current.node_id) if current.node_id else None
-            if (
-                not allow_existing
-                and node is not None
-                and tree.children_ids(node.id)
-            ):
-                logger.debug(
-                    "Skip node %s because children already exist and allow_existing=False",
-                    node.id,
-                )
-                _log_job(
-                    "debug",
-                    "Skipped node because it already has children",
-                    {"node_id": node.id, "allow_existing_children": allow_existing},
-                )
-                continue
+                node = tree.nodes.get(current.node_id) if current.node_id else None
+                if self._skip_existing(tree, node, allow_existing):
+                    continue
 
-            print(f"[run_plan] Decomposing node {current.node_id} at depth {current.relative_depth} (queue={len(queue)}, budget={budget_remaining})")
+                print(f"[run_plan] Decomposing node {current.node_id} at depth {current.relative_depth} (queue={len(queue)}, budget={budget_remaining})")
             
-            _log_job(
-                "info",
-                "Preparing to decompose node",
-                {
-                    "node_id": current.node_id,
-                    "depth": current.relative_depth,
-                    "queue_remaining": len(queue),
-                    "budget_remaining": budget_remaining,
-                },
-            )
-            web_context: Optional[str] = None
-            if effective_allow_web_search and hasattr(self._llm, "decide_search"):
-                decision_prompt = self._build_search_decision_prompt(
-                    plan=tree,
-                    node=node,
-                    outline=outline_cache,
-                    depth=current.relative_depth,
-                    max_depth=max_depth,
-                )
-                try:
-                    raw_decision = self._llm.decide_search(decision_prompt)
-                except Exception as exc:  # pragma: no cover - defensive
-                    logger.exception(
-                        "Search decision failed for node %s: %s",
-                        current.node_id,
-                        exc,
-                    )
-                    _log_job(
-                        "error",
-                        "Search decision LLM call failed",
-                        {"node_id": current.node_id, "error": str(exc)},
-                    )
-                    raw_decision = ""
-
-                decision = self._parse_search_decision(raw_decision)
                 _log_job(
                     "info",
-                    "Search decision evaluated",
+                    "Preparing to decompose node",
                     {
                         "node_id": current.node_id,
-                        "use_search": decision.use_search,
-                        "query": decision.query or "",
+                        "depth": current.relative_depth,
+                        "queue_remaining": len(queue),
+                        "budget_remaining": budget_remaining,
                     },
                 )
-                if decision.use_search and decision.query:
-                    try:
-                        payload = run_async(
-                            execute_tool(
-                                "web_search",
-                                query=decision.query,
-                                max_results=5,
-                            )
-                        )
-                    except Exception as exc:  # pragma: no cover - defensive
-                        logger.exception(
-                            "Web search failed for node %s: %s",
-                            current.node_id,
-                            exc,
-                        )
-                        _log_job(
-                            "error",
-                            "Web search failed",
-                            {"node_id": current.node_id, "error": str(exc)},
-                        )
-                        payload = None
+                expansion = self._expand_node(
+                    tree=tree,
+                    item=current,
+                    node=node,
+                    outline=outline_cache,
+                    mode=mode,
+                    max_depth=max_depth,
+                    allow_web_search=effective_allow_web_search,
+                )
+                self._apply_expansion_web_context(plan_id, tree, expansion)
+                if expansion.llm_result is None:
+                    failed.append(current.node_id)
+                    continue
+                llm_calls += 1
 
-                    if isinstance(payload, dict) and payload.get("success", True):
-                        web_context, results_count, provider = self._format_web_context(
-                            payload
-                        )
-                        if web_context:
-                            self._apply_web_context(
-                                plan_id=plan_id,
-                                node=node,
-                                tree=tree,
-                                context=web_context,
-                                query=decision.query,
-                                provider=provider,
-                                results_count=results_count,
-                            )
-                        _log_job(
-                            "info",
-                            "Web search completed",
-                            {
-                                "node_id": current.node_id,
-                                "query": decision.query,
-                                "provider": provider,
-                                "results_count": results_count,
-                            },
-                        )
-                    elif isinstance(payload, dict):
-                        _log_job(
-                            "error",
-                            "Web search returned failure",
-                            {
-                                "node_id": current.node_id,
-                                "query": decision.query,
-                                "error": payload.get("error"),
-                            },
-                        )
-            elif effective_allow_web_search:
-                _log_job(
-                    "debug",
-                    "Search decision skipped (unsupported LLM)",
-                    {"node_id": current.node_id},
+                processed.append(current.node_id)
+                budget_remaining, stopped_reason = self._apply_llm_result(
+                    plan_id,
+                    tree=tree,
+                    item=current,
+                    llm_result=expansion.llm_result,
+                    queue=queue,
+                    max_depth=max_depth,
+                    budget_remaining=budget_remaining,
+                    created_nodes=created_nodes,
                 )
-            prompt = self._prompt_builder.build(
+                outline_cache = tree.to_outline(max_depth=5, max_nodes=80)
+                if stopped_reason:
+                    break
+
+        if budget_remaining <= 0:
+            stopped_reason = stopped_reason or "node_budget_exhausted"
+            _log_job(
+                "info",
+                "Decomposition budget exhausted; stopping",
+                {"node_budget": node_budget},
+            )
+
+        return DecompositionResult(
+            plan_id=plan_id,
+            mode=mode,
+            root_node_id=root_reference,
+            processed_nodes=processed,
+            created_tasks=created_nodes,
+            failed_nodes=failed,
+            stopped_reason=stopped_reason,
+            stats={
+                "node_budget": node_budget,
+                "consumed_budget": node_budget - budget_remaining,
+                "queue_remaining": len(queue),
+                "llm_calls": llm_calls,
+                "max_concurrency": max_concurrency,
+                **({"levels": levels} if max_concurrency > 1 else {}),
+            },
+        )
+
+    def _skip_existing(
+        self, tree: PlanTree, node: Optional[PlanNode], allow_existing: bool
+    ) -> bool:
+        if allow_existing or node is None or not tree.children_ids(node.id):
+            return False
+        logger.debug(
+            "Skip node %s because children already exist and allow_existing=False",
+            node.id,
+        )
+        _log_job(
+            "debug",
+            "Skipped node because it already has children",
+            {"node_id": node.id, "allow_existing_children": allow_existing},
+        )
+        return True
+
+    def _expand_node(
+        self,
+        *,
+        tree: PlanTree,
+        item: QueueItem,
+        node: Optional[PlanNode],
+        outline: str,
+        mode: str,
+        max_depth: int,
+        allow_web_search: bool,
+    ) -> _NodeExpansion:
+        """Run the search decision, web search and decomposition call for one node.
+
+        Only reads ``tree``; the web context is returned on the expansion and
+        written back by ``_apply_expansion_web_context`` so that this method can
+        run on worker threads.
+        """
+        started = time.perf_counter()
+        expansion = _NodeExpansion(item=item, node=node)
+        if allow_web_search and hasattr(self._llm, "decide_search"):
+            decision_prompt = self._build_search_decision_prompt(
                 plan=tree,
                 node=node,
-                outline=outline_cache,
-                web_context=web_context,
-                mode=mode,
-                settings=self._settings,
-                depth=current.relative_depth,
+                outline=outline,
+                depth=item.relative_depth,
                 max_depth=max_depth,
             )
-
             try:
-                llm_result = self._llm.generate(prompt)
-                llm_calls += 1
+                raw_decision = self._llm.decide_search(decision_prompt)
             except Exception as exc:  # pragma: no cover - defensive
-                logger.exception("Decomposition failed for node %s: %s", current.node_id, exc)
+                logger.exception(
+                    "Search decision failed for node %s: %s",
+                    item.node_id,
+                    exc,
+                )
                 _log_job(
                     "error",
-                    "LLM decomposition call failed",
-                    {"node_id": current.node_id, "error": str(exc)},
+                    "Search decision LLM call failed",
+                    {"node_id": item.node_id, "error": str(exc)},
                 )
-                failed.append(current.node_id)
-                continue
-
-            processed.append(current.node_id)
+                raw_decision = ""
 
-            children = self._trim_children(
-                llm_result.children, self._settings.max_children
-            )
+            decision = self._parse_search_decision(raw_decision)
             _log_job(
                 "info",
-                "LLM returned a decomposition payload",
+                "Search decision evaluated",
                 {
-                    "node_id": current.node_id,
-                    "children_count": len(children),
-                    "should_stop": llm_result.should_stop,
+                    "node_id": item.node_id,
+                    "use_search": decision.use_search,
+                    "query": decision.query or "",
                 },
             )
-            if not children:
-                if llm_result.should_stop:
-                    stopped_reason = llm_result.reason or "llm_requested_stop"
+            if decision.use_search and decision.query:
+                try:
+                    payload = run_async(
+                        execute_tool(
+                            "web_search",
+                            query=decision.query,
+                            max_results=5,
+                        )
+                    )
+                except Exception as exc:  # pragma: no cover - defensive
+                    logger.exception(
+                        "Web search failed for node %s: %s",
+                        item.node_id,
+                        exc,
+                    )
                     _log_job(
-                        "info",
-                        "LLM requested to stop decomposition",
-                        {"node_id": current.node_id, "reason": stopped_reason},
+                        "error",
+                        "Web search failed",
+                        {"node_id": item.node_id, "error": str(exc)},
                     )
-                    break
-                if self._settings.stop_on_empty:
-                    stopped_reason = llm_result.reason or "empty_children"
+                    payload = None
+
+                if isinstance(payload, dict) and payload.get("success", True):
+                    web_context, results_count, provider = self._format_web_context(
+                        payload
+                    )
+                    expansion.web_context = web_context or None
+                    expansion.web_query = decision.query
+                    expansion.web_provider = provider
+                    expansion.web_results_count = results_count
                     _log_job(
                         "info",
-                        "No new subtasks; stopping according to settings",
-                        {"node_id": current.node_id, "reason": stopped_reason},
+                        "Web search completed",
+                        {
+                            "node_id": item.node_id,
+                            "query": decision.query,
+                            "provider": provider,
+                            "results_count": results_count,
+                        },
                     )
-                    break
-                continue
-
-            for child in children:
-                if budget_remaining <= 0:
-                    break
-                new_node = self._create_child_node(
-                    plan_id, parent_id=current.node_id, child=child
-                )
-                budget_remaining -= 1
-                created_nodes.append(new_node)
-                self._update_tree_cache(tree, new_node)
-                outline_cache = tree.to_outline(max_depth=5, max_nodes=80)
-                
-                print(f"  -> Created task [{new_node.id}] {new_node.name}")
-                
-                _log_job(
-                    "info",
-                    "Created child task node",
-                    {
-                        "parent_id": current.node_id,
-                        "task_id": new_node.id,
-                        "name": new_node.name,
-                    },
-                )
-                if (
-                    not child.leaf
-                    and current.relative_depth + 1 <= max_depth
-                    and budget_remaining > 0
-                ):
-                    queue.append(
-                        QueueItem(
-                            node_id=new_node.id,
-                            relative_depth=current.relative_depth + 1,
-                        )
+                elif isinstance(payload, dict):
+                    _log_job(
+                        "error",
+                        "Web search returned failure",
+                        {
+                            "node_id": item.node_id,
+                            "query": decision.query,
+                            "error": payload.get("error"),
+                        },
                     )
+        elif allow_web_search:
+            _log_job(
+                "debug",
+                "Search decision skipped (unsupported LLM)",
+                {"node_id": item.node_id},
+            )
+        prompt = self._prompt_builder.build(
+            plan=tree,
+            node=node,
+            outline=outline,
+            web_context=expansion.web_context,
+            mode=mode,
+            settings=self._settings,
+            depth=item.relative_depth,
+            max_depth=max_depth,
+        )
+
+        try:
+            expansion.llm_result = self._llm.generate(prompt)
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.exception("Decomposition failed for node %s: %s", item.node_id, exc)
+            _log_job(
+                "error",
+                "LLM decomposition call failed",
+                {"node_id": item.node_id, "error": str(exc)},
+            )
+        expansion.seconds = time.perf_counter() - started
+        return expansion
+
+    def _apply_expansion_web_context(
+        self, plan_id: int, tree: PlanTree, expansion: _NodeExpansion
+    ) -> None:
+        if not expansion.web_context:
+            return
+        self._apply_web_context(
+            plan_id=plan_id,
+            node=expansion.node,
+            tree=tree,
+            context=expansion.web_context,
+            query=expansion.web_query or "",
+            provider=expansion.web_provider,
+            results_count=expansion.web_results_count,
+        )
 
+    def _apply_llm_result(
+        self,
+        plan_id: int,
+        *,
+        tree: PlanTree,
+        item: QueueItem,
+        llm_result: DecompositionResponse,
+        queue: Deque[QueueItem],
+        max_depth: int,
+        budget_remaining: int,
+        created_nodes: List[PlanNode],
+    ) -> Tuple[int, Optional[str]]:
+        """Create the returned children and enqueue expandable ones.
+
+        Returns the remaining budget and a stop reason when decomposition
+        should end after this node.
+        """
+        children = self._trim_children(
+            llm_result.children, self._settings.max_children
+        )
+        _log_job(
+            "info",
+            "LLM returned a decomposition payload",
+            {
+                "node_id": item.node_id,
+                "children_count": len(children),
+                "should_stop": llm_result.should_stop,
+            },
+        )
+        if not children:
             if llm_result.should_stop:
                 stopped_reason = llm_result.reason or "llm_requested_stop"
                 _log_job(
                     "info",
-                    "LLM requested to stop further decomposition",
-                    {"node_id": current.node_id, "reason": stopped_reason},
+                    "LLM requested to stop decomposition",
+                    {"node_id": item.node_id, "reason": stopped_reason},
+                )
+                return budget_remaining, stopped_reason
+            if self._settings.stop_on_empty:
+                stopped_reason = llm_result.reason or "empty_children"
+                _log_job(
+                    "info",
+                    "No new subtasks; stopping according to settings",
+                    {"node_id": item.node_id, "reason": stopped_reason},
                 )
+                return budget_remaining, stopped_reason
+            return budget_remaining, None
+
+        for child in children:
+            if budget_remaining <= 0:
                 break
+            new_node = self._create_child_node(
+                plan_id, parent_id=item.node_id, child=child
+            )
+            budget_remaining -= 1
+            created_nodes.append(new_node)
+            self._update_tree_cache(tree, new_node)
+
+            print(f"  -> Created task [{new_node.id}] {new_node.name}")
 
-        if budget_remaining <= 0:
-            stopped_reason = stopped_reason or "node_budget_exhausted"
             _log_job(
                 "info",
-                "Decomposition budget exhausted; stopping",
-                {"node_budget": node_budget},
+                "Created child task node",
+                {
+                    "parent_id": item.node_id,
+                    "task_id": new_node.id,
+                    "name": new_node.name,
+                },
             )
+            if (
+                not child.leaf
+                and item.relative_depth + 1 <= max_depth
+                and budget_remaining > 0
+            ):
+                queue.append(
+                    QueueItem(
+                        node_id=new_node.id,
+                        relative_depth=item.relative_depth + 1,
+                    )
+                )
 
-        return DecompositionResult(
-            plan_id=plan_id,
-            mode=mode,
-            root_node_id=root_reference,
-            processed_nodes=processed,
-            created_tasks=created_nodes,
-            failed_nodes=failed,
-            stopped_reason=stopped_reason,
-            stats={
-                "node_budget": node_budget,
-                "consumed_budget": node_budget - budget_remaining,
-                "queue_remaining": len(queue),
-                "llm_calls": llm_calls,
-            },
-        )
+        if llm_result.should_stop:
+            stopped_reason = llm_result.reason or "llm_requested_stop"
+            _log_job(
+                "info",
+                "LLM requested to stop further decomposition",
+                {"node_id": item.node_id, "reason": stopped_reason},
+            )
+            return budget_remaining, stopped_reason
+        return budget_remaining, None
+
+    def _process_levels(
+        self,
+        plan_id: int,
+        *,
+        tree: PlanTree,
+        mode: str,
+        queue: Deque[QueueItem],
+        max_depth: int,
+        budget_remaining: int,
+        allow_existing: bool,
+        allow_web_search: bool,
+        max_concurrency: int,
+        processed: List[Optional[int]],
+        created_nodes: List[PlanNode],
+        failed: List[Optional[int]],
+    ) -> Tuple[int, int, Optional[str], List[Dict[str, Any]]]:
+        """Level-parallel BFS: expand a whole frontier concurrently, then apply it.
+
+        The LLM/search calls of one depth level run on up to ``max_concurrency``
+        threads against a snapshot of the tree. Results are then applied on the
+        calling thread in queue order, so node creation, budget accounting and
+        ``_update_tree_cache`` happen exactly as in the sequential loop. A level
+        never expands more nodes than the remaining budget; once the budget is
+        exhausted or a node asks to stop, the unapplied rest of that level goes
+        back to the front of ``queue`` so ``queue_remaining`` still counts it.
+        """
+        llm_calls = 0
+        stopped_reason: Optional[str] = None
+        levels: List[Dict[str, Any]] = []
+        outline = tree.to_outline(max_depth=5, max_nodes=80)
+
+        with ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="plan-decompose"
+        ) as pool:
+            while queue and budget_remaining > 0 and stopped_reason is None:
+                if _job_cancelled():
+                    stopped_reason = "cancelled"
+                    break
+                depth = queue[0].relative_depth
+                frontier: List[Tuple[QueueItem, Optional[PlanNode]]] = []
+                while (
+                    queue
+                    and queue[0].relative_depth == depth
+                    and len(frontier) < budget_remaining
+                ):
+                    item = queue.popleft()
+                    if item.relative_depth > max_depth:
+                        continue
+                    node = tree.nodes.get(item.node_id) if item.node_id else None
+                    if self._skip_existing(tree, node, allow_existing):
+                        continue
+                    frontier.append((item, node))
+                if not frontier:
+                    continue
+
+                print(f"[run_plan] Decomposing {len(frontier)} nodes at depth {depth} (queue={len(queue)}, budget={budget_remaining})")
+                _log_job(
+                    "info",
+                    "Preparing to decompose level",
+                    {
+                        "depth": depth,
+                        "node_ids": [item.node_id for item, _ in frontier],
+                        "queue_remaining": len(queue),
+                        "budget_remaining": budget_remaining,
+                    },
+                )
+                level_started = time.perf_counter()
+                futures = [
+                    # Each task gets its own context copy so job logging keeps the current job id.
+                    pool.submit(
+                        contextvars.copy_context().run,
+                        partial(
+                            self._expand_node,
+                            tree=tree,
+                            item=item,
+                            node=node,
+                            outline=outline,
+                            mode=mode,
+                            max_depth=max_depth,
+                            allow_web_search=allow_web_search,
+                        ),
+                    )
+                    for item, node in frontier
+                ]
+                expansions = [future.result() for future in futures]
+                expand_seconds = time.perf_counter() - level_started
+
+                apply_started = time.perf_counter()
+                created_before = len(created_nodes)
+                failed_before = len(failed)
+                applied = 0
+                for expansion in expansions:
+                    if expansion.llm_result is not None:
+                        llm_calls += 1
+                for expansion in expansions:
+                    if budget_remaining <= 0 or stopped_reason is not None:
+                        break
+                    applied += 1
+                    self._apply_expansion_web_context(plan_id, tree, expansion)
+                    if expansion.llm_result is None:
+                        failed.append(expansion.item.node_id)
+                        continue
+                    processed.append(expansion.item.node_id)
+                    budget_remaining, stopped_reason = self._apply_llm_result(
+                        plan_id,
+                        tree=tree,
+                        item=expansion.item,
+                        llm_result=expansion.llm_result,
+                        queue=queue,
+                        max_depth=max_depth,
+                        budget_remaining=budget_remaining,
+                        created_nodes=created_nodes,
+                    )
+                # Their expansions are dropped; the nodes themselves stay pending
+                # in queue order, as they would in the sequential loop.
+                queue.extendleft(reversed([expansion.item for expansion in expansions[applied:]]))
+                outline = tree.to_outline(max_depth=5, max_nodes=80)
+
+                levels.append(
+                    {
+                        "depth": depth,
+                        "nodes": len(frontier),
+                        "created": len(created_nodes) - created_before,
+                        "failed": len(failed) - failed_before,
+                        "requeued": len(frontier) - applied,
+                        "expand_seconds": round(expand_seconds, 4),
+                        "max_node_seconds": round(
+                            max(expansion.seconds for expansion in expansions), 4
+                        ),
+                        "apply_seconds": round(time.perf_counter() - apply_started, 4),
+                    }
+                )
+
+        return budget_remaining, llm_calls, stopped_reason, levels
 
     def _trim_children(
         self, children: Iterable[DecompositionChild], limit: int
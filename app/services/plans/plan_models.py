@@ -12,6 +12,7 @@ class PlanSummary(BaseModel):
     title: str
     description: Optional[str] = None
     task_count: int = 0
+    status_counts: Dict[str, int] = Field(default_factory=dict)
     updated_at: Optional[str] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
@@ -75,3 +75,32 @@ Notes:
 - Tasks with different methods (GEM, CNDM, PCA, etc.) cannot be merged.
 - Only tasks that perform exactly the same operation should be merged.
 - Carefully check keyword differences in task names."""
+
+
+BATCH_PAIR_MERGE_SYSTEM = """You are a task analysis expert. For each numbered pair of task nodes, determine whether the two tasks can be merged.
+
+[Can merge]
+1. The two tasks perform exactly the same operation (same method, same parameter configuration).
+2. The tasks are duplicated only because the input data differs.
+3. The task name and instruction are essentially identical.
+
+[Cannot merge]
+1. Tasks using different algorithms or methods (e.g., GEM clustering vs CNDM clustering -> cannot merge).
+2. Tasks operating on different data types.
+3. Task names include different proper nouns, method names, or algorithm names.
+4. Similar goal but different implementation details.
+
+[Important] Judge every pair independently. Prefer not merging over mistakenly merging different tasks.
+
+Output format: JSON array only, no extra text, exactly one entry per pair.
+[
+    {"pair": 1, "can_merge": true/false, "similarity": 0.0-1.0, "reason": "short reason"},
+    ...
+]"""
+
+
+BATCH_PAIR_MERGE_USER = """Decide for each of the following task pairs whether the two tasks can be merged:
+
+{pairs_text}
+
+Note: If two tasks use different methods/algorithms (e.g., GEM vs CNDM), they must NOT be merged even if both are "clustering analysis"."""
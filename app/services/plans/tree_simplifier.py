@@ -13,7 +13,12 @@ _project_root = os.path.abspath(os.path.join(_current_dir, "../../../"))
 if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
+import hashlib
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Set, Tuple, Any
 from copy import deepcopy
@@ -67,6 +72,11 @@ class DAG:
     # 合并记录: 被合并节点ID -> 目标节点ID
     merge_map: Dict[int, int] = field(default_factory=dict)
     
+    # 可达性闭包缓存（由 TreeSimplifier 维护）
+    _reachability: Optional["ReachabilityClosure"] = field(
+        default=None, repr=False, compare=False
+    )
+    
     def node_count(self) -> int:
         return len(self.nodes)
     
@@ -258,6 +268,81 @@ class DAG:
         return "\n".join(lines)
 
 
+class ReachabilityClosure:
+    """
+    DAG 的传递闭包（位集表示）
+    
+    每个节点分配一个比特位，descendants[id] 是其所有后代的位集（Python 大整数）。
+    按反向拓扑序一次传播即可构建；合并两个互不可达节点时增量更新，无需重建。
+    """
+    
+    def __init__(self, dag: DAG):
+        self.positions: Dict[int, int] = {}
+        self.descendants: Dict[int, int] = {}
+        for node_id in dag.nodes:
+            self.positions[node_id] = len(self.positions)
+        
+        try:
+            order = dag.topological_sort(reverse=True)
+        except ValueError:
+            # 强制合并后可能出现环，退化为逐节点遍历
+            order = None
+        
+        if order is not None:
+            for node_id in order:
+                bits = 0
+                for child_id in dag.nodes[node_id].child_ids:
+                    if child_id in self.positions:
+                        bits |= self.descendants[child_id] | (1 << self.positions[child_id])
+                self.descendants[node_id] = bits
+        else:
+            for node_id in dag.nodes:
+                bits = 0
+                stack = list(dag.nodes[node_id].child_ids)
+                while stack:
+                    current = stack.pop()
+                    pos = self.positions.get(current)
+                    if pos is None or bits >> pos & 1:
+                        continue
+                    bits |= 1 << pos
+                    stack.extend(dag.nodes[current].child_ids)
+                self.descendants[node_id] = bits
+        
+        self.signature = self.dag_signature(dag)
+    
+    @staticmethod
+    def dag_signature(dag: DAG) -> Tuple[int, int]:
+        """(节点数, 边数)，用于发现绕过 merge_nodes 的结构修改"""
+        return len(dag.nodes), sum(len(n.child_ids) for n in dag.nodes.values())
+    
+    def reaches(self, from_id: int, to_id: int) -> bool:
+        """from_id 是否可达 to_id（自身视为可达）"""
+        if from_id == to_id:
+            return True
+        pos = self.positions.get(to_id)
+        bits = self.descendants.get(from_id)
+        if pos is None or bits is None:
+            return False
+        return bool(bits >> pos & 1)
+    
+    def merge(self, keep_id: int, remove_id: int) -> None:
+        """
+        将 remove_id 合并进 keep_id 后更新闭包（两节点须互不可达）
+        
+        合并后 keep 的后代为两者后代之并；所有原先可达 keep 或 remove 的祖先
+        现在都可达 keep 及其全部后代，其余节点不受影响。
+        """
+        keep_bit = 1 << self.positions[keep_id]
+        remove_bit = 1 << self.positions.pop(remove_id)
+        merged = self.descendants[keep_id] | self.descendants.pop(remove_id)
+        self.descendants[keep_id] = merged
+        
+        touched = keep_bit | remove_bit
+        for node_id, bits in self.descendants.items():
+            if bits & touched:
+                self.descendants[node_id] = (bits & ~remove_bit) | keep_bit | merged
+
+
 class SimilarityMatcher(ABC):
     """相似度匹配器接口"""
     
@@ -297,12 +382,80 @@ class SimilarityMatcher(ABC):
         pass
 
 
+# 合并判定缓存: (节点内容哈希对) -> (can_merge, similarity)
+# 进程内共享，重复简化未变化的计划时无需再调用LLM
+_VERDICT_CACHE: "OrderedDict[Tuple[str, str], Tuple[bool, float]]" = OrderedDict()
+_VERDICT_CACHE_LOCK = threading.Lock()
+_VERDICT_CACHE_MAX = 10000
+
+
+def _node_content_hash(node: DAGNode) -> str:
+    text = f"{node.name.strip()}\x00{(node.instruction or '').strip()}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _pair_key(node1: DAGNode, node2: DAGNode) -> Tuple[str, str]:
+    h1, h2 = _node_content_hash(node1), _node_content_hash(node2)
+    return (h1, h2) if h1 <= h2 else (h2, h1)
+
+
+def _lexical_bigrams(node: DAGNode) -> frozenset:
+    text = "".join(f"{node.name} {node.instruction or ''}".lower().split())
+    if len(text) < 2:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i:i + 2] for i in range(len(text) - 1))
+
+
+class _RequestPacer:
+    """简单的请求速率限制（每秒最多 rate 次，rate<=0 表示不限制）"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+    
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self.interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+
 class LLMSimilarityMatcher(SimilarityMatcher):
     """基于LLM的相似度匹配器"""
     
-    def __init__(self, threshold: float = 0.8):
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        batched: bool = False,
+        batch_size: int = 20,
+        max_concurrency: int = 4,
+        requests_per_second: float = 2.0,
+        prefilter_threshold: float = 0.3,
+    ):
+        """
+        Args:
+            threshold: 判定合并的最低相似度
+            batched: 批量模式——先用词法预筛选候选对，再将多个候选对打包进一个
+                提示并发调用LLM，判定结果按节点内容哈希缓存
+            batch_size: 每个提示包含的候选对数量
+            max_concurrency: 同时进行的LLM请求数
+            requests_per_second: LLM请求速率上限（<=0 不限制）
+            prefilter_threshold: 词法相似度（字符二元组Jaccard）低于该值的节点对直接跳过
+        """
         self.threshold = threshold
+        self.batched = batched
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.prefilter_threshold = prefilter_threshold
+        self._pacer = _RequestPacer(requests_per_second)
         self._llm = None
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"llm_calls": 0, "cache_hits": 0, "prefiltered": 0}
     
     @property
     def llm(self):
@@ -340,6 +493,135 @@ class LLMSimilarityMatcher(SimilarityMatcher):
         
         return None
     
+    def _call_llm(self, prompt: str) -> str:
+        self._pacer.wait()
+        with self._stats_lock:
+            self.stats["llm_calls"] += 1
+        return self.llm.chat(prompt)
+    
+    @staticmethod
+    def _cached_verdict(key: Tuple[str, str]) -> Optional[Tuple[bool, float]]:
+        with _VERDICT_CACHE_LOCK:
+            verdict = _VERDICT_CACHE.get(key)
+            if verdict is not None:
+                _VERDICT_CACHE.move_to_end(key)
+            return verdict
+    
+    @staticmethod
+    def _store_verdict(key: Tuple[str, str], can_merge: bool, similarity: float) -> None:
+        with _VERDICT_CACHE_LOCK:
+            _VERDICT_CACHE[key] = (can_merge, similarity)
+            _VERDICT_CACHE.move_to_end(key)
+            while len(_VERDICT_CACHE) > _VERDICT_CACHE_MAX:
+                _VERDICT_CACHE.popitem(last=False)
+    
+    def candidate_pairs(self, nodes: List[DAGNode]) -> List[Tuple[DAGNode, DAGNode, float]]:
+        """词法预筛选：返回字符二元组Jaccard不低于 prefilter_threshold 的节点对"""
+        grams = [(node, _lexical_bigrams(node)) for node in nodes]
+        candidates = []
+        for i in range(len(grams)):
+            node1, g1 = grams[i]
+            for j in range(i + 1, len(grams)):
+                node2, g2 = grams[j]
+                union = len(g1 | g2)
+                score = len(g1 & g2) / union if union else 1.0
+                if score >= self.prefilter_threshold:
+                    candidates.append((node1, node2, score))
+                else:
+                    self.stats["prefiltered"] += 1
+        return candidates
+    
+    def _judge_batch(self, batch: List[Tuple[DAGNode, DAGNode]]) -> Dict[int, Tuple[bool, float]]:
+        """一次LLM调用判定一批节点对，返回 {批内序号: (can_merge, similarity)}"""
+        from app.services.plans.prompts.merge_similarity import (
+            BATCH_PAIR_MERGE_SYSTEM,
+            BATCH_PAIR_MERGE_USER
+        )
+        
+        lines = []
+        for idx, (node1, node2) in enumerate(batch, start=1):
+            lines.append(f"[Pair {idx}]")
+            lines.append(f"- Task A: [{node1.id}] {node1.name}: {(node1.instruction or '(无)')[:300]}")
+            lines.append(f"- Task B: [{node2.id}] {node2.name}: {(node2.instruction or '(无)')[:300]}")
+        prompt = BATCH_PAIR_MERGE_SYSTEM + "\n\n" + BATCH_PAIR_MERGE_USER.format(pairs_text="\n".join(lines))
+        
+        verdicts: Dict[int, Tuple[bool, float]] = {}
+        try:
+            result = self._parse_json(self._call_llm(prompt))
+        except Exception as e:
+            print(f"  ⚠ LLM批量判断失败: {e}")
+            return verdicts
+        
+        for item in result if isinstance(result, list) else []:
+            if not isinstance(item, dict):
+                continue
+            try:
+                idx = int(item.get("pair"))
+                similarity = float(item.get("similarity", 0))
+            except (TypeError, ValueError):
+                continue
+            if 1 <= idx <= len(batch):
+                verdicts[idx - 1] = (bool(item.get("can_merge", False)), similarity)
+        return verdicts
+    
+    def judge_pairs(
+        self,
+        pairs: List[Tuple[DAGNode, DAGNode]]
+    ) -> List[Optional[Tuple[bool, float]]]:
+        """
+        批量判定节点对是否可合并
+        
+        先查缓存，未命中的节点对按 batch_size 打包，在 max_concurrency 个线程中
+        并发调用LLM（受速率限制）。LLM未给出结论的节点对返回 None 且不缓存。
+        
+        Returns:
+            与 pairs 一一对应的 (can_merge, similarity) 或 None
+        """
+        results: List[Optional[Tuple[bool, float]]] = [None] * len(pairs)
+        pending: Dict[Tuple[str, str], List[int]] = {}
+        for idx, (node1, node2) in enumerate(pairs):
+            key = _pair_key(node1, node2)
+            verdict = self._cached_verdict(key)
+            if verdict is not None:
+                self.stats["cache_hits"] += 1
+                results[idx] = verdict
+            else:
+                # 内容相同的节点对只问一次
+                pending.setdefault(key, []).append(idx)
+        
+        if not pending:
+            return results
+        
+        keys = list(pending)
+        batches = [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+        
+        def _run(batch_keys: List[Tuple[str, str]]) -> Dict[int, Tuple[bool, float]]:
+            return self._judge_batch([pairs[pending[key][0]] for key in batch_keys])
+        
+        workers = min(self.max_concurrency, len(batches))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="merge-judge") as pool:
+                batch_verdicts = list(pool.map(_run, batches))
+        else:
+            batch_verdicts = [_run(batch_keys) for batch_keys in batches]
+        
+        for batch_keys, verdicts in zip(batches, batch_verdicts):
+            for pos, verdict in verdicts.items():
+                key = batch_keys[pos]
+                self._store_verdict(key, *verdict)
+                for idx in pending[key]:
+                    results[idx] = verdict
+        return results
+    
+    def _find_similar_pairs_batched(self, nodes: List[DAGNode]) -> List[Tuple[int, int, float]]:
+        candidates = self.candidate_pairs(nodes)
+        verdicts = self.judge_pairs([(node1, node2) for node1, node2, _ in candidates])
+        pairs = []
+        for (node1, node2, _), verdict in zip(candidates, verdicts):
+            if verdict and verdict[0] and verdict[1] >= self.threshold:
+                pairs.append((node1.id, node2.id, verdict[1]))
+        return pairs
+    
     def find_similar_pairs(
         self, 
         nodes: List[DAGNode]
@@ -348,6 +630,9 @@ class LLMSimilarityMatcher(SimilarityMatcher):
         if len(nodes) < 2:
             return []
         
+        if self.batched:
+            return self._find_similar_pairs_batched(nodes)
+        
         from app.services.plans.prompts.merge_similarity import (
             BATCH_SIMILARITY_SYSTEM,
             BATCH_SIMILARITY_USER
@@ -363,7 +648,7 @@ class LLMSimilarityMatcher(SimilarityMatcher):
         prompt = f"{BATCH_SIMILARITY_SYSTEM}\n\n{BATCH_SIMILARITY_USER.format(nodes_text=nodes_text)}"
         
         try:
-            response = self.llm.chat(prompt)
+            response = self._call_llm(prompt)
             result = self._parse_json(response)
             
             if isinstance(result, list):
@@ -387,6 +672,12 @@ class LLMSimilarityMatcher(SimilarityMatcher):
         node2: DAGNode
     ) -> bool:
         """使用LLM判断两个节点是否应合并"""
+        key = _pair_key(node1, node2)
+        verdict = self._cached_verdict(key)
+        if verdict is not None:
+            self.stats["cache_hits"] += 1
+            return verdict[0] and verdict[1] >= self.threshold
+        
         from app.services.plans.prompts.merge_similarity import (
             MERGE_SIMILARITY_SYSTEM,
             MERGE_SIMILARITY_USER
@@ -402,13 +693,14 @@ class LLMSimilarityMatcher(SimilarityMatcher):
         )
         
         try:
-            response = self.llm.chat(prompt)
+            response = self._call_llm(prompt)
             result = self._parse_json(response)
             
             if isinstance(result, dict):
-                can_merge = result.get("can_merge", False)
+                can_merge = bool(result.get("can_merge", False))
                 similarity = float(result.get("similarity", 0))
                 reason = result.get("reason", "")
+                self._store_verdict(key, can_merge, similarity)
                 
                 if can_merge and similarity >= self.threshold:
                     print(f"  ✓ LLM判定可合并 [{node1.id}]+[{node2.id}]: {reason}")
@@ -444,9 +736,25 @@ class TreeSimplifier:
         """
         self.matcher = matcher or LLMSimilarityMatcher()
     
+    def reachability(self, dag: DAG) -> ReachabilityClosure:
+        """
+        获取DAG的可达性闭包（缓存在 dag 上，结构被外部修改时重建）
+        
+        Args:
+            dag: DAG结构
+            
+        Returns:
+            可达性闭包
+        """
+        closure = dag._reachability
+        if closure is None or closure.signature != ReachabilityClosure.dag_signature(dag):
+            closure = ReachabilityClosure(dag)
+            dag._reachability = closure
+        return closure
+    
     def is_reachable(self, dag: DAG, from_id: int, to_id: int) -> bool:
         """
-        BFS检查从from_id是否可达to_id
+        检查从from_id是否可达to_id（查询传递闭包）
         
         Args:
             dag: DAG结构
@@ -456,25 +764,7 @@ class TreeSimplifier:
         Returns:
             是否可达
         """
-        if from_id == to_id:
-            return True
-        
-        visited = set()
-        queue = [from_id]
-        
-        while queue:
-            current = queue.pop(0)
-            if current == to_id:
-                return True
-            if current in visited:
-                continue
-            visited.add(current)
-            
-            node = dag.nodes.get(current)
-            if node:
-                queue.extend(node.child_ids - visited)
-        
-        return False
+        return self.reachability(dag).reaches(from_id, to_id)
     
     def can_merge(
         self, 
@@ -499,6 +789,15 @@ class TreeSimplifier:
         Returns:
             (可否合并, 原因)
         """
+        return self._can_merge(dag, self.reachability(dag), node1_id, node2_id)
+    
+    def _can_merge(
+        self,
+        dag: DAG,
+        closure: ReachabilityClosure,
+        node1_id: int,
+        node2_id: int
+    ) -> Tuple[bool, str]:
         node1 = dag.nodes.get(node1_id)
         node2 = dag.nodes.get(node2_id)
         
@@ -516,10 +815,10 @@ class TreeSimplifier:
             return False, "存在直接父子关系（父节点）"
         
         # 检查2: 祖先-后代关系（路径可达性）
-        if self.is_reachable(dag, node1_id, node2_id):
+        if closure.reaches(node1_id, node2_id):
             return False, f"[{node1_id}]是[{node2_id}]的祖先，存在路径"
         
-        if self.is_reachable(dag, node2_id, node1_id):
+        if closure.reaches(node2_id, node1_id):
             return False, f"[{node2_id}]是[{node1_id}]的祖先，存在路径"
         
         # 检查3: 依赖关系
@@ -538,20 +837,10 @@ class TreeSimplifier:
         Returns:
             可合并节点组列表，每组可以合并为一个节点
         """
-        node_ids = list(dag.nodes.keys())
-        n = len(node_ids)
-        
-        # 构建可达性矩阵
-        reachable = {}
-        for i in range(n):
-            for j in range(i + 1, n):
-                id1, id2 = node_ids[i], node_ids[j]
-                can, _ = self.can_merge(dag, id1, id2)
-                reachable[(id1, id2)] = can
-                reachable[(id2, id1)] = can
-        
-        # 使用并查集或贪心算法找出可合并组
-        # 这里使用简单的贪心：按节点名称分组，然后检查组内是否可合并
+        # 可达性闭包只构建一次，之后每次检查都是位运算
+        closure = self.reachability(dag)
+        
+        # 使用简单的贪心：按节点名称分组，然后只检查组内节点是否可合并
         name_groups: Dict[str, List[int]] = {}
         for node_id, node in dag.nodes.items():
             # 使用名称的简化版本作为key
@@ -567,7 +856,7 @@ class TreeSimplifier:
             group_valid = True
             for i in range(len(ids)):
                 for j in range(i + 1, len(ids)):
-                    if not reachable.get((ids[i], ids[j]), False):
+                    if not self._can_merge(dag, closure, ids[i], ids[j])[0]:
                         group_valid = False
                         break
                 if not group_valid:
@@ -643,11 +932,15 @@ class TreeSimplifier:
             return False
         
         # 安全检查
+        closure = self.reachability(dag)
         if not force:
-            can, reason = self.can_merge(dag, keep_id, remove_id)
+            can, reason = self._can_merge(dag, closure, keep_id, remove_id)
             if not can:
                 print(f"  ⚠ 无法合并 [{keep_id}] 和 [{remove_id}]: {reason}")
                 return False
+        mutually_unreachable = not (
+            closure.reaches(keep_id, remove_id) or closure.reaches(remove_id, keep_id)
+        )
         
         keep_node = dag.nodes[keep_id]
         remove_node = dag.nodes[remove_id]
@@ -683,6 +976,13 @@ class TreeSimplifier:
         del dag.nodes[remove_id]
         dag.merge_map[remove_id] = keep_id
         
+        # 增量更新可达性闭包；强制合并可能引入环，此时丢弃缓存
+        if mutually_unreachable:
+            closure.merge(keep_id, remove_id)
+            closure.signature = ReachabilityClosure.dag_signature(dag)
+        else:
+            dag._reachability = None
+        
         return True
     
     def merge_group(
@@ -704,9 +1004,10 @@ class TreeSimplifier:
             return node_ids[0] if node_ids else None
         
         # 检查组内所有节点两两可合并
+        closure = self.reachability(dag)
         for i in range(len(node_ids)):
             for j in range(i + 1, len(node_ids)):
-                can, reason = self.can_merge(dag, node_ids[i], node_ids[j])
+                can, reason = self._can_merge(dag, closure, node_ids[i], node_ids[j])
                 if not can:
                     print(f"  ⚠ 组内节点不可合并: [{node_ids[i]}] 和 [{node_ids[j]}]: {reason}")
                     return None
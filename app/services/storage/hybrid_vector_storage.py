@@ -2,14 +2,17 @@
 混合向量存储管理器
 同时支持SQLite (备份) 和 Milvus (主力)
 提供无缝迁移和回滚能力
+
+SQLite 部分即统一嵌入存储的磁盘层（``embedding_vectors`` 表），
+与嵌入服务共用同一个数据库和内容寻址键，不再单独维护一份 JSON 表。
 """
 
-import sqlite3
-import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
-from pathlib import Path
 
+import numpy as np
+
+from ..embeddings.embedding_store import SQLiteEmbeddingTier, get_embedding_store
 from .milvus_service import get_milvus_service
 import logging
 
@@ -21,24 +24,38 @@ class HybridVectorStorage:
     """混合向量存储管理器"""
     
     def __init__(self, 
-                 sqlite_path: str = "./data/databases/cache/embedding_cache.db",
+                 sqlite_path: Optional[str] = None,
                  migration_mode: str = "hybrid"):
         """
         初始化混合存储
         
         Args:
-            sqlite_path: SQLite数据库路径
+            sqlite_path: SQLite数据库路径（默认使用统一嵌入存储的磁盘层）
             migration_mode: 迁移模式 
                 - "sqlite_only": 仅使用SQLite
                 - "hybrid": 双写模式（推荐）
                 - "milvus_only": 仅使用Milvus
         """
-        self.sqlite_path = sqlite_path
         self.migration_mode = migration_mode
         self.milvus_service = None
-        
-        # 确保SQLite数据库存在
-        Path(sqlite_path).parent.mkdir(parents=True, exist_ok=True)
+        self._sqlite_path = sqlite_path
+        self._sqlite: Optional[SQLiteEmbeddingTier] = None
+
+    @property
+    def sqlite(self) -> SQLiteEmbeddingTier:
+        """SQLite 磁盘层（懒加载）"""
+        if self._sqlite is None:
+            disk = get_embedding_store().disk if self._sqlite_path is None else None
+            if disk is None:
+                from ...config.database_config import get_cache_database_path
+
+                disk = SQLiteEmbeddingTier(self._sqlite_path or get_cache_database_path("embedding"))
+            self._sqlite = disk
+        return self._sqlite
+
+    @property
+    def sqlite_path(self) -> str:
+        return self.sqlite.db_path
     
     async def initialize(self):
         """初始化存储服务"""
@@ -65,11 +82,7 @@ class HybridVectorStorage:
     def _test_sqlite_connection(self):
         """测试SQLite连接"""
         try:
-            conn = sqlite3.connect(self.sqlite_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM embedding_cache")
-            count = cursor.fetchone()[0]
-            conn.close()
+            count = self.sqlite.count()
             logger.info(f"SQLite连接正常，当前记录数: {count}")
         except Exception as e:
             logger.error(f"SQLite连接测试失败: {e}")
@@ -120,40 +133,7 @@ class HybridVectorStorage:
     def _store_to_sqlite(self, text_hash: str, embedding: List[float], model: str) -> bool:
         """存储到SQLite"""
         try:
-            conn = sqlite3.connect(self.sqlite_path)
-            cursor = conn.cursor()
-            
-            # 检查是否已存在
-            cursor.execute("SELECT access_count FROM embedding_cache WHERE text_hash = ?", (text_hash,))
-            existing = cursor.fetchone()
-            
-            current_time = datetime.now().timestamp()
-            
-            if existing:
-                # 更新访问计数
-                new_count = existing[0] + 1
-                cursor.execute("""
-                    UPDATE embedding_cache 
-                    SET access_count = ?, last_accessed = ?
-                    WHERE text_hash = ?
-                """, (new_count, current_time, text_hash))
-            else:
-                # 插入新记录
-                cursor.execute("""
-                    INSERT INTO embedding_cache 
-                    (text_hash, embedding_json, model, created_at, access_count, last_accessed)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    text_hash,
-                    json.dumps(embedding),
-                    model,
-                    current_time,
-                    1,
-                    current_time
-                ))
-            
-            conn.commit()
-            conn.close()
+            self.sqlite.put_many([(text_hash, embedding)], model)
             return True
             
         except Exception as e:
@@ -212,42 +192,30 @@ class HybridVectorStorage:
                       score_threshold: float) -> List[Dict[str, Any]]:
         """SQLite向量搜索 (简化的余弦相似度)"""
         try:
-            conn = sqlite3.connect(self.sqlite_path)
-            cursor = conn.cursor()
-            
-            # 获取所有向量
-            cursor.execute("SELECT text_hash, embedding_json, model, created_at, access_count FROM embedding_cache")
-            all_embeddings = cursor.fetchall()
-            conn.close()
-            
-            if not all_embeddings:
-                return []
-            
-            # 计算相似度
-            import numpy as np
-            query_vec = np.array(query_embedding)
+            query_vec = np.asarray(query_embedding, dtype=np.float32)
             query_norm = np.linalg.norm(query_vec)
+            if query_norm == 0:
+                return []
             
             similarities = []
-            for text_hash, embedding_json, model, created_at, access_count in all_embeddings:
-                try:
-                    stored_vec = np.array(json.loads(embedding_json))
-                    stored_norm = np.linalg.norm(stored_vec)
-                    
-                    # 余弦相似度
-                    similarity = np.dot(query_vec, stored_vec) / (query_norm * stored_norm)
-                    
-                    if similarity >= score_threshold:
-                        similarities.append({
-                            "text_hash": text_hash,
-                            "model": model,
-                            "score": float(similarity),
-                            "created_at": int(created_at),
-                            "access_count": access_count
-                        })
-                except Exception as e:
-                    logger.warning(f"向量计算失败: {e}")
+            for text_hash, model, stored_vec, created_at, access_count in self.sqlite.iter_vectors():
+                if stored_vec.shape != query_vec.shape:
+                    continue
+                stored_norm = np.linalg.norm(stored_vec)
+                if stored_norm == 0:
                     continue
+                
+                # 余弦相似度
+                similarity = float(np.dot(query_vec, stored_vec) / (query_norm * stored_norm))
+                
+                if similarity >= score_threshold:
+                    similarities.append({
+                        "text_hash": text_hash,
+                        "model": model,
+                        "score": similarity,
+                        "created_at": int(created_at),
+                        "access_count": access_count
+                    })
             
             # 按相似度排序
             similarities.sort(key=lambda x: x["score"], reverse=True)
@@ -268,11 +236,7 @@ class HybridVectorStorage:
         try:
             # SQLite统计
             if self.migration_mode in ["sqlite_only", "hybrid"]:
-                conn = sqlite3.connect(self.sqlite_path)
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM embedding_cache")
-                sqlite_count = cursor.fetchone()[0]
-                conn.close()
+                sqlite_count = self.sqlite.count()
                 
                 stats["sqlite"] = {
                     "record_count": sqlite_count,
@@ -301,18 +265,14 @@ class HybridVectorStorage:
             logger.info("🚀 开始SQLite到Milvus的数据迁移...")
             
             # 读取SQLite数据
-            conn = sqlite3.connect(self.sqlite_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT text_hash, embedding_json, model, created_at, access_count FROM embedding_cache")
-            sqlite_data = cursor.fetchall()
-            conn.close()
+            sqlite_data = list(self.sqlite.iter_vectors())
             
             migrated_count = 0
             failed_count = 0
             
-            for text_hash, embedding_json, model, created_at, access_count in sqlite_data:
+            for text_hash, model, vector, created_at, access_count in sqlite_data:
                 try:
-                    embedding = json.loads(embedding_json)
+                    embedding = vector.tolist()
                     
                     success = await self.milvus_service.store_embedding_cache(
                         text_hash, embedding, model
@@ -3,7 +3,8 @@ Milvus向量数据库服务
 支持嵌入式部署，无需外部Docker服务
 """
 
-from typing import Any, Dict, List
+import json
+from typing import Any, Dict, List, Tuple
 from datetime import datetime
 from pathlib import Path
 
@@ -21,6 +22,9 @@ import logging
 # 简化日志配置
 logger = logging.getLogger(__name__)
 
+# embedding_cache 集合的向量维度（见 _create_embedding_cache_collection）
+EMBEDDING_CACHE_DIM = 1024
+
 class MilvusVectorService:
     """Milvus向量存储服务"""
     
@@ -101,7 +105,7 @@ class MilvusVectorService:
         # 添加字段
         schema.add_field(field_name="id", datatype=data_type.INT64, is_primary=True)
         schema.add_field(field_name="text_hash", datatype=data_type.VARCHAR, max_length=64)
-        schema.add_field(field_name="embedding", datatype=data_type.FLOAT_VECTOR, dim=1024)
+        schema.add_field(field_name="embedding", datatype=data_type.FLOAT_VECTOR, dim=EMBEDDING_CACHE_DIM)
         schema.add_field(field_name="model", datatype=data_type.VARCHAR, max_length=50)
         schema.add_field(field_name="created_at", datatype=data_type.INT64)
         schema.add_field(field_name="access_count", datatype=data_type.INT64)
@@ -216,6 +220,38 @@ class MilvusVectorService:
             logger.error(f"❌ 存储嵌入缓存失败: {e}")
             return False
     
+    def store_embedding_cache_many(self, items: List[Tuple[str, List[float]]], model: str) -> int:
+        """批量存储嵌入缓存（同步，供分层嵌入存储使用），返回写入条数"""
+        if self.client is None:
+            return 0
+        now = int(datetime.now().timestamp())
+        data = [
+            {
+                "text_hash": text_hash,
+                "embedding": embedding,
+                "model": model,
+                "created_at": now,
+                "access_count": 1,
+                "last_accessed": now,
+            }
+            for text_hash, embedding in items
+            if len(embedding) == EMBEDDING_CACHE_DIM
+        ]
+        if data:
+            self.client.insert(collection_name=self.collections["embedding_cache"], data=data)
+        return len(data)
+
+    def fetch_embedding_cache(self, text_hashes: List[str], model: str) -> Dict[str, List[float]]:
+        """按 text_hash 精确查询嵌入缓存（同步）"""
+        if self.client is None or not text_hashes:
+            return {}
+        rows = self.client.query(
+            collection_name=self.collections["embedding_cache"],
+            filter=f"model == {json.dumps(model)} and text_hash in {json.dumps(list(text_hashes))}",
+            output_fields=["text_hash", "embedding"],
+        )
+        return {row["text_hash"]: list(row["embedding"]) for row in rows}
+
     async def store_task_embedding(
         self,
         task_id: int,
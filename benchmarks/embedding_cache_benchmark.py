@@ -0,0 +1,190 @@
+"""
+Benchmark: memory footprint and throughput of ``ThreadSafeEmbeddingCache``.
+
+Compares the storage modes of the in-memory tier:
+
+* ``list``    - one ``List[float]`` per entry in a dataclass with its own lock,
+                copied on every hit (the previous implementation);
+* ``float32`` - one contiguous NumPy slab, hash -> slot index, O(1) LRU and
+                read-only views on hits;
+* ``float16`` - the same slab at half precision.
+
+Memory is the traced allocation growth after filling the cache. Throughput
+covers filling, single-key hits, 32-key batch hits and churn past capacity
+(which exercises eviction). ``--persistent`` also compares the previous JSON
+column with the binary BLOB table for writing, reading back and file size.
+
+Usage:
+    python benchmarks/embedding_cache_benchmark.py --entries 10000 --dim 1024
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.embeddings.thread_safe_cache import ThreadSafeEmbeddingCache  # noqa: E402
+
+MODEL = "embedding-bench"
+MODES = ("list", "float32", "float16")
+
+
+def make_vectors(count: int, dim: int, seed: int = 0) -> List[List[float]]:
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((count, dim)).tolist()
+
+
+def new_cache(mode: str, entries: int, db_path: str = "", persistent: bool = False) -> ThreadSafeEmbeddingCache:
+    return ThreadSafeEmbeddingCache(
+        cache_size=entries,
+        enable_persistent=persistent,
+        storage=mode,
+        cache_db_path=db_path or os.path.join(tempfile.mkdtemp(prefix="emb_cache_bench_"), "cache.db"),
+    )
+
+
+def measure_memory(mode: str, texts: List[str], dim: int) -> float:
+    # Vectors are created inside the traced region and owned by the cache
+    # afterwards, as they are when parsed from an API response.
+    rng = np.random.default_rng(0)
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    cache = new_cache(mode, len(texts))
+    for text in texts:
+        cache.put(text, rng.standard_normal(dim).tolist(), MODEL)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del cache
+    return used / (1024 * 1024)
+
+
+def measure_throughput(mode: str, texts: List[str], vectors: List[List[float]], lookups: int) -> Dict[str, float]:
+    cache = new_cache(mode, len(texts))
+    rng = random.Random(1)
+
+    started = time.perf_counter()
+    for text, vector in zip(texts, vectors):
+        cache.put(text, vector, MODEL)
+    fill = len(texts) / (time.perf_counter() - started)
+
+    keys = [rng.choice(texts) for _ in range(lookups)]
+    started = time.perf_counter()
+    for key in keys:
+        cache.get(key, MODEL)
+    single = lookups / (time.perf_counter() - started)
+
+    batches = [keys[i : i + 32] for i in range(0, lookups, 32)]
+    started = time.perf_counter()
+    for batch in batches:
+        cache.get_batch(batch, MODEL)
+    batched = lookups / (time.perf_counter() - started)
+
+    churn = min(1000, len(texts))
+    started = time.perf_counter()
+    for i in range(churn):
+        cache.put(f"churn-{i}", vectors[i], MODEL)
+    evicting = churn / (time.perf_counter() - started)
+
+    return {"fill": fill, "get": single, "get_batch": batched, "evict": evicting}
+
+
+def benchmark_persistent(texts: List[str], vectors: List[List[float]]) -> None:
+    root = Path(tempfile.mkdtemp(prefix="emb_cache_bench_db_"))
+
+    # The previous schema and access pattern: one JSON document per vector,
+    # one statement and commit per entry.
+    json_db = root / "json.db"
+    with sqlite3.connect(json_db) as conn:
+        conn.execute(
+            "CREATE TABLE embedding_cache (text_hash TEXT PRIMARY KEY, embedding_json TEXT NOT NULL, "
+            "model TEXT NOT NULL, created_at REAL NOT NULL, access_count INTEGER DEFAULT 0, "
+            "last_accessed REAL DEFAULT 0.0)"
+        )
+        started = time.perf_counter()
+        now = time.time()
+        for i, (text, vector) in enumerate(zip(texts, vectors)):
+            conn.execute(
+                "INSERT OR REPLACE INTO embedding_cache VALUES (?, ?, ?, ?, 1, ?)",
+                (str(i), json.dumps(vector), MODEL, now, now),
+            )
+        conn.commit()
+        json_write = time.perf_counter() - started
+        started = time.perf_counter()
+        for i in range(len(texts)):
+            row = conn.execute(
+                "SELECT embedding_json, access_count FROM embedding_cache WHERE text_hash = ?", (str(i),)
+            ).fetchone()
+            json.loads(row[0])
+            conn.execute(
+                "UPDATE embedding_cache SET access_count = ?, last_accessed = ? WHERE text_hash = ?",
+                (row[1] + 1, time.time(), str(i)),
+            )
+            conn.commit()
+        json_read = time.perf_counter() - started
+
+    rows = []
+    for mode in ("float32", "float16"):
+        db = root / f"{mode}.db"
+        writer = new_cache(mode, len(texts), str(db), persistent=True)
+        started = time.perf_counter()
+        writer.put_batch(texts, vectors, MODEL)
+        write = time.perf_counter() - started
+        writer.shutdown()
+
+        reader = new_cache(mode, len(texts), str(db), persistent=True)
+        started = time.perf_counter()
+        for i in range(0, len(texts), 32):
+            reader.get_batch(texts[i : i + 32], MODEL)
+        read = time.perf_counter() - started
+        reader.shutdown()
+        rows.append((f"blob/{mode}", write, read, db.stat().st_size))
+
+    print(f"\npersistent tier, {len(texts)} vectors")
+    print(f"{'format':<14}{'write s':>10}{'read s':>10}{'file MB':>10}")
+    for name, write, read, size in [("json", json_write, json_read, json_db.stat().st_size), *rows]:
+        print(f"{name:<14}{write:>10.2f}{read:>10.2f}{size / 1e6:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--lookups", type=int, default=50000)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--persistent", action="store_true", help="also compare JSON and BLOB SQLite tiers")
+    args = parser.parse_args()
+
+    texts = [f"text {i}" for i in range(args.entries)]
+    vectors = make_vectors(args.entries, args.dim)
+
+    print(f"{args.entries} entries x {args.dim} dims, {args.lookups} lookups")
+    print(f"{'mode':<10}{'memory MB':>11}{'fill/s':>11}{'get/s':>11}{'batch/s':>11}{'evict/s':>11}")
+    for mode in args.modes:
+        memory = measure_memory(mode, texts, args.dim)
+        rates = measure_throughput(mode, texts, vectors, args.lookups)
+        print(
+            f"{mode:<10}{memory:>11.1f}{rates['fill']:>11.0f}{rates['get']:>11.0f}"
+            f"{rates['get_batch']:>11.0f}{rates['evict']:>11.0f}"
+        )
+
+    if args.persistent:
+        benchmark_persistent(texts, vectors)
+
+
+if __name__ == "__main__":
+    main()
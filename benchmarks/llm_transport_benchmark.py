@@ -0,0 +1,195 @@
+"""
+Benchmark: per-request urllib connections vs. the pooled LLM transport.
+
+Starts a local OpenAI-compatible stub server and drives it with
+1) the legacy pattern (``urllib.request`` opening a new connection per call),
+2) ``LLMClient.chat`` from a thread pool (shared keep-alive pool),
+3) ``LLMClient.chat_async`` under ``asyncio.gather``.
+
+For each mode it reports throughput, TCP connections opened (and per second)
+and p50/p99 latency.  Loopback HTTP has almost no connection setup cost, so
+``--connect-delay`` can be used to model a TLS handshake to a remote provider.
+
+Usage:
+    python benchmarks/llm_transport_benchmark.py --requests 500 --concurrency 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List
+from urllib import request
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.llm import LLMClient  # noqa: E402
+from app.services.llm.http_transport import close_transports  # noqa: E402
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.connections.get_lock():
+            self.server.connections.value += 1
+        if self.server.connect_delay:
+            time.sleep(self.server.connect_delay)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        body = json.dumps({"choices": [{"message": {"content": "ok"}}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _serve(port_queue, connections, delay: float, connect_delay: float) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    server.connections = connections
+    server.delay = delay
+    server.connect_delay = connect_delay
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def _start_server(delay: float, connect_delay: float):
+    """Run the stub server in its own process so it does not share the GIL."""
+    connections = multiprocessing.Value("i", 0)
+    port_queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(
+        target=_serve, args=(port_queue, connections, delay, connect_delay), daemon=True
+    )
+    proc.start()
+    return proc, connections, port_queue.get(timeout=10)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def _report(name: str, latencies: List[float], elapsed: float, connections: int) -> Dict[str, float]:
+    row = {
+        "mode": name,
+        "requests": len(latencies),
+        "req_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "connections": connections,
+        "conn_per_s": connections / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+    print(
+        f"{name:<16} {row['requests']:>6} req  {row['req_per_s']:>9.1f} req/s  "
+        f"{row['connections']:>6} conns  {row['conn_per_s']:>9.1f} conn/s  "
+        f"p50 {row['p50_ms']:>7.2f} ms  p99 {row['p99_ms']:>7.2f} ms"
+    )
+    return row
+
+
+def _run_threaded(call: Callable[[int], str], total: int, concurrency: int):
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def _timed(i: int) -> None:
+        start = time.perf_counter()
+        call(i)
+        duration = time.perf_counter() - start
+        with lock:
+            latencies.append(duration)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(_timed, range(total)))
+    return latencies, time.perf_counter() - start
+
+
+def _legacy_urllib_call(url: str) -> Callable[[int], str]:
+    def _call(i: int) -> str:
+        payload = {"model": "bench", "messages": [{"role": "user", "content": [{"type": "text", "text": f"p{i}"}]}]}
+        req = request.Request(
+            url,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json", "Authorization": "Bearer bench"},
+            method="POST",
+        )
+        with request.urlopen(req, timeout=30) as resp:
+            obj = json.loads(resp.read().decode("utf-8"))
+        return obj["choices"][0]["message"]["content"]
+
+    return _call
+
+
+async def _run_async(client: LLMClient, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def _timed(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await client.chat_async(f"p{i}")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_timed(i) for i in range(total)))
+    return latencies, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.0, help="Simulated server latency in seconds")
+    parser.add_argument(
+        "--connect-delay", type=float, default=0.0, help="Simulated per-connection setup cost in seconds"
+    )
+    args = parser.parse_args()
+
+    proc, connections, port = _start_server(args.delay, args.connect_delay)
+    url = f"http://127.0.0.1:{port}/v1/chat/completions"
+    client = LLMClient(provider="qwen", api_key="bench", url=url, retries=0)
+
+    print(f"Stub server {url}; {args.requests} requests, concurrency {args.concurrency}\n")
+    try:
+        before = connections.value
+        lat, elapsed = _run_threaded(_legacy_urllib_call(url), args.requests, args.concurrency)
+        _report("before/urllib", lat, elapsed, connections.value - before)
+
+        before = connections.value
+        lat, elapsed = _run_threaded(lambda i: client.chat(f"p{i}"), args.requests, args.concurrency)
+        _report("after/sync", lat, elapsed, connections.value - before)
+
+        before = connections.value
+        lat, elapsed = asyncio.run(_run_async(client, args.requests, args.concurrency))
+        _report("after/async", lat, elapsed, connections.value - before)
+    finally:
+        close_transports()
+        proc.terminate()
+        proc.join()
+
+
+if __name__ == "__main__":
+    main()
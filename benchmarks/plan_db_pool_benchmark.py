@@ -0,0 +1,117 @@
+"""
+Benchmark: repeated ``PlanRepository.update_task`` calls against one plan file.
+
+Compares the previous ``plan_db_connection`` (a fresh ``sqlite3`` connection
+per use, rollback journal, ``foreign_keys`` set every time) with the pooled
+WAL connections from ``PlanConnectionPool``. Each mode runs on its own copy of
+a synthetic plan in a temporary ``DB_ROOT``; ``--threads`` spreads the
+updates over several threads the way execution and decomposition jobs do.
+
+Usage:
+    python benchmarks/plan_db_pool_benchmark.py --tasks 200 --updates 2000 --threads 1 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+os.environ.setdefault("DB_ROOT", tempfile.mkdtemp(prefix="plan_pool_bench_"))
+
+import app.repository.plan_repository as plan_repository  # noqa: E402
+from app.database import init_db, plan_db_connection  # noqa: E402
+from app.database_pool import close_plan_connection_pool, get_plan_connection_pool  # noqa: E402
+from app.repository.plan_repository import PlanRepository  # noqa: E402
+from app.repository.plan_storage import get_plan_db_path  # noqa: E402
+
+
+@contextmanager
+def legacy_plan_db_connection(plan_path: Path):
+    """The unpooled implementation this change replaced."""
+    conn = sqlite3.connect(plan_path, isolation_level="DEFERRED")
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys=ON")
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def build_plan(repo: PlanRepository, tasks: int, journal_mode: str) -> List[int]:
+    plan = repo.create_plan(f"pool-bench-{journal_mode}")
+    task_ids = []
+    parent = None
+    for index in range(tasks):
+        node = repo.create_task(plan.id, name=f"task {index}", parent_id=parent)
+        task_ids.append(node.id)
+        if index % 10 == 0:
+            parent = node.id
+    close_plan_connection_pool()
+    with sqlite3.connect(get_plan_db_path(plan.id)) as conn:
+        conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    return [plan.id] + task_ids
+
+
+def run_updates(repo: PlanRepository, plan_id: int, task_ids: List[int], updates: int, threads: int) -> float:
+    per_thread = updates // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(offset: int) -> None:
+        barrier.wait()
+        for i in range(per_thread):
+            task_id = task_ids[(offset + i) % len(task_ids)]
+            repo.update_task(plan_id, task_id, status="running" if i % 2 else "completed", execution_result=f"r{i}")
+
+    workers = [threading.Thread(target=worker, args=(n * 7,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def bench(label: str, opener: Callable, journal_mode: str, args, threads: int) -> float:
+    plan_repository.plan_db_connection = opener
+    repo = PlanRepository()
+    ids = build_plan(repo, args.tasks, journal_mode)
+    elapsed = run_updates(repo, ids[0], ids[1:], args.updates, threads)
+    updates = (args.updates // threads) * threads
+    print(f"{label:>8} {threads:>7} {updates:>8} {elapsed:>9.3f} {updates / elapsed:>10.0f} {elapsed / updates * 1e6:>9.0f}")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    init_db()
+    print(f"DB_ROOT={os.environ['DB_ROOT']}")
+    print(f"{'mode':>8} {'threads':>7} {'updates':>8} {'seconds':>9} {'ops/s':>10} {'us/op':>9}")
+    for threads in args.threads:
+        legacy = bench("legacy", legacy_plan_db_connection, "delete", args, threads)
+        pooled = bench("pooled", plan_db_connection, "wal", args, threads)
+        print(f"{'':>8} speedup x{legacy / pooled:.2f}")
+    print(get_plan_connection_pool().get_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Microbenchmark: per-candidate similarity loop vs. batched top-k on a cached matrix.
+
+Compares, for 1k/10k/100k candidates:
+- ``loop``:    the former per-target path (``compute_similarity`` for each row)
+- ``find``:    ``find_most_similar`` on a list of candidate dicts
+- ``top_k``:   ``top_k_similar`` against a matrix normalized once and cached
+- ``chunked``: ``top_k_similar`` with ``chunk_size`` for bounded memory
+
+Usage:
+    python benchmarks/similarity_benchmark.py --dim 256 --queries 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.embeddings.similarity_calculator import SimilarityCalculator  # noqa: E402
+
+
+def _timeit(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--chunk-size", type=int, default=8192)
+    parser.add_argument(
+        "--loop-max", type=int, default=10_000, help="Skip the slow per-row loop above this candidate count"
+    )
+    args = parser.parse_args()
+
+    calc = SimilarityCalculator()
+    rng = np.random.default_rng(0)
+    query = rng.normal(size=args.dim).astype(np.float32).tolist()
+
+    print(f"dim={args.dim} k={args.k} (ms per query)\n")
+    print(f"{'candidates':>10} {'loop':>10} {'find':>10} {'normalize':>10} {'top_k':>10} {'chunked':>10}")
+    for size in args.sizes:
+        matrix = rng.normal(size=(size, args.dim)).astype(np.float32)
+        rows = matrix.tolist()
+        candidates = [{"id": i, "embedding": row} for i, row in enumerate(rows)]
+
+        loop_ms = float("nan")
+        if size <= args.loop_max:
+            loop_ms = _timeit(
+                lambda: sorted(
+                    ((calc.compute_similarity(query, row), i) for i, row in enumerate(rows)), reverse=True
+                )[: args.k],
+                1,
+            )
+        find_repeat = max(1, args.queries // 10)
+        find_ms = _timeit(lambda: calc.find_most_similar(query, candidates, k=args.k), find_repeat)
+
+        normalized_holder = {}
+        normalize_ms = _timeit(lambda: normalized_holder.setdefault("m", calc.normalize_embeddings(matrix)), 1)
+        normalized = normalized_holder["m"]
+        top_k_ms = _timeit(lambda: calc.top_k_similar(query, normalized, k=args.k), args.queries)
+        chunked_ms = _timeit(
+            lambda: calc.top_k_similar(query, normalized, k=args.k, chunk_size=args.chunk_size), args.queries
+        )
+
+        print(
+            f"{size:>10} {loop_ms:>10.2f} {find_ms:>10.2f} {normalize_ms:>10.2f} "
+            f"{top_k_ms:>10.3f} {chunked_ms:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
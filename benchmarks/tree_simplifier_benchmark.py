@@ -0,0 +1,140 @@
+"""
+Benchmark: mergeable-group detection in TreeSimplifier on synthetic DAGs.
+
+Compares the previous approach (``can_merge`` with a BFS reachability walk for
+every node pair, before grouping by name) against the transitive-closure
+bitsets, and times merging every detected group with incremental closure
+updates.  The legacy path is quadratic in pairs times a graph walk, so it is
+only run up to ``--legacy-max`` nodes.
+
+Usage:
+    python benchmarks/tree_simplifier_benchmark.py --sizes 100 500 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import io
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.plans.tree_simplifier import DAG, DAGNode, SimilarityMatcher, TreeSimplifier  # noqa: E402
+
+
+class _NoopMatcher(SimilarityMatcher):
+    def find_similar_pairs(self, nodes):
+        return []
+
+    def should_merge(self, node1, node2):
+        return True
+
+
+def build_dag(n: int, names: int, seed: int) -> DAG:
+    """Decomposition-shaped DAG: mostly a tree, with some extra cross edges."""
+    rng = random.Random(seed)
+    dag = DAG(plan_id=0, title=f"synthetic-{n}")
+    for node_id in range(1, n + 1):
+        dag.nodes[node_id] = DAGNode(id=node_id, name=f"step-{rng.randrange(names)}", source_node_ids=[node_id])
+        if node_id == 1:
+            continue
+        parents = {rng.randrange(max(1, node_id - 50), node_id)}
+        if rng.random() < 0.2:
+            parents.add(rng.randrange(1, node_id))
+        for parent_id in parents:
+            dag.nodes[parent_id].child_ids.add(node_id)
+            dag.nodes[node_id].parent_ids.add(parent_id)
+    return dag
+
+
+def _legacy_is_reachable(dag: DAG, from_id: int, to_id: int) -> bool:
+    if from_id == to_id:
+        return True
+    visited = set()
+    queue = [from_id]
+    while queue:
+        current = queue.pop(0)
+        if current == to_id:
+            return True
+        if current in visited:
+            continue
+        visited.add(current)
+        node = dag.nodes.get(current)
+        if node:
+            queue.extend(node.child_ids - visited)
+    return False
+
+
+def _legacy_can_merge(dag: DAG, a: int, b: int) -> bool:
+    n1, n2 = dag.nodes[a], dag.nodes[b]
+    if b in n1.child_ids or a in n2.child_ids or b in n1.parent_ids or a in n2.parent_ids:
+        return False
+    if _legacy_is_reachable(dag, a, b) or _legacy_is_reachable(dag, b, a):
+        return False
+    return b not in n1.dependencies and a not in n2.dependencies
+
+
+def legacy_find_mergeable_groups(dag: DAG) -> List[List[int]]:
+    node_ids = list(dag.nodes)
+    reachable: Dict[tuple, bool] = {}
+    for i in range(len(node_ids)):
+        for j in range(i + 1, len(node_ids)):
+            can = _legacy_can_merge(dag, node_ids[i], node_ids[j])
+            reachable[(node_ids[i], node_ids[j])] = reachable[(node_ids[j], node_ids[i])] = can
+    groups: Dict[str, List[int]] = {}
+    for node_id, node in dag.nodes.items():
+        groups.setdefault(node.name.strip().lower(), []).append(node_id)
+    return [
+        ids for ids in groups.values()
+        if len(ids) > 1 and all(reachable[(a, b)] for i, a in enumerate(ids) for b in ids[i + 1:])
+    ]
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--names", type=int, default=0, help="Distinct node names (default: n // 2)")
+    parser.add_argument("--legacy-max", type=int, default=500, help="Skip the legacy path above this size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>6} {'legacy_s':>10} {'closure_s':>10} {'speedup':>8} {'groups':>7} {'merge_s':>9} {'merged':>7}")
+    for n in args.sizes:
+        names = args.names or max(2, n // 2)
+        dag = build_dag(n, names, args.seed)
+        simplifier = TreeSimplifier(matcher=_NoopMatcher())
+
+        legacy_s = None
+        if n <= args.legacy_max:
+            legacy_groups, legacy_s = _timed(legacy_find_mergeable_groups, copy.deepcopy(dag))
+
+        groups, closure_s = _timed(simplifier.find_mergeable_groups, dag)
+        if legacy_s is not None:
+            assert groups == legacy_groups, "closure result differs from legacy result"
+
+        def _merge_all() -> int:
+            # merge_group prints one line per group; keep the table readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                return sum(1 for group in groups if simplifier.merge_group(dag, group) is not None)
+
+        merged, merge_s = _timed(_merge_all)
+
+        legacy_col = f"{legacy_s:>10.3f}" if legacy_s is not None else f"{'skipped':>10}"
+        speedup = f"{legacy_s / closure_s:>7.0f}x" if legacy_s is not None and closure_s else f"{'-':>8}"
+        print(f"{n:>6} {legacy_col} {closure_s:>10.4f} {speedup} {len(groups):>7} {merge_s:>9.4f} {merged:>7}")
+
+
+if __name__ == "__main__":
+    main()
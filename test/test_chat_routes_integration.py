@@ -6,7 +6,9 @@ import re
 import pytest
 from fastapi.testclient import TestClient
 
+from app.errors import ErrorCode
 from app.main import app
+from app.routers import chat_routes
 from app.routers.chat_routes import AgentResult, AgentStep, StructuredChatAgent
 from app.services.llm.structured_response import LLMAction, LLMReply, LLMStructuredResponse
 from app.services.plans.plan_executor import (
@@ -15,6 +17,12 @@ from app.services.plans.plan_executor import (
     PlanExecutor,
     PlanExecutorLLMService,
 )
+from app.services.plans.decomposition_jobs import (
+    plan_decomposition_jobs,
+    reset_current_job,
+    set_current_job,
+)
+from app.services.plans.job_scheduler import JobQueueFullError
 from app.services.plans.plan_session import PlanSession
 
 
@@ -286,3 +294,66 @@ def test_chat_message_returns_pending_and_completes(monkeypatch, chat_client):
     assert status_payload["actions"][0]["status"] == "completed"
     assert status_payload["actions"][0]["message"] == "计划创建完成"
     assert status_payload["plan_id"] is None
+
+
+@pytest.mark.asyncio
+async def test_structured_agent_stops_between_actions_when_cancelled(monkeypatch, plan_repo):
+    plan = plan_repo.create_plan("Cancel Plan")
+    session = PlanSession(repo=plan_repo, plan_id=plan.id)
+    session.refresh()
+    agent = StructuredChatAgent(plan_session=session, plan_decomposer=None, plan_executor=None)
+
+    job = plan_decomposition_jobs.create_job(
+        plan_id=plan.id, task_id=None, mode="assistant", job_type="chat_action"
+    )
+    executed: list[str] = []
+
+    async def fake_execute_action(self, action: LLMAction) -> AgentStep:
+        executed.append(action.name)
+        plan_decomposition_jobs.request_cancel(job.job_id)
+        return AgentStep(action=action, success=True, message="ok", details={})
+
+    monkeypatch.setattr(StructuredChatAgent, "_execute_action", fake_execute_action)
+    structured = LLMStructuredResponse(
+        llm_reply=LLMReply(message="两步操作"),
+        actions=[
+            LLMAction(kind="task_operation", name="first", order=1, parameters={}),
+            LLMAction(kind="task_operation", name="second", order=2, parameters={}),
+        ],
+    )
+
+    token = set_current_job(job.job_id)
+    try:
+        result = await agent.execute_structured(structured)
+    finally:
+        reset_current_job(token)
+
+    assert executed == ["first"]
+    assert result.cancelled is True and result.success is False
+
+
+def test_chat_message_returns_429_when_job_queue_is_full(monkeypatch, chat_client):
+    structured = LLMStructuredResponse(
+        llm_reply=LLMReply(message="稍后执行"),
+        actions=[LLMAction(kind="plan_operation", name="create_plan", order=1, parameters={"title": "P"})],
+    )
+
+    async def fake_structured(self, user_message: str) -> LLMStructuredResponse:
+        return structured
+
+    class FullScheduler:
+        def submit(self, *args, **kwargs):
+            raise JobQueueFullError("Job queue is full")
+
+    monkeypatch.setattr(StructuredChatAgent, "get_structured_response", fake_structured)
+    monkeypatch.setattr(chat_routes, "get_job_scheduler", lambda: FullScheduler())
+
+    response = chat_client.post(
+        "/chat/message",
+        json={"message": "创建一个计划", "session_id": "sess-queue-full"},
+    )
+    assert response.status_code == 429
+    error = response.json()["error"]
+    assert error["error_code"] == ErrorCode.API_RATE_LIMIT_EXCEEDED
+    assert error["category"] == "business" and error["severity"] == "low"
+    assert "full" in error["message"]
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import itertools
+import threading
+
+import pytest
+
+from app.services.interpreter import docker_interpreter, docker_pool
+from app.services.interpreter.docker_interpreter import DockerCodeInterpreter
+from app.services.interpreter.docker_pool import DockerContainerPool
+
+
+class _FakeContainer:
+    def __init__(self, cid: str, kwargs: dict) -> None:
+        self.id = cid
+        self.kwargs = kwargs
+        self.status = "running"
+        self.killed = threading.Event()
+        self.removed = False
+
+    def reload(self) -> None:
+        pass
+
+    def kill(self) -> None:
+        self.status = "exited"
+        self.killed.set()
+
+    def remove(self, force: bool = False) -> None:
+        self.removed = True
+        self.kill()
+
+
+class _FakeAPI:
+    """Interprets snippets instead of running Python: 'hang' blocks until killed, 'fail' exits 1."""
+
+    base_url = "fake://docker"
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self.execs: dict = {}
+        self.ids = itertools.count(1)
+
+    def exec_create(self, container_id, cmd, workdir=None):
+        exec_id = f"exec-{next(self.ids)}"
+        self.execs[exec_id] = {"container": self.client.by_id[container_id], "cmd": cmd, "workdir": workdir}
+        return {"Id": exec_id}
+
+    def exec_start(self, exec_id, demux=False):
+        record = self.execs[exec_id]
+        code = record["cmd"][-1]
+        container = record["container"]
+        if "hang" in code:
+            container.killed.wait(5)
+            record["exit"] = 137
+            return None, None
+        if "fail" in code:
+            record["exit"] = 1
+            return b"", b"Traceback: fail\n"
+        record["exit"] = 0
+        return f"ran in {container.id}\n".encode(), None
+
+    def exec_inspect(self, exec_id):
+        return {"ExitCode": self.execs[exec_id].get("exit")}
+
+
+class _FakeImages:
+    def get(self, image):
+        return image
+
+
+class _FakeContainers:
+    def __init__(self, client) -> None:
+        self.client = client
+
+    def run(self, **kwargs):
+        container = _FakeContainer(f"c{len(self.client.started) + 1}", kwargs)
+        self.client.started.append(container)
+        self.client.by_id[container.id] = container
+        return container
+
+
+class _FakeDocker:
+    def __init__(self) -> None:
+        self.started: list = []
+        self.by_id: dict = {}
+        self.api = _FakeAPI(self)
+        self.images = _FakeImages()
+        self.containers = _FakeContainers(self)
+
+
+@pytest.fixture()
+def fake_docker():
+    docker_pool.shutdown_container_pools()
+    client = _FakeDocker()
+    yield client
+    docker_pool.shutdown_container_pools()
+
+
+def _pool(client, tmp_path, **kwargs) -> DockerContainerPool:
+    volumes = {str(tmp_path): {"bind": "/workspace", "mode": "rw"}}
+    return DockerContainerPool(client, "python:3.10-slim", volumes, size=0, **kwargs)
+
+
+def test_pool_reuses_container_until_max_runs(fake_docker, tmp_path):
+    pool = _pool(fake_docker, tmp_path, max_runs=3)
+
+    outputs = [pool.execute("print(1)", timeout=5).stdout for _ in range(4)]
+
+    assert outputs == ["ran in c1\n"] * 3 + ["ran in c2\n"]
+    first = fake_docker.started[0]
+    assert first.removed
+    assert first.kwargs["network_disabled"] is True
+    assert first.kwargs["volumes"] == {str(tmp_path): {"bind": "/workspace", "mode": "rw"}}
+    assert first.kwargs["working_dir"] == "/workspace"
+    assert all(e["workdir"] == "/workspace" for e in fake_docker.api.execs.values())
+    assert pool.stats["started"] == 2
+
+
+def test_pool_recycles_container_after_failure_and_timeout(fake_docker, tmp_path):
+    pool = _pool(fake_docker, tmp_path)
+
+    failed = pool.execute("fail()", timeout=5)
+    assert failed.exit_code == 1 and "fail" in failed.stderr
+    assert fake_docker.started[0].removed
+
+    timed_out = pool.execute("hang()", timeout=0.2)
+    assert timed_out.timed_out
+    assert fake_docker.started[1].removed
+
+    ok = pool.execute("print(1)", timeout=5)
+    assert ok.exit_code == 0 and ok.stdout == "ran in c3\n"
+    assert pool.stats["recycled"] == 2 and pool.stats["timeouts"] == 1
+
+
+def test_interpreter_uses_shared_warm_pool(fake_docker, tmp_path, monkeypatch):
+    monkeypatch.setattr(docker_interpreter.docker, "from_env", lambda: fake_docker)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+
+    interpreter = DockerCodeInterpreter(timeout=5, work_dir=str(tmp_path), data_dir=str(data_dir))
+    first = interpreter.run_python_code("print(1)")
+    second = DockerCodeInterpreter(timeout=5, work_dir=str(tmp_path), data_dir=str(data_dir)).run_python_code(
+        "print(2)"
+    )
+    hung = DockerCodeInterpreter(timeout=0.2, work_dir=str(tmp_path), data_dir=str(data_dir)).run_python_code(
+        "hang()"
+    )
+
+    # Both interpreters share the pre-started container for the same mounts.
+    assert first.status == "success" and second.status == "success"
+    assert first.output == second.output == "ran in c1\n"
+    assert hung.status == "timeout"
+    assert hung.error == "Execution exceeded 0.2 seconds limit."
+    volumes = fake_docker.started[0].kwargs["volumes"]
+    assert volumes[str(data_dir)] == {"bind": "/data", "mode": "ro"}
+
+
+def test_idle_pools_are_reaped_and_capped(fake_docker, tmp_path, monkeypatch):
+    monkeypatch.setattr(docker_pool, "_ensure_reaper", lambda: None)
+    dirs = [tmp_path / f"run{i}" for i in range(3)]
+    pools = []
+    for d in dirs:
+        d.mkdir()
+        volumes = {str(d): {"bind": "/workspace", "mode": "rw"}}
+        pools.append(docker_pool.get_container_pool(fake_docker, "python:3.10-slim", volumes, size=0))
+    for pool in pools:
+        pool.execute("print(1)", timeout=5)
+
+    # Over the cap: the least recently used idle pool is closed first.
+    assert docker_pool.reap_container_pools(idle_timeout=3600, max_pools=2) == 1
+    assert pools[0].closed and not pools[2].closed
+    assert all(c.removed for c in fake_docker.started[:1])
+
+    # Past the idle timeout every remaining pool is closed with its containers.
+    assert docker_pool.reap_container_pools(idle_timeout=0, max_pools=2) == 2
+    assert all(pool.closed for pool in pools)
+    assert all(c.removed for c in fake_docker.started)
+
+
+def test_interpreter_runs_in_workspace_subdirectory(fake_docker, tmp_path, monkeypatch):
+    monkeypatch.setattr(docker_interpreter.docker, "from_env", lambda: fake_docker)
+    interpreter = DockerCodeInterpreter(timeout=5, work_dir=str(tmp_path / "out"))
+
+    ok = interpreter.run_python_code("print(1)", work_dir=str(tmp_path / "out" / "nodes" / "task_3"))
+    outside = interpreter.run_python_code("print(1)", work_dir=str(tmp_path / "elsewhere"))
+
+    assert ok.status == "success"
+    assert [e["workdir"] for e in fake_docker.api.execs.values()] == ["/workspace/nodes/task_3"]
+    assert (tmp_path / "out" / "nodes" / "task_3").is_dir()
+    assert outside.status == "error" and "not inside" in outside.error
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+
+import numpy as np
+import pytest
+
+from app.services.cache.embedding_cache import EmbeddingCache as UnifiedEmbeddingCache
+from app.services.embeddings import embedding_store
+from app.services.embeddings.cache import EmbeddingCache
+from app.services.embeddings.embedding_store import TieredEmbeddingStore, embedding_key
+from app.services.embeddings.migrate_embedding_caches import migrate_embedding_caches
+
+MODEL = "embedding-test"
+
+
+def _vec(seed: int, dim: int = 8) -> list:
+    return np.random.default_rng(seed).random(dim).tolist()
+
+
+class DictTier:
+    """Stands in for the Milvus tier: a keyed remote store."""
+
+    def __init__(self):
+        self.rows = {}
+        self.reads = []
+
+    def get_many(self, keys, model):
+        self.reads.append(list(keys))
+        return {k: self.rows[(model, k)] for k in keys if (model, k) in self.rows}
+
+    def put_many(self, items, model):
+        for key, vector in items:
+            self.rows[(model, key)] = list(vector)
+
+
+@pytest.fixture
+def shared_store(tmp_path, monkeypatch):
+    store = TieredEmbeddingStore(memory_size=16, db_path=str(tmp_path / "embedding.db"))
+    monkeypatch.setattr(embedding_store, "_embedding_store", store)
+    yield store
+    store.shutdown()
+
+
+def test_facades_share_one_content_addressed_store(shared_store):
+    unified = UnifiedEmbeddingCache(enable_persistent=False)
+    unified.set_embedding("hello world", _vec(1), MODEL)
+
+    legacy = EmbeddingCache()
+    assert legacy.store is shared_store
+    np.testing.assert_allclose(legacy.get("hello world", MODEL), _vec(1), rtol=1e-6)
+    assert unified._generate_key("hello world", MODEL) == embedding_key("hello world", MODEL)
+
+    legacy.put_batch(["a", "b"], [_vec(2), _vec(3)], MODEL)
+    embeddings, missing = unified.get_batch(["a", "b", "c"], MODEL)
+    assert missing == [2] and isinstance(embeddings[0], list)
+    np.testing.assert_allclose(embeddings[1], _vec(3), rtol=1e-6)
+
+
+def test_lower_tiers_backfill_upper_tiers(tmp_path):
+    remote = DictTier()
+    key = embedding_key("remote only", MODEL)
+    remote.rows[(MODEL, key)] = _vec(4)
+    store = TieredEmbeddingStore(memory_size=4, db_path=str(tmp_path / "embedding.db"), remote=remote)
+
+    results, missing = store.get_many(["remote only", "nowhere", "remote only"], MODEL)
+    assert missing == [1]
+    np.testing.assert_allclose(results[0], _vec(4), rtol=1e-6)
+    assert remote.reads == [[key, embedding_key("nowhere", MODEL)]]
+    assert key in store.disk.get_many([key], MODEL)
+
+    store.clear_memory()
+    assert store.get("remote only", MODEL) is not None
+    assert len(remote.reads) == 1
+    stats = store.get_stats()
+    assert (stats["remote_hits"], stats["persistent_hits"], stats["misses"]) == (2, 1, 1)
+
+    store.put("written", _vec(5), MODEL)
+    assert (MODEL, embedding_key("written", MODEL)) in remote.rows
+    store.shutdown()
+
+
+def test_migration_merges_legacy_databases(tmp_path):
+    now = time.time()
+    legacy = tmp_path / "legacy.db"
+    with sqlite3.connect(legacy) as conn:
+        conn.execute(
+            "CREATE TABLE embedding_cache (text_hash TEXT PRIMARY KEY, embedding_json TEXT NOT NULL, "
+            "model TEXT NOT NULL, created_at REAL NOT NULL, access_count INTEGER DEFAULT 0, "
+            "last_accessed REAL DEFAULT 0.0)"
+        )
+        conn.executemany(
+            "INSERT INTO embedding_cache VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (embedding_key("old", MODEL), json.dumps(_vec(6)), MODEL, now - 100, 7, now - 50),
+                ("broken", "not json", MODEL, now, 0, now),
+            ],
+        )
+        conn.execute("CREATE TABLE cache_entries (key TEXT PRIMARY KEY, entry_data TEXT)")
+        conn.execute("INSERT INTO cache_entries VALUES ('md5', ?)", (json.dumps({"value": _vec(7)}),))
+
+    other = TieredEmbeddingStore(memory_size=4, db_path=str(tmp_path / "other.db"))
+    other.put("newer", _vec(8), MODEL)
+    other.shutdown()
+
+    target = str(tmp_path / "target.db")
+    sources = [str(legacy), str(tmp_path / "other.db")]
+    dry = migrate_embedding_caches(target, sources, dry_run=True)
+    assert dry["merged"] == 2 and dry["total"] == 0
+
+    report = migrate_embedding_caches(target, sources, drop_legacy=True)
+    assert report["merged"] == 2 and report["total"] == 2
+    entry = report["sources"][str(legacy)]
+    assert (entry["json_rows"], entry["invalid_rows"], entry["unaddressable_rows"]) == (1, 1, 1)
+    with sqlite3.connect(legacy) as conn:
+        assert "embedding_cache" not in {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+
+    assert migrate_embedding_caches(target, sources)["merged"] == 0
+
+    store = TieredEmbeddingStore(memory_size=4, db_path=target)
+    results, missing = store.get_many(["old", "newer"], MODEL)
+    assert missing == []
+    np.testing.assert_allclose(results[0], _vec(6), rtol=1e-6)
+    np.testing.assert_allclose(results[1], _vec(8), rtol=1e-6)
+    store.shutdown()
+
+
+def test_memory_hits_are_not_overwritten_by_backfill(tmp_path):
+    store = TieredEmbeddingStore(memory_size=2, db_path=str(tmp_path / "embedding.db"))
+    store.put_many(["a", "b", "c"], [_vec(1), _vec(2), _vec(3)], MODEL)
+    store.clear_memory()
+    assert store.get("a", MODEL) is not None
+
+    # "a" is a memory hit; backfilling "b" and "c" evicts it and reuses its slot.
+    results, missing = store.get_many(["a", "b", "c"], MODEL)
+    assert missing == []
+    for result, seed in zip(results, (1, 2, 3)):
+        np.testing.assert_allclose(result, _vec(seed), rtol=1e-6)
+    store.shutdown()
+
+
+def test_legacy_json_rows_migrate_on_first_read(tmp_path):
+    db_path = tmp_path / "embedding.db"
+    key = embedding_key("legacy text", MODEL)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE embedding_cache (text_hash TEXT PRIMARY KEY, embedding_json TEXT NOT NULL, "
+            "model TEXT NOT NULL, created_at REAL NOT NULL, access_count INTEGER DEFAULT 0, "
+            "last_accessed REAL DEFAULT 0.0)"
+        )
+        conn.execute(
+            "INSERT INTO embedding_cache VALUES (?, ?, ?, ?, 0, 0.0)", (key, json.dumps(_vec(9)), MODEL, time.time())
+        )
+
+    store = TieredEmbeddingStore(memory_size=4, db_path=str(db_path))
+    assert store.disk.has_legacy_table and store.disk.count() == 0
+    np.testing.assert_allclose(store.get("legacy text", MODEL), _vec(9), rtol=1e-6)
+    assert store.get_stats()["persistent_hits"] == 1
+    store.shutdown()
+
+    # The row now lives in the binary table and no longer needs the JSON fallback.
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT dtype, dim FROM embedding_vectors WHERE text_hash = ?", (key,)).fetchone() == (
+            "float32",
+            8,
+        )
+        conn.execute("DELETE FROM embedding_cache")
+    reopened = TieredEmbeddingStore(memory_size=4, db_path=str(db_path))
+    np.testing.assert_allclose(reopened.get("legacy text", MODEL), _vec(9), rtol=1e-6)
+    reopened.shutdown()
+
+
+def test_float16_vectors_round_trip_through_disk(tmp_path):
+    db_path = str(tmp_path / "embedding.db")
+    store = TieredEmbeddingStore(memory_size=4, storage="float16", db_path=db_path)
+    store.put("half", _vec(10), MODEL)
+    store.shutdown()
+
+    reopened = TieredEmbeddingStore(memory_size=4, storage="float16", db_path=db_path)
+    result = reopened.get("half", MODEL)
+    assert result.dtype == np.float16
+    np.testing.assert_allclose(result, _vec(10), atol=1e-3)
+    assert reopened.get_stats()["persistent_hits"] == 1
+    assert reopened.get("half", MODEL).dtype == np.float16  # served from the float16 slab
+    reopened.shutdown()
+
+    with sqlite3.connect(db_path) as conn:
+        dtype, blob = conn.execute("SELECT dtype, vector FROM embedding_vectors").fetchone()
+    assert dtype == "float16" and len(blob) == 8 * 2
+
+
+class FailingTier:
+    def get_many(self, keys, model):
+        raise ConnectionError("tier offline")
+
+    def put_many(self, items, model):
+        raise ConnectionError("tier offline")
+
+
+def test_failing_tiers_are_skipped(tmp_path, monkeypatch):
+    remote = DictTier()
+    store = TieredEmbeddingStore(memory_size=4, db_path=str(tmp_path / "embedding.db"), remote=FailingTier())
+    store.put("kept", _vec(11), MODEL)  # the remote write fails; memory and disk still get it
+    store.clear_memory()
+    np.testing.assert_allclose(store.get("kept", MODEL), _vec(11), rtol=1e-6)
+    assert store.get("unknown", MODEL) is None
+
+    # A failing disk read falls through to the remote tier.
+    store.remote = remote
+    remote.rows[(MODEL, embedding_key("remote", MODEL))] = _vec(12)
+    monkeypatch.setattr(store.disk, "get_many", FailingTier().get_many)
+    np.testing.assert_allclose(store.get("remote", MODEL), _vec(12), rtol=1e-6)
+    stats = store.get_stats()
+    assert (stats["persistent_hits"], stats["remote_hits"], stats["misses"]) == (1, 1, 1)
+    store.shutdown()
+
+
+def test_unified_cache_warns_that_ttl_is_ignored(shared_store):
+    cache = UnifiedEmbeddingCache(enable_persistent=False)
+    with pytest.warns(DeprecationWarning):
+        cache.set_embedding("ttl", _vec(13), MODEL, ttl=60)
+    with pytest.warns(DeprecationWarning):
+        cache.set_batch(["ttl batch"], [_vec(14)], MODEL, ttl=60)
+    assert cache.get_embedding("ttl", MODEL) is not None
+
+
+@pytest.mark.parametrize("storage, kind", [("list", list), ("float32", np.ndarray), ("float16", np.ndarray)])
+def test_lower_tier_hits_match_the_memory_representation(tmp_path, storage, kind):
+    remote = DictTier()
+    remote.rows[(MODEL, embedding_key("remote", MODEL))] = _vec(15)
+    store = TieredEmbeddingStore(memory_size=4, storage=storage, db_path=str(tmp_path / "e.db"), remote=remote)
+    store.put("disk", _vec(16), MODEL)
+    store.clear_memory()
+
+    results, missing = store.get_many(["disk", "remote"], MODEL)
+    again, _ = store.get_many(["disk", "remote"], MODEL)
+
+    assert missing == []
+    for first, memory_hit in zip(results, again):
+        assert type(first) is type(memory_hit) and isinstance(first, kind)
+        if kind is np.ndarray:
+            assert first.dtype == memory_hit.dtype == np.dtype(storage)
+    store.shutdown()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import sys
+import threading
+
+import pytest
+
+from app.services.interpreter import executor_pool
+from app.services.interpreter.code_executor import CodeExecutor
+from app.services.interpreter.executor_pool import SnippetWorkerPool, shutdown_snippet_pool
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="resource limits are POSIX only")
+
+
+@pytest.fixture
+def pool():
+    pool = SnippetWorkerPool(size=2, timeout=10, cpu_seconds=30, memory_mb=512, preload=("numpy",))
+    yield pool
+    pool.close()
+
+
+def test_concurrent_calls_capture_their_own_output(pool):
+    code = "def run(tag):\n    for _ in range(200):\n        print(tag)\n    return tag\n"
+    results = {}
+
+    def call(tag):
+        results[tag] = pool.execute(code, function_name="run", function_args=(tag,))
+
+    threads = [threading.Thread(target=call, args=(f"t{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for tag, response in results.items():
+        assert response["success"] and response["result"] == tag
+        assert set(response["stdout"].split()) == {tag}
+
+
+def test_results_are_json_with_numpy_values(pool):
+    code = "import numpy as np\ndef run(n):\n    a = np.arange(n)\n    return {'sum': a.sum(), 'head': a[:3]}\n"
+
+    response = pool.execute(code, function_name="run", function_kwargs={"n": 5})
+
+    assert response["result"] == {"sum": 10, "head": [0, 1, 2]}
+
+
+def test_timeout_kills_and_replaces_worker(pool):
+    response = pool.execute("import time\ntime.sleep(30)", timeout=0.5)
+    assert response["error_type"] == "TimeoutError"
+
+    assert pool.execute("x = 1 + 1")["success"]
+    assert pool.stats["timeouts"] == 1
+
+
+def test_cpu_and_memory_limits_are_reported(pool):
+    spin = pool.execute("while True:\n    pass", cpu_seconds=1)
+    assert spin["error_type"] == "CpuLimitExceeded"
+
+    hog = pool.execute("block = bytearray(2 * 1024 ** 3)")
+    assert hog["error_type"] == "MemoryError"
+
+    # The same worker keeps serving after the CPU limit was raised again.
+    assert pool.execute("def f():\n    return sum(range(10 ** 6))", function_name="f")["success"]
+
+
+def test_crash_and_exit_do_not_take_down_the_pool(pool):
+    exited = pool.execute("raise SystemExit(3)")
+    assert exited["error_type"] == "SystemExit"
+
+    crashed = pool.execute("import os\nos._exit(7)")
+    assert crashed["error_type"] == "WorkerCrashed" and "7" in crashed["error_message"]
+    assert pool.execute("y = 2")["success"]
+    assert pool.stats["crashes"] == 1
+
+
+def test_code_executor_modes(monkeypatch):
+    code = "def parse_file(path):\n    print('parsing', path)\n    return {'path': path}\n"
+
+    monkeypatch.setattr(CodeExecutor, "mode", "inprocess")
+    inprocess = CodeExecutor.execute_with_file(code, "/tmp/data.csv")
+    # Process mode never falls back to in-process exec, even for arguments it cannot send.
+    monkeypatch.setattr(CodeExecutor, "mode", "process")
+    try:
+        rejected = CodeExecutor.execute("def f(x):\n    return type(x).__name__", function_name="f", function_args=(object(),))
+    finally:
+        shutdown_snippet_pool()
+
+    assert inprocess.result == {"path": "/tmp/data.csv"} and inprocess.stdout == "parsing /tmp/data.csv\n"
+    assert not rejected.success and rejected.error_type == "TypeError"
+
+
+def test_slow_worker_start_is_killed_and_reported(pool, monkeypatch, tmp_path):
+    script = tmp_path / "slow_worker.py"
+    script.write_text("import time\ntime.sleep(30)\n")
+    monkeypatch.setattr(executor_pool, "_WORKER_SCRIPT", str(script))
+    for worker in pool._workers:
+        worker.startup_timeout = 0.5
+
+    response = pool.execute("x = 1")
+
+    assert response["error_type"] == "WorkerUnavailable" and "did not start" in response["error_message"]
+    assert all(worker.pid is None for worker in pool._workers)
+
+
+def test_code_executor_does_not_run_in_process_when_workers_are_unavailable(monkeypatch, tmp_path):
+    closed = SnippetWorkerPool(size=1)
+    closed.close()
+    monkeypatch.setattr(CodeExecutor, "mode", "process")
+    monkeypatch.setattr(executor_pool, "get_snippet_pool", lambda: closed)
+    marker = tmp_path / "ran"
+
+    result = CodeExecutor.execute(f"open({str(marker)!r}, 'w').close()")
+
+    assert not result.success and result.error_type == "WorkerUnavailable"
+    assert not marker.exists()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+
+from app.repository.plan_repository import PlanRepository
+from app.repository.plan_storage import load_decomposition_job
+from app.services.plans.decomposition_jobs import PlanDecompositionJobManager
+from app.services.plans.job_log_writer import JobLogWriter
+
+
+class _ImmediateLoop:
+    """Stands in for an event loop; delivers subscriber payloads synchronously."""
+
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
+
+
+def _drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_many_concurrent_jobs_persist_every_line_in_order(plan_repo: PlanRepository):
+    writer = JobLogWriter(batch_size=25, flush_interval=0.02)
+    manager = PlanDecompositionJobManager(log_writer=writer)
+    plans = [plan_repo.create_plan(f"Log Plan {i}") for i in range(4)]
+    jobs = [
+        manager.create_job(plan_id=plans[i % len(plans)].id, task_id=None, mode="plan_bfs")
+        for i in range(16)
+    ]
+    queues = {job.job_id: manager.register_subscriber(job.job_id, _ImmediateLoop()) for job in jobs}
+    lines_per_job = 120
+    start = threading.Barrier(len(jobs))
+
+    def run(job_id):
+        start.wait()
+        for i in range(lines_per_job):
+            manager.append_log(job_id, "info", f"line {i}", {"i": i})
+
+    threads = [threading.Thread(target=run, args=(job.job_id,)) for job in jobs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Subscribers saw every event, in order, before anything was forced to disk.
+    for job in jobs:
+        events = _drain(queues[job.job_id])
+        assert [e["event"]["metadata"]["i"] for e in events] == list(range(lines_per_job))
+
+    manager.shutdown()
+
+    for job in jobs:
+        record = load_decomposition_job(job.plan_id, job.job_id)
+        assert [log["message"] for log in record["logs"]] == [f"line {i}" for i in range(lines_per_job)]
+    stats = manager.get_log_writer_stats()
+    total = len(jobs) * lines_per_job
+    assert stats["written"] == total and stats["pending"] == 0 and stats["failed"] == 0
+    assert stats["batches"] < total / 10
+
+
+def test_slow_disk_does_not_block_logging_or_subscribers():
+    released = threading.Event()
+    written = []
+
+    def slow_writer(plan_id, entries):
+        released.wait(5)
+        written.extend(entry["message"] for entry in entries)
+
+    writer = JobLogWriter(batch_size=1, flush_interval=0.01, writer=slow_writer)
+    manager = PlanDecompositionJobManager(log_writer=writer)
+    job = manager.create_job(plan_id=None, task_id=None, mode="single_node")
+    queue = manager.register_subscriber(job.job_id, _ImmediateLoop())
+
+    for i in range(50):
+        manager.append_log(job.job_id, "info", f"line {i}")
+
+    assert len(_drain(queue)) == 50
+    assert written == []
+
+    released.set()
+    manager.shutdown()
+    assert written == [f"line {i}" for i in range(50)]
+
+    # After shutdown, lines are written synchronously.
+    manager.append_log(job.job_id, "info", "late")
+    assert written[-1] == "late"
+
+
+def test_finishing_a_job_flushes_its_plan(plan_repo: PlanRepository):
+    manager = PlanDecompositionJobManager(
+        log_writer=JobLogWriter(batch_size=1000, flush_interval=60)
+    )
+    plan = plan_repo.create_plan("Finish Plan")
+    job = manager.create_job(plan_id=plan.id, task_id=None, mode="plan_bfs")
+    manager.append_log(job.job_id, "info", "working")
+
+    manager.mark_success(job.job_id, result=None)
+
+    record = load_decomposition_job(plan.id, job.job_id)
+    assert [log["message"] for log in record["logs"]] == ["working"]
+    manager.shutdown()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.plans.decomposition_jobs import (
+    PlanDecompositionJobManager,
+    execute_decomposition_job,
+    is_current_job_cancelled,
+    plan_decomposition_jobs,
+)
+from app.services.plans.job_log_writer import JobLogWriter
+from app.services.plans.job_scheduler import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    JobQueueFullError,
+    JobScheduler,
+)
+from app.services.plans.plan_decomposer import DecompositionResult
+
+
+@pytest.fixture
+def manager():
+    manager = PlanDecompositionJobManager(log_writer=JobLogWriter(flush_interval=0))
+    yield manager
+    manager.shutdown()
+
+
+def _job(manager, mode="plan_bfs"):
+    return manager.create_job(plan_id=None, task_id=None, mode=mode).job_id
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_priorities_order_queued_jobs(manager):
+    scheduler = JobScheduler(max_workers=1, manager=manager)
+    gate = threading.Event()
+    order = []
+    scheduler.submit(_job(manager), gate.wait, args=(5,))
+    _wait_until(lambda: scheduler.get_metrics()["running"] == 1)
+    for name, priority in [("low", PRIORITY_LOW), ("normal", PRIORITY_NORMAL), ("high", PRIORITY_HIGH), ("normal2", PRIORITY_NORMAL)]:
+        scheduler.submit(_job(manager), order.append, args=(name,), priority=priority)
+
+    metrics = scheduler.get_metrics()
+    assert metrics["running"] == 1 and metrics["queued"] == 4
+    assert metrics["queued_by_priority"] == {"10": 1, "5": 2, "0": 1}
+
+    gate.set()
+    _wait_until(lambda: len(order) == 4)
+    assert order == ["high", "normal", "normal2", "low"]
+    scheduler.shutdown(wait=True)
+    assert scheduler.get_metrics()["completed"] == 5
+
+
+def test_jobs_for_one_plan_never_overlap(manager):
+    scheduler = JobScheduler(max_workers=4, manager=manager)
+    lock = threading.Lock()
+    active = {1: 0, 2: 0}
+    peak = {1: 0, 2: 0}
+    overlap = threading.Event()
+
+    def work(plan_id):
+        with lock:
+            active[plan_id] += 1
+            peak[plan_id] = max(peak[plan_id], active[plan_id])
+            if active[1] and active[2]:
+                overlap.set()
+        time.sleep(0.05)
+        with lock:
+            active[plan_id] -= 1
+
+    for plan_id in (1, 1, 1, 2, 2):
+        scheduler.submit(_job(manager), work, args=(plan_id,), plan_id=plan_id)
+    scheduler.shutdown(cancel_pending=False, wait=True)
+
+    assert peak == {1: 1, 2: 1}
+    assert overlap.is_set()  # different plans still run in parallel
+
+
+def test_cancel_queued_and_running_jobs():
+    # execute_decomposition_job reports to the process-wide manager.
+    manager = plan_decomposition_jobs
+    scheduler = JobScheduler(max_workers=1, manager=manager)
+    started = threading.Event()
+
+    class CancellableDecomposer:
+        def run_plan(self, plan_id, **kwargs):
+            started.set()
+            _wait_until(is_current_job_cancelled)
+            return DecompositionResult(plan_id=plan_id, mode="plan_bfs", stopped_reason="cancelled")
+
+    running_id = _job(manager)
+    scheduler.submit(
+        running_id,
+        execute_decomposition_job,
+        kwargs={"plan_decomposer": CancellableDecomposer(), "job_id": running_id, "plan_id": 7, "mode": "plan_bfs"},
+        plan_id=7,
+    )
+    queued_id = _job(manager)
+    ran = []
+    hooks = []
+    scheduler.submit(queued_id, ran.append, args=("queued",), plan_id=7, on_cancel=lambda: hooks.append("x"))
+    queue = manager.register_subscriber(queued_id, _ImmediateLoop())
+    started.wait(5)
+
+    assert scheduler.cancel(queued_id) == "cancelled"
+    assert manager.get_job(queued_id).status == "cancelled" and hooks == ["x"]
+    assert queue.get_nowait()["status"] == "cancelled"
+
+    assert scheduler.cancel(running_id) == "cancelling"
+    _wait_until(lambda: manager.get_job(running_id).status == "cancelled")
+    scheduler.shutdown(wait=True)
+    assert ran == []
+    assert scheduler.cancel(running_id) is None
+
+
+def test_full_queue_rejects_and_fails_job(manager):
+    scheduler = JobScheduler(max_workers=1, max_queue=1, manager=manager)
+    gate = threading.Event()
+    scheduler.submit(_job(manager), gate.wait, args=(5,))
+    _wait_until(lambda: scheduler.get_metrics()["running"] == 1)
+    scheduler.submit(_job(manager), lambda: None)
+
+    rejected = _job(manager)
+    with pytest.raises(JobQueueFullError):
+        scheduler.submit(rejected, lambda: None)
+
+    assert manager.get_job(rejected).status == "failed"
+    assert scheduler.get_metrics()["rejected"] == 1
+    gate.set()
+    scheduler.shutdown(cancel_pending=False, wait=True)
+
+
+def test_coroutine_jobs_run_on_the_submitting_loop(manager):
+    scheduler = JobScheduler(max_workers=2, manager=manager)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        done = asyncio.Event()
+        seen = []
+
+        async def action():
+            seen.append(asyncio.get_running_loop() is loop)
+            done.set()
+
+        scheduler.submit(_job(manager, mode="assistant"), action)
+        await asyncio.wait_for(done.wait(), 5)
+        return seen
+
+    assert asyncio.run(scenario()) == [True]
+    scheduler.shutdown(wait=True)
+
+
+class _ImmediateLoop:
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.llm.rate_limiter import ProviderRateLimiter, get_rate_limiter, reset_rate_limiters
+
+
+def test_request_budget_allows_a_burst_then_paces():
+    limiter = ProviderRateLimiter("t", rpm=600, burst_seconds=1.0)  # 10/s, bucket of 10
+
+    start = time.monotonic()
+    for _ in range(10):
+        assert limiter.acquire() == 0.0
+    assert time.monotonic() - start < 0.05
+
+    waited = limiter.acquire()
+    assert 0.05 < waited <= 0.2
+    stats = limiter.get_stats()
+    assert stats["requests"] == 11 and stats["waits"] == 1
+    assert stats["request_utilization"] == pytest.approx(11 / 600, abs=1e-3)
+
+
+def test_token_reservations_are_settled_against_usage():
+    limiter = ProviderRateLimiter("t", tpm=6000, burst_seconds=1.0)  # bucket of 100 tokens
+
+    limiter.acquire(100)
+    limiter.record_success(reserved_tokens=100, used_tokens=20)
+    # The unused 80 tokens were handed back, so this does not wait.
+    assert limiter.acquire(60) == 0.0
+    assert limiter.get_stats()["tokens_last_minute"] == 80
+
+    # A failed request refunds its whole reservation.
+    limiter.record_failure(400, reserved_tokens=60)
+    assert limiter.acquire(60) == 0.0
+
+
+def test_throttling_decreases_multiplicatively_and_recovers_additively():
+    limiter = ProviderRateLimiter("t", rpm=1200, tpm=60000, increase_step=0.1, cooldown=60)
+
+    limiter.record_failure(429)
+    limiter.record_failure(503)  # same burst of failures, inside the cooldown
+    stats = limiter.get_stats()
+    assert stats["factor"] == 0.5 and stats["throttled"] == 2
+    assert (stats["effective_rpm"], stats["effective_tpm"]) == (600, 30000)
+
+    limiter.record_failure(400)  # client errors are not a rate signal
+    assert limiter.get_stats()["throttled"] == 2
+
+    for _ in range(3):
+        limiter.record_success()
+    assert limiter.get_stats()["factor"] == pytest.approx(0.8)
+    for _ in range(5):
+        limiter.record_success()
+    assert limiter.get_stats()["factor"] == 1.0
+
+
+def test_retry_after_pauses_the_provider():
+    limiter = ProviderRateLimiter("t", rpm=60000)
+    limiter.record_failure(429, retry_after=0.2)
+
+    async def _acquire():
+        return await limiter.acquire_async()
+
+    assert 0.1 < asyncio.run(_acquire()) <= 0.3
+
+
+def test_unlimited_provider_learns_a_budget_only_from_429():
+    limiter = ProviderRateLimiter("t")
+    for _ in range(40):
+        limiter.acquire(50)
+
+    limiter.record_failure(503)
+    assert limiter.get_stats()["effective_rpm"] is None
+
+    limiter.record_failure(429)
+    stats = limiter.get_stats()
+    assert (stats["learned_rpm"], stats["learned_tpm"]) == (40, 2000)
+    assert (stats["effective_rpm"], stats["effective_tpm"]) == (20, 1000)
+
+
+def test_limiters_are_shared_per_provider(monkeypatch):
+    reset_rate_limiters()
+    monkeypatch.setenv("UNITPROV_RATE_RPM", "120")
+    try:
+        limiter = get_rate_limiter("UnitProv")
+        assert get_rate_limiter("unitprov") is limiter
+        assert limiter.get_stats()["configured_rpm"] == 120
+        assert get_rate_limiter("other").get_stats()["configured_rpm"] is None
+    finally:
+        reset_rate_limiters()
+
+
+class _FakeResponse:
+    def __init__(self, status, body, headers=None):
+        self.status = status
+        self._body = body
+        self.headers = headers or {}
+
+    async def text(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeSession:
+    responses: list = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def post(self, *args, **kwargs):
+        return type(self).responses.pop(0)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_web_search_provider_feeds_throttling_back_to_limiter(monkeypatch):
+    from types import SimpleNamespace
+
+    from tool_box.tools_impl.web_search.exceptions import WebSearchError
+    from tool_box.tools_impl.web_search.providers import perplexity
+
+    reset_rate_limiters()
+    monkeypatch.setattr(perplexity.aiohttp, "ClientSession", _FakeSession)
+    settings = SimpleNamespace(
+        perplexity_api_key="k", perplexity_api_url="http://x", perplexity_model="m", perplexity_timeout=5
+    )
+    _FakeSession.responses = [
+        _FakeResponse(429, "slow down", {"Retry-After": "0.2"}),
+        _FakeResponse(200, '{"choices": [{"message": {"content": "ok"}}], "usage": {"total_tokens": 30}}'),
+    ]
+    try:
+        with pytest.raises(WebSearchError):
+            asyncio.run(perplexity.search(query="q", max_results=3, settings=settings))
+        stats = get_rate_limiter("perplexity").get_stats()
+        assert stats["requests"] == 1 and stats["throttled"] == 1
+        assert stats["blocked_for_seconds"] > 0
+
+        result = asyncio.run(perplexity.search(query="q", max_results=3, settings=settings))
+        assert result.response == "ok"
+        stats = get_rate_limiter("perplexity").get_stats()
+        assert stats["requests"] == 2 and stats["waits"] == 1
+    finally:
+        reset_rate_limiters()
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app.llm as llm_module
+from app.llm import LLMClient
+from app.services.llm.llm_service import LLMService
+from app.services.llm.response_cache import LLMResponseCache, make_key
+
+
+class _SlowTransport:
+    """Counts upstream calls and holds each one open long enough for duplicates to pile up."""
+
+    def __init__(self, delay: float = 0.1) -> None:
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def _reply(self, payload):
+        with self.lock:
+            self.calls += 1
+        prompt = payload["messages"][0]["content"][0]["text"]
+        return {"choices": [{"message": {"content": f"echo:{prompt}"}}], "usage": {"total_tokens": 7}}
+
+    def post_json(self, url, payload, headers, timeout):
+        time.sleep(self.delay)
+        return self._reply(payload)
+
+    async def post_json_async(self, url, payload, headers, timeout):
+        await asyncio.sleep(self.delay)
+        return self._reply(payload)
+
+
+@pytest.fixture()
+def transport(monkeypatch):
+    fake = _SlowTransport()
+    monkeypatch.setattr(llm_module, "get_transport", lambda url: fake)
+    return fake
+
+
+def _client(**kwargs) -> LLMClient:
+    return LLMClient(provider="qwen", api_key="unit-test-key", url="http://stub/v1", retries=0, **kwargs)
+
+
+def test_cache_is_opt_in(transport):
+    client = _client()
+    client.chat("hi")
+    client.chat("hi")
+    assert transport.calls == 2
+    assert client.get_stats()["cache"] is None
+
+
+def test_client_serves_repeats_from_cache_and_honours_bypass(transport):
+    client = _client(cache=LLMResponseCache())
+
+    assert client.chat("hello  \r\nworld") == "echo:hello  \r\nworld"
+    assert client.chat("hello\nworld\n") == "echo:hello  \r\nworld"  # normalized prompt hits
+    assert client.chat("hello\nworld", model="qwen-max") == "echo:hello\nworld"  # model is part of the key
+    assert client.chat("hello\nworld", use_cache=False) == "echo:hello\nworld"
+
+    stats = client.get_stats()["cache"]
+    assert transport.calls == 3
+    assert (stats["hits"], stats["misses"], stats["bypassed"]) == (1, 2, 1)
+    assert stats["saved_tokens"] == 7
+
+
+def test_concurrent_identical_requests_share_one_upstream_call(transport):
+    client = _client(cache=LLMResponseCache())
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        replies = list(pool.map(client.chat, ["same"] * 8))
+
+    async def _run():
+        return await asyncio.gather(*(client.chat_async("other") for _ in range(5)))
+
+    assert replies == ["echo:same"] * 8
+    assert asyncio.run(_run()) == ["echo:other"] * 5
+    stats = client.get_stats()["cache"]
+    assert transport.calls == 2
+    assert stats["misses"] == 2 and stats["coalesced"] == 11
+    assert stats["saved_tokens"] == 7 * 11
+
+
+def test_failures_reach_waiters_but_are_not_cached():
+    cache = LLMResponseCache()
+    calls = []
+
+    def _boom():
+        calls.append(1)
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(cache.get_or_compute, "k", _boom) for _ in range(4)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="upstream down"):
+            future.result()
+    assert len(calls) == 1
+
+    assert cache.get_or_compute("k", lambda: ("ok", 1)) == "ok"
+
+
+def test_ttl_and_lru_bounds():
+    cache = LLMResponseCache(max_entries=2, ttl_seconds=0.05)
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(key, lambda key=key: (key, 1))
+    assert cache.get_stats()["evictions"] == 1
+
+    time.sleep(0.06)
+    assert cache.get_or_compute("c", lambda: ("fresh", 1)) == "fresh"
+    stats = cache.get_stats()
+    assert stats["expirations"] == 1 and stats["size"] == 2
+
+
+def test_service_caches_plain_clients_and_defers_to_caching_clients(transport):
+    class _PlainClient:
+        provider = "plain"
+        model = "m"
+
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def chat(self, prompt, **kwargs):
+            self.calls += 1
+            return f"{prompt}:{kwargs.get('temperature')}"
+
+    plain = _PlainClient()
+    service = LLMService(client=plain, cache=LLMResponseCache())
+    assert service.chat("q", temperature=0.1) == service.chat("q", temperature=0.1) == "q:0.1"
+    assert service.chat("q", temperature=0.9) == "q:0.9"
+    assert plain.calls == 2
+    assert service.get_stats()["cache"]["hits"] == 1
+
+    client = _client(cache=LLMResponseCache())
+    wrapped = LLMService(client=client, use_cache=True)
+    assert wrapped.cache is None  # the client's cache is used, not a second layer
+    wrapped.chat("x")
+    wrapped.chat("x")
+    wrapped.chat("x", use_cache=False)
+    assert transport.calls == 2
+    assert wrapped.get_stats()["cache"]["hits"] == 1
+
+
+def test_key_covers_provider_model_and_payload_defaults():
+    base = make_key("glm", "m", "p", {"temperature": 0})
+    assert base == make_key("glm", "m", " p \n", {"temperature": 0})
+    assert base != make_key("qwen", "m", "p", {"temperature": 0})
+    assert base != make_key("glm", "m2", "p", {"temperature": 0})
+    assert base != make_key("glm", "m", "p", {"temperature": 1})
+    assert base != make_key("glm", "m", "P", {"temperature": 0})
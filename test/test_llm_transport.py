@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.llm import LLMClient
+from app.services.llm import http_transport
+from app.services.llm.llm_service import LLMService
+from app.services.llm.rate_limiter import ProviderRateLimiter
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:  # pragma: no cover - silence test output
+        pass
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.lock:
+            self.server.requests += 1
+            status = self.server.statuses.pop(0) if self.server.statuses else 200
+
+        if status != 200:
+            body = b'{"error": "stub"}'
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if payload.get("stream"):
+            chunks = [
+                {"choices": [{"delta": {"content": part}}]} for part in ("Hel", "lo", "!")
+            ]
+            body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+            encoded = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+            return
+
+        prompt = payload["messages"][0]["content"][0]["text"]
+        body = json.dumps({"choices": [{"message": {"content": f"echo:{prompt}"}}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture()
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.requests = 0
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    http_transport.close_transports()
+    try:
+        yield server
+    finally:
+        http_transport.close_transports()
+        server.shutdown()
+        server.server_close()
+
+
+def _client(server) -> LLMClient:
+    host, port = server.server_address
+    return LLMClient(
+        provider="qwen",
+        api_key="unit-test-key",
+        url=f"http://{host}:{port}/v1/chat/completions",
+        retries=2,
+        backoff_base=0.0,
+    )
+
+
+def test_chat_reuses_pooled_connection(stub_server):
+    client = _client(stub_server)
+
+    replies = [client.chat(f"p{i}") for i in range(5)]
+
+    assert replies == [f"echo:p{i}" for i in range(5)]
+    assert stub_server.requests == 5
+    assert stub_server.connections == 1
+
+
+def test_chat_async_is_picked_up_by_llm_service(stub_server):
+    service = LLMService(client=_client(stub_server))
+
+    async def _run():
+        return await asyncio.gather(*(service.chat_async(f"a{i}") for i in range(4)))
+
+    assert asyncio.run(_run()) == [f"echo:a{i}" for i in range(4)]
+
+
+def test_chat_stream_yields_incremental_deltas(stub_server):
+    client = _client(stub_server)
+
+    assert list(client.chat_stream("hi")) == ["Hel", "lo", "!"]
+
+    async def _collect():
+        service = LLMService(client=client)
+        return [delta async for delta in service.stream_chat_async("hi")]
+
+    assert asyncio.run(_collect()) == ["Hel", "lo", "!"]
+
+
+def test_chat_retries_server_errors_but_not_client_errors(stub_server):
+    client = _client(stub_server)
+
+    stub_server.statuses = [503, 502]
+    assert client.chat("again") == "echo:again"
+    assert stub_server.requests == 3
+
+    stub_server.statuses = [400]
+    with pytest.raises(RuntimeError, match="LLM HTTPError: 400"):
+        client.chat("bad")
+    assert stub_server.requests == 4
+
+
+def test_throttling_is_reported_to_the_rate_limiter(stub_server):
+    client = _client(stub_server)
+    client.rate_limiter = ProviderRateLimiter("stub", rpm=6000)
+
+    stub_server.statuses = [429]
+    assert client.chat("slow down") == "echo:slow down"
+    assert stub_server.requests == 2
+
+    stats = client.get_stats()["rate_limit"]
+    assert stats["throttled"] == 1 and stats["requests"] == 2
+    assert stats["factor"] == pytest.approx(0.52)  # halved, then one success
@@ -0,0 +1,123 @@
+import asyncio
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+
+from app.models_memory import ImportanceLevel, MemoryType, QueryMemoryRequest, SaveMemoryRequest
+from app.services.memory import memory_service as ms
+
+_VOCAB = ("apple", "banana", "cherry", "durian")
+
+
+class _BagOfWordsEmb:
+    """Deterministic embeddings: one dimension per vocabulary word."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_single_embedding(self, text):
+        self.calls += 1
+        lowered = text.lower()
+        return [float(lowered.count(word)) for word in _VOCAB] + [0.01]
+
+    def compute_similarity(self, a, b):  # pragma: no cover - must not be used per row
+        raise AssertionError("semantic search should not score rows one by one")
+
+
+class _DummyLLM:
+    def chat(self, *args, **kwargs):
+        return {"content": "{}"}
+
+
+async def _dummy_analyze(self, content):
+    return {"keywords": [], "context": "General", "tags": []}
+
+
+@pytest.fixture()
+def memory_service(monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+
+    @contextmanager
+    def _fake_db():
+        yield conn
+
+    monkeypatch.setattr(ms, "get_db", _fake_db)
+    monkeypatch.setattr(ms, "get_default_client", lambda: _DummyLLM())
+    monkeypatch.setattr(ms, "get_embeddings_service", lambda: _BagOfWordsEmb())
+    monkeypatch.setattr(ms.IntegratedMemoryService, "_analyze_content", _dummy_analyze)
+    monkeypatch.setattr(ms.IntegratedMemoryService, "_get_conn", lambda self, session_id: _fake_db())
+    return ms.IntegratedMemoryService()
+
+
+def _save(svc, content, **kwargs):
+    request = SaveMemoryRequest(
+        content=content,
+        memory_type=kwargs.pop("memory_type", MemoryType.KNOWLEDGE),
+        importance=kwargs.pop("importance", ImportanceLevel.MEDIUM),
+        keywords=["k"],
+        context="unit",
+        tags=kwargs.pop("tags", ["t"]),
+        **kwargs,
+    )
+    return asyncio.run(svc.save_memory(request)).memory_id
+
+
+def _query(svc, text, **kwargs):
+    request = QueryMemoryRequest(search_text=text, min_similarity=kwargs.pop("min_similarity", 0.0), **kwargs)
+    return asyncio.run(svc.query_memory(request)).memories
+
+
+def test_index_is_built_once_and_updated_incrementally(memory_service):
+    apple = _save(memory_service, "apple apple pie")
+    banana = _save(memory_service, "banana bread")
+    cherry = _save(memory_service, "cherry tart with apple")
+
+    hits = _query(memory_service, "apple", limit=2)
+
+    assert [m.memory_id for m in hits] == [apple, cherry]
+    assert hits[0].similarity > hits[1].similarity
+    stats = memory_service.vector_index.stats()
+    # Built lazily by the first save's related-memory lookup, then only appended to.
+    assert stats["builds"] == 1
+    assert stats["appends"] == 2
+    assert stats["rows"] == 3
+    assert banana not in [m.memory_id for m in hits]
+
+
+def test_index_applies_type_importance_and_session_masks(memory_service):
+    knowledge = _save(memory_service, "apple orchard", session_id="s1")
+    _save(memory_service, "apple juice", memory_type=MemoryType.EXPERIENCE, session_id="s1")
+    _save(memory_service, "apple cider", importance=ImportanceLevel.LOW, session_id="s1")
+    _save(memory_service, "apple crumble", session_id="s2", plan_id=7)
+
+    by_type = _query(memory_service, "apple", memory_types=[MemoryType.EXPERIENCE])
+    assert [m.content for m in by_type] == ["apple juice"]
+
+    by_importance = _query(memory_service, "apple", importance_levels=[ImportanceLevel.LOW])
+    assert [m.content for m in by_importance] == ["apple cider"]
+
+    by_plan = _query(memory_service, "apple", plan_id=7)
+    assert [m.content for m in by_plan] == ["apple crumble"]
+
+    combined = _query(
+        memory_service,
+        "apple",
+        memory_types=[MemoryType.KNOWLEDGE],
+        importance_levels=[ImportanceLevel.MEDIUM],
+        session_id="s1",
+    )
+    assert [m.memory_id for m in combined] == [knowledge]
+
+
+def test_delete_invalidates_index(memory_service):
+    keep = _save(memory_service, "durian durian")
+    drop = _save(memory_service, "durian")
+    assert {m.memory_id for m in _query(memory_service, "durian")} == {keep, drop}
+
+    assert asyncio.run(memory_service.delete_memory(drop))
+    assert not memory_service.vector_index.is_loaded("main")
+
+    assert [m.memory_id for m in _query(memory_service, "durian")] == [keep]
+    assert memory_service.vector_index.stats()["builds"] == 2
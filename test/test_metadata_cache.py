@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+from app.services.interpreter.code_executor import CodeExecutor
+from app.services.interpreter.metadata import LLMMetadataParser
+from app.services.interpreter.metadata_cache import MetadataCache
+
+_PARSER_CODE = """```python
+def parse_file(file_path):
+    with open(file_path) as f:
+        rows = f.read().splitlines()
+    return {"file_type": "tabular", "total_rows": len(rows) - 1}
+```"""
+
+
+class _CountingLLM:
+    """Returns fixed parser code; records how many prompts ran at the same time."""
+
+    def __init__(self, reply: str = _PARSER_CODE, delay: float = 0.0) -> None:
+        self.reply = reply
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def chat(self, prompt, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return self.reply
+
+
+def _parser(llm, **kwargs) -> LLMMetadataParser:
+    # The native csv fast path would bypass the LLM; these tests cover the LLM path.
+    return LLMMetadataParser(llm, native=False, **kwargs)
+
+
+def _write_csvs(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"data_{i}.csv"
+        path.write_text("a,b\n" + "1,2\n" * (i + 1))
+        paths.append(str(path))
+    return paths
+
+
+def test_unchanged_files_skip_llm_across_parsers(tmp_path):
+    paths = _write_csvs(tmp_path, 3)
+    db_path = str(tmp_path / "metadata_cache.db")
+
+    first_llm = _CountingLLM()
+    first = _parser(first_llm, cache=MetadataCache(db_path, prompt_version="v1")).parse_many(paths)
+    assert [m.parsed_content["total_rows"] for m in first] == [1, 2, 3]
+    assert first_llm.calls == 3
+
+    # A new run (fresh parser and cache object) reuses the stored results.
+    cache = MetadataCache(db_path, prompt_version="v1")
+    second_llm = _CountingLLM()
+    second = _parser(second_llm, cache=cache).parse_many(paths)
+    assert [m.parsed_content for m in second] == [m.parsed_content for m in first]
+    assert second_llm.calls == 0
+    assert cache.stats["hits"] == 3 and cache.stats["hashed"] == 0
+
+    # Editing one file only re-parses that file; a new prompt version misses everything.
+    with open(paths[1], "a") as f:
+        f.write("5,6\n")
+    os.utime(paths[1], ns=(time.time_ns(), time.time_ns() + 1_000_000))
+    _parser(second_llm, cache=cache).parse_many(paths)
+    assert second_llm.calls == 1
+
+    bumped_llm = _CountingLLM()
+    _parser(bumped_llm, cache=MetadataCache(db_path, prompt_version="v2")).parse(paths[0])
+    assert bumped_llm.calls == 1
+
+
+def test_content_hash_hits_for_copied_file(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    original = tmp_path / "a" / "data.csv"
+    copy = tmp_path / "b" / "data.csv"
+    original.write_text("x\n1\n2\n")
+    copy.write_text("x\n1\n2\n")
+    cache = MetadataCache(str(tmp_path / "cache.db"), prompt_version="v1")
+
+    llm = _CountingLLM()
+    parser = _parser(llm, cache=cache)
+    parser.parse(str(original))
+    copied = parser.parse(str(copy))
+
+    assert llm.calls == 1
+    assert copied.file_path == str(copy)
+    assert copied.parsed_content == {"file_type": "tabular", "total_rows": 2}
+
+
+def test_failed_parses_are_not_cached(tmp_path):
+    (path,) = _write_csvs(tmp_path, 1)
+    cache = MetadataCache(str(tmp_path / "cache.db"), prompt_version="v1")
+    broken = _CountingLLM(reply="```python\ndef parse_file(file_path):\n    raise ValueError('bad')\n```")
+
+    result = _parser(broken, cache=cache).parse(path, max_attempts=1)
+    assert result.parsed_content["error"] == "bad"
+
+    llm = _CountingLLM()
+    _parser(llm, cache=cache).parse(path)
+    assert llm.calls == 1 and cache.stats["stores"] == 1
+
+
+def test_cache_misses_are_parsed_concurrently_in_order(tmp_path, monkeypatch):
+    # Keep worker process start-up out of the timing assertion.
+    monkeypatch.setattr(CodeExecutor, "mode", "inprocess")
+    paths = _write_csvs(tmp_path, 8)
+    llm = _CountingLLM(delay=0.2)
+    parser = _parser(llm, use_cache=False)
+
+    start = time.perf_counter()
+    results = parser.parse_many(paths, max_workers=4)
+    elapsed = time.perf_counter() - start
+
+    assert [m.filename for m in results] == [f"data_{i}.csv" for i in range(8)]
+    assert [m.parsed_content["total_rows"] for m in results] == list(range(1, 9))
+    assert llm.peak == 4
+    assert elapsed < 8 * 0.2
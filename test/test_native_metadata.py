@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.services.interpreter.metadata import FileMetadataExtractor, LLMMetadataParser
+from app.services.interpreter.native_metadata import NativeMetadataParser
+
+
+class _FailingLLM:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def chat(self, prompt, **kwargs):
+        self.calls += 1
+        return "```python\ndef parse_file(file_path):\n    return {'file_type': 'llm'}\n```"
+
+
+def _write_csv(path, rows: int, sep: str = ",") -> None:
+    lines = [sep.join(["id", "score", "label"])]
+    for i in range(rows):
+        # score is missing every 10th row and only non-integer late in the file
+        score = "" if i % 10 == 0 else (f"{i}.5" if i >= rows - 5 else str(i))
+        lines.append(sep.join([str(i), score, f"l{i % 3}"]))
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_csv_streams_chunks_and_merges_column_stats(tmp_path, monkeypatch):
+    monkeypatch.setattr(NativeMetadataParser, "CHUNK_ROWS", 7)
+    path = tmp_path / "data.csv"
+    _write_csv(path, 50)
+
+    parsed = NativeMetadataParser.parse(str(path))
+
+    assert parsed["file_type"] == "tabular" and parsed["parser"] == "native"
+    assert (parsed["total_rows"], parsed["total_columns"]) == (50, 3)
+    ident, score, label = parsed["columns"]
+    assert ident == {"name": "id", "dtype": "int64", "sample_values": [0, 1, 2], "null_count": 0,
+                     "min": 0, "max": 49, "mean": 24.5}
+    assert score["dtype"] == "float64" and score["null_count"] == 5 and score["max"] == 49.5
+    assert label["dtype"] == "object" and "mean" not in label
+    assert parsed["sample_rows"][1] == {"id": 1, "score": 1.0, "label": "l1"}
+    assert parsed["stats_sampled"] is False
+
+
+def test_large_tsv_samples_stats_and_counts_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(NativeMetadataParser, "FULL_SCAN_BYTES", 100)
+    monkeypatch.setattr(NativeMetadataParser, "SAMPLE_ROWS", 20)
+    monkeypatch.setattr(NativeMetadataParser, "LINE_COUNT_BLOCK_BYTES", 64)
+    path = tmp_path / "data.tsv"
+    _write_csv(path, 300, sep="\t")
+
+    parsed = NativeMetadataParser.parse(str(path))
+
+    assert parsed["total_rows"] == 300
+    assert parsed["stats_sampled"] is True and parsed["stats_rows"] == 20
+    assert parsed["columns"][0]["max"] == 19
+
+
+def test_npy_is_memory_mapped_and_sampled(tmp_path, monkeypatch):
+    monkeypatch.setattr(NativeMetadataParser, "MAX_ARRAY_STAT_ELEMENTS", 100)
+    path = tmp_path / "arr.npy"
+    np.save(path, np.arange(1000, dtype=np.float32).reshape(250, 4))
+
+    parsed = NativeMetadataParser.parse(str(path))
+
+    assert parsed["shape"] == [250, 4] and parsed["dtype"] == "float32"
+    assert (parsed["ndim"], parsed["size"]) == (2, 1000)
+    assert parsed["sample_values"] == [0.0, 1.0, 2.0]
+    assert parsed["stats_sampled"] is True
+    assert parsed["min"] == 0.0 and parsed["max"] <= 999.0
+
+
+def test_parquet_uses_file_metadata(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pandas as pd
+
+    path = tmp_path / "data.parquet"
+    pd.DataFrame({"a": [1, 2, None], "b": ["x", "y", "z"]}).to_parquet(path)
+
+    parsed = NativeMetadataParser.parse(str(path))
+
+    assert (parsed["total_rows"], parsed["total_columns"]) == (3, 2)
+    assert parsed["columns"][0]["null_count"] == 1 and parsed["columns"][0]["max"] == 2.0
+
+
+def test_hdf5_reports_largest_dataset(tmp_path):
+    h5py = pytest.importorskip("h5py")
+
+    path = tmp_path / "data.h5"
+    with h5py.File(path, "w") as f:
+        f["small"] = np.zeros(3)
+        f["group/big"] = np.arange(20).reshape(5, 4)
+
+    parsed = NativeMetadataParser.parse(str(path))
+
+    assert parsed["dataset"] == "group/big" and parsed["shape"] == [5, 4]
+    assert parsed["total_datasets"] == 2 and parsed["max"] == 19
+
+
+def test_parser_uses_native_path_and_falls_back_to_llm(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    _write_csv(csv_path, 5)
+    pickled = tmp_path / "objects.npy"
+    np.save(pickled, np.array([{"a": 1}], dtype=object), allow_pickle=True)
+    llm = _FailingLLM()
+    parser = LLMMetadataParser(llm, use_cache=False)
+
+    native, fallback = parser.parse_many([str(csv_path), str(pickled)])
+
+    assert native.parsed_content["parser"] == "native"
+    assert fallback.parsed_content == {"file_type": "llm"}
+    assert llm.calls == 1
+
+
+def test_text_preview_is_bounded_for_single_huge_line(tmp_path):
+    path = tmp_path / "one_line.json"
+    path.write_text("[" + "1," * 200_000 + "1]")
+
+    metadata = FileMetadataExtractor.extract(str(path))
+
+    assert metadata.preview_lines == 1
+    assert len(metadata.raw_preview) == FileMetadataExtractor.TEXT_PREVIEW_MAX_CHARS
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from app.database_pool import PlanConnectionPool
+
+
+@pytest.fixture
+def pool():
+    pool = PlanConnectionPool(max_open=2, idle_timeout=60)
+    yield pool
+    pool.close_pool()
+
+
+def _init(pool, path):
+    with pool.connection(path) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS t (v INTEGER)")
+
+
+def test_connections_are_reused_in_wal_mode(pool, tmp_path):
+    path = tmp_path / "plan_1.sqlite"
+    _init(pool, path)
+    with pool.connection(path) as conn:
+        first = conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pool.connection(path) as conn:
+        assert conn is first
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+    stats = pool.get_stats()
+    assert stats["opened"] == 1 and stats["reused"] == 2 and stats["in_use"] == 0
+
+
+def test_errors_roll_back_and_nested_use_opens_a_second_connection(pool, tmp_path):
+    path = tmp_path / "plan_2.sqlite"
+    _init(pool, path)
+    with pytest.raises(RuntimeError):
+        with pool.connection(path) as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("boom")
+
+    with pool.connection(path) as outer:
+        with pool.connection(path) as inner:
+            assert inner is not outer
+            assert inner.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_lru_files_are_closed_beyond_max_open(pool, tmp_path):
+    for i in range(4):
+        _init(pool, tmp_path / f"plan_{i}.sqlite")
+
+    stats = pool.get_stats()
+    assert stats["idle_connections"] == 2 and stats["closed_lru"] == 2
+    # The most recently used files stay open.
+    with pool.connection(tmp_path / "plan_3.sqlite"):
+        pass
+    assert pool.get_stats()["opened"] == 4
+
+
+def test_idle_connections_expire(tmp_path):
+    pool = PlanConnectionPool(idle_timeout=0)
+    _init(pool, tmp_path / "a.sqlite")
+    _init(pool, tmp_path / "b.sqlite")
+
+    stats = pool.get_stats()
+    assert stats["idle_connections"] == 0 and stats["closed_idle"] == 2
+
+
+def test_deleted_or_discarded_files_are_not_reused(pool, tmp_path):
+    path = tmp_path / "plan_9.sqlite"
+    _init(pool, path)
+    pool.discard(path)
+    assert pool.get_stats()["idle_connections"] == 0
+
+    _init(pool, path)
+    os.remove(path)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(f"{path}{suffix}"):
+            os.remove(f"{path}{suffix}")
+    with pool.connection(path) as conn:
+        # A fresh, empty file rather than the unlinked one.
+        assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+    assert pool.get_stats()["closed_stale"] == 1
+
+
+def test_checkout_waits_at_max_open_but_nested_use_does_not(pool, tmp_path):
+    paths = [tmp_path / f"busy_{i}.sqlite" for i in range(3)]
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold(path):
+        with pool.connection(path):
+            held.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold, args=(paths[0],))
+    holder.start()
+    held.wait(5)
+    with pool.connection(paths[1]):
+        # Both slots are checked out; this thread may still nest past the limit.
+        with pool.connection(paths[2]):
+            assert pool.get_stats()["open_connections"] == 3
+        assert pool.get_stats()["over_limit"] == 1
+
+        # Another thread without a connection waits until one is returned.
+        acquired = threading.Event()
+
+        def waiter():
+            with pool.connection(paths[2]):
+                acquired.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        assert not acquired.wait(0.2)
+        release.set()
+        assert acquired.wait(5)
+        thread.join(5)
+    holder.join(5)
+
+    stats = pool.get_stats()
+    assert stats["waits"] >= 1 and stats["in_use"] == 0
+    assert stats["open_connections"] <= 2
+
+
+def test_checkout_times_out_when_every_connection_is_busy(tmp_path):
+    pool = PlanConnectionPool(max_open=1, timeout=0.1)
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with pool.connection(tmp_path / "a.sqlite"):
+            held.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    held.wait(5)
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            with pool.connection(tmp_path / "b.sqlite"):
+                pass
+    finally:
+        release.set()
+        holder.join(5)
+        pool.close_pool()
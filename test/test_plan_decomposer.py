@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import re
+import threading
+import time
 from dataclasses import replace
 from typing import Iterable, List, Optional
 
@@ -153,3 +156,115 @@ def test_decompose_node_skips_when_children_exist(plan_repo: PlanRepository):
     assert result.created_tasks == []
     assert result.processed_nodes == []
     assert result.stats["llm_calls"] == 0
+
+
+class ConcurrentStubLLM(PlanDecomposerLLMService):
+    """Answers by target node name so call order does not matter; records overlap."""
+
+    def __init__(self, children_by_name: dict, delay: float = 0.05) -> None:
+        self._children = children_by_name
+        self._delay = delay
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.targets: List[str] = []
+
+    def generate(self, prompt: str) -> DecompositionResponse:
+        name = re.search(r"^Name: (.*)$", prompt, re.MULTILINE).group(1)
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.targets.append(name)
+        time.sleep(self._delay)
+        with self._lock:
+            self.active -= 1
+        return _make_response(
+            target=None,
+            mode="plan_bfs",
+            should_stop=False,
+            reason=None,
+            children=[
+                {"name": child, "instruction": f"Do {child}", "leaf": child.endswith("leaf")}
+                for child in self._children.get(name, [])
+            ],
+        )
+
+
+_LEVEL_TREE = {
+    "Level Plan": ["A", "B", "C"],
+    "A": ["A1 leaf", "A2 leaf"],
+    "B": ["B1 leaf"],
+    "C": ["C1 leaf", "C2 leaf"],
+}
+
+
+def test_run_plan_level_parallel_matches_sequential(plan_repo: PlanRepository):
+    sequential_plan = plan_repo.create_plan("Level Plan")
+    sequential = PlanDecomposer(
+        repo=plan_repo,
+        llm_service=ConcurrentStubLLM(_LEVEL_TREE, delay=0),
+        settings=_settings(stop_on_empty=False, enable_web_search=False),
+    ).run_plan(sequential_plan.id, max_depth=2, node_budget=20)
+
+    parallel_plan = plan_repo.create_plan("Level Plan")
+    stub_llm = ConcurrentStubLLM(_LEVEL_TREE)
+    parallel = PlanDecomposer(
+        repo=plan_repo,
+        llm_service=stub_llm,
+        settings=_settings(stop_on_empty=False, enable_web_search=False),
+    ).run_plan(parallel_plan.id, max_depth=2, node_budget=20, max_concurrency=3)
+
+    names = [node.name for node in parallel.created_tasks]
+    assert names == [node.name for node in sequential.created_tasks]
+    assert names == ["A", "B", "C", "A1 leaf", "A2 leaf", "B1 leaf", "C1 leaf", "C2 leaf"]
+    tree = plan_repo.get_plan_tree(parallel_plan.id)
+    a, b, c = (node.id for node in parallel.created_tasks[:3])
+    assert [tree.nodes[i].name for i in tree.children_ids(a)] == ["A1 leaf", "A2 leaf"]
+    assert [tree.nodes[i].name for i in tree.children_ids(c)] == ["C1 leaf", "C2 leaf"]
+    assert b in tree.nodes
+
+    assert stub_llm.peak == 3
+    levels = parallel.stats["levels"]
+    assert [(level["depth"], level["nodes"], level["created"]) for level in levels] == [
+        (0, 1, 3),
+        (1, 3, 5),
+    ]
+    assert all(level["expand_seconds"] > 0 for level in levels)
+    assert parallel.stats["llm_calls"] == 4 and parallel.stats["consumed_budget"] == 8
+
+
+def test_run_plan_level_parallel_enforces_budget(plan_repo: PlanRepository):
+    plan = plan_repo.create_plan("Level Plan")
+    stub_llm = ConcurrentStubLLM(_LEVEL_TREE)
+    decomposer = PlanDecomposer(
+        repo=plan_repo,
+        llm_service=stub_llm,
+        settings=_settings(stop_on_empty=False, enable_web_search=False),
+    )
+
+    result = decomposer.run_plan(plan.id, max_depth=2, node_budget=4, max_concurrency=4)
+
+    # Three roots leave a budget of one, so only "A" is expanded and only its first child is kept.
+    assert [node.name for node in result.created_tasks] == ["A", "B", "C", "A1 leaf"]
+    assert stub_llm.targets == ["Level Plan", "A"]
+    assert result.stopped_reason == "node_budget_exhausted"
+    assert plan_repo.get_plan_tree(plan.id).node_count() == 4
+
+
+def test_run_plan_level_parallel_requeues_unapplied_nodes(plan_repo: PlanRepository):
+    plan = plan_repo.create_plan("Level Plan")
+    stub_llm = ConcurrentStubLLM(_LEVEL_TREE)
+    decomposer = PlanDecomposer(
+        repo=plan_repo,
+        llm_service=stub_llm,
+        settings=_settings(stop_on_empty=False, enable_web_search=False),
+    )
+
+    result = decomposer.run_plan(plan.id, max_depth=2, node_budget=6, max_concurrency=4)
+
+    # "A" and "B" use up the budget, so the expansion of "C" is not applied.
+    assert [node.name for node in result.created_tasks] == ["A", "B", "C", "A1 leaf", "A2 leaf", "B1 leaf"]
+    assert sorted(stub_llm.targets) == ["A", "B", "C", "Level Plan"]
+    assert result.stopped_reason == "node_budget_exhausted"
+    assert result.stats["queue_remaining"] == 1
+    assert result.stats["levels"][-1]["requeued"] == 1
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import app.services.interpreter.plan_execute as plan_execute
+from app.services.interpreter.task_executer import TaskExecutionResult, TaskType
+
+
+class _StubLLMClient:
+    def __init__(self, *args, **kwargs) -> None:
+        pass
+
+
+class _StubLLMService:
+    def __init__(self, *args, **kwargs) -> None:
+        pass
+
+
+class _RecordingTaskExecutor:
+    """Stub TaskExecutor that tracks how many tasks overlap in time."""
+
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    calls: list[str] = []
+    contexts: dict[str, str] = {}
+    failing: set[str] = set()
+
+    def __init__(self, *args, **kwargs) -> None:
+        pass
+
+    @classmethod
+    def reset(cls) -> None:
+        cls.active = 0
+        cls.peak = 0
+        cls.calls = []
+        cls.contexts = {}
+        cls.failing = set()
+
+    def execute(self, task_title: str, task_description: str, subtask_results: str = "", **kwargs):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            cls.calls.append(task_title)
+            cls.contexts[task_title] = subtask_results or ""
+        if kwargs.get("work_dir"):
+            # Every node writes the same file name, as generated code typically does.
+            results = Path(kwargs["work_dir"]) / "results"
+            results.mkdir(parents=True, exist_ok=True)
+            (results / "summary.csv").write_text(task_title, encoding="utf-8")
+        # Later leaves finish first so completion order differs from topo order.
+        time.sleep(0.05 if task_title.startswith("Leaf 1") else 0.02)
+        with cls.lock:
+            cls.active -= 1
+        if task_title in cls.failing:
+            return TaskExecutionResult(
+                task_type=TaskType.TEXT_ONLY,
+                success=False,
+                error_message=f"{task_title} failed",
+            )
+        return TaskExecutionResult(
+            task_type=TaskType.TEXT_ONLY,
+            success=True,
+            text_response=f"result of {task_title}",
+        )
+
+
+@pytest.fixture()
+def stub_executor(monkeypatch, tmp_path):
+    monkeypatch.setattr(plan_execute, "TaskExecutor", _RecordingTaskExecutor)
+    monkeypatch.setattr(plan_execute, "LLMClient", _StubLLMClient)
+    monkeypatch.setattr(plan_execute, "LLMService", _StubLLMService)
+    _RecordingTaskExecutor.reset()
+    return _RecordingTaskExecutor
+
+
+def _build_plan(plan_repo):
+    plan = plan_repo.create_plan("Concurrent Plan")
+    root = plan_repo.create_task(plan.id, name="Root")
+    leaves = [
+        plan_repo.create_task(plan.id, name=f"Leaf {idx}", parent_id=root.id)
+        for idx in range(1, 5)
+    ]
+    return plan, root, leaves
+
+
+def _report_task_ids(report_path: str) -> list[int]:
+    with open(report_path, encoding="utf-8") as f:
+        return [int(m) for m in re.findall(r"\*\*Task ID\*\*: (\d+)", f.read())]
+
+
+def test_concurrent_execution_overlaps_independent_leaves(plan_repo, stub_executor, tmp_path):
+    plan, root, leaves = _build_plan(plan_repo)
+
+    executor = plan_execute.PlanExecutorInterpreter(
+        plan_id=plan.id,
+        data_file_paths=["unused.csv"],
+        output_dir=str(tmp_path / "out"),
+        repo=plan_repo,
+        max_workers=4,
+    )
+    result = executor.execute()
+
+    assert result.success
+    assert result.completed_nodes == 5
+    assert stub_executor.peak > 1
+    # The root only runs once every leaf has finished, and sees their output.
+    assert stub_executor.calls[-1] == "Root"
+    for leaf in leaves:
+        assert f"result of {leaf.name}" in stub_executor.contexts["Root"]
+
+    tree = plan_repo.get_plan_tree(plan.id)
+    assert all(node.status == "completed" for node in tree.nodes.values())
+
+
+def test_concurrent_report_matches_topological_order(plan_repo, stub_executor, tmp_path):
+    plan, root, leaves = _build_plan(plan_repo)
+
+    executor = plan_execute.PlanExecutorInterpreter(
+        plan_id=plan.id,
+        data_file_paths=["unused.csv"],
+        output_dir=str(tmp_path / "out"),
+        repo=plan_repo,
+        max_workers=3,
+    )
+    result = executor.execute()
+
+    assert _report_task_ids(result.report_path) == executor._topo_order
+    assert executor._topo_order[-1] == root.id
+
+
+def test_concurrent_execution_releases_parent_after_failed_child(plan_repo, stub_executor, tmp_path):
+    plan, root, leaves = _build_plan(plan_repo)
+    stub_executor.failing = {leaves[1].name}
+
+    executor = plan_execute.PlanExecutorInterpreter(
+        plan_id=plan.id,
+        data_file_paths=["unused.csv"],
+        output_dir=str(tmp_path / "out"),
+        repo=plan_repo,
+        max_workers=4,
+    )
+    result = executor.execute()
+
+    assert not result.success
+    assert result.failed_nodes == 1
+    assert result.completed_nodes == 4
+    assert stub_executor.calls[-1] == "Root"
+    assert f"result of {leaves[1].name}" not in stub_executor.contexts["Root"]
+
+
+def test_concurrent_nodes_get_their_own_output_directories(plan_repo, stub_executor, tmp_path):
+    plan, root, leaves = _build_plan(plan_repo)
+    out = tmp_path / "out"
+
+    executor = plan_execute.PlanExecutorInterpreter(
+        plan_id=plan.id,
+        data_file_paths=["unused.csv"],
+        output_dir=str(out),
+        repo=plan_repo,
+        max_workers=4,
+    )
+    result = executor.execute()
+
+    assert result.success
+    for node in [root, *leaves]:
+        record = executor._node_records[node.id]
+        expected = f"nodes/task_{node.id}/results/summary.csv"
+        assert record.generated_files == [expected]
+        assert (out / expected).read_text(encoding="utf-8") == node.name
+
+
+def test_dependents_get_paths_relative_to_their_own_directory(plan_repo, stub_executor, tmp_path):
+    plan, root, leaves = _build_plan(plan_repo)
+    out = tmp_path / "out"
+
+    executor = plan_execute.PlanExecutorInterpreter(
+        plan_id=plan.id,
+        data_file_paths=["unused.csv"],
+        output_dir=str(out),
+        repo=plan_repo,
+        max_workers=4,
+    )
+    assert executor.execute().success
+
+    context = stub_executor.contexts["Root"]
+    root_dir = out / "nodes" / f"task_{root.id}"
+    assert "output directory are under `../../`" in context
+    for leaf in leaves:
+        path = f"../task_{leaf.id}/results/summary.csv"
+        assert path in context
+        # The parent can open its children's outputs from its own working directory.
+        assert (root_dir / path).read_text(encoding="utf-8") == leaf.name
@@ -5,9 +5,11 @@ import json
 import pytest
 from fastapi.testclient import TestClient
 
+from app.errors import ErrorCode
 from app.main import app
 from app.repository.plan_repository import PlanRepository
 from app.routers import plan_routes
+from app.services.plans.job_scheduler import JobQueueFullError
 from app.services.plans.plan_decomposer import DecompositionResult
 from app.services.plans.plan_models import PlanNode
 
@@ -99,6 +101,32 @@ def test_decompose_task_endpoint_returns_stubbed_result(
     assert payload["result"]["created_tasks"]
 
 
+def test_decompose_task_returns_429_when_job_queue_is_full(
+    plan_repo: PlanRepository,
+    test_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    plan = plan_repo.create_plan("Busy Plan")
+    root = plan_repo.create_task(plan.id, name="Root")
+
+    class FullScheduler:
+        def submit(self, *args, **kwargs):
+            raise JobQueueFullError("Job queue is full")
+
+    monkeypatch.setattr(plan_routes, "get_job_scheduler", lambda: FullScheduler())
+
+    response = test_client.post(
+        f"/tasks/{root.id}/decompose",
+        json={"plan_id": plan.id, "async_mode": True},
+    )
+    assert response.status_code == 429
+    payload = response.json()
+    assert payload["success"] is False
+    assert payload["error"]["error_code"] == ErrorCode.API_RATE_LIMIT_EXCEEDED
+    assert payload["error"]["category"] == "business"
+    assert "full" in payload["error"]["message"]
+
+
 def test_plan_results_endpoint(plan_repo: PlanRepository, test_client: TestClient):
     plan = plan_repo.create_plan("Results Plan")
     root = plan_repo.create_task(plan.id, name="Root")
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+
+from app.repository.plan_repository import PlanRepository
+from app.repository.plan_storage import get_plan_db_path
+
+
+def _stored_counts(main_db_path: Path, plan_id: int):
+    with sqlite3.connect(main_db_path) as conn:
+        count, histogram = conn.execute(
+            "SELECT task_count, task_status_counts FROM plans WHERE id=?", (plan_id,)
+        ).fetchone()
+    return count, json.loads(histogram)
+
+
+def _fail_plan_opens(monkeypatch, plan_repo):
+    def boom(*args, **kwargs):
+        raise AssertionError("plan database opened while listing plans")
+
+    module = type(plan_repo).__module__
+    monkeypatch.setattr(f"{module}.plan_db_connection", boom)
+
+
+def test_mutations_keep_counters_current(plan_repo: PlanRepository, main_db_path: Path):
+    plan = plan_repo.create_plan("Counted")
+    assert _stored_counts(main_db_path, plan.id) == (0, {})
+
+    root = plan_repo.create_task(plan.id, name="Root")
+    child = plan_repo.create_task(plan.id, name="Child", parent_id=root.id)
+    other = plan_repo.create_task(plan.id, name="Other", status="running")
+    plan_repo.update_task(plan.id, child.id, status="completed")
+    plan_repo.move_task(plan.id, child.id, new_parent_id=other.id)
+
+    summary = plan_repo.get_plan_summary(plan.id)
+    assert summary.task_count == 3
+    assert summary.status_counts == {"pending": 1, "running": 1, "completed": 1}
+
+    plan_repo.delete_task(plan.id, other.id)  # removes its moved child too
+    summary = plan_repo.get_plan_summary(plan.id)
+    assert (summary.task_count, summary.status_counts) == (1, {"pending": 1})
+
+    tree = plan_repo.get_plan_tree(plan.id)
+    tree.nodes[root.id].status = "failed"
+    plan_repo.upsert_plan_tree(tree)
+    assert plan_repo.get_plan_summary(plan.id).status_counts == {"failed": 1}
+
+
+def test_list_plans_is_a_single_main_db_query(plan_repo: PlanRepository, monkeypatch):
+    plans = [plan_repo.create_plan(f"Listed {i}") for i in range(3)]
+    for index, plan in enumerate(plans):
+        for n in range(index + 1):
+            plan_repo.create_task(plan.id, name=f"t{n}")
+
+    _fail_plan_opens(monkeypatch, plan_repo)
+    summaries = {summary.id: summary for summary in plan_repo.list_plans()}
+
+    assert [summaries[plan.id].task_count for plan in plans] == [1, 2, 3]
+    assert summaries[plans[2].id].status_counts == {"pending": 3}
+
+
+def test_legacy_rows_are_backfilled(plan_repo: PlanRepository, main_db_path: Path):
+    plan = plan_repo.create_plan("Legacy")
+    plan_repo.create_task(plan.id, name="A")
+    task = plan_repo.create_task(plan.id, name="B")
+    plan_repo.update_task(plan.id, task.id, status="completed")
+    with sqlite3.connect(main_db_path) as conn:
+        conn.execute(
+            "UPDATE plans SET task_count=NULL, task_status_counts=NULL WHERE id=?",
+            (plan.id,),
+        )
+        updated_at = conn.execute("SELECT updated_at FROM plans WHERE id=?", (plan.id,)).fetchone()[0]
+
+    # Listing heals the row once.
+    listed = next(s for s in plan_repo.list_plans() if s.id == plan.id)
+    assert listed.task_count == 2
+    assert _stored_counts(main_db_path, plan.id) == (2, {"pending": 1, "completed": 1})
+
+    # Drift introduced behind the repository's back is fixed by a full backfill,
+    # without reordering the plan list.
+    with sqlite3.connect(get_plan_db_path(plan.id)) as conn:
+        conn.execute("DELETE FROM tasks WHERE name='A'")
+    assert plan_repo.backfill_task_counts(only_missing=True) == 0
+    assert plan_repo.backfill_task_counts(only_missing=False) >= 1
+    assert plan_repo.get_plan_summary(plan.id).status_counts == {"completed": 1}
+    with sqlite3.connect(main_db_path) as conn:
+        assert conn.execute("SELECT updated_at FROM plans WHERE id=?", (plan.id,)).fetchone()[0] == updated_at
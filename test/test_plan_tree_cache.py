@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from app.repository.plan_repository import PlanRepository
+
+
+def _module():
+    # conftest reloads plan_repository after this file is imported.
+    return sys.modules["app.repository.plan_repository"]
+
+
+@pytest.fixture
+def no_disk(monkeypatch, plan_repo):
+    """Fail any attempt to read the plan database."""
+
+    def boom(*args, **kwargs):
+        raise AssertionError("plan tree was reloaded from disk")
+
+    def install():
+        monkeypatch.setattr(type(plan_repo), "_load_tasks_and_dependencies", boom)
+
+    return install
+
+
+def test_unchanged_plan_is_served_from_memory(plan_repo: PlanRepository, no_disk):
+    plan = plan_repo.create_plan("Cached")
+    root = plan_repo.create_task(plan.id, name="Root")
+    plan_repo.create_task(plan.id, name="Child", parent_id=root.id, metadata={"tags": ["a"]})
+    first = plan_repo.get_plan_snapshot(plan.id)
+
+    no_disk()
+    # Another repository instance shares the process-wide cache.
+    assert type(plan_repo)().get_plan_snapshot(plan.id) is first
+
+    copy = plan_repo.get_plan_tree(plan.id)
+    assert copy == first and copy is not first
+    child = next(node for node in copy.nodes.values() if node.name == "Child")
+    child.metadata["tags"].append("b")
+    copy.adjacency[None].append(999)
+    assert first.nodes[child.id].metadata["tags"] == ["a"]
+    assert 999 not in first.adjacency[None]
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda repo, plan, ids: repo.create_task(plan.id, name="New"),
+        lambda repo, plan, ids: repo.update_task(plan.id, ids[1], status="completed"),
+        lambda repo, plan, ids: repo.update_task(plan.id, ids[1], execution_result="done"),
+        lambda repo, plan, ids: repo.move_task(plan.id, ids[1], new_parent_id=None),
+        lambda repo, plan, ids: repo.delete_task(plan.id, ids[1]),
+        lambda repo, plan, ids: repo.upsert_plan_tree(
+            repo.get_plan_tree(plan.id).model_copy(update={"title": "Renamed"})
+        ),
+    ],
+    ids=["create", "update", "update_result", "move", "delete", "upsert"],
+)
+def test_every_mutation_bumps_the_version(plan_repo: PlanRepository, mutate):
+    plan = plan_repo.create_plan("Versioned")
+    root = plan_repo.create_task(plan.id, name="Root")
+    child = plan_repo.create_task(plan.id, name="Child", parent_id=root.id)
+    before = plan_repo.get_plan_snapshot(plan.id)
+    version = plan_repo.get_plan_version(plan.id)
+
+    mutate(plan_repo, plan, [root.id, child.id])
+
+    assert plan_repo.get_plan_version(plan.id) > version
+    after = plan_repo.get_plan_snapshot(plan.id)
+    assert after is not before
+    assert after == type(plan_repo)()._load_plan_tree(plan.id)
+
+
+def test_outline_skips_heavy_columns(plan_repo: PlanRepository):
+    plan = plan_repo.create_plan("Outline")
+    task = plan_repo.create_task(plan.id, name="Task", instruction="do it", dependencies=[])
+    plan_repo.update_task(
+        plan.id,
+        task.id,
+        status="completed",
+        execution_result="x" * 10_000,
+        context_combined="ctx",
+        context_sections=[{"title": "t", "content": "c"}],
+        context_meta={"k": 1},
+    )
+
+    outline = plan_repo.get_plan_outline(plan.id)
+    node = outline.nodes[task.id]
+    assert (node.name, node.status, node.instruction) == ("Task", "completed", "do it")
+    assert node.execution_result is None and node.context_combined is None
+    assert node.context_sections == [] and node.context_meta == {}
+    assert plan_repo.get_plan_outline(plan.id) is outline
+    assert plan_repo.get_plan_snapshot(plan.id).nodes[task.id].execution_result == "x" * 10_000
+
+
+def test_write_during_load_is_not_cached(plan_repo: PlanRepository, monkeypatch):
+    plan = plan_repo.create_plan("Race")
+    plan_repo.create_task(plan.id, name="A")
+    repo_cls = type(plan_repo)
+    original = repo_cls._load_plan_tree
+    calls = []
+
+    def load_then_write(self, plan_id, **kwargs):
+        tree = original(self, plan_id, **kwargs)
+        if not calls:
+            calls.append(plan_id)
+            plan_repo.create_task(plan_id, name="B")
+        return tree
+
+    monkeypatch.setattr(repo_cls, "_load_plan_tree", load_then_write)
+    stale = plan_repo.get_plan_snapshot(plan.id)
+    fresh = plan_repo.get_plan_snapshot(plan.id)
+
+    assert stale.node_count() == 1
+    assert fresh.node_count() == 2
+
+
+def test_deleted_plan_is_not_served(plan_repo: PlanRepository):
+    plan = plan_repo.create_plan("Doomed")
+    plan_repo.get_plan_snapshot(plan.id)
+    plan_repo.delete_plan(plan.id)
+
+    with pytest.raises(ValueError):
+        plan_repo.get_plan_snapshot(plan.id)
+    assert _module().get_plan_tree_cache().get_stats()["invalidations"] > 0
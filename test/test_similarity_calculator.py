@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.services.embeddings.similarity_calculator import SimilarityCalculator
+
+
+def _brute_force_top_k(query, matrix, k):
+    scores = [SimilarityCalculator().compute_similarity(query, row) for row in matrix]
+    order = sorted(range(len(scores)), key=lambda i: (-scores[i], i))[:k]
+    return order, [scores[i] for i in order]
+
+
+def test_normalize_embeddings_keeps_zero_rows_and_input():
+    raw = np.array([[3.0, 4.0], [0.0, 0.0]], dtype=np.float32)
+    normalized = SimilarityCalculator.normalize_embeddings(raw)
+
+    assert np.allclose(normalized, [[0.6, 0.8], [0.0, 0.0]])
+    assert np.allclose(raw, [[3.0, 4.0], [0.0, 0.0]])
+
+
+def test_top_k_matches_pairwise_scores_with_and_without_chunking():
+    rng = np.random.default_rng(7)
+    matrix = rng.normal(size=(257, 16)).tolist()
+    query = rng.normal(size=16).tolist()
+    calc = SimilarityCalculator()
+    normalized = calc.normalize_embeddings(matrix)
+
+    expected_idx, expected_scores = _brute_force_top_k(query, matrix, 10)
+    for chunk_size in (None, 1, 50, 1000):
+        idx, scores = calc.top_k_similar(query, normalized, k=10, chunk_size=chunk_size)
+        assert idx.tolist() == expected_idx
+        assert np.allclose(scores, expected_scores, atol=1e-5)
+
+
+def test_top_k_applies_threshold_and_handles_dimension_mismatch():
+    calc = SimilarityCalculator()
+    normalized = calc.normalize_embeddings([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+
+    idx, scores = calc.top_k_similar([1.0, 0.0], normalized, k=5, min_similarity=0.5)
+    assert idx.tolist() == [0, 2]
+    assert scores[0] > scores[1]
+
+    idx, scores = calc.top_k_similar([1.0, 0.0, 0.0], normalized, k=5)
+    assert idx.size == 0 and scores.size == 0
+
+
+def test_find_most_similar_returns_sorted_candidates():
+    calc = SimilarityCalculator()
+    candidates = [
+        {"id": "a", "embedding": [0.0, 1.0]},
+        {"id": "b", "embedding": [1.0, 0.1]},
+        {"id": "empty", "embedding": []},
+        {"id": "c", "embedding": [1.0, 1.0]},
+    ]
+
+    results = calc.find_most_similar([1.0, 0.0], candidates, k=2, min_similarity=0.1)
+
+    assert [r["id"] for r in results] == ["b", "c"]
+    assert results[0]["similarity"] >= results[1]["similarity"]
+
+
+def test_compute_similarities_falls_back_for_ragged_targets():
+    calc = SimilarityCalculator()
+
+    scores = calc.compute_similarities([1.0, 0.0], [[1.0, 0.0], [0.0, 1.0], [1.0]])
+
+    assert scores == [1.0, 0.0, 0.0]
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+
+import numpy as np
+
+from app.services.embeddings.thread_safe_cache import ThreadSafeEmbeddingCache
+
+MODEL = "embedding-test"
+
+
+def _vec(seed: int, dim: int = 8) -> list:
+    return np.random.default_rng(seed).random(dim).tolist()
+
+
+def _cache(tmp_path, **kwargs) -> ThreadSafeEmbeddingCache:
+    kwargs.setdefault("enable_persistent", False)
+    return ThreadSafeEmbeddingCache(cache_db_path=str(tmp_path / "embedding_cache.db"), **kwargs)
+
+
+def test_slab_hits_survive_slot_reuse(tmp_path):
+    cache = _cache(tmp_path, cache_size=2, storage="float32")
+    cache.put("alpha", _vec(1), MODEL)
+
+    first = cache.get("alpha", MODEL)
+    second = cache.get("alpha", MODEL)
+    assert first.dtype == np.float32
+    assert not np.shares_memory(first, second)
+
+    # Evicting "alpha" frees its slot, which the next put reuses.
+    cache.put("beta", _vec(2), MODEL)
+    cache.put("gamma", _vec(3), MODEL)
+    assert cache.get("alpha", MODEL) is None
+    np.testing.assert_allclose(first, _vec(1), rtol=1e-6)
+
+    stats = cache.get_stats()
+    assert stats["memory_bytes"] == 2 * 8 * 4 and stats["memory_hits"] == 2
+
+
+def test_slab_evicts_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, cache_size=3, storage="float16")
+    for i, text in enumerate(["a", "b", "c"]):
+        cache.put(text, _vec(i), MODEL)
+    cache.get("a", MODEL)  # "b" is now the least recently used entry
+    cache.put("d", _vec(3), MODEL)
+
+    results, misses = cache.get_batch(["a", "b", "c", "d"], MODEL)
+    assert misses == [1]
+    assert results[3].dtype == np.float16
+    np.testing.assert_allclose(results[3], _vec(3), atol=1e-3)
+
+    # Vectors of another dimension get their own slab, freed once emptied.
+    cache.put("wide", _vec(9, dim=16), MODEL)
+    assert set(cache.get_stats()["slabs"]) == {8, 16}
+    for text in ["e", "f", "g"]:
+        cache.put(text, _vec(5), MODEL)
+    assert set(cache.get_stats()["slabs"]) == {8}
+
+
+def test_persistent_tier_stores_binary_blobs(tmp_path):
+    writer = _cache(tmp_path, enable_persistent=True)
+    writer.put_batch(["one", "two"], [_vec(1), _vec(2)], MODEL)
+    writer.shutdown()
+
+    with sqlite3.connect(tmp_path / "embedding_cache.db") as conn:
+        dtype, dim, blob = conn.execute("SELECT dtype, dim, vector FROM embedding_vectors LIMIT 1").fetchone()
+    assert (dtype, dim, len(blob)) == ("float32", 8, 32)
+
+    reader = _cache(tmp_path, enable_persistent=True, storage="list")
+    results, misses = reader.get_batch(["one", "two", "three"], MODEL)
+    assert misses == [2]
+    assert isinstance(results[0], list)
+    np.testing.assert_allclose(results[1], _vec(2), rtol=1e-6)
+    assert reader.get_stats()["persistent_hits"] == 2
+
+
+def test_legacy_json_rows_are_migrated_on_read(tmp_path):
+    db = tmp_path / "embedding_cache.db"
+    cache = _cache(tmp_path, enable_persistent=True)
+    text_hash = cache._compute_text_hash("legacy", MODEL)
+    with sqlite3.connect(db) as conn:
+        conn.execute(
+            "CREATE TABLE embedding_cache (text_hash TEXT PRIMARY KEY, embedding_json TEXT NOT NULL, "
+            "model TEXT NOT NULL, created_at REAL NOT NULL, access_count INTEGER DEFAULT 0, "
+            "last_accessed REAL DEFAULT 0.0)"
+        )
+        conn.execute(
+            "INSERT INTO embedding_cache VALUES (?, ?, ?, 0, 0, 0)", (text_hash, json.dumps(_vec(4)), MODEL)
+        )
+
+    cache = _cache(tmp_path, enable_persistent=True)
+    np.testing.assert_allclose(cache.get("legacy", MODEL), _vec(4), rtol=1e-6)
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM embedding_vectors").fetchone()[0] == 1
@@ -154,6 +154,170 @@ def test_with_real_plan(plan_id: int = None):
     print("\n✓ 真实计划测试完成")
 
 
+def _random_dag(n: int, seed: int = 0) -> DAG:
+    """构造随机DAG：每个节点挂在一到两个更早的节点下，名称取自小集合"""
+    import random
+
+    rng = random.Random(seed)
+    dag = DAG(plan_id=0, title="random")
+    for node_id in range(1, n + 1):
+        dag.nodes[node_id] = DAGNode(id=node_id, name=f"step-{rng.randrange(8)}", source_node_ids=[node_id])
+        if node_id == 1:
+            continue
+        for parent_id in rng.sample(range(1, node_id), min(node_id - 1, rng.choice((1, 1, 2)))):
+            dag.nodes[parent_id].child_ids.add(node_id)
+            dag.nodes[node_id].parent_ids.add(parent_id)
+    return dag
+
+
+def _bfs_reachable(dag: DAG, from_id: int, to_id: int) -> bool:
+    seen, stack = set(), [from_id]
+    while stack:
+        current = stack.pop()
+        if current == to_id:
+            return True
+        if current in seen:
+            continue
+        seen.add(current)
+        stack.extend(dag.nodes[current].child_ids)
+    return False
+
+
+def _assert_closure_matches_bfs(simplifier: TreeSimplifier, dag: DAG) -> None:
+    for a in dag.nodes:
+        for b in dag.nodes:
+            assert simplifier.is_reachable(dag, a, b) == _bfs_reachable(dag, a, b), (a, b)
+
+
+def test_reachability_closure_is_updated_incrementally_on_merge():
+    """合并后增量更新的闭包应与重新遍历的结果一致"""
+    simplifier = TreeSimplifier(matcher=LLMSimilarityMatcher())
+    dag = _random_dag(60, seed=7)
+    _assert_closure_matches_bfs(simplifier, dag)
+    closure = dag._reachability
+
+    merged = 0
+    for group in simplifier.find_mergeable_groups(dag):
+        if simplifier.merge_group(dag, group) is not None:
+            merged += 1
+    assert merged > 0
+
+    # 合并过程中闭包被原地更新而不是重建
+    assert dag._reachability is closure
+    _assert_closure_matches_bfs(simplifier, dag)
+    assert dag.topological_sort()
+
+
+def test_find_mergeable_groups_only_returns_unreachable_same_name_nodes():
+    simplifier = TreeSimplifier(matcher=LLMSimilarityMatcher())
+    dag = _random_dag(120, seed=3)
+
+    groups = simplifier.find_mergeable_groups(dag)
+
+    names = {}
+    for node_id, node in dag.nodes.items():
+        names.setdefault(node.name.strip().lower(), []).append(node_id)
+    expected = [
+        ids for ids in names.values()
+        if len(ids) > 1 and all(
+            not _bfs_reachable(dag, a, b) and not _bfs_reachable(dag, b, a)
+            for i, a in enumerate(ids) for b in ids[i + 1:]
+        )
+    ]
+    assert groups == expected
+
+
+def test_closure_is_rebuilt_after_external_edge_change():
+    simplifier = TreeSimplifier(matcher=LLMSimilarityMatcher())
+    dag = _random_dag(10, seed=1)
+    leaves = [node.id for node in dag.get_leaves()]
+    assert not simplifier.is_reachable(dag, leaves[0], leaves[1])
+
+    dag.nodes[leaves[0]].child_ids.add(leaves[1])
+    dag.nodes[leaves[1]].parent_ids.add(leaves[0])
+
+    assert simplifier.is_reachable(dag, leaves[0], leaves[1])
+
+
+class _PairJudgeLLM:
+    """假LLM：批量提示中名称相同的节点对判定为可合并"""
+
+    def __init__(self):
+        import threading
+
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def chat(self, prompt):
+        import json
+        import re
+
+        with self.lock:
+            self.prompts.append(prompt)
+        names = re.findall(r"- Task [AB]: \[\d+\] (.+?):", prompt)
+        verdicts = []
+        for idx in range(len(names) // 2):
+            same = names[2 * idx] == names[2 * idx + 1]
+            verdicts.append({"pair": idx + 1, "can_merge": same, "similarity": 0.95 if same else 0.2})
+        return json.dumps(verdicts)
+
+
+def _batched_matcher(llm, **kwargs):
+    matcher = LLMSimilarityMatcher(threshold=0.9, batched=True, requests_per_second=0, **kwargs)
+    matcher._llm = llm
+    return matcher
+
+
+def _similarity_nodes():
+    return [
+        DAGNode(id=1, name="配置聚类算法", instruction="使用K-Means聚类，k=5"),
+        DAGNode(id=2, name="配置聚类算法", instruction="使用K-Means聚类，k=5"),
+        DAGNode(id=3, name="配置聚类算法（DBSCAN）", instruction="使用DBSCAN聚类，eps=0.5"),
+        DAGNode(id=4, name="加载数据", instruction="从CSV文件加载数据"),
+        DAGNode(id=5, name="加载数据", instruction="从CSV文件加载数据"),
+        DAGNode(id=6, name="生成报告", instruction="输出分析结果"),
+    ]
+
+
+def test_batched_matcher_prefilters_and_packs_pairs(monkeypatch):
+    from app.services.plans import tree_simplifier
+
+    monkeypatch.setattr(tree_simplifier, "_VERDICT_CACHE", tree_simplifier.OrderedDict())
+    llm = _PairJudgeLLM()
+    matcher = _batched_matcher(llm, batch_size=2, max_concurrency=3)
+
+    pairs = matcher.find_similar_pairs(_similarity_nodes())
+
+    assert sorted((a, b) for a, b, _ in pairs) == [(1, 2), (4, 5)]
+    # 15 个节点对中只有词法相近的被送往LLM，且按 batch_size 打包
+    judged = sum(p.count("[Pair ") for p in llm.prompts)
+    assert 0 < judged < 15
+    assert matcher.stats["prefiltered"] == 15 - judged
+    assert len(llm.prompts) == -(-judged // 2)
+
+
+def test_batched_verdicts_are_memoized_by_content(monkeypatch):
+    from app.services.plans import tree_simplifier
+
+    monkeypatch.setattr(tree_simplifier, "_VERDICT_CACHE", tree_simplifier.OrderedDict())
+    first = _PairJudgeLLM()
+    _batched_matcher(first).find_similar_pairs(_similarity_nodes())
+    assert first.prompts
+
+    # 重新简化未变化的计划（节点ID不同但内容相同）不再调用LLM
+    second = _PairJudgeLLM()
+    matcher = _batched_matcher(second)
+    renumbered = [
+        DAGNode(id=node.id + 100, name=node.name, instruction=node.instruction)
+        for node in _similarity_nodes()
+    ]
+    pairs = matcher.find_similar_pairs(renumbered)
+    assert sorted((a, b) for a, b, _ in pairs) == [(101, 102), (104, 105)]
+    assert matcher.should_merge(renumbered[0], renumbered[1])
+    assert second.prompts == []
+    assert matcher.stats["llm_calls"] == 0
+
+
 if __name__ == "__main__":
     print("TreeSimplifier 测试套件")
     print("=" * 60)
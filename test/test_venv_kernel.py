@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services.interpreter.venv_interpreter import VenvCodeInterpreter
+
+
+@pytest.fixture()
+def kernel_interpreter(tmp_path):
+    interpreter = VenvCodeInterpreter(timeout=10, work_dir=str(tmp_path), persistent=True, preload=())
+    yield interpreter
+    interpreter.close()
+
+
+def test_kernel_keeps_modules_but_isolates_namespaces(kernel_interpreter):
+    first = kernel_interpreter.run_python_code(
+        "import os, json\njson._kernel_marker = 'resident'\nx = 1\nprint(os.getpid())"
+    )
+    second = kernel_interpreter.run_python_code(
+        "import os, json\nprint(os.getpid())\nprint(json._kernel_marker)\nprint('x' in globals())"
+    )
+
+    assert first.status == "success"
+    pid, marker, has_x = second.output.split()
+    assert pid == first.output.strip()
+    assert marker == "resident"
+    assert has_x == "False"
+
+
+def test_kernel_reports_output_and_exit_status(kernel_interpreter, tmp_path):
+    exited = kernel_interpreter.run_python_code("import sys\nprint('partial')\nsys.exit(3)")
+    assert (exited.status, exited.exit_code, exited.output) == ("failed", 3, "partial\n")
+
+    raised = kernel_interpreter.run_python_code("print('before')\nraise ValueError('boom')")
+    assert raised.status == "failed" and raised.exit_code == 1
+    assert raised.output == "before\n"
+    assert "ValueError: boom" in raised.error
+
+    # Output from child processes is captured at the file-descriptor level.
+    shelled = kernel_interpreter.run_python_code(
+        "import os, subprocess, sys\nopen('out.txt', 'w').write('ok')\n"
+        "subprocess.run([sys.executable, '-c', 'print(\"child\")'])"
+    )
+    assert shelled.status == "success" and shelled.output == "child\n"
+    assert (tmp_path / "out.txt").read_text() == "ok"
+
+
+def test_kernel_restarts_after_timeout_and_crash(tmp_path):
+    interpreter = VenvCodeInterpreter(timeout=1, work_dir=str(tmp_path), persistent=True, preload=())
+    try:
+        pid = interpreter.run_python_code("import os\nprint(os.getpid())").output
+
+        hung = interpreter.run_python_code("import time\ntime.sleep(30)")
+        assert hung.status == "timeout"
+        assert hung.error == "Execution exceeded 1 seconds limit."
+
+        crashed = interpreter.run_python_code("import os\nos._exit(5)")
+        assert crashed.status == "failed" and crashed.exit_code == 5
+
+        after = interpreter.run_python_code("import os\nprint(os.getpid())")
+        assert after.status == "success" and after.output != pid
+        assert interpreter._kernel.restarts == 2
+    finally:
+        interpreter.close()
+
+
+def test_kernel_caches_dataframes_and_returns_copies(tmp_path):
+    pytest.importorskip("pandas")
+    (tmp_path / "data.csv").write_text("a,b\n1,2\n3,4\n")
+    interpreter = VenvCodeInterpreter(timeout=60, work_dir=str(tmp_path), persistent=True, preload=("pandas",))
+    try:
+        mutate = interpreter.run_python_code(
+            "import pandas as pd\ndf = pd.read_csv('data.csv')\ndf['a'] = 0\nprint(df['a'].sum())"
+        )
+        reread = interpreter.run_python_code(
+            "import pandas as pd\nprint(pd.read_csv('data.csv')['a'].sum())\nprint(hasattr(pd.read_csv, '__wrapped__'))"
+        )
+    finally:
+        interpreter.close()
+
+    assert mutate.output.strip() == "0"
+    assert reread.output.split() == ["4", "True"]
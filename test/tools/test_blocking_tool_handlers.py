@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from tool_box.tools_impl import database_query
+from tool_box.tools_impl.database_query import database_query_handler
+from tool_box.tools_impl.file_operations import file_operations_handler
+
+@pytest.fixture()
+def numbers_db(tmp_path: Path) -> str:
+    path = tmp_path / "numbers.sqlite"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE numbers (n INTEGER)")
+        conn.executemany("INSERT INTO numbers VALUES (?)", [(i,) for i in range(25)])
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_slow_query_does_not_block_the_event_loop(numbers_db: str, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    run_query = database_query._execute_query
+
+    def gated_query(*args):
+        # Holds the query until the event loop releases it; if the handler ran
+        # on the loop itself nothing could set ``release`` and the wait fails.
+        started.set()
+        if not release.wait(5):
+            raise RuntimeError("event loop was blocked by the query")
+        return run_query(*args)
+
+    monkeypatch.setattr(database_query, "_execute_query", gated_query)
+    task = asyncio.create_task(database_query_handler(numbers_db, "SELECT count(*) AS total FROM numbers"))
+    for _ in range(500):
+        if started.is_set():
+            break
+        await asyncio.sleep(0.01)
+    assert started.is_set() and not task.done()
+    release.set()
+    result = await task
+
+    assert result["success"] and result["rows"] == [{"total": 25}]
+
+
+@pytest.mark.asyncio
+async def test_query_results_are_paged(numbers_db: str):
+    sql = "SELECT n FROM numbers ORDER BY n"
+
+    first = await database_query_handler(numbers_db, sql, max_rows=10)
+    assert [row["n"] for row in first["rows"]] == list(range(10))
+    assert first["has_more"] and first["next_offset"] == 10
+
+    last = await database_query_handler(numbers_db, sql, max_rows=10, offset=20)
+    assert [row["n"] for row in last["rows"]] == list(range(20, 25))
+    assert not last["has_more"] and last["next_offset"] is None
+
+
+@pytest.mark.asyncio
+async def test_large_files_are_read_in_ranges(tmp_path: Path):
+    path = tmp_path / "big.txt"
+    text = "数据" * 2_000_000 + "end"  # ~12MB, above the whole-file limit
+    path.write_text(text, encoding="utf-8")
+
+    first = await file_operations_handler("read", str(path), limit=1_000_000)
+    assert first["success"] and first["truncated"]
+    # The range ends inside a 3-byte character; it is left for the next read.
+    assert first["next_offset"] == 999_999
+    assert first["content"] == text[:333_333]
+
+    pieces, offset = [], 0
+    while offset is not None:
+        chunk = await file_operations_handler("read", str(path), offset=offset, limit=4_000_000)
+        pieces.append(chunk["content"])
+        offset = chunk["next_offset"]
+    assert "".join(pieces) == text
+
+    small = tmp_path / "small.txt"
+    small.write_text("hello", encoding="utf-8")
+    result = await file_operations_handler("read", str(small))
+    assert (result["content"], result["truncated"], result["next_offset"]) == ("hello", False, None)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from tool_box.tools_impl.database_query import SQLiteConnectionPool
+
+
+def _make_db(path: Path, name: str) -> str:
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS marker (name TEXT)")
+        conn.execute("INSERT INTO marker VALUES (?)", (name,))
+    return str(path)
+
+
+def test_connections_are_keyed_by_database(tmp_path: Path):
+    pool = SQLiteConnectionPool(max_connections=4)
+    a = _make_db(tmp_path / "a.sqlite", "a")
+    b = _make_db(tmp_path / "b.sqlite", "b")
+
+    for _ in range(3):
+        for path, name in ((a, "a"), (b, "b")):
+            with pool.connection(path) as conn:
+                assert conn.execute("SELECT name FROM marker").fetchone()[0] == name
+
+    stats = pool.get_stats()
+    assert (stats["opened"], stats["reused"], stats["databases"]) == (2, 4, 2)
+    # Reused right away, so no liveness probe was needed.
+    assert stats["health_checks"] == 0
+    pool.close_all()
+    assert pool.get_stats()["open"] == 0
+
+
+def test_health_check_runs_only_after_idle_time(tmp_path: Path):
+    pool = SQLiteConnectionPool(health_check_after=0.0)
+    db = _make_db(tmp_path / "a.sqlite", "a")
+    with pool.connection(db):
+        pass
+    with pool.connection(db):
+        pass
+    assert pool.get_stats()["health_checks"] == 1
+
+
+def test_bounded_pool_queues_and_evicts_idle_connections(tmp_path: Path):
+    pool = SQLiteConnectionPool(max_connections=1, acquire_timeout=5.0)
+    a = _make_db(tmp_path / "a.sqlite", "a")
+    b = _make_db(tmp_path / "b.sqlite", "b")
+
+    # An idle connection to another database is closed to make room.
+    with pool.connection(a):
+        pass
+    with pool.connection(b):
+        pass
+    assert pool.get_stats()["closed_evicted"] == 1
+
+    held = pool.get_connection(a)
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.get_connection(b)))
+    waiter.start()
+    deadline = time.monotonic() + 5
+    while pool.get_stats()["waiting"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not got
+
+    pool.return_connection(held)
+    waiter.join(5)
+    assert got and got[0].execute("SELECT name FROM marker").fetchone()[0] == "b"
+    stats = pool.get_stats()
+    assert stats["open"] == 1 and stats["waits"] == 1
+    pool.return_connection(got[0])
+
+
+def test_exhausted_pool_times_out(tmp_path: Path):
+    pool = SQLiteConnectionPool(max_connections=1, acquire_timeout=0.05)
+    db = _make_db(tmp_path / "a.sqlite", "a")
+    with pool.connection(db):
+        with pytest.raises(TimeoutError):
+            pool.get_connection(db)
+    assert pool.get_stats()["wait_timeouts"] == 1
+    # The pool is still usable afterwards.
+    with pool.connection(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM marker").fetchone()[0] == 1
+
+
+def test_connections_checked_out_across_close_all_are_not_pooled(tmp_path: Path):
+    pool = SQLiteConnectionPool()
+    db = _make_db(tmp_path / "a.sqlite", "a")
+    held = pool.get_connection(db)
+    pool.close_all()
+
+    pool.return_connection(held)
+    stats = pool.get_stats()
+    assert (stats["open"], stats["idle"], stats["closed_stale"]) == (0, 0, 1)
+    with pytest.raises(sqlite3.ProgrammingError):
+        held.execute("SELECT 1")
+
+
+def test_in_memory_databases_are_private_to_each_checkout():
+    pool = SQLiteConnectionPool()
+    with pool.connection(":memory:") as conn:
+        conn.execute("CREATE TABLE secret (v TEXT)")
+    with pool.connection(":memory:") as conn:
+        assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+
+    stats = pool.get_stats()
+    assert (stats["open"], stats["idle"], stats["in_use"]) == (0, 0, 0)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import csv
+import random
+from pathlib import Path
+
+from tool_box.tools_impl.graph_rag.graph_rag import GraphRAG, _normalize, _tokenize
+
+FIELDS = ["entity1", "entity1_type", "relation", "entity2", "entity2_type", "pdf_name", "source"]
+WORDS = ["phage", "host", "lysis", "receptor", "噬菌体", "细菌", "宿主", "感染", "T4", "capsid", "DNA"]
+
+
+def _write_triples(path: Path, rows: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    entities = [f"{rng.choice(WORDS)}{rng.choice(['', '-1', '-2'])}" for _ in range(40)]
+    with path.open("w", newline="", encoding="utf-8") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(FIELDS)
+        for i in range(rows):
+            writer.writerow(
+                [
+                    rng.choice(entities),
+                    "A",
+                    rng.choice(["infects", "binds", "裂解"]),
+                    rng.choice(entities + [""]),
+                    "B",
+                    f"paper_{i % 5}.pdf",
+                    " ".join(rng.choices(WORDS, k=4)),
+                ]
+            )
+
+
+def _full_scan(rag: GraphRAG, query: str, top_k: int):
+    """Reference ranking: score every triple, stable sort."""
+    q_tokens = set(_tokenize(query))
+    scored = []
+    for idx, row in rag.df.iterrows():
+        text = f"{row['entity1']} --{row['relation']}--> {row['entity2']} | src: {row['source']}"
+        tokens = set(_tokenize(text))
+        base = len(q_tokens & tokens) / (len(q_tokens) ** 0.5 * len(tokens) ** 0.5)
+        boost = 0.0
+        for ent in (row["entity1"], row["entity2"]):
+            if _normalize(ent) and _normalize(ent) in _normalize(query):
+                boost += 0.3
+        scored.append((base + boost, idx))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [(round(sc, 4), rag.df.iloc[idx]["entity1"], rag.df.iloc[idx]["source"]) for sc, idx in scored[:top_k]]
+
+
+def test_indexed_search_matches_a_full_scan(tmp_path: Path):
+    path = tmp_path / "triples.csv"
+    _write_triples(path, 300)
+    rag = GraphRAG(str(path), persist_index=False)
+
+    for query in ["phage infects host", "噬菌体如何感染细菌？", "capsid-1 DNA", "宿主", "nothing here", "T4"]:
+        for top_k in (3, 12, 40):
+            got = [(t["score"], t["entity1"], t["source"]) for t in rag.search_triples(query, top_k)]
+            assert got == _full_scan(rag, query, top_k), (query, top_k)
+
+
+def test_index_is_persisted_and_keyed_by_file_hash(tmp_path: Path):
+    path = tmp_path / "triples.csv"
+    _write_triples(path, 50)
+
+    first = GraphRAG(str(path))
+    sidecar = Path(first.index_path)
+    assert sidecar.exists() and not first.index_loaded_from_disk
+
+    second = GraphRAG(str(path))
+    assert second.index_loaded_from_disk
+    assert second.search_triples("phage host", 10) == first.search_triples("phage host", 10)
+    assert second.G.number_of_edges() == first.G.number_of_edges()
+
+    # Editing the triples file invalidates the sidecar.
+    _write_triples(path, 60, seed=8)
+    third = GraphRAG(str(path))
+    assert not third.index_loaded_from_disk
+    assert third.index.size == 60
+
+    # A corrupt sidecar is rebuilt rather than failing the load.
+    sidecar.write_bytes(b"not an index")
+    assert GraphRAG(str(path)).index.size == 60
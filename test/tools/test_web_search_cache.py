@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+from app.config import get_search_settings
+from tool_box.cache import get_cache_stats
+from tool_box.tools_impl.web_search import router
+from tool_box.tools_impl.web_search.cache import get_search_cache, normalize_query, reset_search_cache
+from tool_box.tools_impl.web_search.exceptions import WebSearchError
+from tool_box.tools_impl.web_search.handler import web_search_handler
+from tool_box.tools_impl.web_search.providers import register_provider
+from tool_box.tools_impl.web_search.result import WebSearchResult
+
+
+@pytest.fixture()
+def fake_provider():
+    calls = []
+
+    async def search(*, query, max_results, settings, **_):
+        calls.append(query)
+        await asyncio.sleep(0.05)
+        if "fail" in query:
+            raise WebSearchError(code="http_error", message="boom", provider="fake")
+        return WebSearchResult(query=query, provider="fake", response=f"answer for {query}")
+
+    router._ensure_initialised()
+    register_provider("fake", search)
+    reset_search_cache()
+    yield calls
+    reset_search_cache()
+
+
+def test_queries_are_normalized():
+    assert normalize_query("  What is  CRISPR？ ") == normalize_query("what is crispr?") == "what is crispr"
+    assert normalize_query("ＴＥＳＴ\n查询。") == "test 查询"
+
+
+@pytest.mark.asyncio
+async def test_repeated_and_concurrent_queries_share_one_search(fake_provider):
+    first, second = await asyncio.gather(
+        router.dispatch(query="Phage therapy", provider="fake", max_results=5),
+        router.dispatch(query="phage   therapy?", provider="fake", max_results=5),
+    )
+    third = await router.dispatch(query="PHAGE THERAPY", provider="fake", max_results=5)
+
+    assert fake_provider == ["Phage therapy"]
+    assert "cache_hit" not in first.meta
+    assert second.meta["cache_hit"] and third.meta["cache_hit"]
+    assert third.query == "PHAGE THERAPY" and third.response == first.response
+
+    # Result size and explicit opt-out both lead to real searches.
+    await router.dispatch(query="phage therapy", provider="fake", max_results=3)
+    await router.dispatch(query="phage therapy", provider="fake", max_results=5, use_cache=False)
+    assert len(fake_provider) == 3
+
+    stats = (await get_cache_stats())["web_search"]
+    assert (stats["hits"], stats["coalesced"], stats["misses"]) == (1, 1, 2)
+    assert stats["hit_rate"] == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached_and_entries_expire(fake_provider):
+    for _ in range(2):
+        with pytest.raises(WebSearchError):
+            await router.dispatch(query="fail please", provider="fake", max_results=5)
+    assert len(fake_provider) == 2
+
+    settings = replace(get_search_settings(), cache_ttl=0.01)
+    get_search_cache().ttl_seconds = settings.cache_ttl
+    await router.dispatch(query="short lived", provider="fake", max_results=5, settings=settings)
+    await asyncio.sleep(0.02)
+    await router.dispatch(query="short lived", provider="fake", max_results=5, settings=settings)
+    assert fake_provider.count("short lived") == 2
+
+
+@pytest.mark.asyncio
+async def test_batched_queries_run_concurrently_in_order(fake_provider):
+    payload = await web_search_handler(
+        queries=["alpha", "beta", "Alpha", "fail here", "gamma"],
+        provider="fake",
+    )
+
+    assert [item["query"] for item in payload["results"]] == ["alpha", "beta", "Alpha", "fail here", "gamma"]
+    assert [item["success"] for item in payload["results"]] == [True, True, True, False, True]
+    assert payload["results"][3]["code"] == "http_error"
+    assert payload["succeeded"] == 4 and payload["success"]
+    # "Alpha" coalesced with "alpha".
+    assert sorted(fake_provider) == ["alpha", "beta", "fail here", "gamma"]
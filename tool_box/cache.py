@@ -321,12 +321,15 @@ async def get_persistent_cache() -> PersistentToolCache:
 
 async def get_cache_stats() -> Dict[str, Any]:
     """Get combined cache statistics"""
+    from .tools_impl.web_search.cache import get_search_cache_stats
+
     memory_stats = await _memory_cache.get_stats()
     persistent_stats = await _persistent_cache.get_stats()
 
     return {
         "memory_cache": memory_stats,
         "persistent_cache": persistent_stats,
+        "web_search": get_search_cache_stats(),
         "combined": {
             "total_entries": memory_stats["total_entries"] + persistent_stats["total_entries"],
             "total_accesses": memory_stats["total_accesses"] + persistent_stats["total_accesses"],
@@ -6,80 +6,310 @@ This module provides database query functionality for AI agents.
 
 import asyncio
 import logging
+import os
 import sqlite3
 import threading
-from contextlib import asynccontextmanager
-from typing import Any, Dict, List, Optional
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from .executors import run_blocking
 
 logger = logging.getLogger(__name__)
 
+# Rows returned by one query call unless the caller asks for a different page size
+DEFAULT_MAX_ROWS = 1000
+MAX_ROWS_LIMIT = 10000
+# Rows fetched per round trip from the cursor
+_FETCH_BATCH = 500
+
+
+@dataclass
+class _PooledConnection:
+    """A pooled connection and the database path it was opened for"""
+
+    conn: sqlite3.Connection
+    database: str
+    generation: int = 0
+    pooled: bool = True
+    last_used: float = field(default_factory=time.monotonic)
+
 
 class SQLiteConnectionPool:
-    """Simple SQLite connection pool for better performance"""
+    """
+    SQLite connection pool keyed by database path
+
+    - a connection is only ever handed back out for the database it was opened for;
+    - at most ``max_connections`` connections are open at once (checked out plus
+      idle); when the bound is reached an idle connection to another database is
+      closed, otherwise callers wait up to ``acquire_timeout`` seconds in FIFO
+      order for one to be returned;
+    - at most ``max_idle_per_database`` idle connections are kept per path, and
+      idle connections older than ``idle_timeout`` are closed;
+    - a liveness check (``SELECT 1``) only runs on connections that sat idle
+      longer than ``health_check_after`` seconds;
+    - in-memory databases are never pooled: each checkout gets a private
+      connection that is closed when returned.
+    """
 
-    def __init__(self, max_connections: int = 10):
-        self.max_connections = max_connections
-        self.connections: List[sqlite3.Connection] = []
-        self.in_use: set = set()
-        self._lock = threading.Lock()
+    def __init__(
+        self,
+        max_connections: int = 10,
+        max_idle_per_database: int = 2,
+        acquire_timeout: float = 30.0,
+        health_check_after: float = 30.0,
+        idle_timeout: float = 300.0,
+    ):
+        self.max_connections = max(1, max_connections)
+        self.max_idle_per_database = max(1, max_idle_per_database)
+        self.acquire_timeout = acquire_timeout
+        self.health_check_after = health_check_after
+        self.idle_timeout = idle_timeout
+        self._idle: "OrderedDict[str, List[_PooledConnection]]" = OrderedDict()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._open = 0
+        self._generation = 0
+        self._waiters: Deque[object] = deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._stats: Dict[str, int] = {
+            "opened": 0,
+            "reused": 0,
+            "health_checks": 0,
+            "health_check_failures": 0,
+            "closed_idle": 0,
+            "closed_evicted": 0,
+            "closed_stale": 0,
+            "waits": 0,
+            "wait_timeouts": 0,
+        }
+
+    @staticmethod
+    def _key(database: str) -> str:
+        if database.startswith("file:"):
+            return database
+        return os.path.abspath(database)
+
+    @staticmethod
+    def _is_private(database: str) -> bool:
+        # Each connection to ":memory:" (or "") is its own database, so a pooled
+        # one would leak tables and rows between unrelated callers
+        return database in ("", ":memory:")
 
     def get_connection(self, database: str) -> sqlite3.Connection:
-        """Get a connection from the pool"""
-        with self._lock:
-            # Try to reuse existing connection
-            for conn in self.connections:
-                if id(conn) not in self.in_use:
-                    # Check if connection is still valid
-                    try:
-                        conn.execute("SELECT 1")
-                        self.in_use.add(id(conn))
-                        return conn
-                    except sqlite3.Error:
-                        # Connection is invalid, remove it
-                        self.connections.remove(conn)
-                        continue
-
-            # Create new connection if pool not full
-            if len(self.connections) < self.max_connections:
-                conn = sqlite3.connect(database, check_same_thread=False)
-                conn.row_factory = sqlite3.Row
-                # Enable WAL mode for better concurrency
-                conn.execute("PRAGMA journal_mode=WAL")
-                conn.execute("PRAGMA synchronous=NORMAL")
-                conn.execute("PRAGMA cache_size=10000")
-                conn.execute("PRAGMA temp_store=MEMORY")
-
-                self.connections.append(conn)
-                self.in_use.add(id(conn))
-                return conn
-
-            # Pool is full, create temporary connection
-            conn = sqlite3.connect(database)
-            conn.row_factory = sqlite3.Row
-            return conn
+        """Check out a connection to ``database``; blocks while the pool is exhausted"""
+        if self._is_private(database):
+            entry = _PooledConnection(conn=self._connect(database), database=database, pooled=False)
+            with self._cond:
+                self._in_use[id(entry.conn)] = entry
+            return entry.conn
+
+        key = self._key(database)
+        deadline = time.monotonic() + self.acquire_timeout
+        ticket = object()
+        with self._cond:
+            self._waiters.append(ticket)
+            try:
+                waited = False
+                while True:
+                    # First come, first served once the pool is exhausted
+                    if self._waiters[0] is ticket:
+                        entry, to_close = self._checkout_locked(key)
+                        if entry is not None or to_close is not None:
+                            break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["wait_timeouts"] += 1
+                        raise TimeoutError(
+                            f"No database connection available within {self.acquire_timeout}s "
+                            f"({self._open}/{self.max_connections} open)"
+                        )
+                    if not waited:
+                        waited = True
+                        self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+            finally:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+
+        self._close_entries(to_close)
+        if entry is not None:
+            entry = self._check_health(entry)
+        if entry is None:
+            entry = self._open_connection(key)
+        with self._cond:
+            self._in_use[id(entry.conn)] = entry
+        return entry.conn
 
     def return_connection(self, conn: sqlite3.Connection) -> None:
         """Return a connection to the pool"""
-        with self._lock:
-            if id(conn) in self.in_use:
-                self.in_use.remove(id(conn))
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            return
+        if conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+        if not entry.pooled:
+            self._close_entries([entry])
+            return
+        now = time.monotonic()
+        to_close: List[_PooledConnection] = []
+        with self._cond:
+            if entry.generation != self._generation:
+                # Checked out before close_all(): close instead of pooling
+                to_close.append(entry)
+                self._open -= 1
+                self._stats["closed_stale"] += 1
+            elif len(self._idle.get(entry.database, ())) >= self.max_idle_per_database:
+                to_close.append(entry)
+                self._open -= 1
+            else:
+                stack = self._idle.setdefault(entry.database, [])
+                entry.last_used = now
+                stack.append(entry)
+                self._idle.move_to_end(entry.database)
+            to_close.extend(self._expire_idle_locked(now))
+            self._cond.notify_all()
+        self._close_entries(to_close)
+
+    @contextmanager
+    def connection(self, database: str) -> Iterator[sqlite3.Connection]:
+        """Check out a connection for the duration of a ``with`` block"""
+        conn = self.get_connection(database)
+        try:
+            yield conn
+        finally:
+            self.return_connection(conn)
 
     def close_all(self) -> None:
-        """Close all connections in the pool"""
-        with self._lock:
-            for conn in self.connections:
-                try:
-                    conn.close()
-                except sqlite3.Error:
-                    pass
-            self.connections.clear()
-            self.in_use.clear()
+        """Close idle connections; checked-out ones are closed when returned"""
+        with self._cond:
+            entries = [entry for stack in self._idle.values() for entry in stack]
+            self._idle.clear()
+            self._generation += 1
+            self._open -= len(entries)
+            self._cond.notify_all()
+        self._close_entries(entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool occupancy and counters"""
+        with self._cond:
+            return {
+                "max_connections": self.max_connections,
+                "open": self._open,
+                "in_use": len(self._in_use),
+                "idle": sum(len(stack) for stack in self._idle.values()),
+                "databases": len(self._idle),
+                "waiting": len(self._waiters),
+                **self._stats,
+            }
+
+    def _checkout_locked(self, key: str):
+        """
+        Pick an idle connection or reserve a slot for a new one
+
+        Returns:
+            (entry, None) to reuse ``entry``; (None, entries_to_close) when a slot
+            was reserved; (None, None) when the caller has to wait.
+        """
+        stack = self._idle.get(key)
+        if stack:
+            entry = stack.pop()
+            if not stack:
+                del self._idle[key]
+            return entry, None
+        if self._open < self.max_connections:
+            self._open += 1
+            return None, []
+        # Full: make room by closing the least recently used idle connection of another database
+        for other, other_stack in self._idle.items():
+            victim = other_stack.pop(0)
+            if not other_stack:
+                del self._idle[other]
+            self._stats["closed_evicted"] += 1
+            return None, [victim]
+        return None, None
+
+    def _check_health(self, entry: _PooledConnection) -> Optional[_PooledConnection]:
+        if time.monotonic() - entry.last_used < self.health_check_after:
+            with self._cond:
+                self._stats["reused"] += 1
+            return entry
+        try:
+            entry.conn.execute("SELECT 1")
+        except sqlite3.Error:
+            # Keep the slot and open a replacement instead
+            self._close_entries([entry])
+            with self._cond:
+                self._stats["health_checks"] += 1
+                self._stats["health_check_failures"] += 1
+            return None
+        with self._cond:
+            self._stats["health_checks"] += 1
+            self._stats["reused"] += 1
+        return entry
+
+    @staticmethod
+    def _connect(database: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(database, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # Enable WAL mode for better concurrency
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=10000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _open_connection(self, key: str) -> _PooledConnection:
+        try:
+            conn = self._connect(key)
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._stats["opened"] += 1
+            generation = self._generation
+        return _PooledConnection(conn=conn, database=key, generation=generation)
+
+    def _expire_idle_locked(self, now: float) -> List[_PooledConnection]:
+        expired: List[_PooledConnection] = []
+        for key in list(self._idle):
+            stack = self._idle[key]
+            keep = [entry for entry in stack if now - entry.last_used < self.idle_timeout]
+            if len(keep) != len(stack):
+                expired.extend(entry for entry in stack if now - entry.last_used >= self.idle_timeout)
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+        self._open -= len(expired)
+        self._stats["closed_idle"] += len(expired)
+        return expired
+
+    @staticmethod
+    def _close_entries(entries: Optional[List[_PooledConnection]]) -> None:
+        for entry in entries or ():
+            try:
+                entry.conn.close()
+            except sqlite3.Error:
+                pass
 
 
 # Global connection pool
 _connection_pool = SQLiteConnectionPool()
 
 
+def get_connection_pool_stats() -> Dict[str, Any]:
+    """Statistics of the shared database_query connection pool"""
+    return _connection_pool.get_stats()
+
+
 @asynccontextmanager
 async def get_db_connection(database: str):
     """Async context manager for database connections"""
@@ -110,7 +340,12 @@ def _normalize_database_path(database: str) -> str:
 
 
 async def database_query_handler(
-    database: str, sql: str, operation: str = "query", params: Optional[List[Any]] = None
+    database: str,
+    sql: str,
+    operation: str = "query",
+    params: Optional[List[Any]] = None,
+    max_rows: Optional[int] = None,
+    offset: int = 0,
 ) -> Dict[str, Any]:
     """
     Database query tool handler
@@ -120,19 +355,24 @@ async def database_query_handler(
         sql: SQL query string
         operation: Operation type ("query", "execute", "schema")
         params: Query parameters for parameterized queries
+        max_rows: Page size for query results (default 1000, at most 10000)
+        offset: Number of result rows to skip (query operations)
 
     Returns:
         Dict containing query results
+
+    Queries run on the bounded "database" executor; results are paged so a
+    large table never has to be materialized at once.
     """
     try:
         # 规范化数据库路径
         database = _normalize_database_path(database)
         if operation == "query":
-            return await _execute_query(database, sql, params)
+            return await run_blocking("database", _execute_query, database, sql, params, max_rows, offset)
         elif operation == "execute":
-            return await _execute_statement(database, sql, params)
+            return await run_blocking("database", _execute_statement, database, sql, params)
         elif operation == "schema":
-            return await _get_schema(database)
+            return await run_blocking("database", _get_schema, database)
         else:
             return {"operation": operation, "success": False, "error": f"Unsupported operation: {operation}"}
 
@@ -141,8 +381,14 @@ async def database_query_handler(
         return {"operation": operation, "database": database, "success": False, "error": str(e)}
 
 
-async def _execute_query(database: str, sql: str, params: Optional[List[Any]] = None) -> Dict[str, Any]:
-    """Execute SELECT query using connection pool"""
+def _execute_query(
+    database: str,
+    sql: str,
+    params: Optional[List[Any]] = None,
+    max_rows: Optional[int] = None,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """Execute SELECT query using connection pool, returning one page of rows"""
     try:
         # 🔒 专事专办检查：如果是查询pending任务且没有session_id过滤，记录警告
         if ("tasks" in sql.lower() and "status" in sql.lower() and "pending" in sql.lower() 
@@ -150,7 +396,10 @@ async def _execute_query(database: str, sql: str, params: Optional[List[Any]] =
             logger.warning(f"🚨 检测到可能违反专事专办原则的SQL查询: {sql}")
             logger.warning("💡 建议：待办任务查询应包含 session_id 过滤条件")
         
-        async with get_db_connection(database) as conn:
+        page_size = DEFAULT_MAX_ROWS if max_rows is None else max(1, min(int(max_rows), MAX_ROWS_LIMIT))
+        offset = max(0, int(offset or 0))
+
+        with _connection_pool.connection(database) as conn:
             cursor = conn.cursor()
 
             try:
@@ -160,14 +409,28 @@ async def _execute_query(database: str, sql: str, params: Optional[List[Any]] =
                 else:
                     cursor.execute(sql)
 
-                # Fetch results
-                rows = cursor.fetchall()
                 columns = [desc[0] for desc in cursor.description] if cursor.description else []
 
-                # Convert rows to dicts
-                results = []
-                for row in rows:
-                    results.append(dict(row))
+                # Skip to the requested page without holding skipped rows
+                skipped = 0
+                while skipped < offset:
+                    batch = cursor.fetchmany(min(_FETCH_BATCH, offset - skipped))
+                    if not batch:
+                        break
+                    skipped += len(batch)
+
+                # Stream the page in batches; one extra row tells whether another page exists
+                results: List[Dict[str, Any]] = []
+                has_more = False
+                while True:
+                    batch = cursor.fetchmany(min(_FETCH_BATCH, page_size + 1 - len(results)))
+                    if not batch:
+                        break
+                    results.extend(dict(row) for row in batch)
+                    if len(results) > page_size:
+                        has_more = True
+                        del results[page_size:]
+                        break
 
                 return {
                     "operation": "query",
@@ -177,6 +440,9 @@ async def _execute_query(database: str, sql: str, params: Optional[List[Any]] =
                     "columns": columns,
                     "rows": results,
                     "row_count": len(results),
+                    "offset": offset,
+                    "has_more": has_more,
+                    "next_offset": offset + len(results) if has_more else None,
                 }
 
             finally:
@@ -186,10 +452,10 @@ async def _execute_query(database: str, sql: str, params: Optional[List[Any]] =
         return {"operation": "query", "database": database, "sql": sql, "success": False, "error": str(e)}
 
 
-async def _execute_statement(database: str, sql: str, params: Optional[List[Any]] = None) -> Dict[str, Any]:
+def _execute_statement(database: str, sql: str, params: Optional[List[Any]] = None) -> Dict[str, Any]:
     """Execute INSERT, UPDATE, DELETE statements using connection pool"""
     try:
-        async with get_db_connection(database) as conn:
+        with _connection_pool.connection(database) as conn:
             cursor = conn.cursor()
 
             try:
@@ -217,10 +483,10 @@ async def _execute_statement(database: str, sql: str, params: Optional[List[Any]
         return {"operation": "execute", "database": database, "sql": sql, "success": False, "error": str(e)}
 
 
-async def _get_schema(database: str) -> Dict[str, Any]:
+def _get_schema(database: str) -> Dict[str, Any]:
     """Get database schema information using connection pool"""
     try:
-        async with get_db_connection(database) as conn:
+        with _connection_pool.connection(database) as conn:
             cursor = conn.cursor()
 
             try:
@@ -290,6 +556,8 @@ database_query_tool = {
                 "description": "查询参数（用于参数化查询）",
                 "items": {"type": ["string", "number", "boolean", "null"]},
             },
+            "max_rows": {"type": "integer", "description": "单页返回的最大行数（默认1000，上限10000）", "minimum": 1},
+            "offset": {"type": "integer", "description": "跳过的结果行数（用于分页）", "minimum": 0, "default": 0},
         },
         "required": ["database", "sql"],
     },
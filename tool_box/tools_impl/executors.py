@@ -0,0 +1,61 @@
+"""
+Bounded thread pools for blocking tool work
+
+Tool handlers are ``async`` and run on the FastAPI event loop, but file system
+and ``sqlite3`` calls block. Handlers hand that work to a small, named thread
+pool per kind of I/O so one large file or slow query cannot stall concurrent
+requests, and file operations cannot starve database queries (or vice versa).
+
+Pool sizes come from ``TOOL_<NAME>_WORKERS`` (e.g. ``TOOL_FILE_WORKERS``).
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_WORKERS = 4
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _worker_count(name: str) -> int:
+    raw = os.getenv(f"TOOL_{name.upper()}_WORKERS")
+    try:
+        return max(1, int(raw)) if raw else DEFAULT_WORKERS
+    except ValueError:
+        logger.warning(f"Ignoring invalid TOOL_{name.upper()}_WORKERS={raw!r}")
+        return DEFAULT_WORKERS
+
+
+def get_tool_executor(name: str) -> ThreadPoolExecutor:
+    """Return the shared executor for one kind of blocking work ("file", "database", ...)"""
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=_worker_count(name), thread_name_prefix=f"tool-{name}")
+            _executors[name] = executor
+        return executor
+
+
+async def run_blocking(name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``func`` on the named pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_tool_executor(name), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_tool_executors(wait: bool = True) -> None:
+    """Stop every tool executor; they are recreated lazily on next use"""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
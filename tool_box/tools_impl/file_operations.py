@@ -10,6 +10,8 @@ import shutil
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from .executors import run_blocking
+
 logger = logging.getLogger(__name__)
 
 # Security configuration
@@ -26,6 +28,11 @@ ALLOWED_BASE_PATHS = [
 # 默认工作目录 - 避免在根目录创建文件
 DEFAULT_WORK_DIR = "results"
 
+# Files larger than this are rejected by whole-file operations; reads page through them instead
+MAX_FILE_SIZE = 10 * 1024 * 1024
+# Bytes returned by one read call unless the caller asks for a different range
+DEFAULT_READ_LIMIT = 1024 * 1024
+
 
 def _normalize_file_path(file_path: str) -> str:
     """规范化文件路径，避免在根目录创建文件"""
@@ -37,10 +44,14 @@ def _normalize_file_path(file_path: str) -> str:
     return file_path
 
 
-def _validate_path_security(file_path: str) -> tuple[bool, str]:
+def _validate_path_security(file_path: str, check_size: bool = True) -> tuple[bool, str]:
     """
     Validate file path for security
 
+    Args:
+        file_path: Path to validate
+        check_size: Reject existing files larger than ``MAX_FILE_SIZE``
+
     Returns:
         (is_safe, error_message)
     """
@@ -72,9 +83,9 @@ def _validate_path_security(file_path: str) -> tuple[bool, str]:
             if str(abs_path).startswith(dangerous):
                 return False, f"Access to {dangerous} is not allowed"
 
-        # Check file size for read operations (prevent reading huge files)
-        if abs_path.exists() and abs_path.is_file():
-            if abs_path.stat().st_size > 10 * 1024 * 1024:  # 10MB limit
+        # Check file size (prevent loading huge files at once)
+        if check_size and abs_path.exists() and abs_path.is_file():
+            if abs_path.stat().st_size > MAX_FILE_SIZE:
                 return False, "File too large (>10MB)"
 
         return True, ""
@@ -89,6 +100,8 @@ async def file_operations_handler(
     content: Optional[str] = None,
     destination: Optional[str] = None,
     pattern: Optional[str] = None,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
 ) -> Dict[str, Any]:
     # 规范化文件路径
     path = _normalize_file_path(path)
@@ -103,31 +116,36 @@ async def file_operations_handler(
         content: Content for write operations
         destination: Destination path for copy/move operations
         pattern: File pattern for list operations
+        offset: Byte offset to start reading from (read operations)
+        limit: Maximum number of bytes to read (read operations)
 
     Returns:
         Dict containing operation results
+
+    All file system work runs on the bounded "file" executor so the event
+    loop stays responsive.
     """
     try:
         if operation == "read":
-            return await _read_file(path)
+            return await run_blocking("file", _read_file, path, offset or 0, limit)
         elif operation == "write":
-            return await _write_file(path, content or "")
+            return await run_blocking("file", _write_file, path, content or "")
         elif operation == "list":
-            return await _list_directory(path, pattern)
+            return await run_blocking("file", _list_directory, path, pattern)
         elif operation == "delete":
-            return await _delete_path(path)
+            return await run_blocking("file", _delete_path, path)
         elif operation == "copy":
             if not destination:
                 return {"operation": operation, "path": path, "success": False, "error": "Destination is required"}
-            return await _copy_path(path, destination)
+            return await run_blocking("file", _copy_path, path, destination)
         elif operation == "move":
             if not destination:
                 return {"operation": operation, "path": path, "success": False, "error": "Destination is required"}
-            return await _move_path(path, destination)
+            return await run_blocking("file", _move_path, path, destination)
         elif operation == "exists":
-            return await _check_exists(path)
+            return await run_blocking("file", _check_exists, path)
         elif operation == "info":
-            return await _get_file_info(path)
+            return await run_blocking("file", _get_file_info, path)
         else:
             return {"operation": operation, "success": False, "error": f"Unsupported operation: {operation}"}
 
@@ -136,11 +154,26 @@ async def file_operations_handler(
         return {"operation": operation, "path": path, "success": False, "error": str(e)}
 
 
-async def _read_file(file_path: str) -> Dict[str, Any]:
-    """Read file content with security validation"""
+def _decode_chunk(data: bytes, at_eof: bool) -> tuple[str, int]:
+    """
+    Decode a UTF-8 chunk, leaving a character split by the range end for the next read
+
+    Returns:
+        (text, bytes_consumed)
+    """
+    try:
+        return data.decode("utf-8"), len(data)
+    except UnicodeDecodeError as e:
+        if at_eof or e.reason != "unexpected end of data" or len(data) - e.start > 3:
+            raise
+        return data[: e.start].decode("utf-8"), e.start
+
+
+def _read_file(file_path: str, offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Read a byte range of a file with security validation"""
     try:
-        # Security validation
-        is_safe, error_msg = _validate_path_security(file_path)
+        # Security validation; size is bounded by the range instead
+        is_safe, error_msg = _validate_path_security(file_path, check_size=False)
         if not is_safe:
             return {
                 "operation": "read",
@@ -157,9 +190,15 @@ async def _read_file(file_path: str) -> Dict[str, Any]:
         if not path.is_file():
             return {"operation": "read", "path": file_path, "success": False, "error": "Path is not a file"}
 
-        # File size already checked in security validation
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
+        offset = max(0, int(offset))
+        limit = DEFAULT_READ_LIMIT if limit is None else max(1, min(int(limit), MAX_FILE_SIZE))
+        with open(path, "rb") as f:
+            total_size = os.fstat(f.fileno()).st_size
+            f.seek(offset)
+            data = f.read(limit)
+        end = offset + len(data)
+        content, consumed = _decode_chunk(data, at_eof=end >= total_size)
+        next_offset = offset + consumed
 
         return {
             "operation": "read",
@@ -168,6 +207,10 @@ async def _read_file(file_path: str) -> Dict[str, Any]:
             "content": content,
             "size": len(content),
             "encoding": "utf-8",
+            "offset": offset,
+            "total_size": total_size,
+            "next_offset": next_offset if next_offset < total_size else None,
+            "truncated": offset > 0 or next_offset < total_size,
         }
 
     except UnicodeDecodeError:
@@ -181,7 +224,7 @@ async def _read_file(file_path: str) -> Dict[str, Any]:
         return {"operation": "read", "path": file_path, "success": False, "error": str(e)}
 
 
-async def _write_file(file_path: str, content: str) -> Dict[str, Any]:
+def _write_file(file_path: str, content: str) -> Dict[str, Any]:
     """Write content to file with security validation"""
     try:
         # Security validation
@@ -208,7 +251,7 @@ async def _write_file(file_path: str, content: str) -> Dict[str, Any]:
         return {"operation": "write", "path": file_path, "success": False, "error": str(e)}
 
 
-async def _list_directory(dir_path: str, pattern: Optional[str] = None) -> Dict[str, Any]:
+def _list_directory(dir_path: str, pattern: Optional[str] = None) -> Dict[str, Any]:
     """List directory contents"""
     try:
         path = Path(dir_path)
@@ -239,7 +282,7 @@ async def _list_directory(dir_path: str, pattern: Optional[str] = None) -> Dict[
         return {"operation": "list", "path": dir_path, "success": False, "error": str(e)}
 
 
-async def _delete_path(target_path: str) -> Dict[str, Any]:
+def _delete_path(target_path: str) -> Dict[str, Any]:
     """Delete file or directory with security validation"""
     try:
         # Security validation
@@ -268,7 +311,7 @@ async def _delete_path(target_path: str) -> Dict[str, Any]:
         return {"operation": "delete", "path": target_path, "success": False, "error": str(e)}
 
 
-async def _copy_path(source: str, destination: str) -> Dict[str, Any]:
+def _copy_path(source: str, destination: str) -> Dict[str, Any]:
     """Copy file or directory with security validation"""
     try:
         # Security validation for both paths
@@ -318,7 +361,7 @@ async def _copy_path(source: str, destination: str) -> Dict[str, Any]:
         return {"operation": "copy", "source": source, "destination": destination, "success": False, "error": str(e)}
 
 
-async def _move_path(source: str, destination: str) -> Dict[str, Any]:
+def _move_path(source: str, destination: str) -> Dict[str, Any]:
     """Move file or directory with security validation"""
     try:
         # Security validation for both paths
@@ -365,7 +408,7 @@ async def _move_path(source: str, destination: str) -> Dict[str, Any]:
         return {"operation": "move", "source": source, "destination": destination, "success": False, "error": str(e)}
 
 
-async def _check_exists(target_path: str) -> Dict[str, Any]:
+def _check_exists(target_path: str) -> Dict[str, Any]:
     """Check if path exists"""
     path = Path(target_path)
     return {
@@ -376,7 +419,7 @@ async def _check_exists(target_path: str) -> Dict[str, Any]:
     }
 
 
-async def _get_file_info(target_path: str) -> Dict[str, Any]:
+def _get_file_info(target_path: str) -> Dict[str, Any]:
     """Get file/directory information"""
     try:
         path = Path(target_path)
@@ -418,6 +461,8 @@ file_operations_tool = {
             "content": {"type": "string", "description": "写入的内容（write操作时需要）"},
             "destination": {"type": "string", "description": "目标路径（copy/move操作时需要）"},
             "pattern": {"type": "string", "description": "文件匹配模式（list操作时可选）"},
+            "offset": {"type": "integer", "description": "读取起始字节偏移（read操作时可选，默认0）", "minimum": 0},
+            "limit": {"type": "integer", "description": "单次读取的最大字节数（read操作时可选，默认1MB）", "minimum": 1},
         },
         "required": ["operation", "path"],
     },
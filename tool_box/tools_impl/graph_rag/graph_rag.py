@@ -3,24 +3,48 @@
 GraphRAG: Lightweight, LLM-agnostic Graph RAG over extracted triples.
 - Loads Triples/all_triples.csv
 - Builds a NetworkX graph
+- Indexes triples by token and entity name (persisted as a sidecar file keyed
+  by the triples file hash, so restarts skip re-indexing)
 - Retrieves relevant triples and an optional k-hop subgraph for a query
 - Produces a compact prompt string any LLM can consume
 """
 
 from __future__ import annotations
 
+import hashlib
+import heapq
 import json
+import logging
 import os
 import re
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import networkx as nx
+import numpy as np
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
 TRIPLES_PATH_DEFAULT = os.path.join(
     os.path.dirname(__file__), "Triples", "all_triples.csv"
 )
 
+TRIPLE_COLUMNS = (
+    "entity1",
+    "entity1_type",
+    "relation",
+    "entity2",
+    "entity2_type",
+    "pdf_name",
+    "source",
+)
+
+# Bump when the layout of the persisted index changes.
+INDEX_FORMAT_VERSION = 1
+INDEX_SUFFIX = ".graphrag-index.npz"
+ENTITY_MATCH_BOOST = 0.3
+_HASH_CHUNK_BYTES = 1024 * 1024
+
 
 def _normalize(text: str) -> str:
     return (text or "").strip().lower()
@@ -30,106 +54,275 @@ def _tokenize(text: str) -> List[str]:
     return re.findall(r"\b\w+\b", _normalize(text))
 
 
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _to_csr(postings: Dict[str, List[int]]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Flatten ``key -> ids`` into (keys, offsets, ids) arrays."""
+    keys = list(postings)
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(postings[k]) for k in keys])
+    ids = np.fromiter(
+        (i for k in keys for i in postings[k]), dtype=np.int32, count=int(offsets[-1])
+    )
+    return keys, offsets, ids
+
+
+def _json_blob(value: Any) -> np.ndarray:
+    return np.frombuffer(
+        json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"), dtype=np.uint8
+    )
+
+
+def _from_json_blob(blob: np.ndarray) -> Any:
+    return json.loads(blob.tobytes().decode("utf-8"))
+
+
+class TripleIndex:
+    """
+    Column arrays plus inverted indices over a triples table.
+
+    - ``token -> triple ids`` over the same text the original scan scored
+      (``"e1 --rel--> e2 | src: source"``), with per-triple token counts;
+    - ``normalized entity name -> triple ids`` (once per matching side) for
+      the exact-substring boost.
+
+    Both are stored CSR-style (keys, offsets, flat int32 ids) so they can be
+    persisted to and loaded from a single ``.npz`` file without pickling.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, List[Any]],
+        tokens: List[str],
+        token_offsets: np.ndarray,
+        token_postings: np.ndarray,
+        doc_lengths: np.ndarray,
+        entity_names: List[str],
+        entity_offsets: np.ndarray,
+        entity_postings: np.ndarray,
+    ):
+        self.columns = columns
+        self.size = len(doc_lengths)
+        self.token_offsets = token_offsets
+        self.token_postings = token_postings
+        self.doc_lengths = doc_lengths
+        self.entity_offsets = entity_offsets
+        self.entity_postings = entity_postings
+        self.token_ids = {token: i for i, token in enumerate(tokens)}
+        self.entity_ids = {name: i for i, name in enumerate(entity_names)}
+        self.max_entity_length = max((len(name) for name in entity_names), default=0)
+        self._tokens = tokens
+        self._entity_names = entity_names
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "TripleIndex":
+        columns = {col: df[col].tolist() for col in TRIPLE_COLUMNS}
+        token_postings: Dict[str, List[int]] = {}
+        entity_postings: Dict[str, List[int]] = {}
+        doc_lengths = np.zeros(len(df), dtype=np.int32)
+        rows = zip(columns["entity1"], columns["relation"], columns["entity2"], columns["source"])
+        for idx, (e1, rel, e2, src) in enumerate(rows):
+            tokens = set(_tokenize(f"{e1} --{rel}--> {e2} | src: {src}"))
+            doc_lengths[idx] = len(tokens)
+            for token in tokens:
+                token_postings.setdefault(token, []).append(idx)
+            for ent in (e1, e2):
+                name = _normalize(str(ent))
+                if name:
+                    entity_postings.setdefault(name, []).append(idx)
+        tokens, token_offsets, token_ids = _to_csr(token_postings)
+        names, entity_offsets, entity_ids = _to_csr(entity_postings)
+        return cls(
+            columns, tokens, token_offsets, token_ids, doc_lengths, names, entity_offsets, entity_ids
+        )
+
+    @classmethod
+    def load(cls, path: str, source_digest: str) -> Optional["TripleIndex"]:
+        """Load a persisted index; ``None`` if missing, stale or unreadable."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = _from_json_blob(data["meta"])
+                if meta.get("version") != INDEX_FORMAT_VERSION or meta.get("source_sha256") != source_digest:
+                    return None
+                return cls(
+                    _from_json_blob(data["columns"]),
+                    _from_json_blob(data["tokens"]),
+                    data["token_offsets"],
+                    data["token_postings"],
+                    data["doc_lengths"],
+                    _from_json_blob(data["entity_names"]),
+                    data["entity_offsets"],
+                    data["entity_postings"],
+                )
+        except Exception as exc:
+            logger.warning("Ignoring unreadable GraphRAG index %s: %s", path, exc)
+            return None
+
+    def save(self, path: str, source_digest: str) -> None:
+        """Write the index atomically next to its source file."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    meta=_json_blob({"version": INDEX_FORMAT_VERSION, "source_sha256": source_digest}),
+                    columns=_json_blob(self.columns),
+                    tokens=_json_blob(self._tokens),
+                    token_offsets=self.token_offsets,
+                    token_postings=self.token_postings,
+                    doc_lengths=self.doc_lengths,
+                    entity_names=_json_blob(self._entity_names),
+                    entity_offsets=self.entity_offsets,
+                    entity_postings=self.entity_postings,
+                )
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Could not persist GraphRAG index %s: %s", path, exc)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _postings(self, offsets: np.ndarray, postings: np.ndarray, key_id: int) -> np.ndarray:
+        return postings[offsets[key_id] : offsets[key_id + 1]]
+
+    def token_matches(self, q_tokens: Set[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Candidate triple ids and how many query tokens each contains."""
+        lists = [
+            self._postings(self.token_offsets, self.token_postings, self.token_ids[t])
+            for t in q_tokens
+            if t in self.token_ids
+        ]
+        if not lists:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(lists), return_counts=True)
+
+    def entity_matches(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Triple ids whose entity names occur in ``query``, with the number of matching sides."""
+        q = _normalize(query)
+        matched: Set[int] = set()
+        for start in range(len(q)):
+            for end in range(start + 1, min(len(q), start + self.max_entity_length) + 1):
+                name_id = self.entity_ids.get(q[start:end])
+                if name_id is not None:
+                    matched.add(name_id)
+        if not matched:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+        lists = [self._postings(self.entity_offsets, self.entity_postings, i) for i in matched]
+        return np.unique(np.concatenate(lists), return_counts=True)
+
+    def row(self, idx: int) -> Dict[str, Any]:
+        return {col: self.columns[col][idx] for col in TRIPLE_COLUMNS}
+
+
 class GraphRAG:
-    def __init__(self, triples_path: str = TRIPLES_PATH_DEFAULT):
+    def __init__(
+        self,
+        triples_path: str = TRIPLES_PATH_DEFAULT,
+        index_path: Optional[str] = None,
+        persist_index: bool = True,
+    ):
+        """
+        Args:
+            triples_path: CSV file with one triple per row.
+            index_path: Where to persist the search index; defaults to a
+                sidecar next to the triples file.
+            persist_index: Reuse/write the sidecar. It is keyed by the SHA-256
+                of the triples file, so an edited file is re-indexed.
+        """
         self.triples_path = triples_path
-        self.df = self._load_triples(triples_path)
-        self.G = self._build_graph(self.df)
-        # Precompute simple indices
-        self.entity_texts = self._build_entity_texts()
-        self.triple_texts = self._build_triple_texts()
+        self.index_path = index_path or f"{triples_path}{INDEX_SUFFIX}"
+        self._df: Optional[pd.DataFrame] = None
+        digest = _file_digest(triples_path) if persist_index else ""
+        index = TripleIndex.load(self.index_path, digest) if persist_index else None
+        self.index_loaded_from_disk = index is not None
+        if index is None:
+            self._df = self._load_triples(triples_path)
+            index = TripleIndex.build(self._df)
+            if persist_index:
+                index.save(self.index_path, digest)
+        self.index = index
+        self.G = self._build_graph(index.columns)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """The triples table (rebuilt from the index when it was loaded from disk)."""
+        if self._df is None:
+            self._df = pd.DataFrame(self.index.columns, columns=list(TRIPLE_COLUMNS))
+        return self._df
 
     def _load_triples(self, path: str) -> pd.DataFrame:
         df = pd.read_csv(path)
-        expected_cols = {
-            "entity1",
-            "entity1_type",
-            "relation",
-            "entity2",
-            "entity2_type",
-            "pdf_name",
-            "source",
-        }
+        expected_cols = set(TRIPLE_COLUMNS)
         missing = expected_cols - set(df.columns)
         if missing:
             raise ValueError(f"Triples file missing required columns: {missing}")
         return df.fillna("")
 
-    def _build_graph(self, df: pd.DataFrame) -> nx.MultiDiGraph:
+    def _build_graph(self, columns: Dict[str, List[Any]]) -> nx.MultiDiGraph:
         G = nx.MultiDiGraph()
-        for _, row in df.iterrows():
-            e1 = str(row["entity1"]).strip()
-            e2 = str(row["entity2"]).strip()
-            rel = str(row["relation"]).strip()
-            e1t = str(row["entity1_type"]).strip()
-            e2t = str(row["entity2_type"]).strip()
-            pdf = str(row["pdf_name"]).strip()
-            src = str(row["source"]).strip()
-
+        rows = list(
+            zip(*(
+                [str(v).strip() for v in columns[col]] for col in TRIPLE_COLUMNS
+            ))
+        )
+        for e1, e1t, rel, e2, e2t, pdf, src in rows:
             if e1:
                 G.add_node(e1, type=e1t)
             if e2:
                 G.add_node(e2, type=e2t)
-            if e1 and e2:
-                G.add_edge(e1, e2, relation=rel, pdf_name=pdf, source=src)
+        G.add_edges_from(
+            (e1, e2, {"relation": rel, "pdf_name": pdf, "source": src})
+            for e1, e1t, rel, e2, e2t, pdf, src in rows
+            if e1 and e2
+        )
         return G
 
-    def _build_entity_texts(self) -> Dict[str, Set[str]]:
-        # For each entity, collect tokens from its name and connected sources
-        ent_tokens: Dict[str, Set[str]] = {}
-        for n, data in self.G.nodes(data=True):
-            toks = set(_tokenize(n))
-            ent_tokens[n] = toks
-        # Augment with neighbor edge source tokens
-        for u, v, k, data in self.G.edges(keys=True, data=True):
-            for node in (u, v):
-                ent_tokens.setdefault(node, set()).update(
-                    _tokenize(data.get("relation", ""))
-                )
-                ent_tokens[node].update(_tokenize(data.get("source", "")))
-        return ent_tokens
-
-    def _build_triple_texts(self) -> List[Tuple[int, str, Set[str]]]:
-        texts: List[Tuple[int, str, Set[str]]] = []
-        for idx, (_, row) in enumerate(self.df.iterrows()):
-            s = f"{row['entity1']} --{row['relation']}--> {row['entity2']} | src: {row['source']}"
-            texts.append((idx, s, set(_tokenize(s))))
-        return texts
-
-    def _score(self, q_tokens: Set[str], doc_tokens: Set[str]) -> float:
-        if not q_tokens or not doc_tokens:
-            return 0.0
-        inter = q_tokens & doc_tokens
-        return len(inter) / (len(q_tokens) ** 0.5 * len(doc_tokens) ** 0.5)
-
     def search_triples(self, query: str, top_k: int = 15) -> List[Dict[str, Any]]:
+        """
+        Rank triples by token overlap (cosine over token sets) plus a boost of
+        ``ENTITY_MATCH_BOOST`` per entity whose name occurs in the query.
+
+        Only triples sharing a token or an entity name with the query are
+        scored; the remaining slots of ``top_k`` are filled with zero-score
+        triples in file order, as a full scan would rank them.
+        """
         q_tokens = set(_tokenize(query))
-        if not q_tokens:
+        if not q_tokens or top_k <= 0:
             return []
-        scored = []
-        for idx, text, tokens in self.triple_texts:
-            base = self._score(q_tokens, tokens)
-            # Boost if entity name exact substring matches
-            row = self.df.iloc[idx]
+        index = self.index
+        scores: Dict[int, float] = {}
+
+        ids, counts = index.token_matches(q_tokens)
+        if len(ids):
+            base = counts / (len(q_tokens) ** 0.5 * index.doc_lengths[ids] ** 0.5)
+            scores.update(zip(ids.tolist(), base.tolist()))
+
+        ids, sides = index.entity_matches(query)
+        for idx, n in zip(ids.tolist(), sides.tolist()):
             boost = 0.0
-            for ent in (row["entity1"], row["entity2"]):
-                if _normalize(ent) and _normalize(ent) in _normalize(query):
-                    boost += 0.3
-            scored.append((base + boost, idx))
-        scored.sort(key=lambda x: x[0], reverse=True)
+            for _ in range(n):
+                boost += ENTITY_MATCH_BOOST
+            scores[idx] = scores.get(idx, 0.0) + boost
+
+        # Ties keep file order, like the stable sort of a full scan.
+        ranked = heapq.nlargest(top_k, ((sc, -idx) for idx, sc in scores.items()))
+        top = [(sc, -neg) for sc, neg in ranked]
+        if len(top) < top_k:
+            filler = (i for i in range(index.size) if i not in scores)
+            top.extend((0.0, i) for _, i in zip(range(top_k - len(top)), filler))
+
         results = []
-        for sc, idx in scored[:top_k]:
-            row = self.df.iloc[idx]
-            results.append({
-                "score": round(float(sc), 4),
-                "entity1": row["entity1"],
-                "entity1_type": row["entity1_type"],
-                "relation": row["relation"],
-                "entity2": row["entity2"],
-                "entity2_type": row["entity2_type"],
-                "pdf_name": row["pdf_name"],
-                "source": row["source"],
-            })
+        for sc, idx in top:
+            results.append({"score": round(float(sc), 4), **index.row(idx)})
         return results
 
     def expand_subgraph(
@@ -158,9 +351,12 @@ class GraphRAG:
         for n in nodes:
             if n in self.G:
                 SG.add_node(n, **self.G.nodes[n])
-        for u, v, k, data in self.G.edges(keys=True, data=True):
-            if u in nodes and v in nodes:
-                SG.add_edge(u, v, **data)
+        # Walk only the edges leaving selected nodes, not the whole graph.
+        for u in list(SG):
+            for v, keyed in self.G.succ[u].items():
+                if v in nodes:
+                    for data in keyed.values():
+                        SG.add_edge(u, v, **data)
         return SG
 
     def subgraph_to_json(self, SG: nx.MultiDiGraph) -> Dict[str, Any]:
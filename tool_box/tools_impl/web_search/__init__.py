@@ -15,7 +15,12 @@ web_search_tool = {
         "properties": {
             "query": {
                 "type": "string",
-                "description": "需要检索的查询字符串",
+                "description": "需要检索的查询字符串（与 queries 至少提供一个）",
+            },
+            "queries": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "批量查询（可选），多个查询并发执行，结果按顺序返回",
             },
             "provider": {
                 "type": "string",
@@ -30,7 +35,6 @@ web_search_tool = {
                 "maximum": 20,
             },
         },
-        "required": ["query"],
     },
     "handler": web_search_handler,
     "tags": [
@@ -0,0 +1,100 @@
+"""
+Result cache for web search.
+
+Every provider answers a query with a full LLM-backed search call, so sibling
+plan nodes that ask near-identical questions used to pay for the same search
+several times.  Results are cached per provider variant (provider, upstream
+model) on a normalized query, expire after ``WEB_SEARCH_CACHE_TTL`` seconds and
+concurrent identical searches are coalesced into a single upstream call, even
+across the worker threads/event loops used by plan decomposition.
+
+Only successful results are cached; provider errors are shared with coalesced
+waiters but never stored.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from typing import Optional, Tuple
+
+from app.config import SearchSettings, get_search_settings
+from app.services.llm.response_cache import LLMResponseCache, make_key
+
+# 查询首尾常见的标点（中英文问号、句号等），不影响检索语义
+_EDGE_PUNCTUATION = " \t\r\n?？!！.。,，;；:：、\"'“”‘’`"
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Fold width/case and collapse whitespace so trivially different queries share a cache entry."""
+    text = unicodedata.normalize("NFKC", str(query or "")).casefold()
+    text = _WHITESPACE.sub(" ", text)
+    return text.strip(_EDGE_PUNCTUATION)
+
+
+def provider_variant(provider_name: str, settings: SearchSettings) -> Tuple[str, Optional[str]]:
+    """
+    Identify the upstream that would answer a query for ``provider_name``.
+
+    ``builtin`` delegates to a configurable model provider, so switching
+    ``BUILTIN_SEARCH_PROVIDER`` or the model must not serve stale answers.
+    """
+    if provider_name == "builtin":
+        upstream = (settings.builtin_provider or "qwen").lower()
+        model = settings.glm_model if upstream == "glm" else settings.qwen_model
+        return f"builtin:{upstream}", model
+    if provider_name == "perplexity":
+        return provider_name, settings.perplexity_model
+    return provider_name, None
+
+
+def search_cache_key(
+    provider_name: str,
+    query: str,
+    max_results: int,
+    settings: SearchSettings,
+) -> str:
+    provider, model = provider_variant(provider_name, settings)
+    return make_key(provider, model, normalize_query(query), {"max_results": int(max_results)})
+
+
+_search_cache: Optional[LLMResponseCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> LLMResponseCache:
+    """Process-wide web search result cache."""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            settings = get_search_settings()
+            _search_cache = LLMResponseCache(
+                max_entries=settings.cache_max_entries,
+                ttl_seconds=settings.cache_ttl,
+            )
+        return _search_cache
+
+
+def reset_search_cache() -> None:
+    """Drop the cache so the next lookup picks up fresh settings."""
+    global _search_cache
+    with _search_cache_lock:
+        _search_cache = None
+
+
+def get_search_cache_stats() -> dict:
+    stats = get_search_cache().get_stats()
+    stats["enabled"] = get_search_settings().cache_enabled
+    return stats
+
+
+__all__ = [
+    "normalize_query",
+    "provider_variant",
+    "search_cache_key",
+    "get_search_cache",
+    "get_search_cache_stats",
+    "reset_search_cache",
+]
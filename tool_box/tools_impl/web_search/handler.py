@@ -1,12 +1,12 @@
 import logging
 from dataclasses import asdict
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from app.config import get_search_settings
 
 from .exceptions import WebSearchError
 from .result import WebSearchResult
-from .router import dispatch
+from .router import dispatch, dispatch_many
 
 logger = logging.getLogger(__name__)
 
@@ -34,20 +34,139 @@ def _failure_payload(query: str, provider: str, code: str, message: str, *, meta
     return payload
 
 
-async def web_search_handler(
+async def _recover(
+    exc: WebSearchError,
+    *,
     query: str,
+    requested_provider: Optional[str],
+    max_results: int,
+    settings: Any,
+    include_raw: bool,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    logger.warning(
+        "Web search provider error: %s",
+        exc.message,
+        extra={"provider": exc.provider, "code": exc.code},
+    )
+
+    # 自动兜底：builtin 失败时尝试切换到 perplexity
+    if exc.provider == "builtin" and (
+        requested_provider is None or requested_provider == "builtin"
+    ):
+        try:
+            fallback_result = await dispatch(
+                query=query,
+                provider="perplexity",
+                max_results=max_results,
+                settings=settings,
+                **kwargs,
+            )
+            payload = _format_success(fallback_result, include_raw=include_raw)
+            payload["fallback_from"] = "builtin"
+            return payload
+        except WebSearchError as fallback_exc:
+            logger.error(
+                "Fallback web search failed: %s",
+                fallback_exc.message,
+                extra={"provider": fallback_exc.provider, "code": fallback_exc.code},
+            )
+            return _failure_payload(
+                query,
+                fallback_exc.provider,
+                fallback_exc.code,
+                fallback_exc.message,
+                meta=fallback_exc.meta,
+            )
+
+    return _failure_payload(query, exc.provider, exc.code, exc.message, meta=exc.meta)
+
+
+async def _batch_search(
+    queries: List[str],
+    *,
+    requested_provider: Optional[str],
+    max_results: int,
+    settings: Any,
+    include_raw: bool,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    outcomes = await dispatch_many(
+        queries=queries,
+        provider=requested_provider,
+        max_results=max_results,
+        settings=settings,
+        **kwargs,
+    )
+    items: List[Dict[str, Any]] = []
+    for query, outcome in zip(queries, outcomes):
+        if isinstance(outcome, WebSearchError):
+            items.append(
+                await _recover(
+                    outcome,
+                    query=query,
+                    requested_provider=requested_provider,
+                    max_results=max_results,
+                    settings=settings,
+                    include_raw=include_raw,
+                    **kwargs,
+                )
+            )
+        else:
+            items.append(_format_success(outcome, include_raw=include_raw))
+    succeeded = sum(1 for item in items if item.get("success"))
+    return {
+        "queries": queries,
+        "provider": requested_provider or settings.default_provider,
+        "results": items,
+        "total_queries": len(items),
+        "succeeded": succeeded,
+        "success": succeeded > 0,
+        "error": None if succeeded else "All batched searches failed",
+    }
+
+
+async def web_search_handler(
+    query: Optional[str] = None,
     max_results: int = 5,
     provider: Optional[str] = None,
     include_raw: bool = False,
+    queries: Optional[List[str]] = None,
     **kwargs: Any,
 ) -> Dict[str, Any]:
     """
     Web search entry point exposed to toolbox integration.
+
+    Pass ``queries`` to run several searches concurrently; the payload then
+    carries one result per query, in order.
     """
 
     settings = get_search_settings()
     requested_provider = (provider or "").strip().lower() or None
 
+    if queries:
+        batch = [str(q) for q in queries if str(q or "").strip()]
+        if query and str(query).strip():
+            batch.insert(0, str(query))
+        try:
+            return await _batch_search(
+                batch,
+                requested_provider=requested_provider,
+                max_results=max_results,
+                settings=settings,
+                include_raw=include_raw,
+                **kwargs,
+            )
+        except Exception as exc:  # pragma: no cover - defensive path
+            logger.exception("Unexpected batched web search failure")
+            provider_name = requested_provider or settings.default_provider
+            return _failure_payload(" | ".join(batch), provider_name, "unexpected_error", str(exc))
+
+    if not query or not str(query).strip():
+        return _failure_payload(
+            "", requested_provider or settings.default_provider, "missing_query", "query or queries is required"
+        )
+
     try:
         result = await dispatch(
             query=query,
@@ -58,42 +177,15 @@ async def web_search_handler(
         )
         return _format_success(result, include_raw=include_raw)
     except WebSearchError as exc:
-        logger.warning(
-            "Web search provider error: %s",
-            exc.message,
-            extra={"provider": exc.provider, "code": exc.code},
+        return await _recover(
+            exc,
+            query=query,
+            requested_provider=requested_provider,
+            max_results=max_results,
+            settings=settings,
+            include_raw=include_raw,
+            **kwargs,
         )
-
-        # 自动兜底：builtin 失败时尝试切换到 perplexity
-        if exc.provider == "builtin" and (
-            requested_provider is None or requested_provider == "builtin"
-        ):
-            try:
-                fallback_result = await dispatch(
-                    query=query,
-                    provider="perplexity",
-                    max_results=max_results,
-                    settings=settings,
-                    **kwargs,
-                )
-                payload = _format_success(fallback_result, include_raw=include_raw)
-                payload["fallback_from"] = "builtin"
-                return payload
-            except WebSearchError as fallback_exc:
-                logger.error(
-                    "Fallback web search failed: %s",
-                    fallback_exc.message,
-                    extra={"provider": fallback_exc.provider, "code": fallback_exc.code},
-                )
-                return _failure_payload(
-                    query,
-                    fallback_exc.provider,
-                    fallback_exc.code,
-                    fallback_exc.message,
-                    meta=fallback_exc.meta,
-                )
-
-        return _failure_payload(query, exc.provider, exc.code, exc.message, meta=exc.meta)
     except Exception as exc:  # pragma: no cover - defensive path
         logger.exception("Unexpected web search failure")
         provider_name = requested_provider or settings.default_provider
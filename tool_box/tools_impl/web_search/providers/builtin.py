@@ -1,12 +1,15 @@
 import json
 import logging
 import re
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import aiohttp
 
 from app.config import SearchSettings
+from app.services.foundation.settings import get_settings
+from app.services.llm.rate_limiter import get_rate_limiter, parse_retry_after
+from app.services.llm.response_cache import estimate_tokens
 
 from ..exceptions import WebSearchError
 from ..result import WebSearchResult
@@ -83,6 +86,13 @@ def _parse_content(content: Any, max_results: int) -> Tuple[str, List[Dict[str,
     return answer, references[:max_results]
 
 
+def _usage_tokens(data: Any) -> Optional[int]:
+    try:
+        return int(data["usage"]["total_tokens"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
 async def search(
     *,
     query: str,
@@ -141,11 +151,23 @@ async def search(
 
     timeout = aiohttp.ClientTimeout(total=settings.builtin_request_timeout)
 
+    # Same account quota as chat completions, so share the provider's limiter.
+    rate_limiter = get_rate_limiter(provider_name)
+    reserved = estimate_tokens(*(m["content"] for m in messages)) + int(
+        getattr(get_settings(), "llm_rate_completion_reserve", 512)
+    )
+    await rate_limiter.acquire_async(reserved)
+
     try:
         async with aiohttp.ClientSession(timeout=timeout) as session:
             async with session.post(api_url, headers=headers, json=payload) as response:
                 raw_text = await response.text()
                 if response.status != 200:
+                    rate_limiter.record_failure(
+                        response.status,
+                        retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                        reserved_tokens=reserved,
+                    )
                     raise WebSearchError(
                         code="http_error",
                         message=f"HTTP {response.status}: {raw_text}",
@@ -155,15 +177,18 @@ async def search(
                 try:
                     data = json.loads(raw_text)
                 except json.JSONDecodeError as exc:
+                    rate_limiter.record_success(reserved)
                     raise WebSearchError(
                         code="invalid_response",
                         message=f"Invalid JSON response: {exc}",
                         provider="builtin",
                     ) from exc
+                rate_limiter.record_success(reserved, _usage_tokens(data))
 
     except WebSearchError:
         raise
     except Exception as exc:  # pragma: no cover - network/runtime
+        rate_limiter.record_failure(reserved_tokens=reserved)
         logger.error("Builtin search request failed: %s", exc)
         raise WebSearchError(
             code="request_failed",
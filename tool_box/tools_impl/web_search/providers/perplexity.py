@@ -1,10 +1,12 @@
 import json
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import aiohttp
 
 from app.config import SearchSettings
+from app.services.llm.rate_limiter import get_rate_limiter, parse_retry_after
+from app.services.llm.response_cache import estimate_tokens
 
 from ..exceptions import WebSearchError
 from ..result import WebSearchResult
@@ -30,6 +32,13 @@ def _format_results(answer: str) -> List[Dict[str, Any]]:
     ]
 
 
+def _usage_tokens(data: Any) -> Optional[int]:
+    try:
+        return int(data["usage"]["total_tokens"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
 async def search(
     *,
     query: str,
@@ -65,11 +74,20 @@ async def search(
         "stream": False,
     }
 
+    rate_limiter = get_rate_limiter("perplexity")
+    reserved = estimate_tokens(SYSTEM_PROMPT, query) + payload["max_tokens"]
+    await rate_limiter.acquire_async(reserved)
+
     try:
         async with aiohttp.ClientSession(timeout=timeout) as session:
             async with session.post(api_url, headers=headers, json=payload) as response:
                 text = await response.text()
                 if response.status != 200:
+                    rate_limiter.record_failure(
+                        response.status,
+                        retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                        reserved_tokens=reserved,
+                    )
                     raise WebSearchError(
                         code="http_error",
                         message=f"HTTP {response.status}: {text}",
@@ -79,14 +97,17 @@ async def search(
                 try:
                     data = json.loads(text)
                 except json.JSONDecodeError as exc:
+                    rate_limiter.record_success(reserved)
                     raise WebSearchError(
                         code="invalid_response",
                         message=f"Invalid JSON payload: {exc}",
                         provider="perplexity",
                     ) from exc
+                rate_limiter.record_success(reserved, _usage_tokens(data))
     except WebSearchError:
         raise
     except Exception as exc:  # pragma: no cover - network/runtime
+        rate_limiter.record_failure(reserved_tokens=reserved)
         logger.error("Perplexity search failed: %s", exc)
         raise WebSearchError(
             code="request_failed",
@@ -1,7 +1,11 @@
-from typing import Any, Optional
+import asyncio
+from dataclasses import replace
+from typing import Any, List, Optional, Sequence, Union
 
 from app.config import SearchSettings, get_search_settings
+from app.services.llm.response_cache import estimate_tokens
 
+from .cache import get_search_cache, search_cache_key
 from .exceptions import WebSearchError
 from .providers import get_provider, init_default_providers
 from .result import WebSearchResult
@@ -22,6 +26,7 @@ async def dispatch(
     provider: Optional[str],
     max_results: int,
     settings: Optional[SearchSettings] = None,
+    use_cache: Optional[bool] = None,
     **kwargs: Any,
 ) -> WebSearchResult:
     _ensure_initialised()
@@ -37,9 +42,58 @@ async def dispatch(
             provider=provider_name,
         )
 
-    return await func(
-        query=query,
-        max_results=max_results,
-        settings=settings,
-        **kwargs,
-    )
+    computed = False
+
+    async def _search():
+        nonlocal computed
+        computed = True
+        result = await func(
+            query=query,
+            max_results=max_results,
+            settings=settings,
+            **kwargs,
+        )
+        return result, estimate_tokens(result.response)
+
+    bypass = not settings.cache_enabled if use_cache is None else not use_cache
+    key = search_cache_key(provider_name, query, max_results, settings)
+    result = await get_search_cache().get_or_compute_async(key, _search, bypass=bypass)
+    if computed:
+        return result
+    # 命中缓存或合并到进行中的请求：返回副本，保留调用方自己的 query
+    return replace(result, query=query, meta={**result.meta, "cache_hit": True})
+
+
+async def dispatch_many(
+    *,
+    queries: Sequence[str],
+    provider: Optional[str],
+    max_results: int,
+    settings: Optional[SearchSettings] = None,
+    max_concurrency: Optional[int] = None,
+    **kwargs: Any,
+) -> List[Union[WebSearchResult, WebSearchError]]:
+    """
+    Run several searches concurrently, in input order.
+
+    Duplicate queries are coalesced by the result cache; a failing query yields
+    its ``WebSearchError`` in place instead of failing the whole batch.
+    """
+    settings = settings or get_search_settings()
+    limit = max(1, int(max_concurrency or settings.batch_concurrency))
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _one(item: str) -> Union[WebSearchResult, WebSearchError]:
+        async with semaphore:
+            try:
+                return await dispatch(
+                    query=item,
+                    provider=provider,
+                    max_results=max_results,
+                    settings=settings,
+                    **kwargs,
+                )
+            except WebSearchError as exc:
+                return exc
+
+    return list(await asyncio.gather(*(_one(q) for q in queries)))